@@ -1,10 +1,8 @@
-import json
-import logging
-import os
 from typing import Any, Dict
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+from lex_runtime.log import get_logger, log_event
+
+logger = get_logger()
 
 
 def handler(event: Dict[str, Any], context=None):
@@ -12,7 +10,7 @@ def handler(event: Dict[str, Any], context=None):
     Handler for address change Lambda fulfillment
     """
 
-    logger.debug('Event: %s', json.dumps(event, indent=2))
+    log_event(logger, event)
 
     if event['invocationSource'] != 'FulfillmentCodeHook':
         raise Exception(f'{event["invocationSource"]} is not implemented yet')
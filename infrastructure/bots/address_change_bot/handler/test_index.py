@@ -4,6 +4,16 @@ import sys
 
 # Add the parent directory to sys.path to import the handler module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The lex_runtime layer, which Lambda adds to the path
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        *['..'] * 3,
+        'lambda_layers',
+        'lex_runtime',
+        'python',
+    )
+)
 from handler.index import handler
 
 
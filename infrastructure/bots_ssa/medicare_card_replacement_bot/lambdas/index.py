@@ -1,11 +1,98 @@
-import json
-import logging
-import os
 import random
 from typing import Any, Dict
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+from lex_runtime.fsm import DialogMachine
+from lex_runtime.lexicon import YES_NO
+from lex_runtime.log import get_logger, log_event
+
+logger = get_logger()
+
+NO_AGREEMENT = 'Without your agreement, I will not be able to help you with anything that requires access to personal information. Hold on while I get someone to help you.'
+
+MACHINE = DialogMachine(
+    name='medicare_card_replacement',
+    intents={
+        'ProcessMedicareCardReplacement': 'privacyAcknowledgment',
+        'ReturnToMenu': 'goodbye',
+        'Finished': 'goodbye',
+    },
+    default='delegate',
+    states={
+        # Step 1: Privacy acknowledgment
+        'privacyAcknowledgment': {
+            'slot': 'privacyAcknowledgment',
+            'prompt': 'Before I can access your records, I will need to ask a question or two to verify who you are. Social Security is allowed to collect this information under the Social Security Act and the collect meets the requirements of the Paperwork Reduction Act under OMB number 0 9 6 0 0 5 9 6. The whole process should take about four minutes. To hear detailed information about the Privacy Act or Paperwork Reduction Act, say more information. Otherwise, say continue.',
+            'lexicon': YES_NO,
+            # Only the whole answers the prompts ask for, 'I know' is not a no
+            'match': {'more': ['*more*'], 'yes': ['continue']},
+            'on': {
+                'more': {
+                    'say': 'Privacy and Paperwork Reduction Act. Say Continue if you agree.'
+                },
+                'no': 'privacyDeclined',
+                'yes': {
+                    'next': 'termsAgreement',
+                    'set': {'privacyAcknowledged': 'true'},
+                },
+                'other': {
+                    'say': 'Please say continue to proceed, or say more information for details about the Privacy Act.'
+                },
+            },
+        },
+        'privacyDeclined': {
+            'close': NO_AGREEMENT,
+            'set': {'action': 'TransferToAgent', 'reason': 'PrivacyDeclined'},
+        },
+        # Step 2: Terms agreement
+        'termsAgreement': {
+            'slot': 'termsAgreement',
+            'prompt': 'Please note that any person who makes a false representation in an effort to alter or obtain information from the Social Security Administration may be punished by a fine or imprisonment or both. Do you understand and agree to these terms?',
+            'lexicon': YES_NO,
+            'match': {'yes': ['agree', 'i agree'], 'no': ['disagree', 'i disagree']},
+            'on': {
+                'no': 'termsDeclined',
+                'yes': {
+                    'next': 'socialSecurityNumber',
+                    'set': {'termsAgreed': 'true'},
+                },
+                'other': {
+                    'say': 'Please say yes or agree to continue, or say no if you disagree.'
+                },
+            },
+        },
+        'termsDeclined': {
+            'close': NO_AGREEMENT,
+            'set': {'action': 'TransferToAgent', 'reason': 'TermsDeclined'},
+        },
+        # Steps 3 to 6: Social Security Number, date of birth and name
+        'socialSecurityNumber': {
+            'slot': 'socialSecurityNumber',
+            'prompt': 'Please provide your Social Security number.',
+            'on': {'other': 'dateOfBirth'},
+        },
+        'dateOfBirth': {
+            'slot': 'dateOfBirth',
+            'prompt': 'Please provide your date of birth.',
+            'on': {'other': 'firstName'},
+        },
+        'firstName': {
+            'slot': 'firstName',
+            'prompt': 'Please provide your first name.',
+            'on': {'other': 'lastName'},
+        },
+        'lastName': {
+            'slot': 'lastName',
+            'prompt': 'Please provide your last name.',
+            'on': {'other': 'fulfill'},
+        },
+        # All slots filled - fulfill
+        'fulfill': {'fulfill': True},
+        'goodbye': {'close': 'Thank you for calling.'},
+        'delegate': {
+            'delegate': "Thank you. I've got everything I need. Hold on while I submit this."
+        },
+    },
+)
 
 
 class MedicareCardReplacementHandler:
@@ -15,7 +102,7 @@ class MedicareCardReplacementHandler:
 
     def handler(self, event: Dict[str, Any], context=None) -> Dict[str, Any]:
         """Route to dialog_hook() or fulfillment_hook()"""
-        logger.debug('Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event)
 
         invocation_source = event.get('invocationSource')
         if invocation_source == 'DialogCodeHook':
@@ -25,208 +112,9 @@ class MedicareCardReplacementHandler:
         else:
             raise ValueError(f'Unknown invocation source: {invocation_source}')
 
-    def get_slot_value(self, slots, slot_name):
-        """Safely extract slot value, handling None cases"""
-        slot = slots.get(slot_name)
-        if not slot or not isinstance(slot, dict):
-            return ''
-
-        value = slot.get('value', {})
-        if not isinstance(value, dict):
-            return ''
-
-        return (
-            value.get('interpretedValue', '') or value.get('originalValue', '')
-        ).lower()
-
     def dialog_hook(self, event):
-        """Handle dialog hook"""
-        intent_object = event['sessionState']['intent']
-        intent_name = self.get_intent_name(event)
-        slots = self.get_slots(event)
-        session_attributes = self.get_session_attributes(event)
-
-        if intent_name == 'ProcessMedicareCardReplacement':
-            # Step 1: Privacy acknowledgment
-            if not session_attributes.get('privacyAcknowledged') == 'true':
-                # This block executes if privacy has NOT YET been acknowledged in the session.
-                if not slots.get('privacyAcknowledgment'):
-                    # Elicit slot if it's not present in the current event (first time asking)
-                    return self.elicit_slot_response(
-                        slot_name='privacyAcknowledgment',
-                        message='Before I can access your records, I will need to ask a question or two to verify who you are. Social Security is allowed to collect this information under the Social Security Act and the collect meets the requirements of the Paperwork Reduction Act under OMB number 0 9 6 0 0 5 9 6. The whole process should take about four minutes. To hear detailed information about the Privacy Act or Paperwork Reduction Act, say more information. Otherwise, say continue.',
-                        session_attributes=session_attributes,
-                        intent=intent_object,
-                    )
-
-                # Slot 'privacyAcknowledgment' is present, process its value
-                privacy_value = self.get_slot_value(slots, 'privacyAcknowledgment')
-                logger.debug('Privacy value from slot: %s', privacy_value)
-
-                if 'more' in privacy_value:
-                    return self.elicit_slot_response(
-                        slot_name='privacyAcknowledgment',
-                        message='Privacy and Paperwork Reduction Act. Say Continue if you agree.',
-                        session_attributes=session_attributes,
-                        intent=intent_object,
-                    )
-
-                if 'no' in privacy_value or 'disagree' in privacy_value:
-                    session_attributes['action'] = 'TransferToAgent'
-                    session_attributes['reason'] = 'PrivacyDeclined'  # Corrected reason
-                    return self.close_response(
-                        intent_name=intent_name,
-                        message='Without your agreement, I will not be able to help you with anything that requires access to personal information. Hold on while I get someone to help you.',
-                        session_attributes=session_attributes,
-                    )
-
-                # Check if the provided value means acknowledgment
-                is_privacy_acknowledged_this_turn = (
-                    'continue' in privacy_value
-                    or 'yes' in privacy_value
-                    or 'agree' in privacy_value
-                )
-                logger.debug(
-                    'Is privacy acknowledged this turn: %s',
-                    is_privacy_acknowledged_this_turn,
-                )
-
-                if is_privacy_acknowledged_this_turn:
-                    session_attributes['privacyAcknowledged'] = 'true'
-                    logger.info('Privacy acknowledged and set in session.')
-                else:
-                    # User provided a value, but it wasn't a recognized acknowledgment
-                    if privacy_value:  # Ensure there was some input to respond to
-                        return self.elicit_slot_response(
-                            slot_name='privacyAcknowledgment',
-                            message='Please say continue to proceed, or say more information for details about the Privacy Act.',
-                            session_attributes=session_attributes,
-                            intent=intent_object,
-                        )
-                    else:
-                        # Slot was present but value was empty, or some other edge case. Delegate.
-                        logger.warning(
-                            'Privacy slot present but value unclear or not an acknowledgment. Delegating.'
-                        )
-                        return self.delegate_response(session_attributes, intent_object)
-
-            # Safeguard: If privacy is still not marked in session, something is wrong. Delegate.
-            if not session_attributes.get('privacyAcknowledged') == 'true':
-                logger.error(
-                    'Error: Privacy not acknowledged in session after privacy block. Delegating.'
-                )
-                return self.delegate_response(session_attributes, intent_object)
-
-            # Step 2: Terms agreement
-            if not session_attributes.get('termsAgreed') == 'true':
-                # This block executes if terms have NOT YET been agreed in the session.
-                if not slots.get('termsAgreement'):
-                    # Elicit slot if it's not present in the current event (first time asking)
-                    return self.elicit_slot_response(
-                        slot_name='termsAgreement',
-                        message='Please note that any person who makes a false representation in an effort to alter or obtain information from the Social Security Administration may be punished by a fine or imprisonment or both. Do you understand and agree to these terms?',
-                        session_attributes=session_attributes,
-                        intent=intent_object,
-                    )
-
-                # Slot 'termsAgreement' is present, process its value
-                terms_value = self.get_slot_value(slots, 'termsAgreement')
-                logger.debug('Terms value from slot: %s', terms_value)
-
-                if 'no' in terms_value or 'disagree' in terms_value:
-                    session_attributes['action'] = 'TransferToAgent'
-                    session_attributes['reason'] = 'TermsDeclined'
-                    return self.close_response(
-                        intent_name=intent_name,
-                        message='Without your agreement, I will not be able to help you with anything that requires access to personal information. Hold on while I get someone to help you.',
-                        session_attributes=session_attributes,
-                    )
-
-                is_terms_agreed_this_turn = (
-                    'yes' in terms_value or 'agree' in terms_value
-                )
-                logger.debug(
-                    'Are terms agreed this turn: %s', is_terms_agreed_this_turn
-                )
-
-                if is_terms_agreed_this_turn:
-                    session_attributes['termsAgreed'] = 'true'
-                    logger.info('Terms agreed and set in session.')
-                else:
-                    if terms_value:  # User provided a value, but not 'yes' or 'agree'
-                        return self.elicit_slot_response(
-                            slot_name='termsAgreement',
-                            message='Please say yes or agree to continue, or say no if you disagree.',
-                            session_attributes=session_attributes,
-                            intent=intent_object,
-                        )
-                    else:
-                        logger.warning(
-                            'Terms slot present but value unclear or not an agreement. Delegating.'
-                        )
-                        return self.delegate_response(session_attributes, intent_object)
-
-            # Safeguard: If terms are still not marked in session, something is wrong. Delegate.
-            if not session_attributes.get('termsAgreed') == 'true':
-                logger.error(
-                    'Error: Terms not agreed in session after terms block. Delegating.'
-                )
-                return self.delegate_response(session_attributes, intent_object)
-
-            # Step 3: Social Security Number
-            if not slots.get('socialSecurityNumber'):
-                return self.elicit_slot_response(
-                    slot_name='socialSecurityNumber',
-                    message='Please provide your Social Security number.',
-                    session_attributes=session_attributes,
-                    intent=intent_object,
-                )
-
-            # Step 4: Date of Birth
-            if not slots.get('dateOfBirth'):
-                return self.elicit_slot_response(
-                    slot_name='dateOfBirth',
-                    message='Please provide your date of birth.',
-                    session_attributes=session_attributes,
-                    intent=intent_object,
-                )
-
-            # Step 5: First Name
-            if not slots.get('firstName'):
-                return self.elicit_slot_response(
-                    slot_name='firstName',
-                    message='Please provide your first name.',
-                    session_attributes=session_attributes,
-                    intent=intent_object,
-                )
-
-            # Step 6: Last Name
-            if not slots.get('lastName'):
-                return self.elicit_slot_response(
-                    slot_name='lastName',
-                    message='Please provide your last name.',
-                    session_attributes=session_attributes,
-                    intent=intent_object,
-                )
-
-            # All slots filled - delegate to fulfillment
-            return self.fulfillment_hook(event)
-
-        if intent_name == 'ReturnToMenu':
-            return self.close_response(
-                intent_name=intent_name,
-                message='Thank you for calling.',
-                session_attributes=session_attributes,
-            )
-
-        if intent_name == 'Finished':
-            return self.close_response(
-                intent_name=intent_name,
-                message='Thank you for calling.',
-                session_attributes=session_attributes,
-            )
-
-        return self.delegate_response(session_attributes, intent_object)
+        """Handle dialog hook, see MACHINE"""
+        return MACHINE.handle(event, self.fulfillment_hook)
 
     def fulfillment_hook(self, event):
         """Handle fulfillment hook (Do the actual work with collected data)"""
@@ -311,33 +199,6 @@ class MedicareCardReplacementHandler:
 
     ### Helper functions to build Lex responses ###
 
-    def elicit_slot_response(self, slot_name, message, session_attributes, intent):
-        """Build "ask for slot" response"""
-        return {
-            'sessionState': {
-                'dialogAction': {'type': 'ElicitSlot', 'slotToElicit': slot_name},
-                'intent': intent,
-                'sessionAttributes': session_attributes,
-            },
-            'messages': [{'contentType': 'PlainText', 'content': message}],
-        }
-
-    def delegate_response(self, session_attributes, intent_object):
-        """Build "let Lex continue" response"""
-        return {
-            'sessionState': {
-                'dialogAction': {'type': 'Delegate'},
-                'intent': intent_object,
-                'sessionAttributes': session_attributes,
-            },
-            'messages': [
-                {
-                    'contentType': 'PlainText',
-                    'content': "Thank you. I've got everything I need. Hold on while I submit this.",
-                }
-            ],
-        }
-
     def close_response(self, message, intent_name, session_attributes):
         """Build "conversation finished" response"""
         return {
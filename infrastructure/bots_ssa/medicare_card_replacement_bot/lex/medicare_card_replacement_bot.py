@@ -122,6 +122,7 @@ class MedicareCardReplacementBot(Construct):
             function_name=f'{bot_name}-handler',
             description='Handles Medicare card replacement conversation flow',
             environment={},
+            exclude=['lex_v2_schema.json'],
         )
 
         locales: List[SimpleLocale] = [
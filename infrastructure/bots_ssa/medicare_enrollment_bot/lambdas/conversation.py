@@ -0,0 +1,261 @@
+"""
+Conversation steps of the Medicare enrollment intent
+
+CONVERSATION_STEPS is the step graph, compiled once per container into STEPS:
+steps indexed by id, with the prompts compiled from the catalog (see prompts.py)
+and the outcomes pointing at the next Step. compile_steps raises a ValueError
+for a graph with unknown prompts, missing `next` targets or unreachable steps,
+so a broken graph fails at import (and at synth, see check_prompts) instead of
+in the middle of a call.
+
+SESSION packs the conversation state into one session attribute: the current
+step, retry and metrics counters, and the answered steps as bitsets.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+# pylint: disable=import-error
+from lex_runtime.prompts import Prompt, PromptCatalog
+from lex_runtime.session import Bits, Enum, Int, SessionCodec
+from prompts import CATALOG
+
+FIRST_STEP_ID = 'step_1'
+
+# Extra Help resource limits (2025) quoted by P1375
+PROMPT_VALUES = {'individual_maximum': '$17,600', 'couple_maximum': '$35,130'}
+
+CONVERSATION_STEPS: List[Dict[str, Any]] = [
+    {
+        'id': 'step_1',
+        'attribute': 'alreadyEnrolledInMedicare',
+        'prompt': 'P1370',
+        'retry_prompt': 'P1370a',
+        'outcomes': {
+            'yes': {'next': 'step_2'},
+            'no': {'next': 'step_medicare_info'},  # formerly block_a
+        },
+    },
+    {
+        'id': 'step_2',
+        'attribute': 'needReplacementCard',
+        'prompt': 'P1372',
+        'retry_prompt': 'P1372a',
+        'outcomes': {
+            'yes': {'next': 'step_transfer_card_replacement'},
+            'no': {'next': 'step_3'},
+        },
+    },
+    {
+        'id': 'step_3',
+        'attribute': 'wantMedicationCostHelp',
+        'prompt': 'P1373',
+        'retry_prompt': 'P1373a',
+        'outcomes': {
+            'yes': {'next': 'step_4'},
+            'no': {'next': 'step_end_flow'},
+        },
+    },
+    {
+        'id': 'step_4',
+        'attribute': 'alreadyEnrolledInMedicationCostHelp_PartD',
+        'prompt': 'P1374',
+        'retry_prompt': 'P1374a',
+        'outcomes': {
+            'yes': {'next': 'step_5'},
+            'no': {'next': 'step_extra_help_info'},  # formerly block_b
+        },
+    },
+    {
+        'id': 'step_5',
+        'attribute': 'wantMedicationCostHelp_repeat',
+        'prompt': 'P1375 + P1376',
+        'retry_prompt': 'P1376a',
+        'outcomes': {
+            'yes': {'next': 'step_repeat_info'},  # formerly repeat_p1375_p1376
+            'no': {'next': 'step_6'},
+        },
+    },
+    {
+        'id': 'step_6',
+        'attribute': 'wantToReceiveApplication',
+        'prompt': 'P1377',
+        'retry_prompt': 'P1377a',
+        'outcomes': {
+            'yes': {'next': 'step_transfer_extra_help'},
+            'no': {'next': 'step_end_flow'},
+        },
+    },
+    # Former block_a - Medicare info for non-enrolled users
+    {
+        'id': 'step_medicare_info',
+        'attribute': 'wantMoreMedicareInfo',
+        'prompt': 'P1378 + P1379',  # Combined prompts
+        'retry_prompt': 'P1378',
+        'outcomes': {
+            'yes': {'next': 'step_provide_medicare_info'},
+            'no': {'next': 'step_end_flow'},
+        },
+    },
+    {
+        'id': 'step_provide_medicare_info',
+        'attribute': 'providedMedicareInfo',
+        'prompt': 'P1379',
+        'is_terminal': True,  # This step ends the conversation
+    },
+    # Former block_b - Extra Help program info
+    {
+        'id': 'step_extra_help_info',
+        'attribute': 'wantExtraHelpApplication',
+        'prompt': 'P1379 + P1380',  # Combined prompts
+        'retry_prompt': 'P1380',
+        'outcomes': {
+            'yes': {'next': 'step_transfer_extra_help'},
+            'no': {'next': 'step_end_flow'},
+        },
+    },
+    # Former repeat_p1375_p1376 - Repeat medication cost help info
+    {
+        'id': 'step_repeat_info',
+        'attribute': 'wantExtraHelpAfterRepeat',
+        'prompt': 'P1375 + P1376 + P1380',  # Combined prompts
+        'retry_prompt': 'P1380',
+        'outcomes': {
+            'yes': {'next': 'step_transfer_extra_help'},
+            'no': {'next': 'step_end_flow'},
+        },
+    },
+    # Terminal steps
+    {
+        'id': 'step_transfer_card_replacement',
+        'attribute': 'transferredToCardReplacement',
+        'prompt': 'TRANSFER_MEDICARE_CARD',
+        'is_terminal': True,
+    },
+    {
+        'id': 'step_transfer_extra_help',
+        'attribute': 'transferredToExtraHelp',
+        'prompt': 'TRANSFER_EXTRA_HELP',
+        'is_terminal': True,
+    },
+    {
+        'id': 'step_end_flow',
+        'attribute': 'conversationEnded',
+        'prompt': 'P1382',
+        'is_terminal': True,
+    },
+]
+
+
+class Step:
+    """Compiled conversation step, shared by all invocations: don't modify"""
+
+    __slots__ = ('id', 'attribute', 'message', 'retry_message', 'is_terminal', 'next')
+
+    def __init__(
+        self,
+        id: str,
+        attribute: str,
+        message: Prompt,
+        retry_message: Optional[Prompt] = None,
+        is_terminal: bool = False,
+    ):
+        self.id = id
+        self.attribute = attribute
+        self.message = message
+        self.retry_message = retry_message
+        self.is_terminal = is_terminal
+        # Outcome ('yes' or 'no') -> next Step, filled in by compile_steps
+        self.next: Dict[str, 'Step'] = {}
+
+    def __repr__(self) -> str:
+        return f'Step({self.id!r})'
+
+
+def compile_prompt(
+    prompt_id: str, catalog: PromptCatalog, values: Mapping[str, Any]
+) -> Prompt:
+    """Compile a (combined) prompt id like 'P1375 + P1376' with all fields bound"""
+    prompt = catalog.prompt(prompt_id, **values)
+    if prompt.fields:
+        raise ValueError(
+            f'No value for {", ".join(sorted(prompt.fields))} in {prompt_id!r}'
+        )
+    return prompt
+
+
+def compile_steps(
+    steps: List[Dict[str, Any]],
+    catalog: PromptCatalog = CATALOG,
+    first_step_id: str = FIRST_STEP_ID,
+    values: Mapping[str, Any] = PROMPT_VALUES,
+) -> Mapping[str, Step]:
+    """
+    Compile the step definitions into Steps indexed by id
+
+    Raises:
+        ValueError: For duplicate ids, unknown prompts, prompt fields without a
+            value, missing `next` targets, non-terminal steps without outcomes
+            or retry_prompt, or steps that can't be reached from the first step
+    """
+    compiled: Dict[str, Step] = {}
+    for definition in steps:
+        step_id = definition['id']
+        if step_id in compiled:
+            raise ValueError(f'Duplicate step {step_id}')
+        is_terminal = definition.get('is_terminal', False)
+        if not is_terminal and not definition.get('outcomes'):
+            raise ValueError(f'Step {step_id} is not terminal and has no outcomes')
+        retry_prompt = definition.get('retry_prompt')
+        if not is_terminal and not retry_prompt:
+            raise ValueError(f'Step {step_id} is not terminal and has no retry_prompt')
+        compiled[step_id] = Step(
+            step_id,
+            definition['attribute'],
+            compile_prompt(definition['prompt'], catalog, values),
+            compile_prompt(retry_prompt, catalog, values) if retry_prompt else None,
+            is_terminal,
+        )
+
+    for definition in steps:
+        step = compiled[definition['id']]
+        for outcome, target in definition.get('outcomes', {}).items():
+            if target['next'] not in compiled:
+                raise ValueError(
+                    f'Step {step.id} {outcome} goes to unknown step {target["next"]}'
+                )
+            step.next[outcome] = compiled[target['next']]
+
+    if first_step_id not in compiled:
+        raise ValueError(f'Unknown first step {first_step_id}')
+    reachable = set()
+    pending = [compiled[first_step_id]]
+    while pending:
+        step = pending.pop()
+        if step.id not in reachable:
+            reachable.add(step.id)
+            pending.extend(step.next.values())
+    unreachable = [step_id for step_id in compiled if step_id not in reachable]
+    if unreachable:
+        raise ValueError(f'Unreachable steps: {", ".join(unreachable)}')
+
+    return MappingProxyType(compiled)
+
+
+STEPS = compile_steps(CONVERSATION_STEPS)
+FIRST_STEP = STEPS[FIRST_STEP_ID]
+
+# Steps are stored by index: append new steps to CONVERSATION_STEPS
+SESSION = SessionCodec(
+    'enrollment',
+    [
+        Enum('current_step', list(STEPS)),
+        Int('retry_count'),
+        Int('steps_completed'),
+        Int('retries'),
+        Int('start_time'),
+        # Steps whose attribute was recorded, and those recorded as yes
+        Bits('answered', list(STEPS)),
+        Bits('answers', list(STEPS)),
+    ],
+)
@@ -1,14 +1,13 @@
-import json
-import logging
-import os
 import time
 from typing import Any, Dict
 
 # pylint: disable=import-error
-from message_map import MessageMap  # noqa: E402
+from conversation import FIRST_STEP, SESSION, STEPS  # noqa: E402
+from lex_runtime.lexicon import YES_NO
+from lex_runtime.log import get_logger, lazy_json, log_event
+from lex_runtime.session import SessionState
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+logger = get_logger()
 
 
 class MedicareEnrollmentHandler:
@@ -17,8 +16,9 @@ class MedicareEnrollmentHandler:
     This handler implements a unified state machine for managing Medicare enrollment conversations.
     Key features include:
 
-    - Single state tracking via 'current_step' session attribute
-    - Consolidated conversation steps in one array
+    - Single state tracking via the 'current_step' field of the session state
+      (conversation.SESSION, packed into one session attribute)
+    - Conversation steps compiled once per container (see conversation.py)
     - Explicit terminal steps with is_terminal flag
     - Support for combined prompts
     - Comprehensive metrics tracking
@@ -34,188 +34,70 @@ class MedicareEnrollmentHandler:
     def handler(self, event: Dict[str, Any], context=None):
         """Route to dialog_hook() or fulfillment_hook()"""
         invocation_source = event['invocationSource']
+        state = SESSION.state(self.get_session_attributes(event))
 
         if invocation_source == 'DialogCodeHook':
-            return self.dialog_hook(event)
+            response = self.dialog_hook(event, state)
         elif invocation_source == 'FulfillmentCodeHook':
-            return self.fulfillment_hook(event)
+            response = self.fulfillment_hook(event, state)
         else:
             raise ValueError(f'Unknown invocation source: {invocation_source}')
+        state.save(response['sessionState']['sessionAttributes'])
+        return response
 
-    def dialog_hook(self, event: Dict[str, Any]):
+    def dialog_hook(self, event: Dict[str, Any], state: SessionState):
         """Handle dialog hook
 
         This method implements a unified state machine pattern to manage the conversation flow
-        for the Medicare Enrollment intent. It tracks the current step in session attributes,
+        for the Medicare Enrollment intent. It tracks the current step in the session state,
         processes user responses, and returns appropriate Lex responses.
         """
-        logger.debug('Dialog hook - Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event, 'Dialog hook - Event')
 
         intent_object = event['sessionState']['intent']
         intent_name = self.get_intent(event)['name']
         slots = self.get_slots(event)
         session_attributes = self.get_session_attributes(event)
+        locale = self.get_locale(event)
 
         logger.debug('Dialog hook - Intent: %s, Slots: %s', intent_name, slots)
-        logger.debug('Dialog hook - Session attributes: %s', session_attributes)
+        logger.debug('Dialog hook - Session state: %s', lazy_json(state.values))
 
         if intent_name == 'MedicareEnrollment':
             logger.debug('Dialog hook - Intent: MedicareEnrollment')
 
             # Track conversation metrics
-            if 'metrics' not in session_attributes:
-                session_attributes['metrics'] = {
-                    'steps_completed': 0,
-                    'retries': 0,
-                    'start_time': str(int(time.time())),
-                }
-
-            # Define all conversation steps in a unified state machine
-            conversation_steps = [
-                {
-                    'id': 'step_1',
-                    'attribute': 'alreadyEnrolledInMedicare',
-                    'prompt': 'P1370English',
-                    'retry_prompt': 'P1370aEnglish',
-                    'outcomes': {
-                        'yes': {'next': 'step_2'},
-                        'no': {'next': 'step_medicare_info'},  # formerly block_a
-                    },
-                },
-                {
-                    'id': 'step_2',
-                    'attribute': 'needReplacementCard',
-                    'prompt': 'P1372English',
-                    'retry_prompt': 'P1372aEnglish',
-                    'outcomes': {
-                        'yes': {'next': 'step_transfer_card_replacement'},
-                        'no': {'next': 'step_3'},
-                    },
-                },
-                {
-                    'id': 'step_3',
-                    'attribute': 'wantMedicationCostHelp',
-                    'prompt': 'P1373English',
-                    'retry_prompt': 'P1373aEnglish',
-                    'outcomes': {
-                        'yes': {'next': 'step_4'},
-                        'no': {'next': 'step_end_flow'},
-                    },
-                },
-                {
-                    'id': 'step_4',
-                    'attribute': 'alreadyEnrolledInMedicationCostHelp_PartD',
-                    'prompt': 'P1374English',
-                    'retry_prompt': 'P1374aEnglish',
-                    'outcomes': {
-                        'yes': {'next': 'step_5'},
-                        'no': {'next': 'step_extra_help_info'},  # formerly block_b
-                    },
-                },
-                {
-                    'id': 'step_5',
-                    'attribute': 'wantMedicationCostHelp_repeat',
-                    'prompt': 'P1375English + P1376English',
-                    'retry_prompt': 'P1376aEnglish',
-                    'outcomes': {
-                        'yes': {
-                            'next': 'step_repeat_info'
-                        },  # formerly repeat_p1375_p1376
-                        'no': {'next': 'step_6'},
-                    },
-                },
-                {
-                    'id': 'step_6',
-                    'attribute': 'wantToReceiveApplication',
-                    'prompt': 'P1377English',
-                    'retry_prompt': 'P1377aEnglish',
-                    'outcomes': {
-                        'yes': {'next': 'step_transfer_extra_help'},
-                        'no': {'next': 'step_end_flow'},
-                    },
-                },
-                # Former block_a - Medicare info for non-enrolled users
-                {
-                    'id': 'step_medicare_info',
-                    'attribute': 'wantMoreMedicareInfo',
-                    'prompt': 'P1371English + P1378English',  # Combined prompts
-                    'retry_prompt': 'P1378English',
-                    'outcomes': {
-                        'yes': {'next': 'step_provide_medicare_info'},
-                        'no': {'next': 'step_end_flow'},
-                    },
-                },
-                {
-                    'id': 'step_provide_medicare_info',
-                    'attribute': 'providedMedicareInfo',
-                    'prompt': 'P1379English',
-                    'is_terminal': True,  # This step ends the conversation
-                },
-                # Former block_b - Extra Help program info
-                {
-                    'id': 'step_extra_help_info',
-                    'attribute': 'wantExtraHelpApplication',
-                    'prompt': 'P1379English + P1380English',  # Combined prompts
-                    'retry_prompt': 'P1380English',
-                    'outcomes': {
-                        'yes': {'next': 'step_transfer_extra_help'},
-                        'no': {'next': 'step_end_flow'},
-                    },
-                },
-                # Former repeat_p1375_p1376 - Repeat medication cost help info
-                {
-                    'id': 'step_repeat_info',
-                    'attribute': 'wantExtraHelpAfterRepeat',
-                    'prompt': 'P1375English + P1376English + P1380English',  # Combined prompts
-                    'retry_prompt': 'P1380English',
-                    'outcomes': {
-                        'yes': {'next': 'step_transfer_extra_help'},
-                        'no': {'next': 'step_end_flow'},
-                    },
-                },
-                # Terminal steps
-                {
-                    'id': 'step_transfer_card_replacement',
-                    'attribute': 'transferredToCardReplacement',
-                    'prompt': 'TRANSFER_CARD_REPLACEMENT',
-                    'is_terminal': True,
-                },
-                {
-                    'id': 'step_transfer_extra_help',
-                    'attribute': 'transferredToExtraHelp',
-                    'prompt': 'TRANSFER_EXTRA_HELP',
-                    'is_terminal': True,
-                },
-                {
-                    'id': 'step_end_flow',
-                    'attribute': 'conversationEnded',
-                    'prompt': 'P1382English',
-                    'is_terminal': True,
-                },
-            ]
+            if 'start_time' not in state:
+                state.update(
+                    {
+                        'steps_completed': 0,
+                        'retries': 0,
+                        'start_time': int(time.time()),
+                    }
+                )
 
             # Initialize conversation if needed
-            if 'step' not in session_attributes:
-                session_attributes['step'] = {}
-                session_attributes['retry_count'] = 0
-                session_attributes['current_step'] = 'step_1'
-                current_step = conversation_steps[0]  # Start with first step
+            if 'current_step' not in state:
+                state.update(
+                    {
+                        'answered': [],
+                        'answers': [],
+                        'retry_count': 0,
+                        'current_step': FIRST_STEP.id,
+                    }
+                )
 
                 # Return initial prompt
-                message = MessageMap.get_message(current_step['prompt'])
                 return self.elicit_slot_response(
                     slot_name='Confirmation',
-                    message=message,
+                    message=FIRST_STEP.message.render(locale),
                     session_attributes=session_attributes,
                     intent=intent_object,
                 )
 
             # Get current step
-            current_step_id = session_attributes.get('current_step', 'step_1')
-            current_step = next(
-                (s for s in conversation_steps if s['id'] == current_step_id),
-                conversation_steps[0],
-            )
+            current_step_id = state.get('current_step', FIRST_STEP.id)
+            current_step = STEPS.get(current_step_id, FIRST_STEP)
 
             logger.debug('Current step: %s', current_step_id)
 
@@ -224,9 +106,9 @@ class MedicareEnrollmentHandler:
             confirmation_value = None
 
             # Handle terminal steps (steps that end the conversation)
-            if current_step.get('is_terminal', False):
+            if current_step.is_terminal:
                 return self._handle_terminal_step(
-                    session_attributes, current_step, intent_name
+                    session_attributes, state, current_step, intent_name, locale
                 )
 
             # Process user's response for non-terminal steps
@@ -235,106 +117,87 @@ class MedicareEnrollmentHandler:
                     confirmation['value'].get('interpretedValue', '').lower()
                 )
                 logger.debug('Confirmation Value: %s', confirmation_value)
+                answer = YES_NO.label(confirmation_value, locale)
 
                 # Process YES response
-                if confirmation_value in [
-                    'yes',
-                    'yeah',
-                    'correct',
-                    'right',
-                    'sure',
-                    'ok',
-                    'okay',
-                ]:
+                if answer == 'yes':
                     return self._handle_step_transition(
                         session_attributes=session_attributes,
+                        state=state,
                         current_step=current_step,
                         outcome_type='yes',
-                        conversation_steps=conversation_steps,
                         intent_name=intent_name,
                         intent_object=intent_object,
                         slots=slots,
+                        locale=locale,
                     )
 
                 # Process NO response
-                elif confirmation_value in [
-                    'no',
-                    'nope',
-                    'nah',
-                    'negative',
-                    'incorrect',
-                ]:
+                elif answer == 'no':
                     return self._handle_step_transition(
                         session_attributes=session_attributes,
+                        state=state,
                         current_step=current_step,
                         outcome_type='no',
-                        conversation_steps=conversation_steps,
                         intent_name=intent_name,
                         intent_object=intent_object,
                         slots=slots,
+                        locale=locale,
                     )
 
                 # Handle invalid responses
                 else:
                     # Increment retry count
-                    retry_count = session_attributes.get('retry_count', 0) + 1
-                    session_attributes['retry_count'] = retry_count
+                    retry_count = state.get('retry_count', 0) + 1
+                    state['retry_count'] = retry_count
 
                     # Update metrics
-                    if 'metrics' in session_attributes:
-                        session_attributes['metrics']['retries'] += 1
+                    if 'retries' in state:
+                        state['retries'] += 1
 
                     logger.debug('Invalid response, retry count: %s', retry_count)
 
                     # Use appropriate message based on retry count
-                    message = self._process_combined_prompt(
-                        current_step['retry_prompt']
-                    )
-
                     # Clear confirmation slot
                     slots['Confirmation'] = None
 
                     return self.elicit_slot_response(
                         slot_name='Confirmation',
-                        message=message,
+                        message=current_step.retry_message.render(locale),
                         session_attributes=session_attributes,
                         intent=intent_object,
                     )
 
             # No confirmation value, elicit slot
             else:
-                message = self._process_combined_prompt(current_step['prompt'])
-
                 return self.elicit_slot_response(
                     slot_name='Confirmation',
-                    message=message,
+                    message=current_step.message.render(locale),
                     session_attributes=session_attributes,
                     intent=intent_object,
                 )
 
         # Log conversation summary before returning
-        if 'metrics' in session_attributes:
-            elapsed_time = int(time.time()) - int(
-                session_attributes['metrics']['start_time']
-            )
+        if 'start_time' in state:
+            elapsed_time = int(time.time()) - state['start_time']
             logger.debug(
                 'Conversation summary - Steps completed: %s, Retries: %s, Duration: %s seconds',
-                session_attributes['metrics']['steps_completed'],
-                session_attributes['metrics']['retries'],
+                state['steps_completed'],
+                state['retries'],
                 elapsed_time,
             )
 
         # Default return if no conditions are met
         return self.delegate_response(session_attributes, intent_object)
 
-    def fulfillment_hook(self, event: Dict[str, Any]):
+    def fulfillment_hook(self, event: Dict[str, Any], state: SessionState):
         """Handle fulfillment hook
 
         This method is called when the conversation is ready for fulfillment.
         It checks the session attributes and user responses to determine the appropriate
         closing message or action.
         """
-        logger.debug('Fulfillment hook - Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event, 'Fulfillment hook - Event')
 
         # Extract necessary information from the event
         intent_object = event['sessionState']['intent']
@@ -344,78 +207,48 @@ class MedicareEnrollmentHandler:
         logger.debug('Fulfillment hook - Slots: %s', slots)
         session_attributes = self.get_session_attributes(event)
 
+        locale = self.get_locale(event)
+
         # Check if we're in a terminal step
-        current_step_id = session_attributes.get('current_step', 'step_1')
+        current_step_id = state.get('current_step', FIRST_STEP.id)
         logger.debug('Fulfillment hook - Current step: %s', current_step_id)
 
-        # Find the terminal step by ID
-        conversation_steps = [
-            # Define all conversation steps (same as in dialog_hook)
-            # This is a simplified version for fulfillment_hook
-            {
-                'id': 'step_transfer_card_replacement',
-                'attribute': 'transferredToCardReplacement',
-                'prompt': 'TRANSFER_CARD_REPLACEMENT',
-                'is_terminal': True,
-            },
-            {
-                'id': 'step_transfer_extra_help',
-                'attribute': 'transferredToExtraHelp',
-                'prompt': 'TRANSFER_EXTRA_HELP',
-                'is_terminal': True,
-            },
-            {
-                'id': 'step_end_flow',
-                'attribute': 'conversationEnded',
-                'prompt': 'P1382English',
-                'is_terminal': True,
-            },
-            {
-                'id': 'step_provide_medicare_info',
-                'attribute': 'providedMedicareInfo',
-                'prompt': 'P1379English',
-                'is_terminal': True,
-            },
-        ]
-
         # Find the current step
-        current_step = next(
-            (s for s in conversation_steps if s['id'] == current_step_id),
-            None,
-        )
+        current_step = STEPS.get(current_step_id)
 
-        if current_step and current_step.get('is_terminal', False):
+        if current_step and current_step.is_terminal:
             return self._handle_terminal_step(
-                session_attributes, current_step, intent_name
+                session_attributes, state, current_step, intent_name, locale
             )
 
         # Default: delegate to Lex
         return self.delegate_response(session_attributes, intent_object)
 
-    def _get_current_step_id(self, session_attributes):
-        """Determine the current step ID based on session attributes
+    def _get_current_step_id(self, state):
+        """Determine the current step ID based on the session state
 
-        This helper method examines the session attributes to determine which step
+        This helper method examines the session state to determine which step
         the conversation is currently on in the main flow.
 
         Args:
-            session_attributes: The session attributes dictionary
+            state: The session state
 
         Returns:
             str: The current step ID (e.g., 'step_1', 'step_2', etc.)
         """
         # In our unified approach, we directly store the current step
-        return session_attributes.get('current_step', 'step_1')
+        return state.get('current_step', FIRST_STEP.id)
 
     def _handle_step_transition(
         self,
         session_attributes,
+        state,
         current_step,
         outcome_type,
-        conversation_steps,
         intent_name,
         intent_object,
         slots,
+        locale=None,
     ):
         """Handle transition to the next step in the conversation flow
 
@@ -425,86 +258,53 @@ class MedicareEnrollmentHandler:
 
         Args:
             session_attributes: The session attributes dictionary
-            current_step: The current step dictionary
+            state: The session state
+            current_step: The current Step
             outcome_type: The type of outcome ('yes' or 'no')
-            conversation_steps: The list of all conversation steps
             intent_name: The name of the intent
             intent_object: The intent object
             slots: The slots dictionary
+            locale: The Lex locale of the prompts
 
         Returns:
             dict: The response object for Lex
         """
-        # Store the attribute value
-        if current_step['id'] not in session_attributes['step']:
-            session_attributes['step'][current_step['id']] = {}
-
-        # Set attribute value based on outcome type
-        session_attributes['step'][current_step['id']][current_step['attribute']] = (
-            outcome_type == 'yes'
-        )
+        # Record the answer to the step's attribute
+        self._record_answer(state, current_step, outcome_type == 'yes')
 
         # Get next step
-        next_step_id = current_step['outcomes'][outcome_type]['next']
-        session_attributes['current_step'] = next_step_id
+        next_step = current_step.next[outcome_type]
+        state['current_step'] = next_step.id
 
         # Reset retry count for new step
-        session_attributes['retry_count'] = 0
+        state['retry_count'] = 0
 
         # Update metrics
-        if 'metrics' in session_attributes:
-            session_attributes['metrics']['steps_completed'] += 1
-
-        # Get next step
-        next_step = next(
-            (s for s in conversation_steps if s['id'] == next_step_id),
-            None,
-        )
+        if 'steps_completed' in state:
+            state['steps_completed'] += 1
 
-        if next_step:
-            logger.debug('Moving to next step: %s', next_step['id'])
+        logger.debug('Moving to next step: %s', next_step.id)
 
-            # If next step is terminal, handle it immediately
-            if next_step.get('is_terminal', False):
-                return self._handle_terminal_step(
-                    session_attributes, next_step, intent_name
-                )
-
-            # Otherwise, elicit slot for the next step
-            message = self._process_combined_prompt(next_step['prompt'])
-
-            # Clear confirmation slot
-            slots['Confirmation'] = None
-
-            return self.elicit_slot_response(
-                slot_name='Confirmation',
-                message=message,
-                session_attributes=session_attributes,
-                intent=intent_object,
+        # If next step is terminal, handle it immediately
+        if next_step.is_terminal:
+            return self._handle_terminal_step(
+                session_attributes, state, next_step, intent_name, locale
             )
 
-        # Default return if next step not found
-        return self.delegate_response(session_attributes, intent_object)
-
-    def _process_combined_prompt(self, prompt_key):
-        """Process potentially combined prompts
-
-        This helper method handles combined prompts (e.g., "P1375English + P1376English")
-        by splitting them and joining the retrieved messages.
-
-        Args:
-            prompt_key: The prompt key or combined prompt keys
+        # Otherwise, elicit slot for the next step
+        # Clear confirmation slot
+        slots['Confirmation'] = None
 
-        Returns:
-            str: The processed message
-        """
-        if '+' in prompt_key:
-            prompt_parts = [p.strip() for p in prompt_key.split('+')]
-            return ' '.join([MessageMap.get_message(p) for p in prompt_parts])
-
-        return MessageMap.get_message(prompt_key)
+        return self.elicit_slot_response(
+            slot_name='Confirmation',
+            message=next_step.message.render(locale),
+            session_attributes=session_attributes,
+            intent=intent_object,
+        )
 
-    def _handle_terminal_step(self, session_attributes, step, intent_name):
+    def _handle_terminal_step(
+        self, session_attributes, state, step, intent_name, locale=None
+    ):
         """Handle terminal steps that end the conversation
 
         This helper method processes terminal steps, updates session attributes,
@@ -512,62 +312,73 @@ class MedicareEnrollmentHandler:
 
         Args:
             session_attributes: The session attributes dictionary
-            step: The terminal step dictionary
+            state: The session state
+            step: The terminal Step
             intent_name: The name of the intent
+            locale: The Lex locale of the prompt
 
         Returns:
             dict: The close response object for Lex
         """
-        logger.debug('Handling terminal step: %s', step['id'])
+        logger.debug('Handling terminal step: %s', step.id)
 
         # Store the attribute value
-        if step['id'] not in session_attributes['step']:
-            session_attributes['step'][step['id']] = {}
-
-        session_attributes['step'][step['id']][step['attribute']] = True
+        self._record_answer(state, step, True)
 
         # For terminal steps, provide the message and close the conversation
-        message = self._process_combined_prompt(step['prompt'])
-
         return self.close_response(
             session_attributes=session_attributes,
             intent_name=intent_name,
-            message=message,
+            message=step.message.render(locale),
         )
 
-    def _initialize_session_attributes(self, session_attributes):
-        """Initialize session attributes with default values if they don't exist
+    def _record_answer(self, state, step, answer):
+        """Record the answer to a step's attribute in the answered/answers bitsets
+
+        Args:
+            state: The session state
+            step: The answered Step
+            answer: True for yes (and for reaching a terminal step)
+        """
+        state['answered'] = state.get('answered', []) + [step.id]
+        if answer:
+            state['answers'] = state.get('answers', []) + [step.id]
+
+    def _initialize_session_state(self, state):
+        """Initialize the session state with default values if they don't exist
 
-        This helper method ensures all required session attributes are properly
+        This helper method ensures all required session state fields are properly
         initialized with default values.
 
         Args:
-            session_attributes: The session attributes dictionary
+            state: The session state
 
         Returns:
-            dict: The initialized session attributes dictionary
+            SessionState: The initialized session state
         """
         # Initialize step tracking if not present
-        if 'step' not in session_attributes:
-            session_attributes['step'] = {}
+        if 'answered' not in state:
+            state.update({'answered': [], 'answers': []})
 
         # Initialize current step if not present
-        if 'current_step' not in session_attributes:
-            session_attributes['current_step'] = 'step_1'
+        if 'current_step' not in state:
+            state['current_step'] = FIRST_STEP.id
 
         # Initialize retry count if not present
-        if 'retry_count' not in session_attributes:
-            session_attributes['retry_count'] = 0
+        if 'retry_count' not in state:
+            state['retry_count'] = 0
 
         # Initialize metrics if not present
-        if 'metrics' not in session_attributes:
-            session_attributes['metrics'] = {
-                'start_time': time.time(),
-                'steps_completed': 0,
-                'total_retries': 0,
-            }
+        if 'start_time' not in state:
+            state.update(
+                {
+                    'start_time': int(time.time()),
+                    'steps_completed': 0,
+                    'retries': 0,
+                }
+            )
 
-        return session_attributes
+        return state
 
     def get_intent(self, event):
         """Extract intent from event"""
@@ -581,6 +392,10 @@ class MedicareEnrollmentHandler:
         """Extract session attributes from event"""
         return event['sessionState'].get('sessionAttributes', {})
 
+    def get_locale(self, event):
+        """Extract the Lex locale (e.g. en_US) from event"""
+        return event.get('bot', {}).get('localeId')
+
     def elicit_slot_response(self, slot_name, message, session_attributes, intent):
         """Return elicit slot response"""
         return {
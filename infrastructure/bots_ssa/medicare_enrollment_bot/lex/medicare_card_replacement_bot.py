@@ -10,6 +10,7 @@ from ....constructs.simple_bot import (
     SimpleLocale,
     SimpleSlot,
 )
+from ....utils.check_prompts import check_prompts
 from ....utils.create_lambda import create_lambda
 
 
@@ -30,16 +31,21 @@ class MedicareEnrollmentBot(Construct):
 
         bot_name = f'{prefix}-medicare-enrollment'
 
+        lambda_dir = os.path.join(os.path.dirname(__file__), '..', 'lambdas')
+        check_prompts(lambda_dir)
+
         # Create Lambda function for handling dialog
         self.lambda_handler = create_lambda(
             self,
             'LambdaHandler',
-            os.path.join(os.path.dirname(__file__), '..', 'lambdas'),
+            lambda_dir,
             function_name=f'{bot_name}-handler',
             description=f'Handles medicare enrollment conversation flow for {bot_name}',
             environment={
                 'AGENT_QUEUE_ARN': city_hall_queue_arn,
             },
+            # The function is configured with index.handler
+            exclude=['index_unified.py'],
         )
 
         locales = [
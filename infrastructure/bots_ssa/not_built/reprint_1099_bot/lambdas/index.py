@@ -1,10 +1,139 @@
-import json
-import logging
 import os
 from typing import Any, Dict
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+from lex_runtime.fsm import DialogMachine
+from lex_runtime.lexicon import YES_NO, Lexicon
+from lex_runtime.log import get_logger, log_event
+
+logger = get_logger()
+
+CURRENT_TAX_YEAR = os.environ.get('CURRENT_TAX_YEAR', '2024')
+
+# Answers to the privacy act notice
+PRIVACY_CHOICE = Lexicon(
+    {
+        'en_US': {
+            'moreInfo': [
+                'more information',
+                'more info',
+                'tell me more',
+                'information',
+                'details',
+                'more',
+            ],
+            'continue': [
+                'continue',
+                'proceed',
+                'go on',
+                'next',
+                'go ahead',
+                'keep going',
+            ],
+        },
+        'es_US': {
+            'moreInfo': ['más información', 'información', 'detalles', 'más'],
+            'continue': ['continuar', 'continúe', 'seguir', 'siga', 'adelante'],
+        },
+    }
+)
+
+# Conditional slot collection: which slots are required depends on the previous answers
+MACHINE = DialogMachine(
+    name='reprint_1099',
+    intents={'Process1099Request': 'foreignAddress'},
+    # For utility intents, just delegate
+    default='delegate',
+    states={
+        # Step 1: Always validate foreign address first, Lex elicits it
+        'foreignAddress': {
+            'slot': 'foreignAddress',
+            'lexicon': YES_NO,
+            'on': {
+                'missing': 'delegate',
+                # Step 2: Skip all other slots (will transfer to agent)
+                'yes': 'delegate',
+                # Step 3: Require current year next
+                'no': 'currentYear',
+                'other': {
+                    'say': 'Please answer yes or no. Do you have a foreign address?'
+                },
+            },
+        },
+        'currentYear': {
+            'slot': 'currentYear',
+            'prompt': f'Are you calling to get a replacement 1099 for the {CURRENT_TAX_YEAR} tax year?',
+            'lexicon': YES_NO,
+            'on': {
+                'yes': 'privacyChoice',
+                # Step 4: Require prior years next
+                'no': 'priorYears',
+                'other': {
+                    'say': f'Please answer yes or no. Are you calling to get a replacement 1099 for the {CURRENT_TAX_YEAR} tax year?'
+                },
+            },
+        },
+        'priorYears': {
+            'slot': 'priorYears',
+            'prompt': 'Are you calling to get a replacement 1099 for any of the prior 5 years?',
+            'lexicon': YES_NO,
+            'on': {
+                'yes': 'privacyChoice',
+                # Step 5: Skip remaining slots (will return to menu)
+                'no': 'delegate',
+                'other': {
+                    'say': 'Please answer yes or no. Are you calling to get a replacement 1099 for any of the prior 5 years?'
+                },
+            },
+        },
+        # Step 6: Either current year or prior years = Yes, continue to privacy
+        'privacyChoice': {
+            'slot': 'privacyChoice',
+            'prompt': (
+                'Alright. Before I can access your records, I will need to ask a question or two to verify who you are. '
+                'Social Security is allowed to collect this information under the Social Security Act, and the collection '
+                'meets the requirements of the Paperwork Reduction Act under OMB numbers 09600596 and 09600583. '
+                'The whole process should take about six minutes. To hear detailed information about the Privacy Act or '
+                'Paperwork Reduction Act, say more information. Otherwise, say continue.'
+            ),
+            'lexicon': PRIVACY_CHOICE,
+            'on': {
+                # Step 7: Handle "more information" response
+                'moreInfo': {
+                    'say': (
+                        'The Privacy Act of 1974 protects your personal information. '
+                        'The Paperwork Reduction Act ensures we only collect necessary information efficiently. '
+                        'Social Security uses this information to verify your identity and provide you with the '
+                        'services you requested. Say continue when you are ready to proceed.'
+                    )
+                },
+                # Step 8: Validate terms agreement
+                'continue': 'termsAgreement',
+                'other': {
+                    'say': 'Please say "more information" to hear about the Privacy Act, or say "continue" to proceed.'
+                },
+            },
+        },
+        'termsAgreement': {
+            'slot': 'termsAgreement',
+            'prompt': (
+                'Please note that any person who makes a false representation in an effort to alter or obtain '
+                'information from the Social Security Administration may be punished by a fine or imprisonment or both. '
+                'Do you understand and agree to these terms?'
+            ),
+            'lexicon': YES_NO,
+            'on': {
+                # Let Lex handle the remaining validation (SSN digits use AMAZON.Number)
+                'yes': 'delegate',
+                # Step 9: Skip SSN collection (will transfer to agent)
+                'no': 'delegate',
+                'other': {
+                    'say': 'Please answer yes or no. Do you understand and agree to these terms?'
+                },
+            },
+        },
+        'delegate': {'delegate': True},
+    },
+)
 
 
 class Reprint1099Handler:
@@ -13,12 +142,12 @@ class Reprint1099Handler:
     """
 
     def __init__(self):
-        self.current_tax_year = os.environ.get('CURRENT_TAX_YEAR', '2024')
+        self.current_tax_year = CURRENT_TAX_YEAR
         self.agent_queue_arn = os.environ.get('AGENT_QUEUE_ARN')
 
     def handler(self, event: Dict[str, Any], context=None) -> Dict[str, Any]:
         """Main handler function"""
-        logger.debug('Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event)
 
         try:
             invocation_source = event.get('invocationSource')
@@ -38,161 +167,13 @@ class Reprint1099Handler:
             )
 
     def dialog_hook(self, event: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle dialog code hook - controls conditional slot collection"""
-        intent_name = self.get_intent_name(event)
-        slots = self.get_slots(event)
-
-        logger.debug(f'Dialog hook - Intent: {intent_name}, Slots: {slots}')
-
-        if intent_name == 'Process1099Request':
-            return self.handle_conditional_slot_collection(event, slots)
-        else:
-            # For utility intents, just delegate
-            return self.delegate_response(event)
-
-    def handle_conditional_slot_collection(self, event, slots):
-        """Control which slots are required based on previous responses"""
-        foreign_address = self.get_slot_value(slots, 'foreignAddress')
-        current_year = self.get_slot_value(slots, 'currentYear')
-        prior_years = self.get_slot_value(slots, 'priorYears')
-        privacy_choice = self.get_slot_value(slots, 'privacyChoice')
-        terms_agreement = self.get_slot_value(slots, 'termsAgreement')
-
-        # Step 1: Always validate foreign address first
-        if foreign_address and not self.is_valid_yes_no(foreign_address):
-            return self.elicit_slot_response(
-                event,
-                'foreignAddress',
-                'Please answer yes or no. Do you have a foreign address?',
-            )
-
-        # Step 2: If foreign address = Yes, skip all other slots (will transfer to agent)
-        if foreign_address and self.normalize_yes_no(foreign_address) == 'yes':
-            logger.debug('Foreign address = yes, skipping other slots')
-            return self.delegate_response(event)  # Go straight to fulfillment
-
-        # Step 3: If foreign address = No, require current year next
-        if foreign_address and self.normalize_yes_no(foreign_address) == 'no':
-            # If currentYear is not filled yet, elicit it
-            if not current_year:
-                return self.elicit_slot_response(
-                    event,
-                    'currentYear',
-                    f'Are you calling to get a replacement 1099 for the {self.current_tax_year} tax year?',
-                )
-
-            # Validate current year response if it exists
-            if current_year and not self.is_valid_yes_no(current_year):
-                return self.elicit_slot_response(
-                    event,
-                    'currentYear',
-                    f'Please answer yes or no. Are you calling to get a replacement 1099 for the {self.current_tax_year} tax year?',
-                )
-
-            # Step 4: If current year = No, require prior years next
-            if current_year and self.normalize_yes_no(current_year) == 'no':
-                # If priorYears is not filled yet, elicit it
-                if not prior_years:
-                    return self.elicit_slot_response(
-                        event,
-                        'priorYears',
-                        'Are you calling to get a replacement 1099 for any of the prior 5 years?',
-                    )
-
-                # Validate prior years response if it exists
-                if prior_years and not self.is_valid_yes_no(prior_years):
-                    return self.elicit_slot_response(
-                        event,
-                        'priorYears',
-                        'Please answer yes or no. Are you calling to get a replacement 1099 for any of the prior 5 years?',
-                    )
-
-                # Step 5: If prior years = No, skip remaining slots (will return to menu)
-                if prior_years and self.normalize_yes_no(prior_years) == 'no':
-                    logger.debug(
-                        'Current year = no AND prior years = no, skipping remaining slots'
-                    )
-                    return self.delegate_response(event)  # Go to fulfillment
-
-            # Step 6: If either current year or prior years = Yes, continue to privacy
-            wants_any_year = (
-                current_year and self.normalize_yes_no(current_year) == 'yes'
-            ) or (prior_years and self.normalize_yes_no(prior_years) == 'yes')
-
-            if wants_any_year:
-                # If privacyChoice is not filled yet, elicit it
-                if not privacy_choice:
-                    return self.elicit_slot_response(
-                        event,
-                        'privacyChoice',
-                        (
-                            'Alright. Before I can access your records, I will need to ask a question or two to verify who you are. '
-                            'Social Security is allowed to collect this information under the Social Security Act, and the collection '
-                            'meets the requirements of the Paperwork Reduction Act under OMB numbers 09600596 and 09600583. '
-                            'The whole process should take about six minutes. To hear detailed information about the Privacy Act or '
-                            'Paperwork Reduction Act, say more information. Otherwise, say continue.'
-                        ),
-                    )
-
-                # Validate privacy choice
-                if privacy_choice and not self.is_valid_privacy_choice(privacy_choice):
-                    return self.elicit_slot_response(
-                        event,
-                        'privacyChoice',
-                        'Please say "more information" to hear about the Privacy Act, or say "continue" to proceed.',
-                    )
-
-                # Step 7: Handle "more information" response
-                if (
-                    privacy_choice
-                    and self.normalize_privacy_choice(privacy_choice) == 'more_info'
-                ):
-                    return self.elicit_slot_response(
-                        event,
-                        'privacyChoice',
-                        (
-                            'The Privacy Act of 1974 protects your personal information. '
-                            'The Paperwork Reduction Act ensures we only collect necessary information efficiently. '
-                            'Social Security uses this information to verify your identity and provide you with the '
-                            'services you requested. Say continue when you are ready to proceed.'
-                        ),
-                    )
-
-                # Step 8: If privacy choice = continue, validate terms agreement
-                if (
-                    privacy_choice
-                    and self.normalize_privacy_choice(privacy_choice) == 'continue'
-                ):
-                    # If termsAgreement is not filled yet, elicit it
-                    if not terms_agreement:
-                        return self.elicit_slot_response(
-                            event,
-                            'termsAgreement',
-                            (
-                                'Please note that any person who makes a false representation in an effort to alter or obtain '
-                                'information from the Social Security Administration may be punished by a fine or imprisonment or both. '
-                                'Do you understand and agree to these terms?'
-                            ),
-                        )
-
-                    # Validate terms agreement response if it exists
-                    if terms_agreement and not self.is_valid_yes_no(terms_agreement):
-                        return self.elicit_slot_response(
-                            event,
-                            'termsAgreement',
-                            'Please answer yes or no. Do you understand and agree to these terms?',
-                        )
-
-                    # Step 9: If terms agreement = No, skip SSN collection (will transfer to agent)
-                    if (
-                        terms_agreement
-                        and self.normalize_yes_no(terms_agreement) == 'no'
-                    ):
-                        logger.debug('Terms agreement = no, skipping SSN collection')
-                        return self.delegate_response(event)  # Go to fulfillment
-
-        # Let Lex handle the remaining validation (SSN digits use AMAZON.Number)
-        return self.delegate_response(event)
+        """Handle dialog code hook - controls conditional slot collection, see MACHINE"""
+        logger.debug(
+            'Dialog hook - Intent: %s, Slots: %s',
+            self.get_intent_name(event),
+            self.get_slots(event),
+        )
+        return MACHINE.handle(event)
 
     def fulfillment_hook(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Handle fulfillment - determine final action based on collected slots"""
@@ -313,110 +294,12 @@ class Reprint1099Handler:
         )
 
     # Validation helper methods
-    def is_valid_yes_no(self, response: str) -> bool:
-        """Check if response is a valid yes/no"""
-        if not response:
-            return False
-
-        response = response.lower().strip()
-        yes_words = [
-            'yes',
-            'yeah',
-            'yep',
-            'yea',
-            'correct',
-            'right',
-            'true',
-            'y',
-            'si',
-            'sure',
-            'okay',
-            'ok',
-        ]
-        no_words = [
-            'no',
-            'nope',
-            'nah',
-            'incorrect',
-            'wrong',
-            'false',
-            'n',
-            'never',
-            'nada',
-        ]
-
-        return response in yes_words or response in no_words
-
     def normalize_yes_no(self, response: str) -> str:
         """Normalize yes/no response to 'yes' or 'no'"""
         if not response:
             return ''
 
-        response = response.lower().strip()
-        yes_words = [
-            'yes',
-            'yeah',
-            'yep',
-            'yea',
-            'correct',
-            'right',
-            'true',
-            'y',
-            'si',
-            'sure',
-            'okay',
-            'ok',
-        ]
-
-        return 'yes' if response in yes_words else 'no'
-
-    def is_valid_privacy_choice(self, response: str) -> bool:
-        """Check if response is a valid privacy choice"""
-        if not response:
-            return False
-
-        response = response.lower().strip()
-        more_info_words = [
-            'more information',
-            'more info',
-            'tell me more',
-            'information',
-            'details',
-            'more',
-        ]
-        continue_words = [
-            'continue',
-            'proceed',
-            'go on',
-            'next',
-            'go ahead',
-            'keep going',
-        ]
-
-        return any(word in response for word in more_info_words) or any(
-            word in response for word in continue_words
-        )
-
-    def normalize_privacy_choice(self, response: str) -> str:
-        """Normalize privacy choice to 'more_info' or 'continue'"""
-        if not response:
-            return ''
-
-        response = response.lower().strip()
-        more_info_words = [
-            'more information',
-            'more info',
-            'tell me more',
-            'information',
-            'details',
-            'more',
-        ]
-
-        return (
-            'more_info'
-            if any(word in response for word in more_info_words)
-            else 'continue'
-        )
+        return YES_NO.label(response) or 'no'
 
     def is_business_hours(self):
         """Check if it's currently business hours"""
@@ -438,25 +321,6 @@ class Reprint1099Handler:
     def get_slots(self, event):
         return event.get('sessionState', {}).get('intent', {}).get('slots', {})
 
-    def delegate_response(self, event):
-        return {
-            'sessionState': {
-                'dialogAction': {'type': 'Delegate'},
-                'intent': event.get('sessionState', {}).get('intent', {}),
-                'sessionAttributes': event.get('sessionAttributes', {}),
-            }
-        }
-
-    def elicit_slot_response(self, event, slot_name, message):
-        return {
-            'sessionState': {
-                'dialogAction': {'type': 'ElicitSlot', 'slotToElicit': slot_name},
-                'intent': event.get('sessionState', {}).get('intent', {}),
-                'sessionAttributes': event.get('sessionAttributes', {}),
-            },
-            'messages': [{'contentType': 'PlainText', 'content': message}],
-        }
-
     def elicit_intent_response(self, event, message, session_attributes=None):
         return {
             'sessionState': {
@@ -1,8 +1,6 @@
-import logging
-import os
+from lex_runtime.log import get_logger
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+logger = get_logger()
 
 
 def handler(event, context=None):
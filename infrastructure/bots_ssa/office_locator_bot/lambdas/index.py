@@ -1,12 +1,96 @@
-import json
-import logging
 import os
-import random
-import re
 from typing import Any, Dict
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+from lex_runtime.cache import TtlCache
+from lex_runtime.fsm import DialogMachine
+from lex_runtime.lexicon import YES_NO
+from lex_runtime.log import get_logger, log_event
+from office_api import OfficeApi
+from office_index import OfficeIndex
+
+logger = get_logger()
+
+# The index is built from the office and zip code centroid data (see
+# office_index) and mapped once per container, the API client keeps its
+# connections alive
+OFFICES = OfficeApi(
+    os.environ.get('OFFICE_API_ENDPOINT'),
+    OfficeIndex(os.path.join(os.path.dirname(__file__), 'offices.idx')),
+)
+# Offices offered for a zip code without a servicing office, up to this far
+# from it. Farther than that, the caller is transferred to an agent
+NEAREST_OFFICES = 2
+NEAREST_MAX_MILES = 250
+# Offices found per zip code and card need, kept across warm invocations. Zip
+# codes without any office are kept for less time
+OFFICE_CACHE_SIZE = 1024
+OFFICE_CACHE_TTL = 300
+OFFICE_CACHE_NEGATIVE_TTL = 30
+
+MACHINE = DialogMachine(
+    name='office_locator',
+    intents={
+        'LocateOffice': 'zipCode',
+        # Offices of the zip code in the session attributes again
+        'RepeatOffice': 'fulfill',
+        'Finished': 'finished',
+        'ReturnToMenu': 'returnToMenu',
+    },
+    default='notUnderstood',
+    states={
+        'zipCode': {
+            'slot': 'zipCode',
+            'prompt': 'Go ahead and say or enter the five digit zip code for your area or the area where you want to find an office.',
+            'match': {
+                'dontKnow': ["*i don't know*", "*i don't have it*", "*i'm not sure*"],
+                'valid': [r're:^\d{5}$'],
+            },
+            'on': {
+                'dontKnow': 'noZipCode',
+                'valid': 'confirmZip',
+                'other': {
+                    'say': 'That zip code is invalid. Please say a five-digit zip code, like 12345.',
+                    'clear': ['zipCode'],
+                },
+            },
+        },
+        # P1110e: (In-Hour) I don't know
+        'noZipCode': {
+            # P1110e: (Off-Hour)
+            # "Sounds like you don't know the zip code. Normally I'd get an agent to help you, but unfortunately we're closed."
+            'close': "Sounds like you don't know the zip code. Let me connect you to an agent.",
+            'set': {'action': 'TransferToAgent', 'reason': 'NoZipCode'},
+        },
+        # Step 5. Confirm zip code (P1118)
+        'confirmZip': {
+            'slot': 'confirmZip',
+            'prompt': 'That zip code is {zipCode}. Right?',
+            'lexicon': YES_NO,
+            'on': {
+                'no': {
+                    'next': 'zipCode',
+                    'say': "My mistake. Let's try again. Please say the five digit zip code where you'd like me to search like this 1 2 3 0 0. Or enter it on your keypad.",
+                    'clear': ['zipCode', 'confirmZip'],
+                },
+                'yes': 'needsCard',
+                'other': 'fulfill',
+            },
+        },
+        # Step 6. Ask about card needs
+        'needsCard': {
+            'slot': 'needsCard',
+            'prompt': 'Thanks. Do you need to get a Social Security card?',
+            'on': {'other': 'fulfill'},
+        },
+        'fulfill': {'fulfill': True},
+        'finished': {'close': 'Ok, finished. Have a nice day.'},
+        'returnToMenu': {'close': 'Returning to the main menu.'},
+        # Fallback for unexpected intents
+        'notUnderstood': {
+            'close': "Sorry, I didn't understand. Please say 'office' to locate an offic."
+        },
+    },
+)
 
 
 class OfficeLocatorHandler:
@@ -15,11 +99,16 @@ class OfficeLocatorHandler:
     """
 
     def __init__(self):
-        self.office_api_endpoint = os.environ.get('OFFICE_API_ENDPOINT')
+        self.offices = TtlCache(
+            'offices',
+            maxsize=OFFICE_CACHE_SIZE,
+            ttl=OFFICE_CACHE_TTL,
+            negative_ttl=OFFICE_CACHE_NEGATIVE_TTL,
+        )
 
     def handler(self, event: Dict[str, Any], context=None) -> Dict[str, Any]:
         """Route to dialog_hook() or fulfillment_hook()"""
-        logger.debug('Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event)
 
         try:
             invocation_source = event.get('invocationSource')
@@ -39,107 +128,8 @@ class OfficeLocatorHandler:
             )
 
     def dialog_hook(self, event):
-        """Handle dialog hook"""
-        intent_object = event['sessionState']['intent']
-        intent_name = self.get_intent_name(event)
-        slots = self.get_slots(event)
-        session_attributes = self.get_session_attributes(event)
-
-        if intent_name == 'LocateOffice':
-            if not slots.get('zipCode') or not slots['zipCode'].get('value'):
-                return self.elicit_slot_response(
-                    'zipCode',
-                    'Go ahead and say or enter the five digit zip code for your area or the area where you want to find an office.',
-                    session_attributes,
-                    intent_object,
-                )
-
-            zip_code = slots['zipCode']['value']['interpretedValue']
-
-            # P1110e: (In-Hour) I don't know
-            if (
-                "i don't know" in zip_code.lower()
-                or "i don't have it" in zip_code.lower()
-                or "i'm not sure" in zip_code.lower()
-            ):
-                session_attributes.update(
-                    {
-                        'action': 'TransferToAgent',
-                        'reason': 'NoZipCode',
-                    }
-                )
-                return self.close_response(
-                    intent_name=intent_name,
-                    # P1110e: (In-Hour)
-                    message="Sounds like you don't know the zip code. Let me connect you to an agent.",
-                    # P1110e: (Off-Hour)
-                    # message="Sounds like you don't know the zip code. Normally I'd get an agent to help you, but unfortunately we're closed.",
-                    session_attributes=session_attributes,
-                )
-
-            # Validate zip code format
-            if not re.match(r'^\d{5}$', zip_code):
-                intent_object['slots']['zipCode'] = None
-                return self.elicit_slot_response(
-                    'zipCode',
-                    'That zip code is invalid. Please say a five-digit zip code, like 12345.',
-                    session_attributes,
-                    intent_object,
-                )
-
-            # Step 5. Confirm zip code
-            if not slots.get('confirmZip') or not slots['confirmZip'].get('value'):
-                return self.elicit_slot_response(
-                    'confirmZip',
-                    # P1118
-                    f'That zip code is {zip_code}. Right?',
-                    session_attributes,
-                    intent_object,
-                )
-            confirm_zip = slots['confirmZip']['value']['interpretedValue']
-
-            if 'no' in confirm_zip.lower():
-                intent_object['slots']['zipCode'] = None
-                intent_object['slots']['confirmZip'] = None
-                return self.elicit_slot_response(
-                    'zipCode',
-                    "My mistake. Let's try again. Please say the five digit zip code where you'd like me to search like this 1 2 3 0 0. Or enter it on your keypad.",
-                    session_attributes,
-                    intent_object,
-                )
-
-            if 'yes' in confirm_zip.lower() or 'right' in confirm_zip.lower():
-                # Step 6. Ask about card needs
-                if not slots.get('needsCard') or not slots['needsCard'].get('value'):
-                    return self.elicit_slot_response(
-                        'needsCard',
-                        'Thanks. Do you need to get a Social Security card?',
-                        session_attributes,
-                        intent_object,
-                    )
-
-            return self.fulfillment_hook(event)
-
-        if intent_name == 'Finished':
-            return self.close_response(
-                intent_name=intent_name,
-                message='Ok, finished. Have a nice day.',
-                session_attributes=session_attributes,
-            )
-
-        if intent_name == 'ReturnToMenu':
-            return self.close_response(
-                intent_name=intent_name,
-                message='Returning to the main menu.',
-                session_attributes=session_attributes,
-            )
-
-        # Fallback for unexpected intents
-        return self.close_response(
-            intent_name=intent_name,
-            message="Sorry, I didn't understand. Please say 'office' to locate an offic.",
-            session_attributes=session_attributes,
-        )
+        """Handle dialog hook, see MACHINE"""
+        return self.record_test_result(MACHINE.handle(event, self.fulfillment_hook))
 
     def fulfillment_hook(self, event):
         """Handle fulfillment for office locator intent"""
@@ -148,7 +138,7 @@ class OfficeLocatorHandler:
         session_attributes = self.get_session_attributes(event)
         intent_object = event['sessionState']['intent']
 
-        if intent_name == 'LocateOffice':
+        if intent_name in ('LocateOffice', 'RepeatOffice'):
             # Extract user data
             zip_code = (
                 slots['zipCode']['value']['interpretedValue']
@@ -160,54 +150,66 @@ class OfficeLocatorHandler:
                 if slots.get('needsCard') and slots['needsCard'].get('value')
                 else session_attributes.get('needsCard', 'no').lower()
             )
-
-            # Mock API call to check if Card Center exists (and retrieve office info)
-            def card_center_in_zip_result(zip_code):
-                result = random.choice([True, True, True, True, True, False])
-                response_success = {
-                    'status': 'success',
-                    'office_hours': '9am - 5pm',
-                    'office_phone': '867-5309',
-                    'office_name': 'Social Security Administration',
-                    'office_address': '123 Main St',
-                    'office_city': 'Springfield',
-                    'office_state': 'CO',
-                    'office_zip': zip_code,
+            needs_card = (
+                YES_NO.label(needs_card, event.get('bot', {}).get('localeId'))
+                or needs_card
+            )
+            if intent_name == 'RepeatOffice' and not zip_code:
+                # Nothing to repeat yet, ask for the zip code
+                event['sessionState']['intent'] = {
+                    'name': 'LocateOffice',
+                    'slots': {},
+                    'state': 'InProgress',
                 }
-                response_failure = {'status': 'failure'}
-                return response_success if result else response_failure
-
-            api_response = card_center_in_zip_result(zip_code)
+                return MACHINE.elicit(event, 'zipCode')
 
-            if api_response.get('status') == 'failure':
+            found = self.find_offices(zip_code, needs_card)
+            if found == []:
+                # A zip code, but no office near it
+                session_attributes['action'] = 'TransferToAgent'
+                session_attributes['reason'] = 'NoOfficeNearby'
+                return self.close_response(
+                    session_attributes=session_attributes,
+                    intent_name=intent_name,
+                    message=f"Sorry, I couldn't find an office near the zip code {zip_code}. Let me connect you to an agent.",
+                )
+            if found is None:
                 intent_object['slots']['confirmZip'] = None
-                return self.elicit_slot_response(
+                return MACHINE.elicit(
+                    event,
                     'zipCode',
                     # P1110C
                     "That is an invalid Zip Code. Let's try again. Please say the live digit zip code where you'd like me to search like this 1 2 3 0 0. Or enter it on your keypad.",
-                    session_attributes,
-                    intent_object,
                 )
-            if api_response.get('status') == 'success':
-                address = api_response['office_address']
-                hours = api_response['office_hours']
-                phone = api_response['office_phone']
-                if needs_card == 'yes':
-                    # message P1122 andP1123
-                    return self.close_response(
-                        session_attributes=session_attributes,
-                        intent_name=intent_name,
-                        message=f'All right. To apply for a new or replacement Social Security card, you will need to visit the card center in your area which is located at {address}. The hours of operation are, {hours}. To hear that again, say repeat that.'
-                        + "For information about the local Social Security office, say local office. To search in a different zip code, say change zip code. Or if you're finished, just say, I'm finished.",
-                    )
-                # message P1112 and P1113
-                if needs_card == 'no':
-                    return self.close_response(
-                        session_attributes=session_attributes,
-                        intent_name=intent_name,
-                        message=f"Okay, here's information for the servicing office in the zip code {zip_code}. The address is {address}. The hours of operation are {hours}. And the phone number is {phone}."
-                        + "To hear that again, say repeat that. Otherwise, to search in a different zip code, say change zip code. Or if you're finished, just say, I'm finished.",
-                    )
+            # For "repeat that"
+            session_attributes['zipCode'] = zip_code
+            session_attributes['needsCard'] = needs_card
+            if isinstance(found, list):
+                return self.close_response(
+                    session_attributes=session_attributes,
+                    intent_name=intent_name,
+                    message=self.nearby_message(zip_code, found, needs_card),
+                )
+            office = found
+            address = office.address
+            hours = office.hours
+            phone = office.phone
+            if needs_card == 'yes':
+                # message P1122 andP1123
+                return self.close_response(
+                    session_attributes=session_attributes,
+                    intent_name=intent_name,
+                    message=f'All right. To apply for a new or replacement Social Security card, you will need to visit the card center in your area which is located at {office.card_center_address or address}. The hours of operation are, {hours}. To hear that again, say repeat that.'
+                    + "For information about the local Social Security office, say local office. To search in a different zip code, say change zip code. Or if you're finished, just say, I'm finished.",
+                )
+            # message P1112 and P1113
+            if needs_card == 'no':
+                return self.close_response(
+                    session_attributes=session_attributes,
+                    intent_name=intent_name,
+                    message=f"Okay, here's information for the servicing office in the zip code {zip_code}. The address is {address}. The hours of operation are {hours}. And the phone number is {phone}."
+                    + "To hear that again, say repeat that. Otherwise, to search in a different zip code, say change zip code. Or if you're finished, just say, I'm finished.",
+                )
 
         # Fallback for unexpected intents
         return self.close_response(
@@ -216,6 +218,53 @@ class OfficeLocatorHandler:
             message='An error occurred.',
         )
 
+    def find_offices(self, zip_code, needs_card):
+        """
+        Return the office of a zip code, else its nearest offices (card centers)
+        within NEAREST_MAX_MILES, possibly none. None if it isn't a zip code:
+        it has neither an office nor a centroid
+        """
+
+        def load():
+            office = OFFICES.lookup(zip_code)
+            if office is not None:
+                return office
+            if not OFFICES.has_centroid(zip_code):
+                return None
+            return OFFICES.nearest(
+                zip_code,
+                NEAREST_OFFICES,
+                card_center=needs_card == 'yes',
+                max_miles=NEAREST_MAX_MILES,
+            )
+
+        return self.offices.get((zip_code, needs_card == 'yes'), load)
+
+    def nearby_message(self, zip_code, nearby, needs_card):
+        """Offer the nearest offices (card centers) to a zip code without one"""
+
+        def distance(miles):
+            return 'less than a mile' if miles < 1 else f'about {round(miles)} miles'
+
+        if needs_card == 'yes':
+            places = [
+                f'{distance(miles)} away in {office.city}, at {office.card_center_address}'
+                for miles, office in nearby
+            ]
+            message = f"All right. There's no card center in the zip code {zip_code}. The nearest one is {places[0]}. The hours of operation are, {nearby[0].office.hours}."
+        else:
+            places = [
+                f'{distance(miles)} away in {office.city}, at {office.address}'
+                for miles, office in nearby
+            ]
+            message = f"Okay, there's no servicing office in the zip code {zip_code}. The nearest one is {places[0]}. The hours of operation are {nearby[0].office.hours}. And the phone number is {nearby[0].office.phone}."
+        for place in places[1:]:
+            message += f' Another one is {place}.'
+        return (
+            message
+            + " To hear that again, say repeat that. Otherwise, to search in a different zip code, say change zip code. Or if you're finished, just say, I'm finished."
+        )
+
     ### Helper functions to extra data ###
     def get_intent_name(self, event):
         """Extract intent name from event"""
@@ -231,27 +280,6 @@ class OfficeLocatorHandler:
 
     ### Helper functions to build Lex responses ###
 
-    def elicit_slot_response(self, slot_name, message, session_attributes, intent):
-        """Build "ask for slot" response"""
-        return {
-            'sessionState': {
-                'dialogAction': {'type': 'ElicitSlot', 'slotToElicit': slot_name},
-                'intent': intent,
-                'sessionAttributes': session_attributes,
-            },
-            'messages': [{'contentType': 'PlainText', 'content': message}],
-        }
-
-    def delegate_response(self, session_attributes, intent_object):
-        """Build "let Lex continue" response"""
-        return {
-            'sessionState': {
-                'dialogAction': {'type': 'Delegate'},
-                'intent': intent_object,
-                'sessionAttributes': session_attributes,
-            },
-        }
-
     def close_response(self, session_attributes, intent_name, message):
         """Build "conversation finished" response"""
         response = {
@@ -265,9 +293,16 @@ class OfficeLocatorHandler:
             },
             'messages': [{'contentType': 'PlainText', 'content': message}],
         }
-
-        # Test code for Lex Fulfillment Handler
-        if session_attributes.get('test-case'):
+        return self.record_test_result(response)
+
+    def record_test_result(self, response):
+        """Test code for Lex Fulfillment Handler, checks Close responses of test cases"""
+        session_state = response['sessionState']
+        session_attributes = session_state['sessionAttributes']
+        if session_state['dialogAction']['type'] == 'Close' and session_attributes.get(
+            'test-case'
+        ):
+            intent_name = session_state['intent']['name']
             response_string = response.get('messages', [{}])[0].get(
                 'content', '[no Response>'
             )
@@ -305,7 +340,6 @@ class OfficeLocatorHandler:
                 )
 
             session_attributes['test-result'] = result
-            response['sessionState']['sessionAttributes'] = session_attributes
 
         return response
 
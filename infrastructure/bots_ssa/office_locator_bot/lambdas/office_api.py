@@ -0,0 +1,60 @@
+"""
+Office lookup through the office API, with the bundled index as its snapshot
+
+Without an endpoint, or when the API fails or its circuit breaker is open,
+offices are looked up in the office index bundled with the lambda.
+"""
+
+import logging
+from typing import Optional
+
+from lex_runtime.api_client import ApiClient, ApiError
+from office_index import RECORD_COLUMNS, Office, OfficeIndex
+
+logger = logging.getLogger(__name__)
+
+# Office fields in the API responses, see tests/lambdas/stub_office_api.py
+API_FIELDS = {
+    'name': 'office_name',
+    'address': 'office_address',
+    'city': 'office_city',
+    'state': 'office_state',
+    'card_center_address': 'card_center_address',
+    'hours': 'office_hours',
+    'phone': 'office_phone',
+}
+
+
+class OfficeApi:
+    def __init__(
+        self,
+        endpoint: Optional[str],
+        snapshot: OfficeIndex,
+        client: Optional[ApiClient] = None,
+    ):
+        self.snapshot = snapshot
+        self.client = client or (ApiClient(endpoint) if endpoint else None)
+
+    def lookup(self, zip_code: Optional[str]) -> Optional[Office]:
+        """Return the office of a five digit zip code, None if there is none"""
+        if self.client is None or not zip_code or not zip_code.isdigit():
+            return self.snapshot.lookup(zip_code)
+        try:
+            result = self.client.get_json(f'/{zip_code}')
+        except ApiError as e:
+            logger.warning('Office API failed, using the snapshot: %s', e)
+            return self.snapshot.lookup(zip_code)
+        if not result or result.get('status') != 'success':
+            return None
+        return Office(
+            zip_code,
+            *(str(result.get(API_FIELDS[column]) or '') for column in RECORD_COLUMNS),
+        )
+
+    def nearest(self, *args, **kwargs):
+        """See OfficeIndex.nearest, always answered from the snapshot"""
+        return self.snapshot.nearest(*args, **kwargs)
+
+    def has_centroid(self, zip_code: Optional[str]) -> bool:
+        """See OfficeIndex.has_centroid, always answered from the snapshot"""
+        return self.snapshot.has_centroid(zip_code)
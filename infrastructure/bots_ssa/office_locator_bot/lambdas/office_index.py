@@ -0,0 +1,366 @@
+"""
+Zip code to office index, memory-mapped by the office locator lambda
+
+build_index() turns the office CSV (see data/offices.csv) and the zip code
+centroids (data/zip_centroids.csv) into offices.idx, committed in the lambda
+directory. Rebuild it after changing the data with `python office_index.py`
+(test_office_index checks it is up to date). Layout, all little-endian:
+
+    header     magic b'SSAO', version (u16), reserved (u16), zip count (u32),
+               centroid count (u32), office count (u32), records offset (u32)
+    zips       zip count x u32, sorted
+    offsets    zip count x u32, offset of the zip's office record from the
+               records
+    centroids  centroid count x u32 zips, sorted, then centroid count x
+               (latitude, longitude) as i32 microdegrees
+    offices    office count x (x, y, z) f32, the office's position on the unit
+               sphere, then office count x u32 record offsets, with CARD_CENTER
+               set for offices with a card center. Stored as an implicit k-d
+               tree: the node of a range is its middle, splitting on x, y and z
+               in turn
+    records    one per distinct office: each field as a u16 length + UTF-8
+
+OfficeIndex maps the file and searches the arrays in place, so a cold start
+only reads the header and a lookup touches a few pages.
+"""
+
+import csv
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+MAGIC = b'SSAO'
+VERSION = 2
+HEADER = struct.Struct('<4sHHIIII')
+LENGTH = struct.Struct('<H')
+CARD_CENTER = 0x80000000
+EARTH_RADIUS_MILES = 3958.8
+
+
+class Office(NamedTuple):
+    # Zip code looked up
+    zip_code: str
+    name: str
+    address: str
+    city: str
+    state: str
+    # Empty when the office has no card center
+    card_center_address: str
+    hours: str
+    phone: str
+
+
+class NearbyOffice(NamedTuple):
+    miles: float
+    office: Office
+
+
+# CSV columns of the record fields, in record order
+RECORD_COLUMNS = Office._fields[1:]
+
+Point = Tuple[int, int]
+Vector = Tuple[float, float, float]
+
+
+def _normalize_zip(zip_code: str) -> int:
+    zip_code = zip_code.strip()
+    if len(zip_code) != 5 or not zip_code.isdigit():
+        raise ValueError(f'Invalid zip code {zip_code!r}')
+    return int(zip_code)
+
+
+def _microdegrees(row: Mapping[str, str]) -> Optional[Point]:
+    latitude = (row.get('latitude') or '').strip()
+    longitude = (row.get('longitude') or '').strip()
+    if not latitude and not longitude:
+        return None
+    point = round(float(latitude) * 1e6), round(float(longitude) * 1e6)
+    if abs(point[0]) > 90e6 or abs(point[1]) > 180e6:
+        raise ValueError(f'Invalid coordinates {latitude}, {longitude}')
+    return point
+
+
+def _unit_vector(point: Point) -> Vector:
+    latitude, longitude = math.radians(point[0] / 1e6), math.radians(point[1] / 1e6)
+    return (
+        math.cos(latitude) * math.cos(longitude),
+        math.cos(latitude) * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+def _kd_order(nodes: List[Tuple[Vector, int]]) -> List[Tuple[Vector, int]]:
+    """Order the nodes as the implicit k-d tree searched by OfficeIndex.nearest"""
+    ordered: List[Tuple[Vector, int]] = [None] * len(nodes)
+
+    def place(nodes: List[Tuple[Vector, int]], lo: int, depth: int):
+        if not nodes:
+            return
+        nodes.sort(key=lambda node: node[0][depth % 3])
+        mid = len(nodes) // 2
+        ordered[lo + mid] = nodes[mid]
+        place(nodes[:mid], lo, depth + 1)
+        place(nodes[mid + 1 :], lo + mid + 1, depth + 1)
+
+    place(list(nodes), 0, 0)
+    return ordered
+
+
+def build_index(
+    rows: Iterable[Mapping[str, str]], centroids: Iterable[Mapping[str, str]] = ()
+) -> bytes:
+    """
+    Build the index from office rows and zip code centroids
+
+    The office rows have a zip_code column, the Office fields and the latitude
+    and longitude of the office, empty to leave the office out of the nearest
+    office search. The centroid rows have zip_code, latitude and longitude.
+
+    Raises:
+        ValueError: For invalid or duplicate zip codes or coordinates, an office
+            with other coordinates in another row, or fields over 64KB
+    """
+    records = bytearray()
+    record_offsets: Dict[bytes, int] = {}
+    nodes: Dict[int, Tuple[Optional[Point], int]] = {}
+    entries: Dict[int, int] = {}
+    for row in rows:
+        zip_code = _normalize_zip(row['zip_code'])
+        if zip_code in entries:
+            raise ValueError(f'Duplicate zip code {row["zip_code"]}')
+        record = bytearray()
+        for column in RECORD_COLUMNS:
+            value = (row.get(column) or '').strip().encode('utf-8')
+            if len(value) > 0xFFFF:
+                raise ValueError(f'{column} of {row["zip_code"]} is too long')
+            record += LENGTH.pack(len(value)) + value
+        record = bytes(record)
+        point = _microdegrees(row)
+        if record not in record_offsets:
+            offset = record_offsets[record] = len(records)
+            records += record
+            if (row.get('card_center_address') or '').strip():
+                nodes[offset] = (point, offset | CARD_CENTER)
+            else:
+                nodes[offset] = (point, offset)
+        offset = record_offsets[record]
+        if nodes[offset][0] != point:
+            raise ValueError(f'Office of {row["zip_code"]} has other coordinates')
+        entries[zip_code] = offset
+
+    points: Dict[int, Point] = {}
+    for row in centroids:
+        zip_code = _normalize_zip(row['zip_code'])
+        if zip_code in points:
+            raise ValueError(f'Duplicate centroid {row["zip_code"]}')
+        point = _microdegrees(row)
+        if point is None:
+            raise ValueError(f'No coordinates for centroid {row["zip_code"]}')
+        points[zip_code] = point
+
+    offices = _kd_order(
+        [(_unit_vector(point), value) for point, value in nodes.values() if point]
+    )
+    zips = sorted(entries)
+    centroid_zips = sorted(points)
+    count, centroid_count, office_count = len(zips), len(points), len(offices)
+    records_offset = HEADER.size + 8 * count + 12 * centroid_count + 16 * office_count
+    return b''.join(
+        [
+            HEADER.pack(
+                MAGIC, VERSION, 0, count, centroid_count, office_count, records_offset
+            ),
+            struct.pack(f'<{count}I', *zips),
+            struct.pack(f'<{count}I', *(entries[zip_code] for zip_code in zips)),
+            struct.pack(f'<{centroid_count}I', *centroid_zips),
+            struct.pack(
+                f'<{2 * centroid_count}i',
+                *(value for zip_code in centroid_zips for value in points[zip_code]),
+            ),
+            struct.pack(
+                f'<{3 * office_count}f',
+                *(value for vector, _ in offices for value in vector),
+            ),
+            struct.pack(f'<{office_count}I', *(value for _, value in offices)),
+            bytes(records),
+        ]
+    )
+
+
+def _read_csv(path: str) -> List[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def write_index(csv_path: str, index_path: str, centroids_path: Optional[str] = None):
+    """Build the index of the CSV files, only rewriting it when it changed"""
+    data = build_index(
+        _read_csv(csv_path), _read_csv(centroids_path) if centroids_path else ()
+    )
+    try:
+        with open(index_path, 'rb') as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
+    with open(index_path, 'wb') as f:
+        f.write(data)
+
+
+def _array(view: memoryview, typecode: str):
+    values = view.cast(typecode)
+    if sys.byteorder == 'big':
+        values = array(typecode, values)
+        values.byteswap()
+    return values
+
+
+class OfficeIndex:
+    """Memory-mapped index built by build_index, shared by all invocations"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, centroid_count, office_count, records_offset = (
+            HEADER.unpack_from(self._map)
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not an office index version {VERSION}')
+        sections = []
+        offset = HEADER.size
+        for typecode, size in (
+            ('I', count),
+            ('I', count),
+            ('I', centroid_count),
+            ('i', 2 * centroid_count),
+            ('f', 3 * office_count),
+            ('I', office_count),
+        ):
+            view = memoryview(self._map)[offset : offset + 4 * size]
+            sections.append(_array(view, typecode))
+            offset += 4 * size
+        (
+            self._zips,
+            self._offsets,
+            self._centroid_zips,
+            self._centroids,
+            self._vectors,
+            self._office_offsets,
+        ) = sections
+        self._records_offset = records_offset
+        self.count = count
+        self.centroid_count = centroid_count
+        self.office_count = office_count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, zip_code: str, offset: int) -> Office:
+        fields: List[str] = [zip_code]
+        offset += self._records_offset
+        for _ in RECORD_COLUMNS:
+            (length,) = LENGTH.unpack_from(self._map, offset)
+            offset += LENGTH.size
+            fields.append(self._map[offset : offset + length].decode('utf-8'))
+            offset += length
+        return Office(*fields)
+
+    def lookup(self, zip_code: Optional[str]) -> Optional[Office]:
+        """Return the office of a five digit zip code, None if there is none"""
+        if not zip_code or len(zip_code) != 5 or not zip_code.isdigit():
+            return None
+        key = int(zip_code)
+        i = bisect_left(self._zips, key)
+        if i == self.count or self._zips[i] != key:
+            return None
+        return self._record(zip_code, self._offsets[i])
+
+    def _centroid(self, zip_code: Optional[str]) -> Optional[int]:
+        if not zip_code or len(zip_code) != 5 or not zip_code.isdigit():
+            return None
+        key = int(zip_code)
+        i = bisect_left(self._centroid_zips, key)
+        if i == len(self._centroid_zips) or self._centroid_zips[i] != key:
+            return None
+        return i
+
+    def has_centroid(self, zip_code: Optional[str]) -> bool:
+        """Whether a zip code has a centroid, i.e. is a zip code at all"""
+        return self._centroid(zip_code) is not None
+
+    def nearest(
+        self,
+        zip_code: Optional[str],
+        k: int = 1,
+        card_center: bool = False,
+        max_miles: Optional[float] = None,
+    ) -> List[NearbyOffice]:
+        """
+        Return the k offices nearest to the centroid of a zip code, closest first
+
+        Only offices with a card center are returned with card_center, and only
+        offices within max_miles with it. Empty if the zip code has no centroid.
+        """
+        i = self._centroid(zip_code)
+        if i is None:
+            return []
+        target = _unit_vector((self._centroids[2 * i], self._centroids[2 * i + 1]))
+
+        vectors = self._vectors
+        offsets = self._office_offsets
+        # Great circle miles to squared chord length on the unit sphere
+        limit = (
+            math.inf
+            if max_miles is None
+            else (2 * math.sin(min(max_miles / EARTH_RADIUS_MILES, math.pi) / 2)) ** 2
+        )
+        # Max-heap of the best (-squared distance, node) so far
+        best: List[Tuple[float, int]] = []
+
+        def search(lo: int, hi: int, axis: int):
+            mid = (lo + hi) // 2
+            x, y, z = vectors[3 * mid : 3 * mid + 3]
+            if not card_center or offsets[mid] & CARD_CENTER:
+                distance = (
+                    (target[0] - x) ** 2 + (target[1] - y) ** 2 + (target[2] - z) ** 2
+                )
+                if len(best) < k:
+                    if distance <= limit:
+                        heapq.heappush(best, (-distance, mid))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, mid))
+            split = target[axis] - vectors[3 * mid + axis]
+            near, far = (
+                ((lo, mid), (mid + 1, hi)) if split < 0 else ((mid + 1, hi), (lo, mid))
+            )
+            if near[0] < near[1]:
+                search(*near, (axis + 1) % 3)
+            bound = -best[0][0] if len(best) == k else limit
+            if far[0] < far[1] and split * split <= bound:
+                search(*far, (axis + 1) % 3)
+
+        if self.office_count and k > 0:
+            search(0, self.office_count, 0)
+        return [
+            NearbyOffice(
+                # Chord length on the unit sphere to great circle miles
+                2 * math.asin(min(1.0, math.sqrt(-distance) / 2)) * EARTH_RADIUS_MILES,
+                self._record(zip_code, offsets[mid] & ~CARD_CENTER),
+            )
+            for distance, mid in sorted(best, reverse=True)
+        ]
+
+
+if __name__ == '__main__':
+    _data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+    write_index(
+        os.path.join(_data_dir, 'offices.csv'),
+        os.path.join(os.path.dirname(__file__), 'offices.idx'),
+        os.path.join(_data_dir, 'zip_centroids.csv'),
+    )
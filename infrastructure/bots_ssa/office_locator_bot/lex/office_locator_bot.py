@@ -1,6 +1,7 @@
 import os
 from typing import List, Optional
 
+from aws_cdk import Annotations
 from aws_cdk import aws_iam as iam
 from constructs import Construct
 
@@ -13,6 +14,11 @@ from ....constructs.simple_bot import (
     SimpleSlot,
 )
 from ....utils.create_lambda import create_lambda
+from ..lambdas.office_index import OfficeIndex
+
+# Fewer centroids than this (there are about 41,000 zip codes) means the
+# bundled index is still built from the sample data in data/
+MIN_ZIP_CENTROIDS = 30000
 
 
 class OfficeLocatorBot(Construct):
@@ -30,6 +36,7 @@ class OfficeLocatorBot(Construct):
         nlu_confidence_threshold: Optional[float] = 0.75,
         log_group=None,
         audio_bucket=None,
+        office_api_endpoint: Optional[str] = None,
         **kwargs,
     ):
         super().__init__(scope, id, **kwargs)
@@ -59,17 +66,30 @@ class OfficeLocatorBot(Construct):
             )
         )
 
+        # Ships the committed zip code index of the offices (offices.idx)
+        lambda_dir = os.path.join(os.path.dirname(__file__), '..', 'lambdas')
+        index = OfficeIndex(os.path.join(lambda_dir, 'offices.idx'))
+        if index.centroid_count < MIN_ZIP_CENTROIDS:
+            Annotations.of(self).add_warning(
+                f'offices.idx is built from sample data ({len(index)} zip codes '
+                f'with an office, {index.centroid_count} zip code centroids): most '
+                'zip codes are invalid or have no office near them. Commit the '
+                'office and zip code centroid data to data/ and rebuild it'
+            )
+
         # Create Lambda function for handling dialog and fulfillment
         self.lambda_handler = create_lambda(
             self,
             'LambdaHandler',
-            os.path.join(os.path.dirname(__file__), '..', 'lambdas'),
+            lambda_dir,
             function_name=f'{bot_name}-handler',
             description=f'Handles office locator conversation flow for {bot_name}',
-            environment={
-                # Add any environment variables needed for office lookup API
-                'OFFICE_API_ENDPOINT': 'https://api.ssa.gov/offices',  # Example
-            },
+            # Without the API, offices are looked up in the bundled index
+            environment=(
+                {'OFFICE_API_ENDPOINT': office_api_endpoint}
+                if office_api_endpoint
+                else {}
+            ),
         )
 
         locales: List[SimpleLocale] = [
@@ -145,6 +165,15 @@ class OfficeLocatorBot(Construct):
                         ],
                     ),
                     # Utility intents
+                    SimpleIntent(
+                        name='RepeatOffice',
+                        utterances=[
+                            'repeat that',
+                            'repeat',
+                            'say that again',
+                            'can you repeat that',
+                        ],
+                    ),
                     SimpleIntent(
                         name='LocalOfficeInfo',
                         utterances=[
@@ -1,14 +1,91 @@
 """
 Handle pamphlet bot
+
+The conversation state is kept in one compact session attribute (SESSION),
+with the last prompt stored by id and rendered again from the state for
+Repeat and ReturnToMenu.
 """
 
-import json
-import logging
-import os
 import random
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+from lex_runtime.lexicon import YES_NO
+from lex_runtime.log import get_logger, lazy_json, log_event
+from lex_runtime.prompts import PromptCatalog
+from lex_runtime.session import Bits, Enum, Int, SessionCodec, Text
+
+logger = get_logger()
+
+PAMPHLETS = [
+    'UnderstandingSocialSecurity',
+    'RetirementBenefits',
+    'DisabilityBenefits',
+    'SurvivorBenefits',
+    'HowWorkAffectsBenefits',
+    'BenefitsForChildrenWithDisabilities',
+    'WhatEveryWomanShouldKnowAboutSocialSecurity',
+]
+
+# Stored by index in the session: append new prompts at the end
+PROMPTS = {
+    'en_US': {
+        'OFFER_FIRST_PAMPHLET': 'Would you like to hear the pamphlet on Understanding Social Security?',
+        'MORE_CHOICES': 'Before I get your mailing address, would you like to hear more choices?',
+        'OFFER_PAMPHLET': 'Do you want the pamphlet on {pamphlet}?',
+        'OFFER_NEXT_PAMPHLET': 'Would you like to hear the pamphlet on {title}?',
+        'LAST_PAMPHLET': 'That was the last pamphlet. Would you like to hear those choices again?',
+        'LAST_ONE': 'That was the last one. Would you like to hear those choices again?',
+        'START_AGAIN': "You haven't selected any pamphlets. Let's start again. Would you like to hear the pamphlet on Understanding Social Security?",
+        'ASK_ADDRESS_1': "Thanks. Now let's get your address. What is your street name? (1)",
+        'ASK_ADDRESS_2': "Thanks. Now let's get your address. What is your street name? (2)",
+        'ASK_ADDRESS_3': "Thanks. Now let's get your address. What is your street name? (3)",
+        'ASK_ADDRESS_4': "Thanks. Now let's get your address. What is your street name? (4)",
+        'ALL_PAMPHLETS_SELECTED': "That's all the pamphlets I have to offer. Thanks. Now let's get your address. What's your street name?",
+        'ASK_CITY': 'Thanks. What is your city?',
+        'ASK_STATE': 'Thanks. What is your state?',
+        'ASK_ZIP_CODE': 'Thanks. What is your zip code?',
+        'CONFIRM_ADDRESS': 'Is this your address: {address}?',
+        'TRY_ADDRESS_AGAIN': "Okay, let's try again. What is your street name?",
+        'GOODBYE': "Alright. If you're finished, feel free to hang up. Otherwise, just hang on and I'll take you back to the Main Menu.",
+        'SKIP_OUTSIDE_SELECTION': 'Sorry, you can only skip pamphlets while selecting them. {last_message}',
+        'REPEAT': 'Sure, let me repeat that: {last_message}',
+        'NOTHING_TO_REPEAT': "Sorry, there's nothing to repeat yet. Would you like a pamphlet on Understanding Social Security?",
+        'CONTINUE': "Sorry, I didn't catch that. Let's continue where we left off.",
+        'CONFIRM_RETURN_TO_MENU': 'Are you sure you want to return to the main menu?',
+        'RETURNING_TO_MENU': 'Returning to the main menu.',
+        'MOVING_ON': 'Moving on.',
+        'ORDER_PLACED': "All set. I've put your order through, and you should receive the pamphlets, {pamphlets}, in the mail within two weeks.",
+        'ORDER_INCOMPLETE': 'Sorry, there was an issue with your request. Please try again. Missing address or pamphlets.',
+        'ORDER_FAILED': 'Sorry, there was an issue processing your request. Please try again later. Mock API call fail simulated.',
+        'UNKNOWN_INTENT': "Sorry, I didn't understand that request. Intent failed.",
+    },
+}
+
+CATALOG = PromptCatalog(PROMPTS)
+
+SESSION = SessionCodec(
+    'pamphlet',
+    [
+        Enum('flowPhase', ['selection', 'address', 'confirmation']),
+        Int('currentPamphletIndex'),
+        Bits('selectedPamphlets', PAMPHLETS),
+        Enum(
+            'lastSlot',
+            PAMPHLETS
+            + [
+                'HearNextPamphletChoiceConfirmation',
+                'HearAllChoicesAgain',
+                'StreetName',
+                'City',
+                'State',
+                'ZipCode',
+                'AddressConfirmation',
+                'MainMenu',
+            ],
+        ),
+        Enum('lastPrompt', list(PROMPTS['en_US'])),
+        Text('fullAddress'),
+    ],
+)
 
 
 class PamphletHandler:
@@ -19,15 +96,18 @@ class PamphletHandler:
 
     def handler(self, event, context=None):
         """Route to dialog_hook() or fulfillment_hook()"""
-        logger.debug('Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event)
 
+        state = SESSION.state(self.get_session_attributes(event))
         invocation_source = event.get('invocationSource')
         if invocation_source == 'DialogCodeHook':
-            return self.dialog_hook(event)
+            response = self.dialog_hook(event, state)
         elif invocation_source == 'FulfillmentCodeHook':
-            return self.fulfillment_hook(event)
+            response = self.fulfillment_hook(event, state)
         else:
             raise ValueError(f'Unknown invocation source: {invocation_source}')
+        state.save(response['sessionState']['sessionAttributes'])
+        return response
 
     slot_names = {
         '1': 'UnderstandingSocialSecurity',
@@ -39,27 +119,24 @@ class PamphletHandler:
         '7': 'WhatEveryWomanShouldKnowAboutSocialSecurity',
     }
 
-    def dialog_hook(self, event):
+    def dialog_hook(self, event, state):
         """Handle dialog code hook - controls conditional slot collection"""
         intent_object = self.get_intent(event)
         intent_name = intent_object.get('name', '')
         slots = self.get_slots(event)
         session_attributes = self.get_session_attributes(event)
         # selection, address, confirmation
-        flow_phase = session_attributes.get('flowPhase', 'selection')
-        last_message = session_attributes.get('lastMessage', '')
+        flow_phase = state.get('flowPhase', 'selection')
         logger.debug('Dialog hook')
-        logger.debug('Intent: %s', json.dumps(intent_name))
-        logger.debug('Slots: %s', json.dumps(slots))
-        logger.debug('Flow Phase: %s', json.dumps(flow_phase))
-        logger.debug('Session Attributes: %s', json.dumps(session_attributes))
+        logger.debug('Intent: %s', lazy_json(intent_name))
+        logger.debug('Slots: %s', lazy_json(slots))
+        logger.debug('Flow Phase: %s', lazy_json(flow_phase))
+        logger.debug('Session state: %s', lazy_json(state.values))
 
         if intent_name == 'ProcessPamphletRequest':
             logger.debug('ProcessPamphletRequest')
             # Get Session Attributes
-            current_pamphlet_index = session_attributes.get(
-                'currentPamphletIndex', None
-            )
+            current_pamphlet_index = state.get('currentPamphletIndex')
 
             # flowChange selection, no session attributes, initialize
             if flow_phase == 'selection' and current_pamphlet_index is None:
@@ -69,18 +146,18 @@ class PamphletHandler:
 
                 # If no session attributes, start at the beginning, initialize session attributes
                 # Offer first pamphlet
-                if 'currentPamphletIndex' not in session_attributes:
-                    message = 'Would you like to hear the pamphlet on Understanding Social Security?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                if 'currentPamphletIndex' not in state:
+                    state.update(
                         {
-                            'currentPamphletIndex': '1',  # add 1 for first pamphlet
+                            'currentPamphletIndex': 1,  # add 1 for first pamphlet
                             'flowPhase': 'selection',
-                            'selectedPamphlets': json.dumps([]),
-                            'lastMessage': message,
+                            'selectedPamphlets': [],
+                            'lastPrompt': 'OFFER_FIRST_PAMPHLET',
                             'lastSlot': 'UnderstandingSocialSecurity',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                 return self.elicit_slot_response(
                     slot_name='UnderstandingSocialSecurity',
                     message=message,
@@ -96,18 +173,14 @@ class PamphletHandler:
                     pamphlet_value = (
                         pamphlet_slot['value'].get('interpretedValue', '').lower()
                     )
-                logger.debug('Pamphlet slot: %s', json.dumps(pamphlet_slot))
-                logger.debug('Pamphlet value: %s', json.dumps(pamphlet_value))
+                logger.debug('Pamphlet slot: %s', lazy_json(pamphlet_slot))
+                logger.debug('Pamphlet value: %s', lazy_json(pamphlet_value))
 
-                current_pamphlet_index = session_attributes.get(
-                    'currentPamphletIndex', 0
-                )
-                selected_pamphlets = json.loads(
-                    session_attributes.get('selectedPamphlets', '[]')
-                )
+                current_pamphlet_index = state.get('currentPamphletIndex', 0)
+                selected_pamphlets = state.get('selectedPamphlets', [])
                 logger.debug('Dialog hook')
                 logger.debug('Current pamphlet index: %s', current_pamphlet_index)
-                logger.debug('Selected pamphlets: %s', json.dumps(selected_pamphlets))
+                logger.debug('Selected pamphlets: %s', lazy_json(selected_pamphlets))
                 logger.debug('Flow phase: %s', flow_phase)
 
                 # if current_pamphlet_index == 1-7:
@@ -115,9 +188,7 @@ class PamphletHandler:
                     # UnderstandingSocialSecurity, RetirementBenefits, DisabilityBenefits, SurvivorBenefits, HowWorkAffectsBenefits, BenefitsForChildrenWithDisabilities, WhatEveryWomanShouldKnowAboutSocialSecurity
                     pamphlet_name = self.slot_names[str(current_pamphlet_index)]
                     pamphlet_slot = slots[pamphlet_name]
-                    selected_pamphlets = json.loads(
-                        session_attributes.get('selectedPamphlets', '[]')
-                    )
+                    selected_pamphlets = state.get('selectedPamphlets', [])
 
                     # Get pamphlet value
                     pamphlet_value = ''
@@ -129,23 +200,21 @@ class PamphletHandler:
                     logger.debug('Pamphlet value: %s', pamphlet_value)
                     logger.debug('Flow phase: %s', flow_phase)
                     logger.debug('Selected pamphlets: %s', selected_pamphlets)
-                    selected_pamphlets = json.loads(
-                        session_attributes.get('selectedPamphlets', '[]')
-                    )
+                    selected_pamphlets = state.get('selectedPamphlets', [])
                     new_index = int(current_pamphlet_index) + 1
                     # If yes they want pamphlet, add pamphlet to selected pamphlets and ask if they want to hear next pamphlet
-                    if 'yes' in pamphlet_value.lower():
+                    if YES_NO.label(pamphlet_value) == 'yes':
                         selected_pamphlets.append(pamphlet_name)
-                        message = 'Before I get your mailing address, would you like to hear more choices?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
-                                'currentPamphletIndex': str(new_index),
-                                'selectedPamphlets': json.dumps(selected_pamphlets),
-                                'lastMessage': message,
+                                'currentPamphletIndex': new_index,
+                                'selectedPamphlets': selected_pamphlets,
+                                'lastPrompt': 'MORE_CHOICES',
                                 'lastSlot': 'HearNextPamphletChoiceConfirmation',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='HearNextPamphletChoiceConfirmation',
                             message=message,
@@ -153,32 +222,32 @@ class PamphletHandler:
                             intent=intent_object,
                         )
                     # If no, ask for next pamphlet before moving to address intent
-                    if 'no' in pamphlet_value.lower():
+                    if YES_NO.label(pamphlet_value) == 'no':
                         if len(selected_pamphlets) == 0:
-                            message = f'Do you want the pamphlet on {pamphlet_name}?'
-                            logger.debug('Message: %s', message)
-                            session_attributes.update(
+                            state.update(
                                 {
-                                    'lastMessage': message,
+                                    'lastPrompt': 'OFFER_PAMPHLET',
                                     'lastSlot': pamphlet_name,
                                 }
                             )
+                            message = self.last_message(state)
+                            logger.debug('Message: %s', message)
                             return self.elicit_slot_response(
                                 slot_name=pamphlet_name,
                                 message=message,
                                 session_attributes=session_attributes,
                                 intent=intent_object,
                             )
-                        message = 'Before I get your mailing address, would you like to hear more choices?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
-                                'currentPamphletIndex': str(new_index),
-                                'selectedPamphlets': json.dumps(selected_pamphlets),
-                                'lastMessage': message,
+                                'currentPamphletIndex': new_index,
+                                'selectedPamphlets': selected_pamphlets,
+                                'lastPrompt': 'MORE_CHOICES',
                                 'lastSlot': 'HearNextPamphletChoiceConfirmation',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='HearNextPamphletChoiceConfirmation',
                             message=message,
@@ -190,14 +259,14 @@ class PamphletHandler:
                 if int(current_pamphlet_index) > 7:
                     # There are no pamphlets selected, offer to hear choices again
                     if len(selected_pamphlets) == 0:
-                        message = 'That was the last pamphlet. Would you like to hear those choices again?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
-                                'lastMessage': message,
+                                'lastPrompt': 'LAST_PAMPHLET',
                                 'lastSlot': 'HearAllChoicesAgain',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='HearAllChoicesAgain',
                             message=message,
@@ -205,15 +274,15 @@ class PamphletHandler:
                             intent=intent_object,
                         )
                     if len(selected_pamphlets) > 0 and len(selected_pamphlets) < 7:
-                        message = "Thanks. Now let's get your address. What is your street name? (1)"
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'address',
-                                'lastMessage': message,
+                                'lastPrompt': 'ASK_ADDRESS_1',
                                 'lastSlot': 'StreetName',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='StreetName',
                             message=message,
@@ -221,16 +290,16 @@ class PamphletHandler:
                             intent=intent_object,
                         )
                     if len(selected_pamphlets) == 7:
-                        message = "That's all the pamphlets I have to offer. Thanks. Now let's get your address. What's your street name?"
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
-                                'selectedPamphlets': json.dumps(selected_pamphlets),
+                                'selectedPamphlets': selected_pamphlets,
                                 'flowPhase': 'address',
-                                'lastMessage': message,
+                                'lastPrompt': 'ALL_PAMPHLETS_SELECTED',
                                 'lastSlot': 'StreetName',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='StreetName',
                             message=message,
@@ -251,35 +320,35 @@ class PamphletHandler:
                         pamphlet_confirmation,
                     )
                     logger.debug('Flow phase: %s', flow_phase)
-                    slot_name = session_attributes['currentPamphletIndex']
+                    slot_name = str(state['currentPamphletIndex'])
                     pamphlet_name = self.slot_names[slot_name]
-                    if 'yes' in pamphlet_confirmation:
+                    if YES_NO.label(pamphlet_confirmation) == 'yes':
                         slots['HearNextPamphletChoiceConfirmation'] = None
-                        message = f'Do you want the pamphlet on {pamphlet_name}?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
-                                'lastMessage': message,
+                                'lastPrompt': 'OFFER_PAMPHLET',
                                 'lastSlot': pamphlet_name,
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name=pamphlet_name,
                             message=message,
                             session_attributes=session_attributes,
                             intent=intent_object,
                         )
-                    if 'no' in pamphlet_confirmation:
+                    if YES_NO.label(pamphlet_confirmation) == 'no':
                         slots['HearNextPamphletChoiceConfirmation'] = None
-                        message = "Thanks. Now let's get your address. What is your street name? (2)"
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'address',
-                                'lastMessage': message,
+                                'lastPrompt': 'ASK_ADDRESS_2',
                                 'lastSlot': 'StreetName',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='StreetName',
                             message=message,
@@ -289,7 +358,7 @@ class PamphletHandler:
 
             if flow_phase == 'address':
                 logger.debug('Flow phase: %s', flow_phase)
-                logger.debug('Slots: %s', json.dumps(slots))
+                logger.debug('Slots: %s', lazy_json(slots))
 
                 # Extract slot values properly
                 street_name_slot = slots.get('StreetName')
@@ -335,16 +404,16 @@ class PamphletHandler:
                     logger.debug('Formatted address: %s', full_address)
 
                     # Update session attributes with full address and change flow phase
-                    message = f'Is this your address: {full_address}?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'fullAddress': full_address,
                             'flowPhase': 'confirmation',
-                            'lastMessage': message,
+                            'lastPrompt': 'CONFIRM_ADDRESS',
                             'lastSlot': 'AddressConfirmation',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     # Elicit AddressConfirmation slot
                     return self.elicit_slot_response(
                         slot_name='AddressConfirmation',
@@ -357,7 +426,7 @@ class PamphletHandler:
                 # This captures cases where Lex doesn't recognize the input as a valid slot value
                 if (
                     flow_phase == 'address'
-                    and session_attributes.get('lastSlot') == 'ZipCode'
+                    and state.get('lastSlot') == 'ZipCode'
                     and 'inputTranscript' in event
                 ):
                     # Manually capture the user's input as the zip code
@@ -422,16 +491,16 @@ class PamphletHandler:
                         )
 
                         # Update session attributes with full address and change flow phase
-                        message = f'Is this your address: {full_address}?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'fullAddress': full_address,
                                 'flowPhase': 'confirmation',
-                                'lastMessage': message,
+                                'lastPrompt': 'CONFIRM_ADDRESS',
                                 'lastSlot': 'AddressConfirmation',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         # Elicit AddressConfirmation slot
                         return self.elicit_slot_response(
                             slot_name='AddressConfirmation',
@@ -445,16 +514,16 @@ class PamphletHandler:
                     logger.debug('Formatted address: %s', full_address)
 
                     # Update session attributes with full address and change flow phase
-                    message = f'Is this your address: {full_address}?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'fullAddress': full_address,
                             'flowPhase': 'confirmation',
-                            'lastMessage': message,
+                            'lastPrompt': 'CONFIRM_ADDRESS',
                             'lastSlot': 'AddressConfirmation',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     # Elicit AddressConfirmation slot
                     return self.elicit_slot_response(
                         slot_name='AddressConfirmation',
@@ -468,15 +537,15 @@ class PamphletHandler:
                     # State was provided, move to ZipCode
                     state_value = state_slot['value'].get('interpretedValue', '')
                     logger.debug('State value: %s', state_value)
-                    message = 'Thanks. What is your zip code?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'flowPhase': 'address',
-                            'lastMessage': message,
+                            'lastPrompt': 'ASK_ZIP_CODE',
                             'lastSlot': 'ZipCode',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='ZipCode',
                         message=message,
@@ -488,7 +557,7 @@ class PamphletHandler:
                 # This captures cases where Lex doesn't recognize the input as a valid slot value
                 if (
                     flow_phase == 'address'
-                    and session_attributes.get('lastSlot') == 'State'
+                    and state.get('lastSlot') == 'State'
                     and 'inputTranscript' in event
                 ):
                     # Manually capture the user's input as the state
@@ -510,15 +579,15 @@ class PamphletHandler:
                         }
 
                         # Move to ZipCode
-                        message = 'Thanks. What is your zip code?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'address',
-                                'lastMessage': message,
+                                'lastPrompt': 'ASK_ZIP_CODE',
                                 'lastSlot': 'ZipCode',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='ZipCode',
                             message=message,
@@ -531,15 +600,15 @@ class PamphletHandler:
                     # City was provided, move to State
                     city_value = city_slot['value'].get('interpretedValue', '')
                     logger.debug('City value: %s', city_value)
-                    message = 'Thanks. What is your state?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'flowPhase': 'address',
-                            'lastMessage': message,
+                            'lastPrompt': 'ASK_STATE',
                             'lastSlot': 'State',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='State',
                         message=message,
@@ -551,7 +620,7 @@ class PamphletHandler:
                 # This captures cases where Lex doesn't recognize the input as a valid slot value
                 if (
                     flow_phase == 'address'
-                    and session_attributes.get('lastSlot') == 'City'
+                    and state.get('lastSlot') == 'City'
                     and 'inputTranscript' in event
                 ):
                     # Manually capture the user's input as the city
@@ -573,15 +642,15 @@ class PamphletHandler:
                         }
 
                         # Move to State
-                        message = 'Thanks. What is your state?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'address',
-                                'lastMessage': message,
+                                'lastPrompt': 'ASK_STATE',
                                 'lastSlot': 'State',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='State',
                             message=message,
@@ -596,15 +665,15 @@ class PamphletHandler:
                         'interpretedValue', ''
                     )
                     logger.debug('Street name value: %s', street_name_value)
-                    message = 'Thanks. What is your city?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'flowPhase': 'address',
-                            'lastMessage': message,
+                            'lastPrompt': 'ASK_CITY',
                             'lastSlot': 'City',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='City',
                         message=message,
@@ -616,7 +685,7 @@ class PamphletHandler:
                 # This captures cases where Lex doesn't recognize the input as a valid slot value
                 if (
                     flow_phase == 'address'
-                    and session_attributes.get('lastSlot') == 'StreetName'
+                    and state.get('lastSlot') == 'StreetName'
                     and 'inputTranscript' in event
                 ):
                     # Manually capture the user's input as the street name
@@ -640,15 +709,15 @@ class PamphletHandler:
                         }
 
                         # Move to City
-                        message = 'Thanks. What is your city?'
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'address',
-                                'lastMessage': message,
+                                'lastPrompt': 'ASK_CITY',
                                 'lastSlot': 'City',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='City',
                             message=message,
@@ -657,17 +726,15 @@ class PamphletHandler:
                         )
 
                 # Fallback: If we get here, start with street name
-                message = (
-                    "Thanks. Now let's get your address. What is your street name? (3)"
-                )
-                logger.debug('Message: %s', message)
-                session_attributes.update(
+                state.update(
                     {
                         'flowPhase': 'address',
-                        'lastMessage': message,
+                        'lastPrompt': 'ASK_ADDRESS_3',
                         'lastSlot': 'StreetName',
                     }
                 )
+                message = self.last_message(state)
+                logger.debug('Message: %s', message)
                 return self.elicit_slot_response(
                     slot_name='StreetName',
                     message=message,
@@ -678,7 +745,7 @@ class PamphletHandler:
             if flow_phase == 'confirmation':
                 logger.debug('Flow phase: %s', flow_phase)
                 logger.debug('Slots: %s', slots)
-                logger.debug('Session Attributes: %s', json.dumps(session_attributes))
+                logger.debug('Session state: %s', lazy_json(state.values))
 
                 # Extract AddressConfirmation slot
                 confirmation_slot = slots.get('AddressConfirmation')
@@ -692,24 +759,22 @@ class PamphletHandler:
                     logger.debug('AddressConfirmation value: %s', confirmation_value)
 
                     # Check selectedPamphlets
-                    selected_pamphlets = json.loads(
-                        session_attributes.get('selectedPamphlets', '[]')
-                    )
+                    selected_pamphlets = state.get('selectedPamphlets', [])
                     logger.debug('Selected pamphlets: %s', selected_pamphlets)
 
                     # If no pamphlets selected, prompt to select pamphlets again
                     if not selected_pamphlets:
-                        message = "You haven't selected any pamphlets. Let's start again. Would you like to hear the pamphlet on Understanding Social Security?"
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'selection',
-                                'currentPamphletIndex': '1',
+                                'currentPamphletIndex': 1,
                                 'fullAddress': '',  # Clear address since we're restarting
-                                'lastMessage': message,
+                                'lastPrompt': 'START_AGAIN',
                                 'lastSlot': 'UnderstandingSocialSecurity',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='UnderstandingSocialSecurity',
                             message=message,
@@ -718,9 +783,9 @@ class PamphletHandler:
                         )
 
                     # If user confirms the address
-                    if 'yes' in confirmation_value:
+                    if YES_NO.label(confirmation_value) == 'yes':
                         # Ensure session_attributes are preserved
-                        session_attributes.update(
+                        state.update(
                             {  # Keep for clarity in fulfillment
                                 'flowPhase': 'confirmation'
                             }
@@ -731,22 +796,22 @@ class PamphletHandler:
                             intent_object=intent_object,
                         )
                     # If user denies the address
-                    if 'no' in confirmation_value:
+                    if YES_NO.label(confirmation_value) == 'no':
                         # Reset address slots and flow phase
                         intent_object['slots']['StreetName'] = None
                         intent_object['slots']['City'] = None
                         intent_object['slots']['State'] = None
                         intent_object['slots']['ZipCode'] = None
-                        message = "Okay, let's try again. What is your street name?"
-                        logger.debug('Message: %s', message)
-                        session_attributes.update(
+                        state.update(
                             {
                                 'flowPhase': 'address',
                                 'fullAddress': '',  # Clear stored address
-                                'lastMessage': message,
+                                'lastPrompt': 'TRY_ADDRESS_AGAIN',
                                 'lastSlot': 'StreetName',
                             }
                         )
+                        message = self.last_message(state)
+                        logger.debug('Message: %s', message)
                         return self.elicit_slot_response(
                             slot_name='StreetName',
                             message=message,
@@ -755,19 +820,19 @@ class PamphletHandler:
                         )
 
                 # If AddressConfirmation slot is not yet filled, elicit it again
-                full_address = session_attributes.get('fullAddress', '')
+                full_address = state.get('fullAddress', '')
                 if not full_address:
                     logger.debug('No fullAddress found, restarting address collection')
-                    message = "Okay, let's try again. What is your street name?"
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'flowPhase': 'address',
                             'fullAddress': '',
-                            'lastMessage': message,
+                            'lastPrompt': 'TRY_ADDRESS_AGAIN',
                             'lastSlot': 'StreetName',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='AddressConfirmation',  ##
                         message=f'Is this your address: {full_address}?',
@@ -788,19 +853,19 @@ class PamphletHandler:
                 logger.debug('HearAllChoicesAgain value: %s', pamphlet_choices_again)
                 if (
                     pamphlet_choices_again is not None
-                    and 'yes' in pamphlet_choices_again
+                    and YES_NO.label(pamphlet_choices_again) == 'yes'
                 ):
-                    message = "You haven't selected any pamphlets. Let's start again. Would you like to hear the pamphlet on Understanding Social Security?"
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
-                            'currentPamphletIndex': '1',
-                            'selectedPamphlets': json.dumps([]),
+                            'currentPamphletIndex': 1,
+                            'selectedPamphlets': [],
                             'flowPhase': 'selection',
-                            'lastMessage': message,
+                            'lastPrompt': 'START_AGAIN',
                             'lastSlot': 'UnderstandingSocialSecurity',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='UnderstandingSocialSecurity',
                         message=message,
@@ -809,17 +874,17 @@ class PamphletHandler:
                     )
                 if (
                     pamphlet_choices_again is not None
-                    and 'no' in pamphlet_choices_again
+                    and YES_NO.label(pamphlet_choices_again) == 'no'
                 ):
-                    message = "Alright. If you're finished, feel free to hang up. Otherwise, just hang on and I'll take you back to the Main Menu."
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
-                            'currentPamphletIndex': '1',
-                            'lastMessage': message,
+                            'currentPamphletIndex': 1,
+                            'lastPrompt': 'GOODBYE',
                             'lastSlot': 'MainMenu',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.close_response(
                         session_attributes=session_attributes,
                         intent_name='MainMenu',
@@ -834,16 +899,14 @@ class PamphletHandler:
                 return self.close_response(
                     session_attributes=session_attributes,
                     intent_name=intent_name,
-                    message=f'Sorry, you can only skip pamphlets while selecting them. {last_message}',
+                    message=self.render('SKIP_OUTSIDE_SELECTION', state),
                 )
             # Grab sesion attributes
-            current_index = int(session_attributes.get('currentPamphletIndex', 1))
-            selected_pamphlets = json.loads(
-                session_attributes.get('selectedPamphlets', '[]')
-            )
+            current_index = state.get('currentPamphletIndex', 1)
+            selected_pamphlets = state.get('selectedPamphlets', [])
             # Increment pamphlet index
             current_index += 1
-            session_attributes['currentPamphletIndex'] = str(current_index)
+            state['currentPamphletIndex'] = current_index
             logger.debug('Updated currentPamphletIndex to %s', current_index)
             # If within pamphlet selection
             if current_index <= 7:
@@ -851,15 +914,15 @@ class PamphletHandler:
                 intent_object['name'] = (
                     'ProcessPamphletRequest'  # Switch back to main intent
                 )
-                message = f'Would you like to hear the pamphlet on {self._format_pamphlet_name(next_pamphlet)}?'
-                logger.debug('Message: %s', message)
-                session_attributes.update(
+                state.update(
                     {
                         'flowPhase': 'selection',
-                        'lastMessage': message,
+                        'lastPrompt': 'OFFER_NEXT_PAMPHLET',
                         'lastSlot': next_pamphlet,
                     }
                 )
+                message = self.last_message(state)
+                logger.debug('Message: %s', message)
                 return self.elicit_slot_response(
                     slot_name=next_pamphlet,
                     message=message,
@@ -885,15 +948,15 @@ class PamphletHandler:
             else:
                 if not selected_pamphlets:
                     intent_object['name'] = 'ProcessPamphletRequest'
-                    message = 'That was the last one. Would you like to hear those choices again?'
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'flowPhase': 'selection',
-                            'lastMessage': message,
+                            'lastPrompt': 'LAST_ONE',
                             'lastSlot': 'HearAllChoicesAgain',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='HearAllChoicesAgain',
                         message=message,
@@ -901,15 +964,15 @@ class PamphletHandler:
                         intent=intent_object,
                     )
                 else:
-                    message = "Thanks. Now let's get your address. What is your street name? (4)"
-                    logger.debug('Message: %s', message)
-                    session_attributes.update(
+                    state.update(
                         {
                             'flowPhase': 'address',
-                            'lastMessage': message,
+                            'lastPrompt': 'ASK_ADDRESS_4',
                             'lastSlot': 'StreetName',
                         }
                     )
+                    message = self.last_message(state)
+                    logger.debug('Message: %s', message)
                     return self.elicit_slot_response(
                         slot_name='StreetName',
                         message=message,
@@ -919,8 +982,8 @@ class PamphletHandler:
 
         elif intent_name == 'Repeat':
             logger.debug('RepeatRequest Intent')
-            last_message = session_attributes.get('lastMessage', '')
-            last_slot = session_attributes.get('lastSlot', '')
+            last_message = self.last_message(state)
+            last_slot = state.get('lastSlot', '')
             logger.debug('Last message: %s', last_message)
             logger.debug('Last slot: %s', last_slot)
 
@@ -940,15 +1003,15 @@ class PamphletHandler:
                 intent_object['name'] = (
                     'ProcessPamphletRequest'  # Switch back to main intent
                 )
-                message = f'Sure, let me repeat that: {last_message}'
+                message = self.render('REPEAT', state, last_message=last_message)
                 logger.debug('Message: %s', message)
 
                 # Preserve the current flow phase instead of always setting to 'selection'
-                current_flow_phase = session_attributes.get('flowPhase', 'selection')
-                session_attributes.update(
+                # and the last prompt, so a repeat of a repeat doesn't nest
+                current_flow_phase = state.get('flowPhase', 'selection')
+                state.update(
                     {
                         'flowPhase': current_flow_phase,
-                        'lastMessage': message,
                         'lastSlot': last_slot,
                     }
                 )
@@ -966,14 +1029,14 @@ class PamphletHandler:
                     last_slot,
                 )
                 intent_object['name'] = 'ProcessPamphletRequest'
-                message = "Sorry, there's nothing to repeat yet. Would you like a pamphlet on Understanding Social Security?"
-                session_attributes.update(
+                state.update(
                     {
                         'flowPhase': 'selection',
-                        'lastMessage': message,
+                        'lastPrompt': 'NOTHING_TO_REPEAT',
                         'lastSlot': 'UnderstandingSocialSecurity',
                     }
                 )
+                message = self.last_message(state)
                 return self.elicit_slot_response(
                     slot_name='UnderstandingSocialSecurity',
                     message=message,
@@ -983,9 +1046,8 @@ class PamphletHandler:
 
         elif intent_name == 'ReturnToMenu':
             logger.debug('ReturnToMenu Intent')
-            session_attributes = self.get_session_attributes(event)
-            last_message = session_attributes.get('lastMessage', '')
-            last_slot = session_attributes.get('lastSlot', '')
+            last_message = self.last_message(state)
+            last_slot = state.get('lastSlot', '')
             logger.debug('Last message: %s', last_message)
             logger.debug('Last slot: %s', last_slot)
 
@@ -1003,7 +1065,7 @@ class PamphletHandler:
             # If None or empty, confirm return to menu
             if confirmation_value is None or confirmation_value == '':
                 logger.debug('ConfirmationMainMenu is empty')
-                message = 'Are you sure you want to return to the main menu?'
+                message = self.render('CONFIRM_RETURN_TO_MENU', state)
                 return self.elicit_slot_response(
                     slot_name='ConfirmationMainMenu',
                     message=message,
@@ -1011,20 +1073,19 @@ class PamphletHandler:
                     intent=intent_object,
                 )
             # If No, return to last slot and intent
-            elif confirmation_value.lower() == 'no':
+            elif YES_NO.label(confirmation_value) == 'no':
                 # Return to last slot and intent
                 logger.debug('ConfirmationMainMenu is No')
-                current_flow_phase = session_attributes.get('flowPhase', 'selection')
+                current_flow_phase = state.get('flowPhase', 'selection')
 
                 # Create a new intent object for ProcessPamphletRequest
                 process_intent = {'name': 'ProcessPamphletRequest', 'slots': {}}
 
-                # Update session attributes
-                session_attributes.update(
+                # Update session state
+                state.update(
                     {
                         'flowPhase': current_flow_phase,
-                        'lastMessage': last_message,
-                        'lastSlot': last_slot,
+                        'lastSlot': last_slot or None,
                     }
                 )
 
@@ -1036,18 +1097,19 @@ class PamphletHandler:
                     intent=process_intent,  # Use the new intent object
                 )
             # If Yes, clear session and close
-            elif confirmation_value.lower() == 'yes':
+            elif YES_NO.label(confirmation_value) == 'yes':
                 logger.debug('ConfirmationMainMenu is Yes')
                 session_attributes.clear()
+                state.clear()
                 return self.close_response(
                     session_attributes=session_attributes,
                     intent_name=intent_name,
-                    message='Returning to the main menu.',
+                    message=self.render('RETURNING_TO_MENU', state),
                 )
 
-        return self.fulfillment_hook(event)
+        return self.fulfillment_hook(event, state)
 
-    def fulfillment_hook(self, event):
+    def fulfillment_hook(self, event, state):
         """Handle fulfillment - determine final action based on collected slots"""
         intent_object = self.get_intent(event)
         intent_name = intent_object.get('name', '')
@@ -1055,27 +1117,25 @@ class PamphletHandler:
         session_attributes = self.get_session_attributes(event)
 
         logger.debug(
-            'Fulfillment hook - Intent: %s, Slots: %s, Session Attributes: %s',
-            json.dumps(intent_name),
-            json.dumps(slots),
-            json.dumps(session_attributes),
+            'Fulfillment hook - Intent: %s, Slots: %s, Session state: %s',
+            lazy_json(intent_name),
+            lazy_json(slots),
+            lazy_json(state.values),
         )
 
         # Check if we're in the address flow phase and we should redirect back to dialog_hook
         # This prevents premature fulfillment when we're still collecting address information
-        flow_phase = session_attributes.get('flowPhase', '')
-        if flow_phase == 'address' and not session_attributes.get('fullAddress'):
+        flow_phase = state.get('flowPhase', '')
+        if flow_phase == 'address' and not state.get('fullAddress'):
             logger.debug(
                 'In address flow phase but address collection not complete, redirecting to dialog_hook'
             )
-            return self.dialog_hook(event)
+            return self.dialog_hook(event, state)
 
         if intent_name == 'ProcessPamphletRequest':
-            # Extract session attributes
-            full_address = session_attributes.get('fullAddress', '')
-            selected_pamphlets = json.loads(
-                session_attributes.get('selectedPamphlets', '[]')
-            )
+            # Extract session state
+            full_address = state.get('fullAddress', '')
+            selected_pamphlets = state.get('selectedPamphlets', [])
             logger.debug('Full address: %s', full_address)
             logger.debug('Selected pamphlets: %s', selected_pamphlets)
 
@@ -1087,7 +1147,7 @@ class PamphletHandler:
                 return self.close_response(
                     session_attributes=session_attributes,
                     intent_name=intent_name,
-                    message='Sorry, there was an issue with your request. Please try again. Missing address or pamphlets.',
+                    message=self.render('ORDER_INCOMPLETE', state),
                 )
 
             # Simulate API call with 90% success rate
@@ -1103,13 +1163,15 @@ class PamphletHandler:
                 return self.close_response(
                     session_attributes=session_attributes,
                     intent_name=intent_name,
-                    message=f"All set. I've put your order through, and you should receive the pamphlets, {formatted_pamphlets}, in the mail within two weeks.",
+                    message=self.render(
+                        'ORDER_PLACED', state, pamphlets=formatted_pamphlets
+                    ),
                 )
             else:
                 return self.close_response(
                     session_attributes=session_attributes,
                     intent_name=intent_name,
-                    message='Sorry, there was an issue processing your request. Please try again later. Mock API call fail simulated.',
+                    message=self.render('ORDER_FAILED', state),
                 )
 
         elif intent_name == 'Skip':
@@ -1117,13 +1179,12 @@ class PamphletHandler:
             return self.close_response(
                 session_attributes=session_attributes,
                 intent_name=intent_name,
-                message='Moving on.',
+                message=self.render('MOVING_ON', state),
             )
 
         elif intent_name == 'Repeat':
             logger.warning('Repeat intent reached fulfillment_hook unexpectedly')
-            flow_phase = session_attributes.get('flowPhase', 'selection')
-            message = "Sorry, I didn't catch that. Let's continue where we left off."
+            flow_phase = state.get('flowPhase', 'selection')
             default_slot = (
                 'UnderstandingSocialSecurity'
                 if flow_phase == 'selection'
@@ -1131,9 +1192,8 @@ class PamphletHandler:
                 if flow_phase == 'address'
                 else 'AddressConfirmation'
             )
-            session_attributes.update(
-                {'lastMessage': message, 'lastSlot': default_slot}
-            )
+            state.update({'lastPrompt': 'CONTINUE', 'lastSlot': default_slot})
+            message = self.last_message(state)
             # Set intent to main intent, return to the main flow
             intent_object['name'] = 'ProcessPamphletRequest'
             return self.elicit_slot_response(
@@ -1146,14 +1206,14 @@ class PamphletHandler:
             return self.close_response(
                 session_attributes=session_attributes,
                 intent_name=intent_name,
-                message='Returning to the main menu.',
+                message=self.render('RETURNING_TO_MENU', state),
             )
         else:
             logger.debug('Unknown intent: %s', intent_name)
             return self.close_response(
                 session_attributes=session_attributes,
                 intent_name=intent_name,
-                message="Sorry, I didn't understand that request. Intent failed.",
+                message=self.render('UNKNOWN_INTENT', state),
             )
 
     ### Helper functions to extract data from Lex events ###
@@ -1172,6 +1232,23 @@ class PamphletHandler:
 
     ### Helper functions to format ###
 
+    def render(self, prompt_id, state, **values):
+        """Render a prompt with the pamphlet or address of the session state"""
+        prompt = CATALOG.prompt(prompt_id)
+        if prompt.fields & {'pamphlet', 'title'}:
+            pamphlet = self.slot_names[str(state['currentPamphletIndex'])]
+            values.update(pamphlet=pamphlet, title=self._format_pamphlet_name(pamphlet))
+        if 'address' in prompt.fields:
+            values['address'] = state.get('fullAddress', '')
+        if 'last_message' in prompt.fields and 'last_message' not in values:
+            values['last_message'] = self.last_message(state)
+        return prompt.render(**values)
+
+    def last_message(self, state):
+        """Render the last prompt of the session again"""
+        last_prompt = state.get('lastPrompt')
+        return self.render(last_prompt, state) if last_prompt else ''
+
     def _format_pamphlet_name(self, pamphlet):
         """Format a single pamphlet name for user-friendly prompts"""
         readable_names = {
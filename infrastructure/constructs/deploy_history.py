@@ -0,0 +1,269 @@
+import json
+import os
+import statistics
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+HISTORY_FILE = 'deploy-history.json'
+PLAN_FILE = 'deploy-plan.json'
+
+# Number of runs kept in the history file
+MAX_RUNS = 20
+# Runs considered when looking for the parallelism that throttles
+THROTTLE_WINDOW = 5
+DEFAULT_PARALLELISM = 2
+MAX_PARALLELISM = 8
+
+# Status reasons CloudFormation reports when Lex refuses a build
+THROTTLE_REASONS = (
+    'rate exceeded',
+    'throttl',
+    'too many requests',
+    'toomanyrequests',
+    'limit exceeded',
+    'internal error',
+)
+
+
+@dataclass
+class BotOutcome:
+    """How the deploy of one bot construct went"""
+
+    duration: float
+    throttled: bool = False
+
+
+@dataclass
+class DeployRun:
+    """Outcome of one deploy, keyed by construct id"""
+
+    parallelism: int
+    bots: Dict[str, BotOutcome] = field(default_factory=dict)
+    # Wall clock time of the whole deploy
+    duration: float = 0
+
+    @property
+    def throttled(self) -> bool:
+        return any(outcome.throttled for outcome in self.bots.values())
+
+
+class DeployHistory:
+    """
+    Local JSON history of deploy outcomes used by `throttled_deploy(parallelism='auto')`
+
+    Format: {"runs": [{"parallelism": 2, "duration": 900.0, "bots": {"YesNoBot":
+    {"duration": 95.0, "throttled": false}}}]}, oldest run first. Durations are in
+    seconds.
+    """
+
+    def __init__(self, runs: Optional[List[DeployRun]] = None):
+        self.runs: List[DeployRun] = runs or []
+
+    @classmethod
+    def load(cls, path: str) -> 'DeployHistory':
+        """Load the history, a missing or unreadable file is an empty history"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+
+        runs = [
+            DeployRun(
+                parallelism=int(run['parallelism']),
+                bots={
+                    id: BotOutcome(
+                        duration=float(outcome['duration']),
+                        throttled=bool(outcome.get('throttled', False)),
+                    )
+                    for id, outcome in run.get('bots', {}).items()
+                },
+                duration=float(run.get('duration', 0)),
+            )
+            for run in data.get('runs', [])
+        ]
+        return cls(runs)
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump({'runs': [asdict(run) for run in self.runs]}, f, indent=2)
+
+    def record(self, run: DeployRun) -> None:
+        self.runs.append(run)
+        del self.runs[:-MAX_RUNS]
+
+    def choose_parallelism(
+        self,
+        default: int = DEFAULT_PARALLELISM,
+        max_parallelism: int = MAX_PARALLELISM,
+    ) -> int:
+        """
+        Pick the parallelism of the next deploy
+
+        Stays below the lowest parallelism that throttled in the last
+        THROTTLE_WINDOW runs, and probes one step higher after each clean run.
+        Once a throttled run leaves the window, the higher value is tried again.
+        """
+        if not self.runs:
+            return default
+
+        recent = self.runs[-THROTTLE_WINDOW:]
+        ceiling = min(
+            (run.parallelism for run in recent if run.throttled),
+            default=max_parallelism + 1,
+        )
+
+        last = self.runs[-1]
+        if last.throttled:
+            parallelism = min(last.parallelism - 1, ceiling - 1)
+        else:
+            parallelism = min(last.parallelism + 1, ceiling - 1)
+
+        return max(1, min(parallelism, max_parallelism))
+
+    def durations(self) -> Dict[str, float]:
+        """Median duration of each bot across runs where it wasn't throttled"""
+        samples: Dict[str, List[float]] = {}
+        for run in self.runs:
+            for id, outcome in run.bots.items():
+                if not outcome.throttled:
+                    samples.setdefault(id, []).append(outcome.duration)
+        return {id: statistics.median(values) for id, values in samples.items()}
+
+    def costs(self, ids: List[str], estimates: List[float]) -> List[float]:
+        """
+        Deploy cost of each id in seconds
+
+        Uses the recorded duration where there is one. Other ids get their estimate
+        scaled by the seconds per estimated unit of the recorded bots.
+        """
+        durations = self.durations()
+        known = [
+            (durations[id], est) for id, est in zip(ids, estimates) if id in durations
+        ]
+        scale = 1.0
+        if known:
+            scale = sum(duration for duration, _ in known) / (
+                sum(est for _, est in known) or 1
+            )
+        return [durations.get(id, est * scale) for id, est in zip(ids, estimates)]
+
+
+def write_plan(outdir: str, parallelism: int, lanes: List[List[str]]) -> None:
+    """Write the lanes of this synth next to the template, read by `record_deploy`"""
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, PLAN_FILE), 'w') as f:
+        json.dump({'parallelism': parallelism, 'lanes': lanes}, f, indent=2)
+
+
+def is_throttle_reason(reason: Optional[str]) -> bool:
+    reason = (reason or '').lower()
+    return any(text in reason for text in THROTTLE_REASONS)
+
+
+def outcomes_from_events(
+    events: List[dict], construct_ids: Dict[str, str]
+) -> Dict[str, BotOutcome]:
+    """
+    Summarize CloudFormation stack events per construct
+
+    Args:
+        events: Stack events of a single deploy (describe_stack_events)
+        construct_ids: Logical id -> top level construct id
+
+    Returns:
+        First start to last completion of the construct's resources, and whether any
+        of them failed because of throttling
+    """
+    spans: Dict[str, List[float]] = {}
+    throttled: Dict[str, bool] = {}
+    for event in events:
+        id = construct_ids.get(event.get('LogicalResourceId'))
+        if id is None:
+            continue
+        time = event['Timestamp'].timestamp()
+        span = spans.setdefault(id, [time, time])
+        span[0] = min(span[0], time)
+        span[1] = max(span[1], time)
+        if event.get('ResourceStatus', '').endswith('FAILED') and is_throttle_reason(
+            event.get('ResourceStatusReason')
+        ):
+            throttled[id] = True
+
+    return {
+        id: BotOutcome(duration=end - start, throttled=throttled.get(id, False))
+        for id, (start, end) in spans.items()
+    }
+
+
+def record_deploy(
+    stack_name: str, cdk_out: str = 'cdk.out', history_path: str = HISTORY_FILE
+) -> DeployRun:
+    """
+    Append the outcome of the last deploy of a stack to the history
+
+    Reads the plan and template of the last synth from cdk_out and the events of
+    the last deploy from CloudFormation.
+    """
+    import boto3
+
+    with open(os.path.join(cdk_out, PLAN_FILE), 'r') as f:
+        plan = json.load(f)
+    with open(os.path.join(cdk_out, f'{stack_name}.template.json'), 'r') as f:
+        template = json.load(f)
+
+    # LexPy/YesNoBot/Bot/Resource -> YesNoBot
+    planned = {id for lane in plan['lanes'] for id in lane}
+    construct_ids = {}
+    for logical_id, resource in template.get('Resources', {}).items():
+        path = resource.get('Metadata', {}).get('aws:cdk:path', '').split('/')
+        if len(path) > 1 and path[1] in planned:
+            construct_ids[logical_id] = path[1]
+
+    # Events are returned newest first, stop at the start of the last deploy
+    events = []
+    client = boto3.client('cloudformation')
+    for page in client.get_paginator('describe_stack_events').paginate(
+        StackName=stack_name
+    ):
+        for event in page['StackEvents']:
+            events.append(event)
+            if (
+                event.get('ResourceType') == 'AWS::CloudFormation::Stack'
+                and event.get('ResourceStatus')
+                in ('CREATE_IN_PROGRESS', 'UPDATE_IN_PROGRESS')
+                and event.get('ResourceStatusReason') == 'User Initiated'
+            ):
+                break
+        else:
+            continue
+        break
+
+    times = [event['Timestamp'].timestamp() for event in events]
+    run = DeployRun(
+        parallelism=plan['parallelism'],
+        bots=outcomes_from_events(events, construct_ids),
+        duration=max(times) - min(times) if times else 0,
+    )
+    history = DeployHistory.load(history_path)
+    history.record(run)
+    history.save(history_path)
+    return run
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Record the outcome of the last deploy into the deploy history'
+    )
+    parser.add_argument('stack_name')
+    parser.add_argument('--cdk-out', default='cdk.out')
+    parser.add_argument('--history', default=HISTORY_FILE)
+    args = parser.parse_args()
+
+    result = record_deploy(args.stack_name, args.cdk_out, args.history)
+    print(
+        f'parallelism={result.parallelism} duration={result.duration:.0f}s '
+        f'throttled={result.throttled}'
+    )
@@ -0,0 +1,96 @@
+import heapq
+from typing import Dict, List
+
+from .deploy_history import BotOutcome, DeployHistory, DeployRun
+from .throttled_deploy import pack_lanes
+
+# Delay before CloudFormation gets a throttled build through on a retry
+RETRY_DELAY = 60.0
+
+
+def simulate_deploy(
+    lanes: List[List[str]],
+    durations: Dict[str, float],
+    build_limit: int,
+    retry_delay: float = RETRY_DELAY,
+) -> DeployRun:
+    """
+    Simulate a deploy of dependency lanes against a Lex build concurrency limit
+
+    Lanes start together and deploy their bots one after the other. A bot that
+    starts while `build_limit` builds are already running is throttled and retried
+    after `retry_delay`.
+
+    Args:
+        lanes: Construct ids of each lane, in deploy order
+        durations: Build time of each construct id in seconds
+        build_limit: Number of builds Lex accepts at the same time
+        retry_delay: Seconds before a throttled build is retried
+
+    Returns:
+        The outcome of each bot, as `record_deploy` would have recorded it
+    """
+    starts: Dict[str, float] = {}
+    throttled: Dict[str, bool] = {}
+    outcomes: Dict[str, BotOutcome] = {}
+    running = 0
+    end = 0.0
+
+    # (time, order, lane index, position in lane, is_finish)
+    # Finishes sort before starts at the same time, they free their build slot
+    events = [(0.0, 1, lane, 0, False) for lane in range(len(lanes)) if lanes[lane]]
+    heapq.heapify(events)
+
+    while events:
+        time, _, lane, position, is_finish = heapq.heappop(events)
+        id = lanes[lane][position]
+
+        if is_finish:
+            running -= 1
+            end = time
+            outcomes[id] = BotOutcome(
+                duration=time - starts[id], throttled=throttled.get(id, False)
+            )
+            if position + 1 < len(lanes[lane]):
+                heapq.heappush(events, (time, 1, lane, position + 1, False))
+            continue
+
+        starts.setdefault(id, time)
+        if running >= build_limit:
+            throttled[id] = True
+            heapq.heappush(events, (time + retry_delay, 1, lane, position, False))
+            continue
+
+        running += 1
+        heapq.heappush(events, (time + durations[id], 0, lane, position, True))
+
+    return DeployRun(parallelism=len(lanes), bots=outcomes, duration=end)
+
+
+def simulate_policy(
+    durations: Dict[str, float],
+    build_limit: int,
+    deploys: int,
+    history: DeployHistory = None,
+) -> List[DeployRun]:
+    """
+    Run the `throttled_deploy(parallelism='auto')` policy for a number of deploys
+
+    Each deploy chooses its parallelism and lanes from the history, is simulated
+    and recorded, like a real deploy followed by `record_deploy`.
+    """
+    history = history or DeployHistory()
+    ids = list(durations)
+    estimates = [durations[id] for id in ids]
+    runs = []
+    for _ in range(deploys):
+        parallelism = history.choose_parallelism()
+        costs = history.costs(ids, estimates)
+        lanes = [
+            [ids[index] for index in lane] for lane in pack_lanes(costs, parallelism)
+        ]
+        run = simulate_deploy(lanes, durations, build_limit)
+        run.parallelism = parallelism
+        history.record(run)
+        runs.append(run)
+    return runs
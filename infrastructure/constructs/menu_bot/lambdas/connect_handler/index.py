@@ -1,33 +1,27 @@
 import json
-import logging
 import os
+from types import MappingProxyType
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
+from lex_runtime.log import get_logger
 
+logger = get_logger()
 
-# def handler(event, context=None):
-#     logger.debug('Event: %s', json.dumps(event, indent=2))
+CONFIG_FILE_PATH = os.path.join(os.path.dirname(__file__), 'menu_config.json')
 
-#     parameters = event.get('Details', {}).get('Parameters', {})
-#     lang_code = event.get('Details', {}).get('ContactData', {}).get('LanguageCode')
+# Set to true to reload menu_config.json when the file changes (local testing)
+RELOAD_CONFIG = os.environ.get('MENU_CONFIG_RELOAD', '').lower() in ('1', 'true')
 
-#     # Get language from parameters, fallback to contact language, then to default 'en_US'
-#     lang = (parameters.get('lang') or lang_code or 'en_US').replace('-', '_')
+RESPONSE_KEYS = ('greeting', 'morePrompt', 'help', 'hangUp')
+EMPTY_RESPONSE = {key: '' for key in RESPONSE_KEYS}
 
-#     config_str = os.environ.get('CONFIG')
-#     if not config_str:
-#         raise ValueError('CONFIG environment variable is required but was empty')
 
-#     config = json.loads(config_str)
-#     locale = config.get(lang, {})
+def load_responses(config_file_path: str = CONFIG_FILE_PATH) -> MappingProxyType:
+    """
+    Build the read-only lookup table of connect responses per locale
 
-
-def handler(event, context=None):
-    # ... existing code ...
-
-    # Read config from file instead of environment variable
-    config_file_path = os.path.join(os.path.dirname(__file__), 'menu_config.json')
+    Returns:
+        locale id -> {'greeting', 'morePrompt', 'help', 'hangUp'}
+    """
     try:
         with open(config_file_path, 'r') as f:
             config = json.load(f)
@@ -36,13 +30,35 @@ def handler(event, context=None):
     except json.JSONDecodeError as e:
         raise ValueError(f'Invalid JSON in config file: {str(e)}')
 
+    return MappingProxyType(
+        {
+            lang: {key: locale.get(key, '') for key in RESPONSE_KEYS}
+            for lang, locale in config.items()
+        }
+    )
+
+
+# Loaded once per container, a warm invocation is a single lookup
+responses = load_responses()
+config_mtime = os.stat(CONFIG_FILE_PATH).st_mtime if RELOAD_CONFIG else None
+
+
+def reload_if_changed() -> None:
+    global responses, config_mtime
+
+    mtime = os.stat(CONFIG_FILE_PATH).st_mtime
+    if mtime != config_mtime:
+        logger.debug('Reloading %s', CONFIG_FILE_PATH)
+        responses = load_responses(CONFIG_FILE_PATH)
+        config_mtime = mtime
+
+
+def handler(event, context=None):
+    if RELOAD_CONFIG:
+        reload_if_changed()
+
     lang_code = event.get('Details', {}).get('ContactData', {}).get('LanguageCode')
     lang = (lang_code or 'en_US').replace('-', '_')
-    locale = config.get(lang, {})
-
-    return {
-        'greeting': locale.get('greeting', ''),
-        'morePrompt': locale.get('morePrompt', ''),
-        'help': locale.get('help', ''),
-        'hangUp': locale.get('hangUp', ''),
-    }
+
+    # Shared between invocations, don't modify
+    return responses.get(lang, EMPTY_RESPONSE)
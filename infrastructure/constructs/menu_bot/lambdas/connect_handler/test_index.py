@@ -1,99 +1,87 @@
 import json
 import os
-import pytest
-from unittest.mock import patch
-
-# Set environment variable for testing
-os.environ['CONFIG'] = json.dumps(
-    {
-        'en_US': {
-            'greeting': 'Thank you for calling the non-emergency hotline. How may I help you?',
-            'more_prompt': 'Is there anything else I can help you with?',
-            'help': 'I can assist with various services. Please tell me what you need.',
-            'hang_up': 'Thank you for calling. Goodbye.',
-        }
-    }
-)
+import sys
 
-# Import after setting environment variable
-# Adjust the import path based on your project structure
-from stacks_constructs.menu_bot.connect_handler import ConnectHandler, ConnectEvent
+import pytest
 
+# The lex_runtime layer, which Lambda adds to the path
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        *['..'] * 4,
+        'lambda_layers',
+        'lex_runtime',
+        'python',
+    )
+)
 
-def test_should_get_greeting():
-    # Create the system under test (sut)
-    sut = ConnectHandler.create()
+import index  # noqa: E402
 
-    # Create the test event
-    event = {
-        'Details': {
-            'ContactData': {'Attributes': {'lang': 'en_US'}, 'LanguageCode': 'en-US'},
-            'Parameters': {'lang': 'en_US'},
-        }
+CONFIG = {
+    'en_US': {
+        'greeting': 'Thank you for calling the non-emergency hotline. How may I help you?',
+        'morePrompt': 'Is there anything else I can help you with?',
+        'help': 'I can assist with various services. Please tell me what you need.',
+        'hangUp': 'Thank you for calling. Goodbye.',
+        'Operator': {'type': 'QueueTransfer'},
     }
+}
 
-    # Call the handler
-    response = sut.handler(event)
 
-    # Assert the response matches expected output
-    assert (
-        response['greeting']
-        == 'Thank you for calling the non-emergency hotline. How may I help you?'
-    )
-    assert response['morePrompt'] == 'Is there anything else I can help you with?'
-    assert (
-        response['help']
-        == 'I can assist with various services. Please tell me what you need.'
-    )
-    assert response['hangUp'] == 'Thank you for calling. Goodbye.'
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / 'menu_config.json'
+    path.write_text(json.dumps(CONFIG))
+    monkeypatch.setattr(index, 'CONFIG_FILE_PATH', str(path))
+    monkeypatch.setattr(index, 'responses', index.load_responses(str(path)))
+    return path
 
 
-def test_should_use_language_code_when_no_parameter():
-    # Create the system under test
-    sut = ConnectHandler.create()
-
-    # Create test event with language code but no lang parameter
+def test_should_get_greeting(config_file):
     event = {'Details': {'ContactData': {'LanguageCode': 'en-US'}, 'Parameters': {}}}
 
-    # Call the handler
-    response = sut.handler(event)
+    response = index.handler(event)
 
-    # Verify it used the language code properly
-    assert (
-        response['greeting']
-        == 'Thank you for calling the non-emergency hotline. How may I help you?'
-    )
+    assert response == {
+        'greeting': 'Thank you for calling the non-emergency hotline. How may I help you?',
+        'morePrompt': 'Is there anything else I can help you with?',
+        'help': 'I can assist with various services. Please tell me what you need.',
+        'hangUp': 'Thank you for calling. Goodbye.',
+    }
 
 
-def test_should_handle_missing_configuration():
-    # Create test with non-existent language
-    sut = ConnectHandler.create()
+def test_should_handle_missing_configuration(config_file):
+    event = {'Details': {'ContactData': {'LanguageCode': 'fr-FR'}}}
 
-    event = {
-        'Details': {
-            'ContactData': {'LanguageCode': 'fr-FR'},
-            'Parameters': {'lang': 'fr_FR'},
-        }
+    # Should return empty strings for missing config
+    assert index.handler(event) == {
+        'greeting': '',
+        'morePrompt': '',
+        'help': '',
+        'hangUp': '',
     }
 
-    # Should return empty strings for missing config
-    response = sut.handler(event)
-    assert response['greeting'] == ''
-    assert response['morePrompt'] == ''
-    assert response['help'] == ''
-    assert response['hangUp'] == ''
 
+def test_should_handle_missing_event_data(config_file):
+    # Should default to en_US
+    assert index.handler({})['hangUp'] == 'Thank you for calling. Goodbye.'
 
-def test_should_handle_missing_event_data():
-    # Test with minimal event
-    sut = ConnectHandler.create()
 
-    # Empty event
-    event = {}
+def test_should_not_read_the_config_when_warm(config_file):
+    os.remove(config_file)
+    assert index.handler({})['help'] != ''
 
-    # Should default to en_US
-    response = sut.handler(event)
-    assert (
-        response['greeting']
-        == 'Thank you for calling the non-emergency hotline. How may I help you?'
-    )
+    with pytest.raises(TypeError):
+        index.responses['en_US'] = {}
+
+
+def test_should_reload_changed_config_when_enabled(config_file, monkeypatch):
+    monkeypatch.setattr(index, 'RELOAD_CONFIG', True)
+    monkeypatch.setattr(index, 'config_mtime', os.stat(config_file).st_mtime)
+
+    config = json.loads(json.dumps(CONFIG))
+    config['en_US']['greeting'] = 'Hello'
+    config_file.write_text(json.dumps(config))
+    os.utime(config_file, (0, 0))
+
+    assert index.handler({})['greeting'] == 'Hello'
@@ -0,0 +1,147 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MORE_PROMPT = 'Is there anything else I can help you with?'
+
+# Session attribute holding the destination of each transfer action type
+DESTINATIONS = {
+    'PhoneTransfer': 'phone_number',
+    'QueueTransfer': 'queue_arn',
+    'FlowTransfer': 'contact_flow_arn',
+}
+
+
+def plain_text(message: Optional[str]) -> Optional[List[Dict[str, str]]]:
+    if not message:
+        return None
+    return [{'contentType': 'PlainText', 'content': message}]
+
+
+class Action(ABC):
+    """
+    Precompiled response for a menu intent
+
+    The messages and session attributes are built once at cold start, a response
+    only needs the session attributes (and slots) of the event filled in.
+    Don't modify the shared messages of a response.
+    """
+
+    __slots__ = ('attributes', 'messages', 'custom_handler')
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        attributes: Optional[Dict[str, str]] = None,
+        custom_handler: Optional[str] = None,
+    ):
+        self.attributes = attributes or {}
+        self.messages = plain_text(message)
+        self.custom_handler = custom_handler
+
+    @abstractmethod
+    def respond(
+        self, session_attributes: Dict[str, Any], intent_name: str, slots: Dict
+    ) -> Dict[str, Any]:
+        """The Lex response, with the event's session attributes updated"""
+
+
+class CloseAction(Action):
+    """Close the intent, with the given intent state"""
+
+    __slots__ = ('state',)
+
+    def __init__(self, *args, state: str = 'Fulfilled', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.state = state
+
+    def respond(self, session_attributes, intent_name, slots):
+        session_attributes.update(self.attributes)
+        result = {
+            'sessionState': {
+                'sessionAttributes': session_attributes,
+                'dialogAction': {'type': 'Close'},
+                'intent': {'slots': slots, 'name': intent_name, 'state': self.state},
+            }
+        }
+        if self.messages:
+            result['messages'] = self.messages
+        return result
+
+
+class ElicitIntentAction(Action):
+    """Play the message and ask for the next intent"""
+
+    __slots__ = ()
+
+    def __init__(self, message: str = '', *args, **kwargs):
+        super().__init__(message, *args, **kwargs)
+        # The message is always sent, even when empty, like LexHelper.elicit_intent
+        self.messages = [{'contentType': 'PlainText', 'content': message}]
+
+    def respond(self, session_attributes, intent_name, slots):
+        session_attributes.update(self.attributes)
+        return {
+            'sessionState': {
+                'sessionAttributes': session_attributes,
+                'dialogAction': {'type': 'ElicitIntent'},
+            },
+            'messages': self.messages,
+        }
+
+
+def compile_action(action: Dict[str, Any], more_prompt: str) -> Action:
+    """Compile one menu action (see models.py) into a response"""
+    action_type = action.get('type', '')
+    attributes = {'action': action_type}
+    # Older configs used camelCase
+    custom_handler = action.get('custom_handler') or action.get('customHandler')
+
+    if action_type == 'Prompt':
+        if action.get('hang_up'):
+            attributes['hangUp'] = 'true'
+            return CloseAction(action.get('prompt', ''), attributes, custom_handler)
+        return ElicitIntentAction(
+            f'{action.get("prompt", "")}... {more_prompt}', attributes, custom_handler
+        )
+
+    if action_type in DESTINATIONS:
+        attributes['destination'] = action.get(DESTINATIONS[action_type], '')
+        return CloseAction(
+            action.get('pre_transfer_prompt'), attributes, custom_handler
+        )
+
+    return CloseAction(
+        f'Unknown action type: {json.dumps(action, indent=2)}',
+        attributes,
+        custom_handler,
+        state='Failed',
+    )
+
+
+def compile_config(
+    config: Dict[str, Any],
+) -> Tuple[Dict[Tuple[str, str], Action], Dict[str, str]]:
+    """
+    Compile the menu config into a dispatch table
+
+    Returns:
+        (locale id, intent name) -> action, and locale id -> more prompt
+    """
+    table: Dict[Tuple[str, str], Action] = {}
+    more_prompts: Dict[str, str] = {}
+
+    for locale_id, locale in config.items():
+        more_prompt = locale.get('morePrompt', DEFAULT_MORE_PROMPT)
+        more_prompts[locale_id] = more_prompt
+
+        help_action = ElicitIntentAction(locale.get('help', ''))
+        table[(locale_id, 'help')] = help_action
+        table[(locale_id, 'FallbackIntent')] = help_action
+        table[(locale_id, 'hangUp')] = CloseAction(locale.get('hangUp', ''))
+
+        for intent_name, action in locale.items():
+            if isinstance(action, dict) and (locale_id, intent_name) not in table:
+                table[(locale_id, intent_name)] = compile_action(action, more_prompt)
+
+    return table, more_prompts
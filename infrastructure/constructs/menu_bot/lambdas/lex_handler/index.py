@@ -1,56 +1,47 @@
 import json
-import logging
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-import boto3
-from botocore.exceptions import ClientError
+from actions import DEFAULT_MORE_PROMPT, compile_config
 from helper import LexHelper
+from lex_runtime.dispatch import AsyncInvoker
+from lex_runtime.log import get_logger, log_event
 
-logger = logging.getLogger()
-logger.setLevel(os.environ.get('LOGGING_LEVEL', 'DEBUG'))
-
-lambda_client = boto3.client('lambda')
+logger = get_logger()
 
 
 class LexHandler:
     """
     Handles Lex events for menu-based bots
-    """
 
-    config = None
+    The menu config is compiled once into a dispatch table of
+    (locale id, intent name) -> precompiled action (see actions.py)
+    """
 
-    def __init__(self):
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
-        Initialize the handler with configuration from file
+        Initialize the handler with the given configuration, or from file
         """
-        # Read config from file instead of environment variable
-        config_file_path = os.path.join(os.path.dirname(__file__), 'menu_config.json')
-        try:
-            with open(config_file_path, 'r') as f:
-                self.config = json.load(f)
-        except FileNotFoundError:
-            raise ValueError(f'Config file not found at {config_file_path}')
-        except json.JSONDecodeError as e:
-            raise ValueError(f'Invalid JSON in config file: {str(e)}')
-
-    # def __init__(self):
-    #     """
-    #     Initialize the handler with configuration from environment variables
-    #     """
-    #     config_str = os.environ.get('CONFIG')
-    #     if not config_str:
-    #         raise ValueError('CONFIG environment variable is required but was empty')
-    #     self.config = json.loads(config_str)
-
-    #     self.event = None
-    #     self.helper = None
+        if config is None:
+            config_file_path = os.path.join(
+                os.path.dirname(__file__), 'menu_config.json'
+            )
+            try:
+                with open(config_file_path, 'r') as f:
+                    config = json.load(f)
+            except FileNotFoundError:
+                raise ValueError(f'Config file not found at {config_file_path}')
+            except json.JSONDecodeError as e:
+                raise ValueError(f'Invalid JSON in config file: {str(e)}')
+
+        self.config = config
+        self.actions, self.more_prompts = compile_config(config)
 
     def handler(self, event: Dict[str, Any], context=None) -> Dict[str, Any]:
         """
         Main handler function for Lex events
         """
-        logger.debug('Event: %s', json.dumps(event, indent=2))
+        log_event(logger, event)
         self.helper = LexHelper(event)
 
         try:
@@ -75,10 +66,9 @@ class LexHandler:
         confirmation_state = intent.get('confirmationState')
 
         if state == 'InProgress' and confirmation_state == 'Denied':
-            locale = self.config.get(helper.locale_id, {})
             # User denied confirmation
             return helper.elicit_intent(
-                locale.get('morePrompt', 'Is there anything else I can help you with?')
+                self.more_prompts.get(helper.locale_id, DEFAULT_MORE_PROMPT)
             )
         else:
             return helper.delegate()
@@ -91,73 +81,41 @@ class LexHandler:
         locale_id = helper.locale_id
         intent_name = helper.intent_name
 
-        locale = self.config.get(locale_id)
-        if not locale:
-            raise ValueError(f'Locale {locale_id} is not configured')
-
-        if intent_name == 'help' or intent_name == 'FallbackIntent':
-            return helper.elicit_intent(locale.get('help', ''))
-        if intent_name == 'hangUp':
-            return helper.fulfilled_response(locale.get('hangUp', ''))
-        if intent_name not in locale:
+        action = self.actions.get((locale_id, intent_name))
+        if action is None:
+            if locale_id not in self.more_prompts:
+                raise ValueError(f'Locale {locale_id} is not configured')
             raise ValueError(f'Intent {intent_name} not found in config')
 
-        action = locale[intent_name]
-        if action.get('customHandler'):
-            self.custom_handler(action['customHandler'])
-
-        helper.session_attributes['action'] = action.get('type', '')
-
-        if action.get('type') == 'Prompt':
-            if action.get('hang_up'):
-                helper.session_attributes['hangUp'] = 'true'
-                return helper.fulfilled_response(action.get('prompt', ''))
-            message = f'{action.get("prompt", "")}... {locale.get("more_prompt", "")}'
-            return helper.elicit_intent(message)
-        elif action.get('type') == 'PhoneTransfer':
-            helper.session_attributes['destination'] = action.get('phone_number', '')
-            return helper.fulfilled_response(action.get('pre_transfer_prompt'))
-        elif action.get('type') == 'QueueTransfer':
-            helper.session_attributes['destination'] = action.get('queue_arn', '')
-            return helper.fulfilled_response(action.get('pre_transfer_prompt'))
-        elif action.get('type') == 'FlowTransfer':
-            helper.session_attributes['destination'] = action.get(
-                'contact_flow_arn', ''
-            )
-            return helper.fulfilled_response(action.get('pre_transfer_prompt'))
+        if action.custom_handler:
+            self.custom_handler(action.custom_handler)
 
-        return helper.failed_response(
-            f'Unknown action type: {json.dumps(action, indent=2)}'
-        )
+        return action.respond(helper.session_attributes, intent_name, helper.slots)
 
     def custom_handler(self, lambda_arn: str) -> None:
         """
-        Invoke a custom handler Lambda function
+        Pass the event to a custom handler Lambda function, without waiting for it
         """
-        function_name = (
-            lambda_arn.split('function/')[-1]
-            if 'function/' in lambda_arn
-            else lambda_arn
-        )
-        logger.info(f'Passing event to custom handler: {function_name}')
-
-        try:
-            response = lambda_client.invoke(
-                FunctionName=function_name,
-                InvocationType='Event',
-                Payload=json.dumps(self.event),
-            )
-            logger.info(f'Lambda invocation response: {response}')
-        except ClientError as e:
-            logger.error(f'Error invoking Lambda function: {str(e)}')
+        invoker.submit(lambda_arn, self.helper.event)
 
 
 # Create handler instance
 handler_instance = LexHandler()
 
+# Custom handlers are invoked in the background and drained before the
+# environment freezes (CUSTOM_HANDLER_DISPATCH=sync to invoke inline). The
+# Lambda client is created by the first of them, and menus without any don't
+# register the drain extension at init
+invoker = AsyncInvoker()
+if any(action.custom_handler for action in handler_instance.actions.values()):
+    invoker.start_drain_extension()
+
 
 def handler(event, context=None):
     """
     Lambda handler function
     """
-    return handler_instance.handler(event, context)
+    try:
+        return handler_instance.handler(event, context)
+    finally:
+        invoker.handler_finished()
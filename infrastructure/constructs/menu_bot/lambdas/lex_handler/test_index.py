@@ -65,11 +65,21 @@ test_config = {
         },
     }
 }
-os.environ['CONFIG'] = json.dumps(test_config)
-
 # Add the parent directory to sys.path to import the handler module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from index import handler
+# The lex_runtime layer, which Lambda adds to the path
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        *['..'] * 4,
+        'lambda_layers',
+        'lex_runtime',
+        'python',
+    )
+)
+from index import LexHandler
+
+handler = LexHandler(test_config).handler
 
 
 def run_test():
@@ -9,9 +9,10 @@ from aws_cdk import aws_s3 as s3
 from aws_cdk.aws_lex import CfnBot, CfnBotAlias, CfnBotVersion
 from constructs import Construct
 
-from ..utils.hash_code import hash_code
+from ..utils.hash_code import hash_code, stable_hash
 from .associate_lex_bot import AssociateLexBot
 from .lex_role import LexRole, LexRoleProps
+from .synth_cache import SynthCache, cached_build
 
 
 @dataclass
@@ -79,7 +80,10 @@ class SimpleIntent:
     fulfillment_prompt: Optional[str] = None
 
     def to_cdk_intent(
-        self, dialog_code_hook: bool, fulfillment_code_hook: bool
+        self,
+        dialog_code_hook: bool,
+        fulfillment_code_hook: bool,
+        cache: Optional[SynthCache] = None,
     ) -> CfnBot.IntentProperty:
         # Prepare slot priorities if slots exist
         slot_priorities: List[CfnBot.SlotPriorityProperty] = None
@@ -91,7 +95,10 @@ class SimpleIntent:
 
         slots: List[CfnBot.SlotProperty] = []
         if self.slots:
-            slots = [slot.to_cdk_slot() for slot in self.slots]
+            slots = [
+                cached_build(cache, 'slot', slot, (), slot.to_cdk_slot)
+                for slot in self.slots
+            ]
 
         return CfnBot.IntentProperty(
             name=self.name,
@@ -165,7 +172,7 @@ class SimpleLocale:
     code_hook: Optional[CodeHook] = None
 
     def to_cdk_locale(
-        self, nlu_confidence_threshold: float
+        self, nlu_confidence_threshold: float, cache: Optional[SynthCache] = None
     ) -> CfnBot.BotLocaleProperty:
         dialog_code_hook = False
         fulfillment_code_hook = False
@@ -174,7 +181,15 @@ class SimpleLocale:
             fulfillment_code_hook = self.code_hook.fulfillment
 
         intents = [
-            intent.to_cdk_intent(dialog_code_hook, fulfillment_code_hook)
+            cached_build(
+                cache,
+                'intent',
+                intent,
+                (dialog_code_hook, fulfillment_code_hook),
+                lambda intent=intent: intent.to_cdk_intent(
+                    dialog_code_hook, fulfillment_code_hook, cache
+                ),
+            )
             for intent in self.intents
         ]
         intents.append(
@@ -255,9 +270,12 @@ class SimpleBot(Construct):
         # Only pass scope and id to the Construct base class
         super().__init__(scope, id)
 
-        version_id = f'Version{hash_code(props)}'
+        version_id = f'Version{self._version_hash(props)}'
         self.props = props
 
+        # Reuse property trees of unchanged locales/intents/slots between synths
+        cache = SynthCache.for_scope(self)
+
         # Store parameters as instance variables
         self.region = Stack.of(scope).region
         self.account = Stack.of(scope).account
@@ -283,7 +301,14 @@ class SimpleBot(Construct):
             role_arn=self.role.role_arn,
             data_privacy={'ChildDirected': False},
             bot_locales=[
-                l.to_cdk_locale(props.nlu_confidence_threshold) for l in props.locales
+                cached_build(
+                    cache,
+                    'locale',
+                    l,
+                    (props.nlu_confidence_threshold,),
+                    lambda l=l: l.to_cdk_locale(props.nlu_confidence_threshold, cache),
+                )
+                for l in props.locales
             ],
             auto_build_bot_locales=True,  # Turned off to prevent build issues
             test_bot_alias_settings=CfnBot.TestBotAliasSettingsProperty(
@@ -360,6 +385,19 @@ class SimpleBot(Construct):
                 alias=self.alias,
             )
 
+    def _version_hash(self, props: SimpleBotProps):
+        """
+        Hash the props for the version id, a new hash creates a new bot version
+        Set the `versionHash` context to `blake2b` to use the streaming hash. The default
+        (`legacy`) keeps existing version ids so deployed versions aren't replaced.
+        """
+        algorithm = self.node.try_get_context('versionHash') or 'legacy'
+        if algorithm == 'legacy':
+            return hash_code(props)
+        if algorithm == 'blake2b':
+            return stable_hash(props)
+        raise ValueError(f'Unknown versionHash algorithm: {algorithm}')
+
     # Rest of the class remains unchanged
     def _transform_slot_type(self, slot_type: dict) -> dict:
         """Transform slot type dictionary to Lex format"""
@@ -0,0 +1,187 @@
+import atexit
+import hashlib
+import json
+import os
+import sys
+from importlib import metadata
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from aws_cdk import Stage
+from constructs import Construct
+
+from ..utils.canonical_stringify import is_unresolved_token
+from ..utils.hash_code import stable_hash
+
+CACHE_FILE = 'simple-bot-cache.json'
+CACHE_FORMAT = 1
+
+
+def _cdk_version() -> str:
+    try:
+        return metadata.version('aws-cdk-lib')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+# Another aws-cdk-lib may render the same properties differently
+CDK_VERSION = _cdk_version()
+
+
+class _Uncacheable(Exception):
+    """Raised when a property tree holds values that can't be written to disk"""
+
+
+class SynthCache:
+    """
+    Content-addressed cache of CfnBot property trees
+
+    Entries are keyed by a hash of the Simple* dataclass that produced them, the
+    arguments of the conversion, the source of the module that defines the
+    conversion and the aws-cdk-lib version. Values are plain (camelCase) dicts,
+    which CfnBot accepts in place of the property classes, so a hit skips building
+    the property objects entirely.
+
+    Trees containing tokens (e.g. lambda ARNs) are never cached.
+    Disable with the `synthCache` context value set to false.
+    """
+
+    _instances: Dict[str, 'SynthCache'] = {}
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Any] = {}
+        self.used: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                if data.get('format') == CACHE_FORMAT:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError):
+                # A corrupt cache is just a cold cache
+                self.entries = {}
+
+    @classmethod
+    def for_scope(cls, scope: Construct) -> Optional['SynthCache']:
+        """Return the cache for the app output directory of the scope (one per outdir)"""
+        if scope.node.try_get_context('synthCache') in (False, 'false'):
+            return None
+
+        outdir = Stage.of(scope).outdir
+        cache = cls._instances.get(outdir)
+        if cache is None:
+            cache = cls(os.path.join(outdir, CACHE_FILE))
+            cls._instances[outdir] = cache
+            atexit.register(cache.save)
+        return cache
+
+    def get_or_build(
+        self, kind: str, source: Any, args: Tuple, build: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached property tree for source, or build and cache it
+
+        Args:
+            kind: Name of the conversion, e.g. 'intent'
+            source: The Simple* dataclass being converted
+            args: Extra arguments that change the output of the conversion
+            build: Builds the property object on a miss
+
+        Returns:
+            The cached plain tree, or the built property object
+        """
+        key = stable_hash((kind, CDK_VERSION, _module_digest(source), source, args))
+
+        cached = self.entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.used[key] = cached
+            return cached
+
+        self.misses += 1
+        built = build()
+        try:
+            tree = _to_plain(built)
+        except _Uncacheable:
+            return built
+
+        self.entries[key] = tree
+        self.used[key] = tree
+        return tree
+
+    def save(self) -> None:
+        """Write the entries used by this synth back to disk"""
+        if not self.path or not self.misses:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump({'format': CACHE_FORMAT, 'entries': self.used}, f)
+        except OSError:
+            # The cache is an optimization, never fail the synth because of it
+            pass
+
+
+def cached_build(
+    cache: Optional[SynthCache],
+    kind: str,
+    source: Any,
+    args: Tuple,
+    build: Callable[[], Any],
+) -> Any:
+    """Build through the cache when one is given, otherwise just build"""
+    if cache is None:
+        return build()
+    return cache.get_or_build(kind, source, args, build)
+
+
+_module_digests: Dict[str, str] = {}
+
+
+def _module_digest(source: Any) -> str:
+    """Hash of the source file that defines the conversion for source"""
+    module_name = type(source).__module__
+    digest = _module_digests.get(module_name)
+    if digest is None:
+        module_file = getattr(sys.modules.get(module_name), '__file__', None) or ''
+        content = b''
+        if module_file and os.path.exists(module_file):
+            with open(module_file, 'rb') as f:
+                content = f.read()
+        digest = hashlib.blake2b(content, digest_size=8).hexdigest()
+        _module_digests[module_name] = digest
+    return digest
+
+
+def _camel_case(name: str) -> str:
+    """slot_type_name -> slotTypeName, lambda_ -> lambda"""
+    first, *rest = name.rstrip('_').split('_')
+    return first + ''.join(part[:1].upper() + part[1:] for part in rest)
+
+
+def _to_plain(val: Any) -> Any:
+    """Convert a property object into the plain structure jsii would send"""
+    if val is None or isinstance(val, (bool, int, float)):
+        if is_unresolved_token(val):
+            raise _Uncacheable()
+        return val
+    if isinstance(val, str):
+        if is_unresolved_token(val):
+            raise _Uncacheable()
+        return val
+    if isinstance(val, (list, tuple)):
+        return [_to_plain(item) for item in val]
+    if isinstance(val, dict):
+        # Dicts are passed through to jsii as-is, keys included
+        return {key: _to_plain(item) for key, item in val.items()}
+
+    values = getattr(val, '_values', None)
+    if type(values) is dict:
+        # Struct (property) classes keep their python-named fields in _values
+        return {_camel_case(key): _to_plain(item) for key, item in values.items()}
+
+    # Tokens, constructs and other jsii references
+    raise _Uncacheable()
@@ -1,34 +1,191 @@
-import math
+import heapq
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from aws_cdk import Annotations, Stack, Stage
+from aws_cdk import aws_lambda as lambda_
 from constructs import Construct
-from typing import List
 
+from .deploy_history import HISTORY_FILE, DeployHistory, write_plan
+from .simple_bot import SimpleBot
+
+# Relative cost of the work CloudFormation waits on for each part of a bot.
+# Lex builds each locale separately, and build time grows with intents and slots
+BOT_COST = 10
+LOCALE_COST = 5
+INTENT_COST = 1
+SLOT_COST = 1
+LAMBDA_COST = 3
+
+
+@dataclass
+class DeployLane:
+    """A chain of constructs that are deployed one after the other"""
+
+    constructs: List[Construct] = field(default_factory=list)
+    cost: float = 0
 
-def throttled_deploy(constructs: List[Construct], parallelism: int = 2) -> None:
+
+def estimate_cost(construct: Construct) -> int:
     """
-    Allows you to control how many resources can be deployed at once
-    Use this to slow down your deploy and avoid AWS API Throttling
-    If you get an `internal error`, you may want to reduce parallelism
+    Estimate the relative deploy cost of a construct
+
+    Sums the bots (locales, intents and slots) and lambda functions found in the
+    construct tree. Constructs without either get a cost of 1.
+    """
+    cost = 0
+    for child in construct.node.find_all():
+        if isinstance(child, SimpleBot):
+            cost += BOT_COST
+            for locale in child.props.locales:
+                cost += LOCALE_COST
+                for intent in locale.intents:
+                    cost += INTENT_COST + SLOT_COST * len(intent.slots or [])
+        elif isinstance(child, lambda_.Function):
+            cost += LAMBDA_COST
+    return cost or 1
+
+
+def pack_lanes(costs: List[float], parallelism: int) -> List[List[int]]:
+    """
+    Pack items into balanced lanes, longest processing time first
+
+    Items are taken from the most to the least expensive and each one is added to
+    the lane with the lowest total cost. Ties keep the original order.
+
+    Returns:
+        The item indexes of each lane
+    """
+    lanes: List[List[int]] = [[] for _ in range(min(parallelism, len(costs)))]
+    if not lanes:
+        return lanes
+
+    order = sorted(range(len(costs)), key=lambda index: (-costs[index], index))
+
+    # (cost, lane index), the lane index breaks ties between equal lanes
+    heap = [(0, index) for index in range(len(lanes))]
+    for index in order:
+        cost, lane_index = heapq.heappop(heap)
+        lanes[lane_index].append(index)
+        heapq.heappush(heap, (cost + costs[index], lane_index))
+
+    return lanes
+
+
+def plan_lanes(
+    constructs: List[Construct],
+    parallelism: int,
+    costs: Optional[List[float]] = None,
+) -> List[DeployLane]:
+    """
+    Pack constructs into balanced lanes, see `pack_lanes`
 
     Args:
         constructs: List of constructs to deploy
-        parallelism: Number of parallel deployments, default 2, use 1 for sequential
+        parallelism: Number of lanes
+        costs: Cost of each construct, defaults to `estimate_cost`
     """
+    if costs is None:
+        costs = [estimate_cost(construct) for construct in constructs]
+
+    return [
+        DeployLane(
+            constructs=[constructs[index] for index in lane],
+            cost=sum(costs[index] for index in lane),
+        )
+        for lane in pack_lanes(costs, parallelism)
+    ]
+
+
+def context_parallelism(scope: Construct, default: int = 2) -> Union[int, str]:
     """
-    This splits your resources into groups based on the parallelism value. With 6 resources and parallelism=2, you'd get 3 resources per chunk.This splits your resources into groups based on the parallelism value. With 6 resources and parallelism=2, you'd get 3 resources per chunk.
+    The parallelism of the `deployParallelism` context value, default without it
+
+    'auto' is opt-in (-c deployParallelism=auto): the synthesized dependencies
+    then follow the deploy history recorded on this machine, which isn't
+    committed.
     """
-    assert parallelism > 0, 'Parallelism must be greater than 0'
+    value = scope.node.try_get_context('deployParallelism')
+    if value is None:
+        return default
+    # Context values of the command line are strings
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
 
+def throttled_deploy(
+    constructs: List[Construct], parallelism: Union[int, str] = 2
+) -> List[DeployLane]:
     """
-    This is the critical part. It creates a chain of dependencies between resources in each chunk:This creates a loop that iterates over the chunks of resources.
+    Allows you to control how many resources can be deployed at once
+    Use this to slow down your deploy and avoid AWS API Throttling
+    If you get an `internal error`, you may want to reduce parallelism,
+    or use parallelism='auto'
+
+    The constructs are packed into `parallelism` lanes balanced by their estimated
+    cost (see `estimate_cost`), and each lane is chained with dependencies. The
+    predicted critical path (the most expensive lane) is reported at synth time.
+
+    With parallelism='auto', the parallelism and the costs come from the deploy
+    history (see `DeployHistory`), read from the `deployHistory` context value or
+    deploy-history.json. Record a deploy with
+    `python -m infrastructure.constructs.deploy_history <stack>`.
+
+    Args:
+        constructs: List of constructs to deploy
+        parallelism: Number of parallel deployments, default 2, use 1 for sequential,
+            or 'auto'
+
+    Returns:
+        The deploy lanes
+
+    Raises:
+        ValueError: When parallelism is neither a positive int nor 'auto'
     """
-    # Create resource chunks which will be deployed sequentially
-    chunk_size = math.ceil(len(constructs) / parallelism)
-    for i in range(0, len(constructs), chunk_size):
-        chunk = constructs[i : i + chunk_size]
-        # print(f"Chunk length: {len(chunk)}")
+    if parallelism != 'auto' and (
+        not isinstance(parallelism, int)
+        or isinstance(parallelism, bool)
+        or parallelism < 1
+    ):
+        raise ValueError(
+            f"parallelism must be a positive int or 'auto', got {parallelism!r}"
+        )
+    if not constructs:
+        return []
+
+    costs = [estimate_cost(construct) for construct in constructs]
+    unit = ''
+    if parallelism == 'auto':
+        history = DeployHistory.load(
+            constructs[0].node.try_get_context('deployHistory') or HISTORY_FILE
+        )
+        parallelism = history.choose_parallelism()
+        if history.runs:
+            costs = history.costs(
+                [construct.node.id for construct in constructs], costs
+            )
+            unit = 's'
+
+    lanes = plan_lanes(constructs, parallelism, costs)
+
+    # Create a chain of dependencies for each lane, lanes are deployed in parallel
+    for lane in lanes:
+        for previous, resource in zip(lane.constructs, lane.constructs[1:]):
+            resource.node.add_dependency(previous)
+
+    stack = Stack.of(constructs[0])
+    critical = max(lanes, key=lambda lane: lane.cost)
+    total = sum(lane.cost for lane in lanes)
+    Annotations.of(stack).add_info(
+        f'throttled_deploy: {len(lanes)} lanes, critical path cost '
+        f'{critical.cost:.0f}{unit} of {total:.0f}{unit}: '
+        + ' -> '.join(construct.node.id for construct in critical.constructs)
+    )
+    write_plan(
+        Stage.of(stack).outdir,
+        parallelism,
+        [[construct.node.id for construct in lane.constructs] for lane in lanes],
+    )
 
-        for index, resource in enumerate(chunk):
-            if index > 0:
-                previous = chunk[index - 1]
-                # print(f"Current: {resource.node.id}, Previous: {previous.node.id}")
-                resource.node.add_dependency(previous)
+    return lanes
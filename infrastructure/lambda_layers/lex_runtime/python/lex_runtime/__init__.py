@@ -0,0 +1,7 @@
+"""
+Shared runtime for the bot lambdas, deployed as a Lambda layer (see create_lambda)
+"""
+
+from .helper import LexHelper
+
+__all__ = ['LexHelper']
@@ -0,0 +1,205 @@
+"""
+HTTP client for the backend APIs of the bot lambdas
+
+Create one per container at cold start so its connections are kept alive
+across invocations (urllib3 is only imported, and the pool only created, by
+the first request):
+
+    OFFICE_API = ApiClient(os.environ['OFFICE_API_ENDPOINT'])
+
+    try:
+        office = OFFICE_API.get_json(f'/{zip_code}')
+    except ApiError:
+        office = fallback(zip_code)
+
+Every call fits in `budget` seconds, the part of the Lex turn given to the
+API: attempts get at most the remaining budget as their timeouts and failed
+attempts (connection errors, timeouts, 429 and 5xx) are retried after a full
+jitter backoff while the budget lasts. A CircuitBreaker fails calls fast
+with CircuitOpenError once an API keeps failing, so a turn isn't spent
+waiting for a backend that is down.
+"""
+
+import json
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import urllib3
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class ApiError(Exception):
+    """The API call failed, `status` is None without a response"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(ApiError):
+    """The call wasn't made because the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` failed attempts in a row
+
+    While open, calls are refused for `reset_timeout` seconds. Then one trial
+    call is let through (half-open): its success closes the breaker, its failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        """Whether a call can be made now"""
+        return self.state != 'open'
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning('Circuit opened after %d failures', self.failures)
+            self.opened_at = self.clock()
+
+
+class ApiClient:
+    """Keep-alive connection pool to one API, with retries and a circuit breaker"""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        budget: float = 2.0,
+        connect_timeout: float = 0.5,
+        read_timeout: float = 1.0,
+        retries: int = 2,
+        backoff: float = 0.05,
+        pool_size: int = 2,
+        headers: Optional[Mapping[str, str]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.budget = budget
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size
+        self.headers = {'Accept': 'application/json', **(headers or {})}
+        self.base_path = urlsplit(self.base_url).path
+        self._pool: Optional['urllib3.HTTPConnectionPool'] = None
+
+    @property
+    def pool(self) -> 'urllib3.HTTPConnectionPool':
+        if self._pool is None:
+            import urllib3
+
+            self._pool = urllib3.connection_from_url(
+                self.base_url,
+                maxsize=self.pool_size,
+                headers=self.headers,
+                retries=False,
+            )
+        return self._pool
+
+    def request(
+        self, method: str, path: str, body: Optional[bytes] = None
+    ) -> 'urllib3.HTTPResponse':
+        """
+        Make a request, retried while the budget lasts
+
+        Returns:
+            The response, with a status below 500 other than 429
+
+        Raises:
+            CircuitOpenError: Without trying, while the breaker is open
+            ApiError: When the last attempt failed
+        """
+        import urllib3
+
+        deadline = time.monotonic() + self.budget
+        attempt = 0
+        error: Optional[ApiError] = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # The backoff overslept, urllib3 rejects timeouts <= 0
+                raise error or ApiError(f'{method} {path}: budget exhausted')
+            if not self.breaker.allow():
+                raise CircuitOpenError(f'Circuit open for {self.base_url}')
+            try:
+                response = self.pool.urlopen(
+                    method,
+                    self.base_path + path,
+                    body=body,
+                    timeout=urllib3.Timeout(
+                        connect=min(self.connect_timeout, remaining),
+                        read=min(self.read_timeout, remaining),
+                    ),
+                    retries=False,
+                )
+                if response.status not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                error = ApiError(
+                    f'{method} {path} returned {response.status}', response.status
+                )
+            except urllib3.exceptions.HTTPError as e:
+                error = ApiError(f'{method} {path} failed: {e}')
+            self.breaker.record_failure()
+
+            # Full jitter, as long as another attempt still fits in the budget
+            delay = random.uniform(0, self.backoff * 2**attempt)
+            attempt += 1
+            if attempt > self.retries or time.monotonic() + delay >= deadline:
+                raise error
+            logger.info('Retrying %s %s in %.3fs: %s', method, path, delay, error)
+            time.sleep(delay)
+
+    def get_json(self, path: str) -> Optional[Any]:
+        """
+        GET a JSON document, None when the API returns 404
+
+        Raises:
+            ApiError: See request(), and for other 4xx statuses or invalid JSON
+        """
+        response = self.request('GET', path)
+        if response.status == 404:
+            return None
+        if response.status >= 400:
+            raise ApiError(f'GET {path} returned {response.status}', response.status)
+        try:
+            return json.loads(response.data)
+        except ValueError as e:
+            raise ApiError(f'GET {path} returned invalid JSON: {e}') from e
@@ -0,0 +1,137 @@
+"""
+Bounded LRU cache with expiring entries, kept across warm invocations
+
+    OFFICES = TtlCache('offices', maxsize=1024, ttl=300, negative_ttl=30)
+
+    office = OFFICES.get((zip_code, needs_card), lambda: lookup(zip_code))
+
+A None result is a negative entry, kept for `negative_ttl` seconds only.
+Concurrent misses of a key are coalesced: one caller loads, the others wait for
+its result (or its exception, which isn't cached). Hits, misses, coalesced
+misses, evictions and expirations are counted and written every
+CACHE_STATS_INTERVAL lookups as a `cacheStats` log record.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Always written, whatever LOGGING_LEVEL is
+stats_logger = logging.getLogger(__name__ + '.stats')
+stats_logger.setLevel(logging.INFO)
+
+CACHE_STATS_INTERVAL = int(os.environ.get('CACHE_STATS_INTERVAL', '100') or 0)
+
+STATS = ('hits', 'misses', 'coalesced', 'evictions', 'expirations')
+
+
+class _Pending:
+    """A load in progress, waited on by the coalesced misses"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TtlCache:
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        negative_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.stats: Dict[str, int] = dict.fromkeys(STATS, 0)
+        self.lookups = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._pending: Dict[Hashable, _Pending] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Return the cached value of key, calling load() on a miss"""
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self._count('hits')
+                    return entry[1]
+                del self._entries[key]
+                self.stats['expirations'] += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _Pending()
+                loading = True
+                self._count('misses')
+            else:
+                loading = False
+                self._count('coalesced')
+
+        if not loading:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = load()
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                if pending.error is None:
+                    self._store(key, pending.value)
+                del self._pending[key]
+            pending.done.set()
+        return pending.value
+
+    def _store(self, key: Hashable, value: Any):
+        ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _count(self, stat: str):
+        self.stats[stat] += 1
+        if CACHE_STATS_INTERVAL and self.lookups % CACHE_STATS_INTERVAL == 0:
+            self.flush_stats()
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop the entry of key, or every entry"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def flush_stats(self):
+        """Write the counts since the last flush as a log record and reset them"""
+        if self.lookups:
+            stats_logger.info(
+                'Cache stats',
+                extra={
+                    'cache': self.name,
+                    'cacheStats': {**self.stats, 'size': len(self._entries)},
+                },
+            )
+        self.stats = dict.fromkeys(STATS, 0)
+        self.lookups = 0
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 'async' (default) invokes from a background thread, 'sync' before returning
+DISPATCH_MODE = os.environ.get('CUSTOM_HANDLER_DISPATCH', 'async')
+# Override the Lambda endpoint, e.g. with a local stub
+ENDPOINT_URL = os.environ.get('LAMBDA_ENDPOINT_URL')
+
+MAX_QUEUE = 100
+DRAIN_TIMEOUT = 5.0
+
+EXTENSION_NAME = 'lex-runtime-drain'
+
+
+def function_name_from_arn(lambda_arn: str) -> str:
+    if 'function/' in lambda_arn:
+        return lambda_arn.split('function/')[-1]
+    if ':function:' in lambda_arn:
+        return lambda_arn.split(':function:')[-1]
+    return lambda_arn
+
+
+def create_lambda_client():
+    """Lambda client with keep-alive connections and short timeouts"""
+    import botocore.session
+    from botocore.config import Config
+
+    return botocore.session.get_session().create_client(
+        'lambda',
+        endpoint_url=ENDPOINT_URL,
+        config=Config(
+            tcp_keepalive=True,
+            connect_timeout=2,
+            read_timeout=5,
+            retries={'max_attempts': 2, 'mode': 'standard'},
+        ),
+    )
+
+
+class AsyncInvoker:
+    """
+    Fire-and-forget Lambda invocations that don't hold up the response
+
+    Invocations are queued (bounded) and sent by a worker thread with a single
+    reused client. Call `drain` before the execution environment freezes, or
+    `start_drain_extension` to let an internal Lambda extension do it after each
+    invocation. When the queue is full the invocation is sent inline.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        max_queue: int = MAX_QUEUE,
+        mode: str = DISPATCH_MODE,
+    ):
+        self.client = client
+        self.mode = mode
+        self.queue: 'queue.Queue' = queue.Queue(maxsize=max_queue)
+        self.worker: Optional[threading.Thread] = None
+        self.invocation_done = threading.Event()
+        self.extension: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def get_client(self):
+        with self.lock:
+            if self.client is None:
+                self.client = create_lambda_client()
+        return self.client
+
+    def invoke(self, function_name: str, payload: bytes) -> None:
+        """Send an asynchronous (Event) invocation now"""
+        try:
+            response = self.get_client().invoke(
+                FunctionName=function_name, InvocationType='Event', Payload=payload
+            )
+            logger.info('Invoked %s: %s', function_name, response.get('StatusCode'))
+        except Exception as e:
+            logger.error(f'Error invoking Lambda function {function_name}: {str(e)}')
+
+    def submit(self, lambda_arn: str, event: Any) -> None:
+        """Invoke a Lambda with the event without waiting for it (in async mode)"""
+        function_name = function_name_from_arn(lambda_arn)
+        payload = json.dumps(event).encode('utf-8')
+        logger.info(f'Passing event to custom handler: {function_name}')
+
+        if self.mode == 'sync':
+            self.invoke(function_name, payload)
+            return
+
+        self.start_worker()
+        try:
+            self.queue.put_nowait((function_name, payload))
+        except queue.Full:
+            logger.warning('Invoke queue is full, invoking %s inline', function_name)
+            self.invoke(function_name, payload)
+
+    def start_worker(self) -> None:
+        if self.worker is None or not self.worker.is_alive():
+            with self.lock:
+                if self.worker is None or not self.worker.is_alive():
+                    self.worker = threading.Thread(
+                        target=self.run_worker, name='lex-runtime-invoker', daemon=True
+                    )
+                    self.worker.start()
+
+    def run_worker(self) -> None:
+        while True:
+            function_name, payload = self.queue.get()
+            try:
+                self.invoke(function_name, payload)
+            finally:
+                self.queue.task_done()
+
+    def drain(self, timeout: float = DRAIN_TIMEOUT) -> bool:
+        """
+        Wait until the queued invocations are sent
+
+        Returns:
+            False if the timeout expired first
+        """
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error('%d invocations not sent', self.queue.unfinished_tasks)
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def handler_finished(self) -> None:
+        """
+        Call when the handler returns
+
+        Without the drain extension, drains here, before the response is returned
+        """
+        if self.extension is not None:
+            self.invocation_done.set()
+        elif self.queue.unfinished_tasks:
+            self.drain()
+
+    def start_drain_extension(self) -> bool:
+        """
+        Register an internal Lambda extension that drains the queue after each
+        invocation, before the environment is frozen. Call during init.
+
+        Returns:
+            False when not running in Lambda or the registration failed
+        """
+        runtime_api = os.environ.get('AWS_LAMBDA_RUNTIME_API')
+        if not runtime_api or self.mode == 'sync':
+            return False
+
+        # Imported here: http.client and email are a good part of an init
+        import urllib.request
+
+        base_url = f'http://{runtime_api}/2020-01-01/extension'
+        try:
+            request = urllib.request.Request(
+                f'{base_url}/register',
+                data=json.dumps({'events': ['INVOKE']}).encode('utf-8'),
+                headers={'Lambda-Extension-Name': EXTENSION_NAME},
+                method='POST',
+            )
+            with urllib.request.urlopen(request, timeout=2) as response:
+                extension_id = response.headers['Lambda-Extension-Identifier']
+        except Exception as e:
+            logger.warning(f'Drain extension not registered: {str(e)}')
+            return False
+
+        self.extension = threading.Thread(
+            target=self.run_extension,
+            args=(base_url, extension_id),
+            name=EXTENSION_NAME,
+            daemon=True,
+        )
+        self.extension.start()
+        return True
+
+    def run_extension(self, base_url: str, extension_id: str) -> None:
+        import urllib.request
+
+        request = urllib.request.Request(
+            f'{base_url}/event/next',
+            headers={'Lambda-Extension-Identifier': extension_id},
+        )
+        while True:
+            # Blocks until the next invocation, Lambda freezes the environment
+            # only once every extension is waiting here
+            with urllib.request.urlopen(request) as response:
+                response.read()
+            self.invocation_done.wait()
+            self.drain()
+            self.invocation_done.clear()
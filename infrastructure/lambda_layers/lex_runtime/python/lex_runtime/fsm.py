@@ -0,0 +1,473 @@
+"""
+Table-driven dialog state machine for the bot lambdas
+
+A bot declares its dialog as data and DialogMachine compiles it once per
+container into dispatch tables:
+
+    MACHINE = DialogMachine(
+        name='office_locator',
+        intents={'LocateOffice': 'zipCode', 'Finished': 'finished'},
+        states={
+            'zipCode': {
+                'slot': 'zipCode',
+                'prompt': 'What is your zip code?',
+                'match': {'valid': ['re:^\\d{5}$']},
+                'on': {
+                    'valid': 'confirmZip',
+                    'other': {'say': 'That zip code is invalid.', 'clear': ['zipCode']},
+                },
+            },
+            'confirmZip': {...},
+            'finished': {'close': 'Ok, finished.'},
+        },
+    )
+
+Slot states elicit a slot and move on once it has a value:
+    slot: The slot of the state
+    prompt: Message eliciting the slot, formatted with the slot values ({zipCode})
+        when it has braces
+    match: Outcome -> patterns classifying the (lowercased, stripped) slot value,
+        tried in order. A pattern matches the whole value ('yes'), a prefix
+        ('more*'), a suffix ('*ok'), a substring ('*more info*') or a regex
+        ('re:^\\d+$'). Whole values are looked up in a dict. Use a lexicon for
+        yes/no answers rather than substrings.
+    lexicon: A lex_runtime.lexicon.Lexicon whose labels are outcomes, matched by
+        whole words in the locale of the event before the match patterns
+    min_confidence: Minimum confidence of a lexicon label (default: the one of
+        the lexicon), values below it go on to the match patterns
+    on: Outcome -> transition: the name of the next state or a dict with
+        next (default: this state), say (message instead of the prompt when the
+        next state elicits its slot), set (session attributes) and clear (slots).
+        'missing' is the outcome of an empty slot (default: elicit the slot) and
+        'other' of a value no pattern matched (default: elicit the slot again).
+
+Terminal states end the turn:
+    close: Close the intent with this message (and intent state `state`)
+    delegate: Let Lex continue, True or a message to play first
+    fulfill: True, call the `fulfill` callback of DialogMachine.handle
+    set: Session attributes set when the state is reached
+
+Each turn walks from the state of the intent (or `default` for other intents)
+through the states whose slots are filled, like the conditional slot handlers it
+replaces: a state reached a second time in a turn elicits its slot.
+
+Turns are counted per state the turn ended in, with their latency, and written
+every DIALOG_STATS_INTERVAL turns as a `dialogStats` log record. Dump the graph
+(optionally with those counts) with:
+
+    python -m lex_runtime.fsm path/to/index.py [MACHINE] [--stats stats.json]
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from .helper import LexHelper, messages
+from .lexicon import Lexicon
+
+logger = logging.getLogger(__name__)
+
+# Always written, whatever LOGGING_LEVEL is
+stats_logger = logging.getLogger(__name__ + '.stats')
+stats_logger.setLevel(logging.INFO)
+
+DIALOG_STATS_INTERVAL = int(os.environ.get('DIALOG_STATS_INTERVAL', '100') or 0)
+
+MISSING = 'missing'
+OTHER = 'other'
+
+TERMINAL_KINDS = ('close', 'delegate', 'fulfill')
+
+
+class Transition:
+    __slots__ = ('target', 'say', 'set', 'clear')
+
+    def __init__(self, target: 'State', say=None, set=None, clear=()):
+        self.target = target
+        self.say = say
+        self.set = set
+        self.clear = tuple(clear)
+
+
+class State:
+    """Compiled state, shared by all invocations: don't modify"""
+
+    __slots__ = (
+        'name',
+        'kind',
+        'slot',
+        'prompt',
+        'format_prompt',
+        'lexicon',
+        'min_confidence',
+        'rules',
+        'on',
+        'message',
+        'intent_state',
+        'set',
+    )
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.slot: Optional[str] = None
+        self.prompt: Optional[str] = None
+        self.format_prompt = False
+        self.lexicon: Optional[Lexicon] = None
+        self.min_confidence: Optional[float] = None
+        # (dict of whole values -> outcome) or (predicate, outcome), in match order
+        self.rules: List[Union[Dict[str, str], Tuple[Callable[[str], bool], str]]] = []
+        self.on: Dict[str, Transition] = {}
+        self.message: Optional[str] = None
+        self.intent_state = 'Fulfilled'
+        self.set: Optional[Dict[str, str]] = None
+
+    def classify(self, value: Optional[str], locale: Optional[str] = None) -> str:
+        if not value:
+            return MISSING
+        if self.lexicon is not None:
+            label = self.lexicon.label(value, locale, self.min_confidence)
+            if label is not None:
+                return label
+        value = value.strip().lower()
+        for rule in self.rules:
+            if isinstance(rule, dict):
+                outcome = rule.get(value)
+                if outcome is not None:
+                    return outcome
+            elif rule[0](value):
+                return rule[1]
+        return OTHER
+
+    def __repr__(self) -> str:
+        return f'State({self.name!r})'
+
+
+def compile_pattern(pattern: str) -> Union[str, Callable[[str], bool]]:
+    """A whole value (str) or a predicate for the pattern syntax of `match`"""
+    if pattern.startswith('re:'):
+        return re.compile(pattern[3:]).search
+    pattern = pattern.lower()
+    if len(pattern) > 2 and pattern[0] == '*' and pattern[-1] == '*':
+        part = pattern[1:-1]
+        return lambda value: part in value
+    if len(pattern) > 1 and pattern[-1] == '*':
+        return lambda value, prefix=pattern[:-1]: value.startswith(prefix)
+    if len(pattern) > 1 and pattern[0] == '*':
+        return lambda value, suffix=pattern[1:]: value.endswith(suffix)
+    return pattern
+
+
+class _SlotValues(dict):
+    """Slot values for formatting prompts, empty for unfilled slots"""
+
+    def __init__(self, lex: LexHelper):
+        super().__init__()
+        self.lex = lex
+
+    def __missing__(self, key: str) -> str:
+        return slot_value(self.lex.slots, key) or ''
+
+
+def slot_value(slots: Mapping[str, Any], slot_name: str) -> Optional[str]:
+    """The interpreted (or else original) value of a slot"""
+    slot = slots.get(slot_name)
+    if not slot or not isinstance(slot, dict):
+        return None
+    value = slot.get('value')
+    if not value or not isinstance(value, dict):
+        return None
+    return value.get('interpretedValue') or value.get('originalValue')
+
+
+class DialogMachine:
+    """
+    Compiled dialog of a bot, see the module docstring for the declaration
+
+    Raises:
+        ValueError: For states that are unknown, unreachable, neither slot nor
+            terminal states, or slot states that can't elicit their slot
+    """
+
+    def __init__(
+        self,
+        states: Mapping[str, Mapping[str, Any]],
+        intents: Mapping[str, str],
+        default: Optional[str] = None,
+        name: str = 'dialog',
+    ):
+        self.name = name
+        self.states: Dict[str, State] = {
+            state_name: self._compile_state(state_name, definition)
+            for state_name, definition in states.items()
+        }
+        for state_name, definition in states.items():
+            self._compile_transitions(self.states[state_name], definition)
+
+        self.entries = {
+            intent_name: self._state(state_name, f'intent {intent_name}')
+            for intent_name, state_name in intents.items()
+        }
+        self.default = self._state(default, 'default') if default else None
+        self._check_reachable()
+
+        # State -> [turns, total nanoseconds]
+        self.stats: Dict[str, List[int]] = {}
+        self.turns = 0
+
+    def _state(self, state_name: str, source: str) -> State:
+        if state_name not in self.states:
+            raise ValueError(
+                f'{self.name}: {source} goes to unknown state {state_name}'
+            )
+        return self.states[state_name]
+
+    def _compile_state(self, state_name: str, definition: Mapping[str, Any]) -> State:
+        kinds = [kind for kind in TERMINAL_KINDS if definition.get(kind)]
+        if definition.get('slot'):
+            kinds.append('slot')
+        if len(kinds) != 1:
+            raise ValueError(
+                f'{self.name}: state {state_name} needs one of slot, '
+                f'{", ".join(TERMINAL_KINDS)}, has {kinds or "none"}'
+            )
+
+        state = State(state_name, kinds[0])
+        state.set = definition.get('set')
+        if state.kind == 'slot':
+            state.slot = definition['slot']
+            state.prompt = definition.get('prompt')
+            state.format_prompt = bool(state.prompt and '{' in state.prompt)
+            state.lexicon = definition.get('lexicon')
+            state.min_confidence = definition.get('min_confidence')
+            for outcome, patterns in definition.get('match', {}).items():
+                for pattern in patterns:
+                    compiled = compile_pattern(pattern)
+                    if isinstance(compiled, str):
+                        if not state.rules or not isinstance(state.rules[-1], dict):
+                            state.rules.append({})
+                        state.rules[-1].setdefault(compiled, outcome)
+                    else:
+                        state.rules.append((compiled, outcome))
+        elif state.kind == 'close':
+            state.message = definition['close']
+            state.intent_state = definition.get('state', 'Fulfilled')
+        elif state.kind == 'delegate' and isinstance(definition['delegate'], str):
+            state.message = definition['delegate']
+        return state
+
+    def _compile_transitions(self, state: State, definition: Mapping[str, Any]):
+        for outcome, transition in definition.get('on', {}).items():
+            if isinstance(transition, str):
+                transition = {'next': transition}
+            target = transition.get('next', state.name)
+            state.on[outcome] = Transition(
+                self._state(target, f'state {state.name} {outcome}'),
+                transition.get('say'),
+                transition.get('set'),
+                transition.get('clear', ()),
+            )
+        if state.kind == 'slot' and not state.prompt:
+            for outcome in (MISSING, OTHER):
+                if outcome not in state.on:
+                    raise ValueError(
+                        f'{self.name}: state {state.name} has no prompt and no '
+                        f'{outcome} transition'
+                    )
+
+    def _check_reachable(self):
+        reachable = set()
+        pending = list(self.entries.values())
+        if self.default:
+            pending.append(self.default)
+        while pending:
+            state = pending.pop()
+            if state.name not in reachable:
+                reachable.add(state.name)
+                pending.extend(transition.target for transition in state.on.values())
+        unreachable = [name for name in self.states if name not in reachable]
+        if unreachable:
+            raise ValueError(
+                f'{self.name}: unreachable states {", ".join(unreachable)}'
+            )
+
+    def handle(
+        self,
+        event: Dict[str, Any],
+        fulfill: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Respond to a dialog code hook event
+
+        Returns None for intents without a state when there is no default state.
+        """
+        start = time.perf_counter_ns()
+        lex = LexHelper(event)
+        state = self.entries.get(lex.intent_name, self.default)
+        if state is None:
+            return None
+
+        slots = lex.slots
+        visited = set()
+        say = None
+        while state.kind == 'slot' and state.name not in visited:
+            visited.add(state.name)
+            outcome = state.classify(slot_value(slots, state.slot), lex.locale_id)
+            transition = state.on.get(outcome)
+            if transition is None:
+                break
+            logger.debug(
+                '%s: %s %s -> %s',
+                self.name,
+                state.name,
+                outcome,
+                transition.target.name,
+            )
+            if transition.set:
+                lex.session_attributes.update(transition.set)
+            for slot_name in transition.clear:
+                lex.clear_slot(slot_name)
+            say = transition.say
+            state = transition.target
+
+        response = self._respond(state, lex, say, event, fulfill)
+        self._count(state, time.perf_counter_ns() - start)
+        return response
+
+    def elicit(
+        self, event: Dict[str, Any], state_name: str, say: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Elicit the slot of a state, e.g. from a fulfillment hook"""
+        state = self.states[state_name]
+        return self._respond(state, LexHelper(event), say, event, None)
+
+    def _respond(
+        self,
+        state: State,
+        lex: LexHelper,
+        say: Optional[str],
+        event: Dict[str, Any],
+        fulfill: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        if state.set:
+            lex.session_attributes.update(state.set)
+
+        if state.kind == 'slot':
+            message = say
+            if message is None:
+                message = state.prompt
+                if state.format_prompt:
+                    message = message.format_map(_SlotValues(lex))
+            return lex.elicit_slot(state.slot, message)
+        if state.kind == 'close':
+            return lex.close(state.intent_state, state.message)
+        if state.kind == 'delegate':
+            response = lex.delegate()
+            if state.message:
+                response['messages'] = messages(state.message)
+            return response
+        if fulfill is None:
+            raise ValueError(
+                f'{self.name}: state {state.name} needs a fulfill callback'
+            )
+        return fulfill(event)
+
+    def _count(self, state: State, duration_ns: int):
+        counts = self.stats.get(state.name)
+        if counts is None:
+            counts = self.stats[state.name] = [0, 0]
+        counts[0] += 1
+        counts[1] += duration_ns
+        self.turns += 1
+        if DIALOG_STATS_INTERVAL and self.turns % DIALOG_STATS_INTERVAL == 0:
+            self.flush_stats()
+
+    def stats_summary(self) -> Dict[str, Dict[str, float]]:
+        """Turns and average milliseconds per state, busiest state first"""
+        return {
+            state_name: {
+                'turns': turns,
+                'avgMs': round(total_ns / turns / 1e6, 3),
+            }
+            for state_name, (turns, total_ns) in sorted(
+                self.stats.items(), key=lambda item: -item[1][0]
+            )
+        }
+
+    def flush_stats(self):
+        """Write the counts since the last flush as a log record and reset them"""
+        if self.stats:
+            stats_logger.info(
+                'Dialog stats',
+                extra={'dialog': self.name, 'dialogStats': self.stats_summary()},
+            )
+        self.stats = {}
+
+    def to_dot(self, stats: Optional[Mapping[str, Mapping[str, Any]]] = None) -> str:
+        """Graphviz source of the states and transitions, with turn counts if given"""
+        lines = [f'digraph "{self.name}" {{', '  rankdir=LR;', '  node [shape=box];']
+        for intent_name, state in self.entries.items():
+            lines.append(f'  "intent:{intent_name}" [shape=plaintext];')
+            lines.append(f'  "intent:{intent_name}" -> "{state.name}";')
+        if self.default:
+            lines.append('  "intent:*" [shape=plaintext];')
+            lines.append(f'  "intent:*" -> "{self.default.name}";')
+        for state in self.states.values():
+            label = (
+                state.name if state.kind == 'slot' else f'{state.name}\\n({state.kind})'
+            )
+            if stats and state.name in stats:
+                counts = stats[state.name]
+                label += f'\\n{counts["turns"]} turns, {counts["avgMs"]} ms'
+            shape = '' if state.kind == 'slot' else ', shape=doubleoctagon'
+            lines.append(f'  "{state.name}" [label="{label}"{shape}];')
+            for outcome, transition in state.on.items():
+                lines.append(
+                    f'  "{state.name}" -> "{transition.target.name}" [label="{outcome}"];'
+                )
+        lines.append('}')
+        return '\n'.join(lines)
+
+
+def load_machine(path: str, attribute: str = 'MACHINE') -> DialogMachine:
+    """Import a bot's handler module (with its directory on the path) and return its machine"""
+    import importlib.util
+
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location('_dialog_module', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, attribute)
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Print the dialog graph of a bot as Graphviz source'
+    )
+    parser.add_argument(
+        'path', help='Python file of the machine, e.g. lambdas/index.py'
+    )
+    parser.add_argument('attribute', nargs='?', default='MACHINE')
+    parser.add_argument(
+        '--stats', help='JSON file with the dialogStats of a log record'
+    )
+    args = parser.parse_args(argv)
+
+    stats = None
+    if args.stats:
+        with open(args.stats, encoding='utf-8') as stats_file:
+            stats = json.load(stats_file)
+        stats = stats.get('dialogStats', stats)
+    print(load_machine(args.path, args.attribute).to_dot(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+from typing import Any, Dict, List, Optional
+
+# Shared parts of responses, never modified
+DELEGATE = {'type': 'Delegate'}
+ELICIT_INTENT = {'type': 'ElicitIntent'}
+CONFIRM_INTENT = {'type': 'ConfirmIntent'}
+CLOSE = {'type': 'Close'}
+
+_UNSET = object()
+
+
+def messages(content: str, content_type: str = 'PlainText') -> List[Dict[str, str]]:
+    return [{'contentType': content_type, 'content': content}]
+
+
+class LexHelper:
+    """
+    Cached view over a Lex V2 event that builds responses
+
+    The event is read once: the intent, slots and interpretation are looked up on
+    first access and kept for the rest of the invocation. Responses reference the
+    event's dicts (session attributes, slots) instead of copying them.
+
+    Subclasses choose where the intent comes from with `intent_source`:
+    'session' (sessionState.intent) or 'interpretation' (the top interpretation).
+    """
+
+    __slots__ = (
+        'event',
+        'session_state',
+        'session_attributes',
+        '_intent',
+        '_interpretation',
+    )
+
+    intent_source = 'session'
+    default_locale_id = 'en_US'
+
+    def __init__(self, event: Dict[str, Any]):
+        self.event = event
+        self.session_state = event.get('sessionState') or {}
+        self.session_attributes = self.session_state.get('sessionAttributes')
+        if self.session_attributes is None:
+            self.session_attributes = {}
+        self._intent = _UNSET
+        self._interpretation = _UNSET
+
+    @property
+    def interpretation(self) -> Dict[str, Any]:
+        """
+        Returns the first interpretation
+        """
+        if self._interpretation is _UNSET:
+            interpretations = self.event.get('interpretations')
+            if not interpretations:
+                raise ValueError('No interpretations found')
+            self._interpretation = interpretations[0]
+        return self._interpretation
+
+    @property
+    def intent(self) -> Dict[str, Any]:
+        """The intent of the event, see intent_source"""
+        if self._intent is _UNSET:
+            if self.intent_source == 'interpretation':
+                intent = self.interpretation.get('intent')
+            else:
+                intent = self.session_state.get('intent')
+            self._intent = intent or {}
+        return self._intent
+
+    @property
+    def intent_name(self) -> str:
+        return self.intent.get('name', '')
+
+    @property
+    def slots(self) -> Dict[str, Any]:
+        return self.intent.get('slots') or {}
+
+    @property
+    def locale_id(self) -> str:
+        return self.event.get('bot', {}).get('localeId', self.default_locale_id)
+
+    @property
+    def input_transcript(self) -> str:
+        """The user's input transcript"""
+        return self.event.get('inputTranscript', '')
+
+    def slot_value(self, slot_name: str) -> Optional[str]:
+        """The interpreted value of a slot"""
+        slot = self.slots.get(slot_name)
+        if not slot or not slot.get('value'):
+            return None
+        return slot['value'].get('interpretedValue')
+
+    get_slot_value = slot_value
+
+    def clear_slot(self, slot_name: str) -> None:
+        """Clear a slot value"""
+        slots = self.slots
+        if slot_name in slots:
+            slots[slot_name] = None
+
+    def delegate(self) -> Dict[str, Any]:
+        """
+        Delegate to Lex to continue the conversation
+        """
+        return {
+            'sessionState': {
+                'intent': self.session_state.get('intent', {}),
+                'sessionAttributes': self.session_attributes,
+                'dialogAction': DELEGATE,
+            },
+        }
+
+    def elicit_intent(self, message: str) -> Dict[str, Any]:
+        """
+        Ask the user for their intent
+        """
+        return {
+            'sessionState': {
+                'sessionAttributes': self.session_attributes,
+                'dialogAction': ELICIT_INTENT,
+            },
+            'messages': messages(message),
+        }
+
+    def elicit_slot(
+        self, slot_to_elicit: str, message: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Ask the user for a specific slot value
+        """
+        response = {
+            'sessionState': {
+                'sessionAttributes': self.session_attributes,
+                'dialogAction': {
+                    'type': 'ElicitSlot',
+                    'slotToElicit': slot_to_elicit,
+                    'slotElicitationStyle': 'Default',
+                },
+                'intent': {
+                    'state': 'InProgress',
+                    'name': self.intent_name,
+                    'slots': self.slots,
+                },
+            },
+        }
+        if message:
+            response['messages'] = messages(message)
+        return response
+
+    def confirm_intent(self, message: str) -> Dict[str, Any]:
+        """
+        Ask the user to confirm the intent
+        """
+        return {
+            'sessionState': {
+                'sessionAttributes': self.session_attributes,
+                'dialogAction': CONFIRM_INTENT,
+                'intent': self.session_state.get('intent', {}),
+            },
+            'messages': messages(message),
+        }
+
+    def close(
+        self, state: str, message: Optional[str] = None, ssml: bool = False
+    ) -> Dict[str, Any]:
+        """Close the intent with the given state"""
+        result = {
+            'sessionState': {
+                'sessionAttributes': self.session_attributes,
+                'dialogAction': CLOSE,
+                'intent': {
+                    'slots': self.slots,
+                    'name': self.intent_name,
+                    'state': state,
+                },
+            }
+        }
+        if message:
+            result['messages'] = messages(message, 'SSML' if ssml else 'PlainText')
+        return result
+
+    def fulfilled_response(
+        self, message: Optional[str] = None, ssml: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Let Lex know that the intent is fulfilled
+
+        Args:
+            message: If provided, message will override the fulfillmentPrompt (if available)
+            ssml: Whether the message is SSML
+
+        Returns:
+            Lex response
+        """
+        return self.close('Fulfilled', message, ssml)
+
+    def failed_response(self, message: str) -> Dict[str, Any]:
+        """
+        Let Lex know that the intent failed
+        """
+        result = self.close('Failed')
+        result['messages'] = messages(message)
+        return result
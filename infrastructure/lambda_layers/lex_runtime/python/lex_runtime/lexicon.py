@@ -0,0 +1,283 @@
+"""
+Word and phrase lexicons compiled at cold start
+
+Answers are classified by whole words, never by substrings, so "nobody" is
+not a no and "yesterday" not a yes:
+
+    CHOICES = Lexicon({
+        'en_US': {'moreInfo': ['more information', 'more'], 'continue': ['continue']},
+        'es_US': {'moreInfo': ['más información', 'más'], 'continue': ['continuar']},
+    })
+
+    CHOICES.match('Tell me more information please', 'en_US')
+    # Match(label='moreInfo', confidence=0.4)
+
+- The phrases of each locale are compiled once into a token trie; a value is
+  tokenized (lowercased, accents removed) and matched in one left to right
+  pass, taking the longest phrase at each token
+- The confidence is the share of the value's tokens covered by phrases of the
+  label, less those covered by phrases of other labels; a value whose labels
+  cover as many tokens each ("yes no") has no match
+- Uncertain phrases ("I'm not sure", "no sé") and a negation word before a
+  phrase of another label ("not sure", "no, right") make the whole value
+  unmatched, so they are never taken for a yes or a no; longer phrases
+  starting with the negation ("not right") and repeats ("no no") still match
+- label() is None below the minimum confidence of the lexicon (or the one it
+  is given): "yes I think so" only covers a quarter of its words
+- Without a locale, or for a locale the lexicon doesn't have, the phrases of
+  every locale are matched
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+_TOKEN = re.compile(r"\w+(?:'\w+)*")
+
+# Key of the label in a trie node, never a token
+_LABEL = ''
+# Label of the uncertain phrases, never a label of the lexicon
+_UNCERTAIN = '?'
+
+
+class Match(NamedTuple):
+    label: str
+    confidence: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of text without accents ('¿Sí?' -> ['si'])"""
+    text = unicodedata.normalize('NFKD', text.lower().replace('’', "'"))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _TOKEN.findall(text)
+
+
+def _compile(phrases: Mapping[str, Iterable[str]], trie: Dict, owner: str) -> Dict:
+    for label, words in phrases.items():
+        for phrase in words:
+            tokens = tokenize(phrase)
+            if not tokens:
+                raise ValueError(f'{owner}: phrase {phrase!r} of {label} has no words')
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            if node.get(_LABEL, label) != label:
+                raise ValueError(
+                    f'{owner}: phrase {phrase!r} is both {node[_LABEL]} and {label}'
+                )
+            node[_LABEL] = label
+    return trie
+
+
+def _longest(trie: Dict, tokens: List[str], i: int) -> Tuple[Optional[str], int]:
+    """The label and length of the longest phrase at tokens[i], else (None, 1)"""
+    node = trie
+    label, length = None, 1
+    for j in range(i, len(tokens)):
+        node = node.get(tokens[j])
+        if node is None:
+            break
+        if _LABEL in node:
+            label, length = node[_LABEL], j - i + 1
+    return label, length
+
+
+class Lexicon:
+    """
+    Per locale labels and their phrases, see the module docstring
+
+    Args:
+        locales: Locale -> label -> phrases
+        uncertain: Locale -> phrases that leave a value unmatched
+        negations: Locale -> words making the phrase after them uncertain
+        min_confidence: Default minimum confidence of label()
+    """
+
+    def __init__(
+        self,
+        locales: Mapping[str, Mapping[str, Iterable[str]]],
+        uncertain: Optional[Mapping[str, Iterable[str]]] = None,
+        negations: Optional[Mapping[str, Iterable[str]]] = None,
+        min_confidence: float = 0.0,
+    ):
+        self.labels = frozenset(
+            label for phrases in locales.values() for label in phrases
+        )
+        self.min_confidence = min_confidence
+        uncertain = uncertain or {}
+        self._tries: Dict[str, Dict] = {}
+        self._any: Dict = {}
+        for locale in {*locales, *uncertain}:
+            phrases = {
+                **locales.get(locale, {}),
+                _UNCERTAIN: uncertain.get(locale, ()),
+            }
+            self._tries[locale] = _compile(phrases, {}, locale)
+            _compile(phrases, self._any, locale)
+        self._negations = {
+            locale: frozenset(token for word in words for token in tokenize(word))
+            for locale, words in (negations or {}).items()
+        }
+        self._any_negations = frozenset().union(*self._negations.values())
+
+    def match(
+        self, text: Optional[str], locale: Optional[str] = None
+    ) -> Optional[Match]:
+        """The label of text and its confidence, None if no label wins"""
+        if not text:
+            return None
+        if locale in self._tries:
+            trie, negations = self._tries[locale], self._negations.get(locale, ())
+        else:
+            trie, negations = self._any, self._any_negations
+        tokens = tokenize(text)
+        covered: Dict[str, int] = {}
+        i = 0
+        while i < len(tokens):
+            label, length = _longest(trie, tokens, i)
+            if length == 1 and tokens[i] in negations:
+                negated, _ = _longest(trie, tokens, i + 1)
+                if negated not in (None, label):
+                    return None
+            if label == _UNCERTAIN:
+                return None
+            if label is not None:
+                covered[label] = covered.get(label, 0) + length
+            i += length
+
+        if not covered:
+            return None
+        ranked = sorted(covered.items(), key=lambda item: item[1], reverse=True)
+        label, count = ranked[0]
+        rest = sum(other for _, other in ranked[1:])
+        if len(ranked) > 1 and ranked[1][1] == count:
+            return None
+        return Match(label, max(count - rest, 0) / len(tokens))
+
+    def label(
+        self,
+        text: Optional[str],
+        locale: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        The label of text, None if no label wins with at least min_confidence
+        (default: the min_confidence of the lexicon)
+        """
+        match = self.match(text, locale)
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+        return match.label if match and match.confidence >= min_confidence else None
+
+
+YES_NO = Lexicon(
+    {
+        'en_US': {
+            'yes': [
+                'yes',
+                'yeah',
+                'yep',
+                'yup',
+                'yea',
+                'y',
+                'sure',
+                'ok',
+                'okay',
+                'correct',
+                'right',
+                'true',
+                'affirmative',
+                'absolutely',
+                'definitely',
+                'of course',
+                'that is right',
+                "that's right",
+                'that is correct',
+                "that's correct",
+                'i do',
+                'i would',
+                'yes please',
+            ],
+            'no': [
+                'no',
+                'nope',
+                'nah',
+                'n',
+                'never',
+                'negative',
+                'incorrect',
+                'wrong',
+                'false',
+                'not really',
+                'not now',
+                'no thanks',
+                'no thank you',
+                'not right',
+                'not correct',
+                "that's wrong",
+                'i do not',
+                "i don't",
+                'i would not',
+                "i wouldn't",
+            ],
+        },
+        'es_US': {
+            'yes': [
+                'sí',
+                'si',
+                'claro',
+                'correcto',
+                'cierto',
+                'exacto',
+                'vale',
+                'bueno',
+                'de acuerdo',
+                'está bien',
+                'por supuesto',
+                'sí por favor',
+                'afirmativo',
+            ],
+            'no': [
+                'no',
+                'nunca',
+                'nada',
+                'tampoco',
+                'para nada',
+                'negativo',
+                'incorrecto',
+                'no gracias',
+                'todavía no',
+                'no es correcto',
+            ],
+        },
+    },
+    uncertain={
+        'en_US': [
+            'not sure',
+            "i'm not sure",
+            'i am not sure',
+            'unsure',
+            'maybe',
+            'perhaps',
+            'i guess',
+            "i don't know",
+            'i do not know',
+            "don't know",
+            'do not know',
+            'dunno',
+            'not certain',
+        ],
+        'es_US': [
+            'no sé',
+            'no lo sé',
+            'no estoy seguro',
+            'no estoy segura',
+            'quizás',
+            'quizá',
+            'tal vez',
+            'a lo mejor',
+        ],
+    },
+    negations={'en_US': ['not', 'no'], 'es_US': ['no']},
+    min_confidence=0.5,
+)
@@ -0,0 +1,104 @@
+"""
+Structured logging for the bot lambdas
+
+- LOGGING_LEVEL sets the level (create_lambda sets ERROR in prod, DEBUG otherwise)
+- LOG_SAMPLE_RATE is the fraction of invocations logged at DEBUG regardless of the
+  level, so some event payloads are still available in prod
+- Records are written as one line of compact JSON
+- Payloads are wrapped in `lazy_json` and only serialized when the record is written
+"""
+
+import json
+import logging
+import os
+import random
+from typing import Any, Dict
+
+LOGGING_LEVEL = os.environ.get('LOGGING_LEVEL', 'DEBUG').upper()
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0') or 0)
+
+# LogRecord attributes that aren't extra fields
+_RECORD_ATTRIBUTES = set(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {
+    'message',
+    'asctime',
+    'aws_request_id',
+}
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+class lazy_json:
+    """Log argument that is serialized to compact JSON only if the record is written"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return compact_json(self.value)
+
+    __repr__ = __str__
+
+
+class JsonFormatter(logging.Formatter):
+    """One line of JSON per record: level, message, logger, request id and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name,
+        }
+        request_id = getattr(record, 'aws_request_id', None)
+        if request_id:
+            entry['requestId'] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return compact_json(entry)
+
+
+_configured = False
+
+
+def get_logger(name: str = None) -> logging.Logger:
+    """
+    Return a logger, configuring the root logger once per container
+
+    The Lambda runtime's handler is kept (it adds the request id), only its
+    format is replaced.
+    """
+    global _configured
+
+    root = logging.getLogger()
+    if not _configured:
+        root.setLevel(LOGGING_LEVEL)
+        if not root.handlers:
+            root.addHandler(logging.StreamHandler())
+        for handler in root.handlers:
+            handler.setFormatter(JsonFormatter())
+        _configured = True
+
+    return logging.getLogger(name) if name else root
+
+
+def log_event(logger: logging.Logger, event: Dict[str, Any], label: str = 'Event'):
+    """
+    Log the event of an invocation at DEBUG
+
+    Call once at the start of each invocation: it also decides whether this
+    invocation is sampled, i.e. logged at DEBUG regardless of LOGGING_LEVEL.
+    """
+    root = logging.getLogger()
+    if LOG_SAMPLE_RATE and random.random() < LOG_SAMPLE_RATE:
+        root.setLevel(logging.DEBUG)
+    elif root.level != logging.getLevelName(LOGGING_LEVEL):
+        root.setLevel(LOGGING_LEVEL)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('%s: %s', label, lazy_json(event))
@@ -0,0 +1,170 @@
+"""
+Prompt catalog compiled at cold start
+
+Prompts are declared per Lex locale, keyed by prompt id without any language
+suffix:
+
+    CATALOG = PromptCatalog({
+        'en_US': {'P1375': 'Resources must be less than {individual_maximum}...',
+                  'P1376': 'Do you want to hear the information again?'},
+        'es_US': {'P1375': 'Sus recursos deben ser inferiores a ...', ...},
+    })
+
+    PROMPT = CATALOG.prompt('P1375 + P1376', individual_maximum='$17,600')
+    PROMPT.render(event['bot']['localeId'])
+
+- Combined ids ('P1375 + P1376') are joined once, when the prompt is compiled
+- Templates are parsed once into literal text and fields; fields bound with
+  values at compile time are folded into the text, so a prompt without
+  remaining fields renders as a plain dict lookup
+- Every prompt must exist in every locale of the catalog, so a missing
+  translation fails at import rather than on a call
+"""
+
+from string import Formatter
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+
+# Literal text followed by the field rendered after it (None after the last part)
+Part = Tuple[str, Optional[Tuple[str, str, Optional[str]]]]
+
+_formatter = Formatter()
+
+
+def _convert(value: Any, conversion: Optional[str]) -> Any:
+    if conversion == 'r':
+        return repr(value)
+    if conversion == 's':
+        return str(value)
+    if conversion == 'a':
+        return ascii(value)
+    return value
+
+
+def _compile_template(
+    template: str, values: Mapping[str, Any]
+) -> Union[str, Tuple[Part, ...]]:
+    """Parse a format template, folding in the bound values"""
+    parts: List[Part] = []
+    literal = ''
+    for text, field, spec, conversion in _formatter.parse(template):
+        literal += text
+        if field is None:
+            continue
+        if not field.isidentifier():
+            raise ValueError(f'Unsupported field {{{field}}} in {template!r}')
+        if field in values:
+            literal += format(_convert(values[field], conversion), spec or '')
+        else:
+            parts.append((literal, (field, spec or '', conversion)))
+            literal = ''
+    if not parts:
+        return literal
+    parts.append((literal, None))
+    return tuple(parts)
+
+
+class Prompt:
+    """Compiled prompt, shared by all invocations"""
+
+    __slots__ = ('id', 'fields', 'default_locale', '_templates')
+
+    def __init__(
+        self,
+        id: str,
+        templates: Mapping[str, Union[str, Tuple[Part, ...]]],
+        default_locale: str,
+    ):
+        self.id = id
+        self.default_locale = default_locale
+        self._templates = templates
+        # Fields that have to be passed to render()
+        fields = set()
+        for template in templates.values():
+            if not isinstance(template, str):
+                fields.update(field[0] for _, field in template if field)
+        self.fields: FrozenSet[str] = frozenset(fields)
+
+    def render(self, locale: Optional[str] = None, **values) -> str:
+        """
+        Render the prompt for a Lex locale (the default locale if not declared)
+
+        Raises:
+            KeyError: For a field of the prompt missing from `values`
+        """
+        template = self._templates.get(locale) or self._templates[self.default_locale]
+        if isinstance(template, str):
+            return template
+        rendered = []
+        for literal, field in template:
+            rendered.append(literal)
+            if field:
+                name, spec, conversion = field
+                rendered.append(format(_convert(values[name], conversion), spec))
+        return ''.join(rendered)
+
+    def __repr__(self) -> str:
+        return f'Prompt({self.id!r})'
+
+
+class PromptCatalog:
+    """Prompt texts indexed by locale and prompt id"""
+
+    def __init__(
+        self,
+        prompts: Mapping[str, Mapping[str, str]],
+        default_locale: str = 'en_US',
+    ):
+        if default_locale not in prompts:
+            raise ValueError(f'No prompts for the default locale {default_locale}')
+        self.prompts = prompts
+        self.default_locale = default_locale
+        self._compiled: Dict[str, Prompt] = {}
+
+    @property
+    def locales(self) -> List[str]:
+        return list(self.prompts)
+
+    def texts(self, prompt_id: str) -> Dict[str, str]:
+        """
+        Texts of a (combined) prompt id like 'P1375 + P1376' by locale
+
+        Raises:
+            ValueError: For ids missing from any locale
+        """
+        ids = [part.strip() for part in prompt_id.split('+')]
+        texts = {}
+        for locale, messages in self.prompts.items():
+            missing = [part for part in ids if part not in messages]
+            if missing:
+                raise ValueError(
+                    f'Unknown prompt {", ".join(missing)} in {prompt_id!r} '
+                    f'for locale {locale}'
+                )
+            texts[locale] = ' '.join(messages[part] for part in ids)
+        return texts
+
+    def prompt(self, prompt_id: str, **values) -> Prompt:
+        """
+        Compile a (combined) prompt id, folding in the given field values
+
+        Raises:
+            ValueError: For ids missing from any locale
+        """
+        if not values and prompt_id in self._compiled:
+            return self._compiled[prompt_id]
+        prompt = Prompt(
+            prompt_id,
+            {
+                locale: _compile_template(text, values)
+                for locale, text in self.texts(prompt_id).items()
+            },
+            self.default_locale,
+        )
+        if not values:
+            self._compiled[prompt_id] = prompt
+        return prompt
+
+    def render(self, prompt_id: str, locale: Optional[str] = None, **values) -> str:
+        """Render a prompt id, compiling it on first use"""
+        prompt = self._compiled.get(prompt_id) or self.prompt(prompt_id)
+        return prompt.render(locale, **values)
@@ -0,0 +1,265 @@
+"""
+Compact session state for the bot lambdas
+
+Lex session attributes are strings and travel between Lex and the Lambda on
+every turn, so a handler's state is packed into a single attribute:
+
+    SESSION = SessionCodec('p', [
+        Enum('flowPhase', ['selection', 'address', 'confirmation']),
+        Int('currentPamphletIndex'),
+        Bits('selectedPamphlets', PAMPHLETS),
+        Text('fullAddress'),
+    ])
+
+    state = SESSION.state(session_attributes)   # decoded on first access
+    state['selectedPamphlets'] += ['RetirementBenefits']
+    state.save(response['sessionState']['sessionAttributes'])
+
+The attribute is a version byte followed by one varint per field: 0 for an
+unset field, otherwise the value + 1 (Int), the choice index + 1 (Enum), the
+choice bitmask + 1 (Bits) or the UTF-8 length + 1 followed by the bytes (Text),
+in URL-safe base64 without padding. Unset fields at the end are dropped, so
+fields can be appended to a declaration; removing or reordering fields or
+choices needs a new version. A state of another version or that can't be
+decoded starts empty.
+"""
+
+import base64
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class Field(ABC):
+    """Declared session field, see Int, Enum, Bits and Text"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    def pack(self, buffer: bytearray, value: Any):
+        """Append the varints of a set value"""
+
+    @abstractmethod
+    def unpack(self, data: bytes, offset: int) -> Tuple[Any, int]:
+        """The value at offset and the offset after it"""
+
+
+class Int(Field):
+    """Non-negative integer"""
+
+    __slots__ = ()
+
+    def pack(self, buffer: bytearray, value: int):
+        if value < 0:
+            raise ValueError(f'{self.name} must not be negative: {value}')
+        _write_varint(buffer, value + 1)
+
+    def unpack(self, data: bytes, offset: int) -> Tuple[int, int]:
+        value, offset = _read_varint(data, offset)
+        return value - 1, offset
+
+
+class Enum(Field):
+    """One of a list of choices, stored as its index"""
+
+    __slots__ = ('choices', 'index')
+
+    def __init__(self, name: str, choices: Sequence[str]):
+        super().__init__(name)
+        self.choices = tuple(choices)
+        self.index = {choice: i for i, choice in enumerate(self.choices)}
+
+    def pack(self, buffer: bytearray, value: str):
+        if value not in self.index:
+            raise ValueError(f'Unknown {self.name}: {value!r}')
+        _write_varint(buffer, self.index[value] + 1)
+
+    def unpack(self, data: bytes, offset: int) -> Tuple[str, int]:
+        value, offset = _read_varint(data, offset)
+        return self.choices[value - 1], offset
+
+
+class Bits(Enum):
+    """Subset of a list of choices, decoded as a list in declaration order"""
+
+    __slots__ = ()
+
+    def pack(self, buffer: bytearray, value: Sequence[str]):
+        mask = 0
+        for choice in value:
+            if choice not in self.index:
+                raise ValueError(f'Unknown {self.name}: {choice!r}')
+            mask |= 1 << self.index[choice]
+        _write_varint(buffer, mask + 1)
+
+    def unpack(self, data: bytes, offset: int) -> Tuple[List[str], int]:
+        mask, offset = _read_varint(data, offset)
+        mask -= 1
+        return [c for i, c in enumerate(self.choices) if mask >> i & 1], offset
+
+
+class Text(Field):
+    """Free text"""
+
+    __slots__ = ()
+
+    def pack(self, buffer: bytearray, value: str):
+        encoded = value.encode('utf-8')
+        _write_varint(buffer, len(encoded) + 1)
+        buffer += encoded
+
+    def unpack(self, data: bytes, offset: int) -> Tuple[str, int]:
+        length, offset = _read_varint(data, offset)
+        end = offset + length - 1
+        if end > len(data):
+            raise ValueError('Truncated text')
+        return data[offset:end].decode('utf-8'), end
+
+
+class SessionCodec:
+    """Packs the declared fields into one session attribute"""
+
+    def __init__(self, attribute: str, fields: Sequence[Field], version: int = 1):
+        if not 0 < version < 0x80:
+            raise ValueError(f'Version must be between 1 and 127: {version}')
+        self.attribute = attribute
+        self.fields = tuple(fields)
+        self.names = frozenset(field.name for field in self.fields)
+        if len(self.names) != len(self.fields):
+            raise ValueError(f'Duplicate fields in session {attribute}')
+        self.version = version
+
+    def encode(self, values: Mapping[str, Any]) -> str:
+        """
+        Encode the field values (missing or None is unset)
+
+        Raises:
+            ValueError: For unknown fields or values that can't be encoded
+        """
+        unknown = set(values) - self.names
+        if unknown:
+            raise ValueError(f'Unknown session fields {", ".join(sorted(unknown))}')
+        buffer = bytearray([self.version])
+        end = 1
+        for field in self.fields:
+            value = values.get(field.name)
+            if value is None:
+                buffer.append(0)
+            else:
+                field.pack(buffer, value)
+                end = len(buffer)
+        return base64.urlsafe_b64encode(bytes(buffer[:end])).rstrip(b'=').decode()
+
+    def decode(self, encoded: Optional[str]) -> Dict[str, Any]:
+        """Decode the set fields, empty for a missing or unreadable state"""
+        if not encoded:
+            return {}
+        try:
+            data = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            if data[0] != self.version:
+                logger.warning(
+                    'Session %s has version %s, expected %s',
+                    self.attribute,
+                    data[0],
+                    self.version,
+                )
+                return {}
+            values = {}
+            offset = 1
+            for field in self.fields:
+                if offset >= len(data):
+                    break
+                if data[offset]:
+                    values[field.name], offset = field.unpack(data, offset)
+                else:
+                    offset += 1
+            return values
+        except (IndexError, ValueError):
+            logger.warning('Session %s could not be decoded', self.attribute)
+            return {}
+
+    def state(self, session_attributes: Mapping[str, str]) -> 'SessionState':
+        """Lazily decoded state of the session attributes"""
+        return SessionState(self, session_attributes.get(self.attribute))
+
+
+class SessionState:
+    """
+    Field values of a session, decoded on first access
+
+    Mutable values (Bits lists) must be assigned again to be saved.
+    """
+
+    __slots__ = ('codec', '_encoded', '_values', '_changed')
+
+    def __init__(self, codec: SessionCodec, encoded: Optional[str]):
+        self.codec = codec
+        self._encoded = encoded
+        self._values: Optional[Dict[str, Any]] = None
+        self._changed = False
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        if self._values is None:
+            self._values = self.codec.decode(self._encoded)
+        return self._values
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return self.values.get(name) is not None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = self.values.get(name)
+        return default if value is None else value
+
+    def __setitem__(self, name: str, value: Any):
+        if name not in self.codec.names:
+            raise KeyError(f'Unknown session field {name}')
+        self.values[name] = value
+        self._changed = True
+
+    def update(self, values: Mapping[str, Any]):
+        for name, value in values.items():
+            self[name] = value
+
+    def clear(self):
+        self._values = {}
+        self._changed = True
+
+    def save(self, session_attributes: Dict[str, str]):
+        """Write the state into the session attributes of a response"""
+        if not self._changed:
+            if self._encoded:
+                session_attributes[self.codec.attribute] = self._encoded
+            return
+        encoded = self.codec.encode(self.values)
+        if len(encoded) > 2:
+            session_attributes[self.codec.attribute] = encoded
+        else:
+            # Only the version: nothing is set
+            session_attributes.pop(self.codec.attribute, None)
@@ -24,7 +24,7 @@ from .bots_ssa.ssa_menu_bot import SSAMenuBot
 
 # Import constructs
 from .constructs.lex_role import LexRole
-from .constructs.throttled_deploy import throttled_deploy
+from .constructs.throttled_deploy import context_parallelism, throttled_deploy
 
 
 # Define stack properties
@@ -191,6 +191,7 @@ class LexStack(Stack):
                 role=role,
                 log_group=log_group,
                 audio_bucket=audio_bucket,
+                office_api_endpoint=self.node.try_get_context('office_api_endpoint'),
             ),
             MedicareCardReplacementBot(
                 self,
@@ -214,8 +215,10 @@ class LexStack(Stack):
             ),
         ]
 
-        # Apply throttled deployment to avoid API limits
-        throttled_deploy(bots)
+        # Apply throttled deployment to avoid API limits. The parallelism adapts to
+        # the recorded deploy history (deploy-history.json) with the
+        # deployParallelism context value set to auto
+        throttled_deploy(bots, parallelism=context_parallelism(self))
 
         # Add tags
         try:
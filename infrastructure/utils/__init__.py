@@ -1,8 +1,21 @@
 # __init__.py
-from .hash_code import hash_code
+from .hash_code import hash_code, stable_hash
 from .safe_stringify import safe_stringify
+from .canonical_stringify import (
+    canonical_bytes,
+    canonical_stringify,
+    iter_canonical_bytes,
+)
 from .load_flow_content import load_flow_content
 
 
 # Make these functions available when importing the package
-__all__ = ['hash_code', 'safe_stringify', 'load_flow_content']
+__all__ = [
+    'hash_code',
+    'stable_hash',
+    'safe_stringify',
+    'canonical_bytes',
+    'canonical_stringify',
+    'iter_canonical_bytes',
+    'load_flow_content',
+]
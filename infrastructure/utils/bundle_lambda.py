@@ -0,0 +1,244 @@
+import fnmatch
+import functools
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import zipfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import jsii
+from aws_cdk import (
+    Annotations,
+    AssetHashType,
+    BundlingOptions,
+    DockerImage,
+    ILocalBundling,
+    Stage,
+)
+from aws_cdk import aws_lambda as lambda_
+from constructs import Construct
+
+REPORT_FILE = 'lambda-bundles.json'
+BUNDLE_FORMAT = 1
+
+# The runtime of the bot lambdas, the .pyc files only load on this version
+PYTHON_VERSION = (3, 9)
+
+# Left out of every bundle: tests, benchmarks, their fixtures and local caches
+EXCLUDE = (
+    '__pycache__',
+    '.pytest_cache',
+    '*.pyc',
+    'test_*.py',
+    '*_test.py',
+    'conftest.py',
+    'benchmark.py',
+    'fulfilled.json',
+    'example_event.json',
+    '*.md',
+)
+
+_reports: Dict[str, Dict[str, Any]] = {}
+
+
+def _matches(relpath: str, patterns: Sequence[str]) -> bool:
+    name = os.path.basename(relpath)
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relpath, pattern)
+        for pattern in patterns
+    )
+
+
+def select_files(
+    source_dir: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Sequence[str] = EXCLUDE,
+) -> Tuple[List[str], List[str]]:
+    """
+    Split the files of source_dir into the bundled and the excluded ones
+
+    Patterns match the file (or directory) name or its path relative to
+    source_dir. Without include every file that isn't excluded is bundled.
+
+    Returns:
+        The sorted relative paths (with / separators) bundled and excluded
+    """
+    bundled, excluded = [], []
+    for directory, subdirs, names in os.walk(source_dir):
+        base = os.path.relpath(directory, source_dir).replace(os.sep, '/')
+        prefix = '' if base == '.' else base + '/'
+        for name in list(subdirs):
+            if _matches(prefix + name, exclude):
+                subdirs.remove(name)
+                excluded.extend(
+                    os.path.relpath(os.path.join(root, file), source_dir)
+                    for root, _, files in os.walk(os.path.join(directory, name))
+                    for file in files
+                )
+        for name in names:
+            relpath = prefix + name
+            if _matches(relpath, exclude) or (
+                include is not None and not _matches(relpath, include)
+            ):
+                excluded.append(relpath)
+            else:
+                bundled.append(relpath)
+    return sorted(bundled), sorted(path.replace(os.sep, '/') for path in excluded)
+
+
+@functools.lru_cache(maxsize=None)
+def find_python(version: Tuple[int, int] = PYTHON_VERSION) -> Optional[str]:
+    """An interpreter of the target runtime version, this one or on the PATH"""
+    if sys.version_info[:2] == version:
+        return sys.executable
+    python = shutil.which('python%d.%d' % version)
+    if python is None:
+        return None
+    # e.g. a pyenv shim of a version that isn't active
+    try:
+        result = subprocess.run(
+            [python, '-c', 'import sys; print(*sys.version_info[:2])'],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return python if result.stdout.split() == [str(part) for part in version] else None
+
+
+@jsii.implements(ILocalBundling)
+class LambdaBundle:
+    """
+    Asset bundle of a lambda directory, built at synth without Docker
+
+    Only the selected files are copied, and with an interpreter of the target
+    runtime they are compiled to .pyc (unchecked-hash, so the read-only
+    /var/task doesn't have to be compiled at every cold start). The asset hash
+    is computed from the selected files before bundling: CDK skips bundling
+    when the staged asset already exists, and unchanged code is not uploaded.
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        include: Optional[Sequence[str]] = None,
+        exclude: Sequence[str] = EXCLUDE,
+        python: Optional[str] = None,
+    ):
+        self.source_dir = os.path.normpath(source_dir)
+        self.files, self.excluded = select_files(self.source_dir, include, exclude)
+        self.python = python
+        self.asset_hash = self._hash()
+
+    def _hash(self) -> str:
+        digest = hashlib.sha256()
+        target = 'cpython-%d%d' % PYTHON_VERSION if self.python else 'source'
+        digest.update(json.dumps([BUNDLE_FORMAT, target]).encode())
+        for relpath in self.files:
+            with open(os.path.join(self.source_dir, relpath), 'rb') as f:
+                content = f.read()
+            digest.update(f'\0{relpath}\0{len(content)}\0'.encode())
+            digest.update(content)
+        return digest.hexdigest()
+
+    def code(self) -> lambda_.AssetCode:
+        return lambda_.Code.from_asset(
+            self.source_dir,
+            asset_hash=self.asset_hash,
+            asset_hash_type=AssetHashType.CUSTOM,
+            bundling=BundlingOptions(
+                # Never pulled: try_bundle always bundles locally
+                image=DockerImage.from_registry('local-bundling-only'),
+                local=self,
+            ),
+        )
+
+    def try_bundle(self, output_dir: str, options: BundlingOptions) -> bool:
+        for relpath in self.files:
+            target = os.path.join(output_dir, relpath)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy(os.path.join(self.source_dir, relpath), target)
+
+        if self.python:
+            result = subprocess.run(
+                [
+                    self.python,
+                    '-m',
+                    'compileall',
+                    '-q',
+                    '--invalidation-mode',
+                    'unchecked-hash',
+                    output_dir,
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode:
+                error = result.stdout.strip() or result.stderr.strip() or 'no output'
+                raise ValueError(f'Compiling {self.source_dir} failed: {error}')
+        return True
+
+
+def bundle_size(path: str) -> Dict[str, int]:
+    """Files, precompiled modules, bytes and deflated (zip) bytes of a bundle"""
+    files = compiled = size = 0
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for directory, subdirs, names in os.walk(path):
+            subdirs.sort()
+            for name in sorted(names):
+                file = os.path.join(directory, name)
+                files += 1
+                compiled += name.endswith('.pyc')
+                size += os.path.getsize(file)
+                archive.write(file, os.path.relpath(file, path))
+    return {
+        'files': files,
+        'compiled': compiled,
+        'bytes': size,
+        'zipBytes': len(buffer.getvalue()),
+    }
+
+
+def report_bundle(construct: Construct, bundle: LambdaBundle) -> Optional[Dict]:
+    """
+    Add the bundle size of a function or layer to the synth report
+
+    Shown as an info annotation, and written with the other bundles of the app
+    to lambda-bundles.json in the output directory.
+    """
+    asset = construct.node.try_find_child('Code')
+    outdir = Stage.of(construct).outdir
+    path = os.path.join(outdir, asset.asset_path) if asset else ''
+    if not os.path.isdir(path):
+        # Bundling was skipped, the stack isn't being synthesized
+        return None
+
+    entry = {
+        'source': os.path.relpath(bundle.source_dir).replace(os.sep, '/'),
+        'assetHash': asset.asset_hash,
+        **bundle_size(path),
+        'excluded': bundle.excluded,
+    }
+    Annotations.of(construct).add_info(
+        f'Lambda bundle: {entry["files"]} files ({entry["compiled"]} precompiled), '
+        f'{entry["bytes"] / 1024:.1f} KiB, {entry["zipBytes"] / 1024:.1f} KiB '
+        f'zipped, {len(bundle.excluded)} excluded'
+        + (
+            ''
+            if bundle.python
+            else ', not precompiled: no python%d.%d' % PYTHON_VERSION
+        )
+    )
+
+    reports = _reports.setdefault(outdir, {})
+    reports[construct.node.path] = entry
+    os.makedirs(outdir, exist_ok=True)
+    with open(os.path.join(outdir, REPORT_FILE), 'w') as f:
+        json.dump(reports, f, indent=2, sort_keys=True)
+    return entry
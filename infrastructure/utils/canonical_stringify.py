@@ -0,0 +1,153 @@
+import dataclasses
+import json
+import math
+from typing import Iterator, List
+
+from aws_cdk import Token
+from constructs import Construct
+
+# C accelerated string encoder used by json.dumps(ensure_ascii=False)
+_encode_str = json.encoder.encode_basestring
+
+# Pieces are joined and encoded in batches by iter_canonical_bytes
+_CHUNK_PIECES = 1024
+
+
+def canonical_stringify(obj) -> str:
+    """
+    Stringify an object to canonical JSON (sorted keys, no whitespace)
+
+    Uses the same rules as `safe_stringify` for constructs, functions and unresolved
+    tokens, but serializes every value exactly once:
+    - lists are written inline (not as nested JSON strings)
+    - objects that appear more than once are serialized once and reused
+    - circular references are written as "{circular}" instead of recursing
+
+    Args:
+        obj: The object to stringify
+
+    Returns:
+        Canonical JSON string
+    """
+    return ''.join(_serialize(obj))
+
+
+def canonical_bytes(obj) -> bytes:
+    """Canonical JSON of an object as UTF-8 bytes"""
+    return canonical_stringify(obj).encode('utf-8', 'surrogatepass')
+
+
+def iter_canonical_bytes(obj) -> Iterator[bytes]:
+    """
+    Canonical JSON of an object as a series of UTF-8 chunks
+    The whole object is serialized first (repeated objects reuse their pieces),
+    only the joining and encoding of the pieces is done chunk by chunk
+    """
+    pieces = _serialize(obj)
+    for start in range(0, len(pieces), _CHUNK_PIECES):
+        chunk = ''.join(pieces[start : start + _CHUNK_PIECES])
+        yield chunk.encode('utf-8', 'surrogatepass')
+
+
+def is_unresolved_token(val) -> bool:
+    """Cheap string check before asking jsii whether a value is an unresolved token"""
+    if isinstance(val, str):
+        return ('${Token[' in val or '#{Token[' in val) and Token.is_unresolved(val)
+    # Number tokens are encoded as very large negative floats
+    return isinstance(val, float) and val < -1e280 and Token.is_unresolved(val)
+
+
+def _serialize(obj) -> List[str]:
+    serializer = _Serializer()
+    serializer.write(obj)
+    return serializer.pieces
+
+
+class _Serializer:
+    """Writes JSON pieces for a value into a single list, in one pass"""
+
+    def __init__(self):
+        self.pieces: List[str] = []
+        # id -> (object, start, end) of its pieces. The object is kept so the id
+        # can't be reused by another object during the walk
+        self.memo = {}
+        self.active = set()
+
+    def write(self, val) -> None:
+        pieces = self.pieces
+
+        if val is None:
+            pieces.append('null')
+        elif val is True:
+            pieces.append('true')
+        elif val is False:
+            pieces.append('false')
+        elif isinstance(val, str):
+            # Tokens change with each synth, which breaks the hashing operation
+            pieces.append('"{token}"' if is_unresolved_token(val) else _encode_str(val))
+        elif isinstance(val, int):
+            pieces.append(int.__repr__(val))
+        elif isinstance(val, float):
+            if is_unresolved_token(val):
+                pieces.append('"{token}"')
+            else:
+                pieces.append(
+                    float.__repr__(val) if math.isfinite(val) else json.dumps(val)
+                )
+        elif isinstance(val, Construct):
+            # Don't serialize constructs
+            pieces.append(_encode_str(f'construct-{val.node.id}'))
+        elif isinstance(val, (list, tuple, dict)) or (
+            dataclasses.is_dataclass(val) and not isinstance(val, type)
+        ):
+            self._write_container(val)
+        elif callable(val):
+            # Don't serialize functions
+            pieces.append('"{function}"')
+        else:
+            # For any other non-serializable objects
+            pieces.append(_encode_str(str(val)))
+
+    def _write_container(self, val) -> None:
+        pieces = self.pieces
+        key = id(val)
+
+        cached = self.memo.get(key)
+        if cached is not None:
+            pieces.extend(pieces[cached[1] : cached[2]])
+            return
+        if key in self.active:
+            pieces.append('"{circular}"')
+            return
+
+        self.active.add(key)
+        start = len(pieces)
+
+        if isinstance(val, (list, tuple)):
+            pieces.append('[')
+            for index, item in enumerate(val):
+                if index:
+                    pieces.append(',')
+                self.write(item)
+            pieces.append(']')
+        else:
+            if isinstance(val, dict):
+                items = [(str(name), value) for name, value in val.items()]
+            else:
+                items = [
+                    (field.name, getattr(val, field.name))
+                    for field in dataclasses.fields(val)
+                ]
+            items.sort(key=lambda item: item[0])
+
+            pieces.append('{')
+            for index, (name, value) in enumerate(items):
+                if index:
+                    pieces.append(',')
+                pieces.append(_encode_str(name))
+                pieces.append(':')
+                self.write(value)
+            pieces.append('}')
+
+        self.active.discard(key)
+        self.memo[key] = (val, start, len(pieces))
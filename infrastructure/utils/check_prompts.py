@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+from typing import Sequence
+
+from .create_lambda import LEX_RUNTIME_PATH
+
+
+def check_prompts(code_path: str, modules: Sequence[str] = ('conversation',)):
+    """
+    Check at synth that the prompts referenced by a bot lambda exist
+
+    The modules compile their prompts from the lambda's catalog at import, so
+    they are imported in a separate interpreter with the lambda's own path and
+    the lex_runtime layer, like in the Lambda runtime.
+
+    Raises:
+        ValueError: With the import error, e.g. an unknown prompt id
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', f'import {", ".join(modules)}'],
+        cwd=code_path,
+        env={
+            **os.environ,
+            'PYTHONPATH': os.pathsep.join(
+                [code_path, os.path.join(LEX_RUNTIME_PATH, 'python')]
+            ),
+            'PYTHONDONTWRITEBYTECODE': '1',
+        },
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        error = result.stderr.strip().splitlines()[-1:] or ['no output']
+        raise ValueError(f'Prompt check of {code_path} failed: {error[0]}')
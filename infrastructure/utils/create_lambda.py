@@ -1,8 +1,53 @@
-from typing import Mapping
+import os
+from typing import Mapping, Optional, Sequence
 
+from aws_cdk import Stack
 from aws_cdk import aws_lambda as lambda_
 from constructs import Construct
 
+from .bundle_lambda import EXCLUDE, LambdaBundle, find_python, report_bundle
+
+# Shared python modules for the bot lambdas (importable as `lex_runtime`)
+LEX_RUNTIME_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'lambda_layers', 'lex_runtime'
+)
+
+
+def lambda_code(
+    scope: Construct,
+    code_path: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Sequence[str] = (),
+):
+    """
+    Return the asset code of code_path and the bundle it is built from
+
+    Disable with the `bundleLambdas` context value set to false, the whole
+    directory is then shipped as is (bundle is None).
+    """
+    if scope.node.try_get_context('bundleLambdas') in (False, 'false'):
+        return lambda_.Code.from_asset(code_path), None
+    bundle = LambdaBundle(code_path, include, (*EXCLUDE, *exclude), find_python())
+    return bundle.code(), bundle
+
+
+def lex_runtime_layer(scope: Construct) -> lambda_.LayerVersion:
+    """Return the lex_runtime layer of the stack, created once per stack"""
+    stack = Stack.of(scope)
+    layer = stack.node.try_find_child('LexRuntimeLayer')
+    if layer is None:
+        code, bundle = lambda_code(stack, LEX_RUNTIME_PATH)
+        layer = lambda_.LayerVersion(
+            stack,
+            'LexRuntimeLayer',
+            code=code,
+            compatible_runtimes=[lambda_.Runtime.PYTHON_3_9],
+            description='Shared runtime for the bot lambdas',
+        )
+        if bundle:
+            report_bundle(layer, bundle)
+    return layer
+
 
 def create_lambda(
     scope: Construct,
@@ -11,7 +56,21 @@ def create_lambda(
     function_name: str = None,
     description: str = None,
     environment: Mapping[str, str] = {},
+    log_sample_rate: float = 0,
+    include: Optional[Sequence[str]] = None,
+    exclude: Sequence[str] = (),
 ):
+    """
+    Create a python bot lambda with the lex_runtime layer
+
+    The code is bundled at synth, see bundle_lambda: tests, fixtures and caches
+    are left out and the modules are precompiled for the runtime.
+
+    Args:
+        log_sample_rate: Fraction of invocations logged at DEBUG in any stage
+        include: Only bundle the files matching these patterns
+        exclude: Patterns left out of the bundle on top of bundle_lambda.EXCLUDE
+    """
     stage = scope.node.try_get_context('stage') or 'dev'
 
     # Default environment variables with any provided ones merged in
@@ -19,14 +78,21 @@ def create_lambda(
         'LOGGING_LEVEL': 'ERROR' if stage == 'prod' else 'DEBUG',
         **environment,
     }
+    if log_sample_rate:
+        merged_env['LOG_SAMPLE_RATE'] = str(log_sample_rate)
 
-    return lambda_.Function(
+    code, bundle = lambda_code(scope, code_path, include, exclude)
+    function = lambda_.Function(
         scope,
         id,
         function_name=function_name,
         description=description,
         runtime=lambda_.Runtime.PYTHON_3_9,
         handler='index.handler',
-        code=lambda_.Code.from_asset(code_path),
+        code=code,
         environment=merged_env,
+        layers=[lex_runtime_layer(scope)],
     )
+    if bundle:
+        report_bundle(function, bundle)
+    return function
@@ -1,10 +1,28 @@
+import hashlib
+import sys
+from operator import mul
+
+from .canonical_stringify import iter_canonical_bytes
 from .safe_stringify import safe_stringify
 
+_MASK = 0xFFFFFFFF
+_MODULUS = 1 << 32
+
+# The legacy hash is the polynomial sum(c[i] * 31^(n-1-i)) mod 2^32, so it can be
+# computed a chunk at a time with C-level map/sum instead of a per-character loop
+_CHUNK = 4096
+_POWERS = [pow(31, _CHUNK - 1 - i, _MODULUS) for i in range(_CHUNK)]
+_UTF32 = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
 
 def hash_code(input_obj):
     """
     Generate a hash code for an object
     Source: https://stackoverflow.com/questions/7616461/generate-a-hash-from-string-in-javascript
+
+    This is the legacy (compatibility) hash used for `Version{hash}` ids. The output is
+    identical to the original character loop, so existing CfnBotVersion logical ids
+    don't churn. Use `stable_hash` for new ids.
     """
     text = safe_stringify(input_obj)
     hash_val = 0
@@ -12,13 +30,38 @@ def hash_code(input_obj):
     if len(text) == 0:
         return hash_val
 
-    for i in range(len(text)):
-        chr_code = ord(text[i])
-        hash_val = ((hash_val << 5) - hash_val) + chr_code
-        hash_val = hash_val & 0xFFFFFFFF  # Convert to 32bit integer
+    # One 32-bit code point per character, same as ord()
+    codes = memoryview(text.encode(_UTF32, 'surrogatepass')).cast('I')
+    for start in range(0, len(codes), _CHUNK):
+        chunk = codes[start : start + _CHUNK]
+        size = len(chunk)
+        chunk_val = sum(map(mul, chunk, _POWERS[_CHUNK - size :]))
+        hash_val = (hash_val * pow(31, size, _MODULUS) + chunk_val) & _MASK
 
     # Convert to signed 32-bit integer
     if hash_val & 0x80000000:
         hash_val = -((hash_val ^ 0xFFFFFFFF) + 1)
 
     return hash_val
+
+
+def stable_hash(input_obj, digest_size: int = 8) -> str:
+    """
+    Generate a stable hex digest for an object
+
+    Feeds the canonical JSON of the object (see `canonical_stringify`) to a blake2b
+    digest chunk by chunk, without building the full JSON string. Constructs, functions
+    and unresolved tokens are replaced with placeholders, so the digest is stable
+    across synths.
+
+    Args:
+        input_obj: The object to hash
+        digest_size: Digest size in bytes, default 8 (16 hex characters)
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.blake2b(digest_size=digest_size)
+    for chunk in iter_canonical_bytes(input_obj):
+        digest.update(chunk)
+    return digest.hexdigest()
@@ -8,6 +8,9 @@ def safe_stringify(obj):
     """
     Stringify object which excludes constructs (circular reference)
 
+    This is the legacy format behind `hash_code`, kept byte-for-byte so existing bot
+    version ids don't change. Prefer `canonical_stringify` for anything new.
+
     Args:
         obj: The object to stringify
 
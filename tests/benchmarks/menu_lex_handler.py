@@ -0,0 +1,135 @@
+"""
+Microbenchmark of the fulfillment hook: if/elif chain vs dispatch table
+
+Replays the test_index.py event (fulfilled.json) for every intent of the test
+config and compares the per-event latency of the original handler (if/elif chain
+over the raw config, event dumped for the debug log) with the compiled dispatch
+table (LexHandler). Both produce the same responses.
+
+Usage: AWS_DEFAULT_REGION=us-east-1 LOGGING_LEVEL=ERROR \
+    python -m tests.benchmarks.menu_lex_handler
+"""
+
+import copy
+import json
+import os
+import sys
+import timeit
+
+LEX_HANDLER_DIR = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    '..',
+    'infrastructure',
+    'constructs',
+    'menu_bot',
+    'lambdas',
+    'lex_handler',
+)
+sys.path.insert(0, LEX_HANDLER_DIR)
+# The lex_runtime layer, which Lambda adds to the path
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'infrastructure',
+        'lambda_layers',
+        'lex_runtime',
+        'python',
+    )
+)
+
+from helper import LexHelper  # noqa: E402
+from index import LexHandler, logger  # noqa: E402
+from test_index import test_config  # noqa: E402
+
+NUMBER = 20000
+
+
+def chain_handler(config, event):
+    """The handler before the dispatch table, for comparison"""
+    logger.debug('Event: %s', json.dumps(event, indent=2))
+    helper = LexHelper(event)
+    if event.get('invocationSource') != 'FulfillmentCodeHook':
+        return helper.delegate()
+
+    locale_id = helper.locale_id
+    intent_name = helper.intent_name
+
+    locale = config.get(locale_id)
+    if not locale:
+        raise ValueError(f'Locale {locale_id} is not configured')
+
+    if intent_name == 'help' or intent_name == 'FallbackIntent':
+        return helper.elicit_intent(locale.get('help', ''))
+    if intent_name == 'hangUp':
+        return helper.fulfilled_response(locale.get('hangUp', ''))
+    if intent_name not in locale:
+        raise ValueError(f'Intent {intent_name} not found in config')
+
+    action = locale[intent_name]
+    helper.session_attributes['action'] = action.get('type', '')
+
+    if action.get('type') == 'Prompt':
+        if action.get('hang_up'):
+            helper.session_attributes['hangUp'] = 'true'
+            return helper.fulfilled_response(action.get('prompt', ''))
+        message = f'{action.get("prompt", "")}... {locale.get("morePrompt", "")}'
+        return helper.elicit_intent(message)
+    elif action.get('type') == 'PhoneTransfer':
+        helper.session_attributes['destination'] = action.get('phone_number', '')
+        return helper.fulfilled_response(action.get('pre_transfer_prompt'))
+    elif action.get('type') == 'QueueTransfer':
+        helper.session_attributes['destination'] = action.get('queue_arn', '')
+        return helper.fulfilled_response(action.get('pre_transfer_prompt'))
+    elif action.get('type') == 'FlowTransfer':
+        helper.session_attributes['destination'] = action.get('contact_flow_arn', '')
+        return helper.fulfilled_response(action.get('pre_transfer_prompt'))
+
+    return helper.failed_response(
+        f'Unknown action type: {json.dumps(action, indent=2)}'
+    )
+
+
+def make_events():
+    with open(os.path.join(LEX_HANDLER_DIR, 'fulfilled.json'), 'r') as f:
+        template = json.load(f)
+
+    intents = ['help', 'FallbackIntent', 'hangUp'] + [
+        name for name, value in test_config['en_US'].items() if isinstance(value, dict)
+    ]
+    events = []
+    for name in intents:
+        event = copy.deepcopy(template)
+        event['interpretations'][0]['intent']['name'] = name
+        event['sessionState']['intent']['name'] = name
+        events.append(event)
+    return events
+
+
+def run_benchmark():
+    sut = LexHandler(test_config)
+    events = make_events()
+
+    for event in events:
+        assert chain_handler(test_config, copy.deepcopy(event)) == sut.handler(
+            copy.deepcopy(event)
+        ), event['interpretations'][0]['intent']['name']
+
+    def chain():
+        for event in events:
+            chain_handler(test_config, event)
+
+    def table():
+        for event in events:
+            sut.handler(event)
+
+    for name, run in (('if/elif chain', chain), ('dispatch table', table)):
+        seconds = min(timeit.repeat(run, number=NUMBER // len(events), repeat=5))
+        per_event = seconds / (NUMBER // len(events)) / len(events) * 1e6
+        print(f'{name:>15}: {per_event:.2f} us/event')
+
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,239 @@
+"""
+Benchmark of the office index against a JSON table of the same offices
+
+Builds a synthetic table of 42,000 zip codes served by 1,230 offices (about the
+size of the national table) and compares, for the mmap index and a dict loaded
+from JSON: the time to open the table at cold start, the warm lookup latency of
+random zip codes and the resident memory added by opening the table and doing
+the lookups. Then compares the nearest office search of the index with a
+linear search over the offices.
+
+With `api`, benchmarks the office API client against the local stand-in of
+tests/lambdas/stub_office_api.py instead: the latency of a call over the kept
+alive connection pool against a new connection per call, and the latency of
+lookups while the API hangs, with and without the circuit breaker.
+
+Usage: python -m tests.benchmarks.office_locator [api]
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+LAMBDAS_DIR = os.path.join(
+    ROOT, 'infrastructure', 'bots_ssa', 'office_locator_bot', 'lambdas'
+)
+sys.path[:0] = [
+    LAMBDAS_DIR,
+    os.path.join(ROOT, 'infrastructure', 'lambda_layers', 'lex_runtime', 'python'),
+]
+
+from office_index import (  # noqa: E402
+    EARTH_RADIUS_MILES,
+    RECORD_COLUMNS,
+    OfficeIndex,
+    build_index,
+)
+
+ZIPS = 42000
+OFFICES = 1230
+LOOKUPS = 10000
+NEAREST = 2
+
+
+def rss_kb() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def make_rows():
+    rng = random.Random(42)
+    offices = [
+        {
+            'name': 'Social Security Administration',
+            'address': f'{100 + i} Federal Plaza',
+            'city': f'City {i}',
+            'state': 'CO',
+            'card_center_address': f'{i} Card Center Way' if i % 5 == 0 else '',
+            'hours': '9am - 4pm',
+            'phone': f'555-{i:04d}',
+            # Continental US
+            'latitude': f'{rng.uniform(25, 49):.6f}',
+            'longitude': f'{rng.uniform(-124, -67):.6f}',
+        }
+        for i in range(OFFICES)
+    ]
+    zips = sorted(rng.sample(range(501, 99951), ZIPS))
+    rows = [
+        {'zip_code': f'{zip_code:05d}', **offices[i * OFFICES // ZIPS]}
+        for i, zip_code in enumerate(zips)
+    ]
+    centroids = [
+        {
+            'zip_code': row['zip_code'],
+            'latitude': f'{float(row["latitude"]) + rng.uniform(-0.5, 0.5):.6f}',
+            'longitude': f'{float(row["longitude"]) + rng.uniform(-0.5, 0.5):.6f}',
+        }
+        for row in rows
+    ]
+    return offices, rows, centroids
+
+
+def haversine_miles(a, b):
+    lat1, lon1, lat2, lon2 = map(math.radians, a + b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(h))
+
+
+def run_benchmark():
+    offices, rows, centroids = make_rows()
+    rng = random.Random(7)
+    keys = [row['zip_code'] for row in rng.sample(rows, LOOKUPS // 2)]
+    keys += [f'{rng.randrange(100000):05d}' for _ in range(LOOKUPS // 2)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, 'offices.idx')
+        json_path = os.path.join(tmp, 'offices.json')
+        with open(index_path, 'wb') as f:
+            f.write(build_index(rows, centroids))
+        with open(json_path, 'w') as f:
+            json.dump(
+                {row['zip_code']: [row[c] for c in RECORD_COLUMNS] for row in rows}, f
+            )
+        print(
+            f'{ZIPS} zips, {OFFICES} offices: index {os.path.getsize(index_path)} '
+            f'bytes, JSON {os.path.getsize(json_path)} bytes'
+        )
+
+        def open_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        for name, open_table, lookup in (
+            ('mmap index', lambda: OfficeIndex(index_path), OfficeIndex.lookup),
+            ('JSON dict', open_json, dict.get),
+        ):
+            rss = rss_kb()
+            table = open_table()
+
+            def lookup_keys(table=table, lookup=lookup):
+                for key in keys:
+                    lookup(table, key)
+
+            lookup_keys()
+            rss = rss_kb() - rss
+
+            open_seconds = min(timeit.repeat(open_table, number=1, repeat=5))
+            lookup_seconds = min(timeit.repeat(lookup_keys, number=1, repeat=5))
+            print(
+                f'{name:>10}: open {open_seconds * 1e3:.2f} ms, '
+                f'lookup {lookup_seconds / len(keys) * 1e6:.2f} us, '
+                f'RSS +{rss} KB'
+            )
+
+        index = OfficeIndex(index_path)
+        points = {
+            row['zip_code']: (float(row['latitude']), float(row['longitude']))
+            for row in centroids
+        }
+        positions = [
+            ((float(office['latitude']), float(office['longitude'])), office['address'])
+            for office in offices
+        ]
+        queries = [row['zip_code'] for row in rng.sample(centroids, 1000)]
+
+        def linear_nearest(zip_code):
+            return heapq.nsmallest(
+                NEAREST,
+                positions,
+                key=lambda position: haversine_miles(points[zip_code], position[0]),
+            )
+
+        for zip_code in queries:
+            assert [
+                office.address for _, office in index.nearest(zip_code, NEAREST)
+            ] == [address for _, address in linear_nearest(zip_code)], zip_code
+
+        for name, nearest in (
+            ('k-d tree', lambda zip_code: index.nearest(zip_code, NEAREST)),
+            ('linear', linear_nearest),
+        ):
+            seconds = min(
+                timeit.repeat(
+                    lambda nearest=nearest: [nearest(zip_code) for zip_code in queries],
+                    number=1,
+                    repeat=3,
+                )
+            )
+            print(
+                f'{name:>10}: {NEAREST} nearest of {OFFICES} offices '
+                f'{seconds / len(queries) * 1e6:.1f} us'
+            )
+
+
+def run_api_benchmark():
+    from lex_runtime.api_client import ApiClient, CircuitBreaker
+    from office_api import OfficeApi
+
+    from tests.lambdas.stub_office_api import StubOfficeApi
+
+    # The fallbacks while the API hangs log warnings
+    logging.getLogger().setLevel(logging.ERROR)
+    calls = 500
+    with StubOfficeApi({'12345': {'office_address': '123 Main St'}}) as api:
+        client = ApiClient(api.url)
+
+        def new_connection():
+            with urllib.request.urlopen(f'{api.url}/12345', timeout=1) as response:
+                json.loads(response.read())
+
+        for name, call in (
+            ('pooled', lambda: client.get_json('/12345')),
+            ('new connection', new_connection),
+        ):
+            connections = api.connections
+            seconds = min(timeit.repeat(call, number=calls, repeat=3))
+            print(
+                f'{name:>15}: {seconds / calls * 1e6:.0f} us/call, '
+                f'{api.connections - connections} connections'
+            )
+
+        # The API hangs: every attempt runs into its read timeout
+        api.latency = 1.0
+        snapshot = OfficeIndex(os.path.join(LAMBDAS_DIR, 'offices.idx'))
+        lookups = 20
+        for name, threshold in (('breaker', 5), ('no breaker', lookups * 3)):
+            offices = OfficeApi(
+                api.url,
+                snapshot,
+                ApiClient(
+                    api.url,
+                    budget=0.2,
+                    read_timeout=0.1,
+                    breaker=CircuitBreaker(failure_threshold=threshold),
+                ),
+            )
+            start = time.monotonic()
+            for _ in range(lookups):
+                assert offices.lookup('12345').address == '123 Main St'
+            seconds = time.monotonic() - start
+            print(f'{name:>15}: {seconds / lookups * 1e3:.1f} ms/lookup while hung')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['api']:
+        run_api_benchmark()
+    else:
+        run_benchmark()
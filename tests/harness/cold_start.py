@@ -0,0 +1,220 @@
+"""
+Cold start profiler for the bot lambdas
+
+Imports the index module of every lambda directory (the code_path of
+create_lambda: a directory with an index.py defining handler) in fresh
+interpreters, the way the Lambda runtime does at init: the lambda directory
+first on the path, then the lex_runtime layer. For each it records the
+median import time, the memory it adds to the interpreter's RSS and the
+third-party packages imported:
+
+    python -m tests.harness.cold_start [DIR ...] [--repeat 5] [--json out.json]
+        [--update] [--tolerance 0.5]
+
+The results are compared with the committed baseline (cold_start.json next to
+this file), --update rewrites it. The run fails when a handler imports a
+third-party package it didn't (boto3 at init instead of on first use), or when
+its import time or init RSS grew more than --tolerance (plus --noise-ms,
+--noise-kib: the baseline comes from another machine).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from tests.harness import replay
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'cold_start.json')
+INFRASTRUCTURE_DIR = os.path.join(replay.ROOT, 'infrastructure')
+
+# Run by each fresh interpreter: argv is the lambda directory and the layer
+_BOOTSTRAP = r"""
+import json, os, resource, sys, time
+
+def rss_kib():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        # Not Linux: the peak RSS instead
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+lambda_dir, layer_dir = sys.argv[1:3]
+sys.path[:0] = [lambda_dir, layer_dir]
+before, rss = set(sys.modules), rss_kib()
+start = time.perf_counter()
+import index
+took = time.perf_counter() - start
+packages = set()
+for name in set(sys.modules) - before:
+    path = getattr(sys.modules[name], '__file__', None) or ''
+    if 'site-packages' in path.split(os.sep):
+        packages.add(name.split('.')[0])
+print(json.dumps({
+    'importMs': took * 1000,
+    'initRssKiB': rss_kib() - rss,
+    'modules': len(set(sys.modules) - before),
+    'packages': sorted(packages),
+}))
+"""
+
+
+def find_lambda_dirs(root: str = INFRASTRUCTURE_DIR) -> List[str]:
+    """The directories of the lambdas under root, as deployed by create_lambda"""
+    found = []
+    for directory, subdirs, names in os.walk(root):
+        subdirs[:] = sorted(
+            name
+            for name in subdirs
+            if name not in ('cdk.out', '__pycache__', 'lambda_layers')
+        )
+        if 'index.py' not in names:
+            continue
+        with open(os.path.join(directory, 'index.py'), encoding='utf-8') as f:
+            source = f.read()
+        if '\ndef handler(' in source or '\nhandler = ' in source:
+            found.append(directory)
+    return found
+
+
+def measure_once(lambda_dir: str) -> Dict[str, Any]:
+    """Import the lambda in a new interpreter with a Lambda-like environment"""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith(('PYTHON', 'AWS_LAMBDA_RUNTIME_API'))
+    }
+    env.update(
+        {
+            'LOGGING_LEVEL': 'ERROR',
+            'AWS_REGION': 'us-east-1',
+            'AWS_DEFAULT_REGION': 'us-east-1',
+            'PYTHONDONTWRITEBYTECODE': '1',
+        }
+    )
+    completed = subprocess.run(
+        [sys.executable, '-c', _BOOTSTRAP, lambda_dir, replay.LAYER_DIR],
+        cwd=lambda_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if completed.returncode:
+        raise RuntimeError(
+            f'Importing {lambda_dir} failed:\n{completed.stderr.strip()}'
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(lambda_dir: str, repeat: int = 5) -> Dict[str, Any]:
+    """The medians of repeat cold starts"""
+    runs = [measure_once(lambda_dir) for _ in range(max(repeat, 1))]
+    return {
+        'importMs': round(statistics.median(run['importMs'] for run in runs), 1),
+        'initRssKiB': int(statistics.median(run['initRssKiB'] for run in runs)),
+        'modules': runs[-1]['modules'],
+        'packages': runs[-1]['packages'],
+    }
+
+
+def regressions(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.5,
+    noise_ms: float = 20.0,
+    noise_kib: int = 2048,
+) -> List[str]:
+    """How results are worse than baseline, by lambda directory"""
+    found = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None:
+            continue
+        added = sorted(set(result['packages']) - set(before['packages']))
+        if added:
+            found.append(f'{name} imports {", ".join(added)} at init')
+        limit = before['importMs'] * (1 + tolerance) + noise_ms
+        if result['importMs'] > limit:
+            found.append(
+                f'{name} imports in {result["importMs"]:.1f} ms > {limit:.1f} ms'
+            )
+        limit = before['initRssKiB'] * (1 + tolerance) + noise_kib
+        if result['initRssKiB'] > limit:
+            found.append(
+                f'{name} adds {result["initRssKiB"]} KiB RSS > {limit:.0f} KiB'
+            )
+    return found
+
+
+def summary(results: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f'{"lambda":<64} {"import ms":>9} {"RSS KiB":>8}  packages']
+    for name, result in sorted(results.items()):
+        lines.append(
+            f'{name:<64} {result["importMs"]:>9.1f} {result["initRssKiB"]:>8}  '
+            + (', '.join(result['packages']) or '-')
+        )
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.harness.cold_start', description=__doc__.split('\n')[1]
+    )
+    parser.add_argument('dirs', nargs='*', help='lambda directories (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='cold starts each')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument(
+        '--update', action='store_true', help='write the results to the baseline'
+    )
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument('--noise-ms', type=float, default=20.0)
+    parser.add_argument('--noise-kib', type=int, default=2048)
+    args = parser.parse_args(argv)
+
+    dirs = [os.path.abspath(path) for path in args.dirs] or find_lambda_dirs()
+    results = {
+        os.path.relpath(path, replay.ROOT).replace(os.sep, '/'): measure(
+            path, args.repeat
+        )
+        for path in dirs
+    }
+    print(summary(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['lambdas']
+    if args.update:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'python': '.'.join(map(str, sys.version_info[:2])),
+                    # The other lambdas kept when only some were measured
+                    'lambdas': {**baseline, **results} if args.dirs else results,
+                },
+                f,
+                indent=2,
+            )
+            f.write('\n')
+        return 0
+
+    found = regressions(
+        results, baseline, args.tolerance, args.noise_ms, args.noise_kib
+    )
+    for line in found:
+        print(f'REGRESSION {line}')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
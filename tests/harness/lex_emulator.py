@@ -0,0 +1,690 @@
+"""
+Local Lex V2 runtime emulator for the synthesized bots
+
+Reads the CfnBot definitions (intents, sample utterances, slots and their
+prompts, code hooks) from the templates in cdk.out and runs conversations
+in-process, calling the bot's lambda handler (its asset directory in cdk.out)
+the way Lex would:
+
+    emulator = LexEmulator.from_cdk_out('cdk.out')
+    emulator.recognize_text('office-locator', 'TSTALIASID', 'en_US', 'session-1', 'office')
+
+or as a RecognizeText compatible endpoint for the existing boto3 scripts:
+
+    python -m tests.harness.lex_emulator [--cdk-out cdk.out] [--port 8000]
+        [--bot-id S7IGLOYNUF=lex-deploy-demo-py-office-locator]
+
+    boto3.client('lexv2-runtime', endpoint_url='http://127.0.0.1:8000', ...)
+
+Bots are found by their id (--bot-id), name, logical id or the end of their
+name ('office-locator'). The emulation is deterministic:
+
+- An utterance matching a sample utterance (lowercased, accents and
+  punctuation removed, slot placeholders capturing the rest) recognizes its
+  intent with confidence 1 and fills its slots; otherwise intents are scored by
+  the words they share with their closest sample (Dice coefficient), and the
+  FallbackIntent is recognized below MATCH_THRESHOLD
+- An elicited slot is filled with the utterance, resolved for AMAZON.Number
+  (spoken digits) and AMAZON.Confirmation (Yes/No, see lex_runtime.lexicon),
+  unless the utterance is a sample utterance of another intent
+- The dialog code hook gets every turn; on Delegate, or without a hook, the
+  next required slot is elicited with its prompt, the intent confirmation
+  prompt is played and the fulfillment code hook (or the fulfillment prompt)
+  closes the intent
+"""
+
+import argparse
+import copy
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from tests.harness import replay
+from tests.lambdas.stub_lambda_endpoint import StubServer
+
+from lex_runtime.lexicon import YES_NO, tokenize  # isort: skip
+
+MATCH_THRESHOLD = 0.5
+
+# Spoken digits of AMAZON.Number values (after tokenize: no accents)
+_DIGITS = {
+    word: str(digit)
+    for words in (
+        'zero one two three four five six seven eight nine',
+        'cero uno dos tres cuatro cinco seis siete ocho nueve',
+    )
+    for digit, word in enumerate(words.split())
+}
+_DIGITS['oh'] = '0'
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+_SESSION_PATH = re.compile(
+    r'^/bots/([^/]+)/botAliases/([^/]+)/botLocales/([^/]+)/sessions/([^/]+)(/text)?$'
+)
+
+
+@dataclass
+class Slot:
+    name: str
+    slot_type: str
+    prompt: str = ''
+    required: bool = False
+
+
+@dataclass
+class Intent:
+    name: str
+    utterances: List[str] = field(default_factory=list)
+    slots: List[Slot] = field(default_factory=list)
+    dialog_hook: bool = False
+    fulfillment_hook: bool = False
+    confirmation_prompt: str = ''
+    fulfillment_prompt: str = ''
+    fallback: bool = False
+
+    def __post_init__(self):
+        # (regex capturing the slots, words without the placeholders) per sample
+        self.samples: List[Tuple[re.Pattern, frozenset]] = []
+        for utterance in self.utterances:
+            parts, words = [], []
+            for i, part in enumerate(_PLACEHOLDER.split(utterance)):
+                if i % 2:
+                    parts.append(f'(?P<{part}>.+?)')
+                elif tokenize(part):
+                    parts.append(re.escape(' '.join(tokenize(part))))
+                    words.extend(tokenize(part))
+            self.samples.append(
+                (re.compile('^' + ' '.join(parts) + '$'), frozenset(words))
+            )
+
+    def slot(self, name: str) -> Optional[Slot]:
+        return next((slot for slot in self.slots if slot.name == name), None)
+
+    def match(self, text: str) -> Tuple[float, int, Dict[str, str]]:
+        """Confidence, number of samples with all the words, captured slots"""
+        words = frozenset(text.split())
+        best, containing = 0.0, 0
+        for pattern, sample in self.samples:
+            found = pattern.match(text)
+            if found:
+                return 1.0, len(self.samples), found.groupdict()
+            if sample:
+                best = max(best, 2 * len(words & sample) / (len(words) + len(sample)))
+                containing += words <= sample
+        return best, containing, {}
+
+
+@dataclass
+class Locale:
+    locale_id: str
+    intents: List[Intent]
+    lambda_dir: Optional[str] = None
+
+    def intent(self, name: str) -> Optional[Intent]:
+        return next((intent for intent in self.intents if intent.name == name), None)
+
+    def recognize(self, utterance: str) -> List[Tuple[Intent, float, Dict[str, str]]]:
+        """The intents in order of confidence, the fallback intent last"""
+        text = ' '.join(tokenize(utterance))
+        scored = []
+        for order, intent in enumerate(self.intents):
+            if intent.fallback:
+                continue
+            confidence, containing, slots = intent.match(text)
+            scored.append((-confidence, -containing, order, intent, slots))
+        scored.sort(key=lambda item: item[:3])
+        ranked = [
+            (intent, -confidence, slots)
+            for confidence, _, _, intent, slots in scored
+            if -confidence >= MATCH_THRESHOLD
+        ]
+        fallback = next((intent for intent in self.intents if intent.fallback), None)
+        if fallback is not None:
+            ranked.append((fallback, 0.0, {}))
+        return ranked
+
+
+@dataclass
+class Bot:
+    name: str
+    logical_id: str
+    locales: Dict[str, Locale]
+
+
+def _message(prompt_specification: Optional[Mapping[str, Any]]) -> str:
+    """The text of the first message group of a prompt or response"""
+    for group in (prompt_specification or {}).get('MessageGroupsList', []):
+        text = group.get('Message', {}).get('PlainTextMessage', {}).get('Value')
+        if text:
+            return text
+    return ''
+
+
+def _intent(definition: Mapping[str, Any]) -> Intent:
+    slots = {}
+    for slot in definition.get('Slots', []):
+        elicitation = slot.get('ValueElicitationSetting', {})
+        slots[slot['Name']] = Slot(
+            slot['Name'],
+            slot.get('SlotTypeName', ''),
+            _message(elicitation.get('PromptSpecification')),
+            elicitation.get('SlotConstraint') == 'Required',
+        )
+    priorities = {
+        priority['SlotName']: priority['Priority']
+        for priority in definition.get('SlotPriorities', [])
+    }
+    fulfillment = definition.get('FulfillmentCodeHook', {})
+    # SimpleIntent puts its fulfillment prompt in the updates specification
+    post_fulfillment = (
+        fulfillment.get('PostFulfillmentStatusSpecification')
+        or fulfillment.get('FulfillmentUpdatesSpecification')
+        or {}
+    )
+    confirmation = definition.get('IntentConfirmationSetting') or {}
+    return Intent(
+        name=definition['Name'],
+        utterances=[
+            sample['Utterance'] for sample in definition.get('SampleUtterances', [])
+        ],
+        slots=sorted(slots.values(), key=lambda slot: priorities.get(slot.name, 0)),
+        dialog_hook=definition.get('DialogCodeHook', {}).get('Enabled', False),
+        fulfillment_hook=fulfillment.get('Enabled', False),
+        confirmation_prompt=_message(confirmation.get('PromptSpecification')),
+        fulfillment_prompt=_message(post_fulfillment.get('SuccessResponse')),
+        fallback=definition.get('ParentIntentSignature') == 'AMAZON.FallbackIntent',
+    )
+
+
+def load_bots(template: Mapping[str, Any], lambda_dirs: Mapping[str, str]) -> List[Bot]:
+    """
+    The bots of a CloudFormation template
+
+    lambda_dirs maps the logical ids of the Lambda functions to their code.
+    """
+    resources = template.get('Resources', {})
+    bots = []
+    for logical_id, resource in resources.items():
+        if resource.get('Type') != 'AWS::Lex::Bot':
+            continue
+        properties = resource['Properties']
+        code_hooks = {}
+        for setting in properties.get('TestBotAliasSettings', {}).get(
+            'BotAliasLocaleSettings', []
+        ):
+            arn = (
+                setting.get('BotAliasLocaleSetting', {})
+                .get('CodeHookSpecification', {})
+                .get('LambdaCodeHook', {})
+                .get('LambdaArn', {})
+            )
+            function = (
+                arn.get('Fn::GetAtt', [None])[0] if isinstance(arn, dict) else None
+            )
+            code_hooks[setting['LocaleId']] = lambda_dirs.get(function)
+        locales = {
+            locale['LocaleId']: Locale(
+                locale['LocaleId'],
+                [_intent(intent) for intent in locale.get('Intents', [])],
+                code_hooks.get(locale['LocaleId']),
+            )
+            for locale in properties.get('BotLocales', [])
+        }
+        bots.append(Bot(properties['Name'], logical_id, locales))
+    return bots
+
+
+def load_cdk_out(outdir: str) -> List[Bot]:
+    """The bots of the stacks synthesized into outdir, with their lambda assets"""
+    bots = []
+    for path in sorted(glob.glob(os.path.join(outdir, '*.template.json'))):
+        with open(path, encoding='utf-8') as f:
+            template = json.load(f)
+        assets = {}
+        manifest = path[: -len('.template.json')] + '.assets.json'
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as f:
+                for key, asset in json.load(f).get('files', {}).items():
+                    assets[key] = os.path.join(outdir, asset['source']['path'])
+        lambda_dirs = {}
+        for logical_id, resource in template.get('Resources', {}).items():
+            if resource.get('Type') != 'AWS::Lambda::Function':
+                continue
+            key = str(resource['Properties'].get('Code', {}).get('S3Key', ''))
+            asset = assets.get(key.split('.')[0])
+            if asset and os.path.isdir(asset):
+                lambda_dirs[logical_id] = asset
+        bots.extend(load_bots(template, lambda_dirs))
+    return bots
+
+
+class LexError(Exception):
+    """A RecognizeText error, with its HTTP status and exception name"""
+
+    def __init__(self, status: int, error_type: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+@dataclass
+class Session:
+    bot: Dict[str, str]
+    session_attributes: Dict[str, str] = field(default_factory=dict)
+    intent: Optional[Dict[str, Any]] = None
+    dialog_action: Dict[str, Any] = field(default_factory=dict)
+
+
+class LexEmulator:
+    """Conversations with the bots, see the module docstring"""
+
+    def __init__(self, bots: List[Bot], bot_ids: Optional[Mapping[str, str]] = None):
+        self.bots = bots
+        self.bot_ids = dict(bot_ids or {})
+        self.sessions: Dict[Tuple[str, str, str, str], Session] = {}
+        # Like a Lambda container, a handler runs one invocation at a time
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_cdk_out(cls, outdir: str, bot_ids: Optional[Mapping[str, str]] = None):
+        return cls(load_cdk_out(outdir), bot_ids)
+
+    def bot(self, bot_id: str) -> Bot:
+        bot_id = self.bot_ids.get(bot_id, bot_id)
+        for bot in self.bots:
+            if bot_id in (bot.name, bot.logical_id):
+                return bot
+        for bot in self.bots:
+            if bot.name.endswith('-' + bot_id):
+                return bot
+        raise LexError(404, 'ResourceNotFoundException', f'Bot {bot_id} not found')
+
+    def _locale(self, bot_id: str, locale_id: str) -> Tuple[Bot, Locale]:
+        bot = self.bot(bot_id)
+        locale = bot.locales.get(locale_id)
+        if locale is None:
+            raise LexError(
+                404, 'ResourceNotFoundException', f'{bot.name} has no {locale_id}'
+            )
+        return bot, locale
+
+    def get_session(
+        self, bot_id: str, alias_id: str, locale_id: str, session_id: str
+    ) -> Dict[str, Any]:
+        session = self.sessions.get((bot_id, alias_id, locale_id, session_id))
+        if session is None:
+            raise LexError(404, 'ResourceNotFoundException', 'Session not found')
+        return {'sessionId': session_id, 'sessionState': self._session_state(session)}
+
+    def delete_session(
+        self, bot_id: str, alias_id: str, locale_id: str, session_id: str
+    ) -> Dict[str, Any]:
+        self.sessions.pop((bot_id, alias_id, locale_id, session_id), None)
+        return {
+            'botId': bot_id,
+            'botAliasId': alias_id,
+            'localeId': locale_id,
+            'sessionId': session_id,
+        }
+
+    def recognize_text(
+        self,
+        bot_id: str,
+        alias_id: str,
+        locale_id: str,
+        session_id: str,
+        text: str,
+        session_state: Optional[Mapping[str, Any]] = None,
+        request_attributes: Optional[Mapping[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """The response of Lex to text, see RecognizeText"""
+        bot, locale = self._locale(bot_id, locale_id)
+        key = (bot_id, alias_id, locale_id, session_id)
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = self.sessions[key] = Session(
+                    {
+                        'id': bot_id,
+                        'name': bot.name,
+                        'aliasId': alias_id,
+                        'aliasName': 'TestBotAlias',
+                        'localeId': locale_id,
+                        'version': 'DRAFT',
+                    }
+                )
+            if session_state:
+                if 'sessionAttributes' in session_state:
+                    session.session_attributes = dict(
+                        session_state['sessionAttributes']
+                    )
+                if session_state.get('intent'):
+                    session.intent = copy.deepcopy(session_state['intent'])
+                if 'dialogAction' in session_state:
+                    session.dialog_action = dict(session_state['dialogAction'])
+            turn = _Turn(session, locale, session_id, text)
+            messages = turn.run()
+            return {
+                'messages': messages,
+                'sessionState': self._session_state(session),
+                'interpretations': turn.interpretations(),
+                'requestAttributes': dict(request_attributes or {}),
+                'sessionId': session_id,
+            }
+
+    @staticmethod
+    def _session_state(session: Session) -> Dict[str, Any]:
+        state = {
+            'dialogAction': dict(session.dialog_action),
+            'sessionAttributes': dict(session.session_attributes),
+            'originatingRequestId': uuid.uuid4().hex,
+        }
+        if session.intent:
+            state['intent'] = copy.deepcopy(session.intent)
+        return state
+
+
+def resolve(slot: Slot, utterance: str, locale_id: str) -> str:
+    """The interpreted value of a slot elicited with utterance"""
+    if slot.slot_type == 'AMAZON.Confirmation':
+        label = YES_NO.label(utterance, locale_id)
+        if label:
+            return label.capitalize()
+    elif slot.slot_type == 'AMAZON.Number':
+        digits = [_DIGITS.get(word, word) for word in tokenize(utterance)]
+        if digits and all(digit.isdigit() for digit in digits):
+            return ''.join(digits)
+    return utterance
+
+
+def slot_value(value: str, original: str) -> Dict[str, Any]:
+    return {
+        'shape': 'Scalar',
+        'value': {
+            'originalValue': original,
+            'interpretedValue': value,
+            'resolvedValues': [value],
+        },
+    }
+
+
+class _Turn:
+    """One RecognizeText call: recognition, code hooks and Lex's own dialog"""
+
+    def __init__(
+        self,
+        session: Session,
+        locale: Locale,
+        session_id: str,
+        text: str,
+    ):
+        self.session = session
+        self.locale = locale
+        self.session_id = session_id
+        self.text = text
+        self.ranked: List[Tuple[Intent, float, Dict[str, str]]] = []
+
+    def interpretations(self, lambda_event: bool = False) -> List[Dict[str, Any]]:
+        """
+        The recognized intents, the one of the session first (with its slots)
+
+        Code hook events have a number for nluConfidence, RecognizeText
+        responses a score.
+        """
+        current = (self.session.intent or {}).get('name')
+        interpretations = []
+        for intent, score, slots in self.ranked:
+            if intent.name == current:
+                interpretation = {'intent': copy.deepcopy(self.session.intent)}
+                interpretations.insert(0, interpretation)
+            else:
+                interpretation = {
+                    'intent': {
+                        'name': intent.name,
+                        'slots': {
+                            name: slot_value(value, value)
+                            for name, value in slots.items()
+                        },
+                        'state': 'InProgress',
+                        'confirmationState': 'None',
+                    }
+                }
+                interpretations.append(interpretation)
+            if score:
+                score = round(score, 2)
+                interpretation['nluConfidence'] = (
+                    score if lambda_event else {'score': score}
+                )
+        if current and all(
+            item['intent']['name'] != current for item in interpretations
+        ):
+            interpretations.insert(0, {'intent': copy.deepcopy(self.session.intent)})
+        return interpretations
+
+    def run(self) -> List[Dict[str, str]]:
+        session = self.session
+        ranked = self.ranked = self.locale.recognize(self.text)
+        action = session.dialog_action.get('type')
+        current = self.locale.intent(session.intent['name']) if session.intent else None
+        top, score, captured = ranked[0] if ranked else (None, 0.0, {})
+        switch = top is not None and score == 1.0 and top is not current
+
+        if current and action == 'ElicitSlot' and not switch:
+            name = session.dialog_action.get('slotToElicit')
+            slot = current.slot(name) or Slot(name, '')
+            value = resolve(slot, self.text, self.locale.locale_id)
+            session.intent.setdefault('slots', {})[name] = slot_value(value, self.text)
+        elif current and action == 'ConfirmIntent' and not switch:
+            answer = YES_NO.label(self.text, self.locale.locale_id)
+            if answer is None:
+                return self._confirm(current)
+            session.intent['confirmationState'] = (
+                'Confirmed' if answer == 'yes' else 'Denied'
+            )
+        else:
+            current = top
+            if current is None:
+                session.intent = None
+                session.dialog_action = {'type': 'ElicitIntent'}
+                return []
+            session.intent = {
+                'name': current.name,
+                'slots': {slot.name: None for slot in current.slots},
+                'state': 'InProgress',
+                'confirmationState': 'None',
+            }
+            for name, value in captured.items():
+                slot = current.slot(name) or Slot(name, '')
+                session.intent['slots'][name] = slot_value(
+                    resolve(slot, value, self.locale.locale_id), value
+                )
+
+        if current.dialog_hook and self.locale.lambda_dir:
+            response = self._invoke('DialogCodeHook')
+            if session.dialog_action.get('type') != 'Delegate':
+                return response.get('messages') or []
+        return self._next(current)
+
+    def _next(self, intent: Intent) -> List[Dict[str, str]]:
+        """Lex's own dialog management, after Delegate or without a dialog hook"""
+        session = self.session
+        slots = session.intent.get('slots') or {}
+        for slot in intent.slots:
+            if slot.required and not slots.get(slot.name):
+                session.intent['state'] = 'InProgress'
+                session.dialog_action = {
+                    'type': 'ElicitSlot',
+                    'slotToElicit': slot.name,
+                }
+                return self._say(slot.prompt)
+        confirmation = session.intent.get('confirmationState', 'None')
+        if intent.confirmation_prompt and confirmation == 'None':
+            return self._confirm(intent)
+        if confirmation == 'Denied':
+            session.intent['state'] = 'Failed'
+            session.dialog_action = {'type': 'Close'}
+            return []
+
+        session.intent['state'] = 'ReadyForFulfillment'
+        messages = []
+        if intent.fulfillment_hook and self.locale.lambda_dir:
+            response = self._invoke('FulfillmentCodeHook')
+            messages = response.get('messages') or []
+            if session.dialog_action.get('type') != 'Delegate':
+                return messages
+        session.intent['state'] = 'Fulfilled'
+        session.dialog_action = {'type': 'Close'}
+        return messages or self._say(intent.fulfillment_prompt)
+
+    def _confirm(self, intent: Intent) -> List[Dict[str, str]]:
+        self.session.dialog_action = {'type': 'ConfirmIntent'}
+        return self._say(intent.confirmation_prompt)
+
+    @staticmethod
+    def _say(text: str) -> List[Dict[str, str]]:
+        return [{'contentType': 'PlainText', 'content': text}] if text else []
+
+    def _invoke(self, source: str) -> Dict[str, Any]:
+        session = self.session
+        handler = replay.load_handler(self.locale.lambda_dir)
+        event = replay.lambda_event(
+            session.bot,
+            self.session_id,
+            self.text,
+            source,
+            session.session_attributes,
+            session.intent,
+            self.interpretations(lambda_event=True),
+        )
+        response = handler(event, None)
+        if not isinstance(response, dict):
+            raise LexError(
+                424,
+                'DependencyFailedException',
+                f'Invalid Lambda Response: the {source} returned {response!r}',
+            )
+        state = response.get('sessionState') or {}
+        if state.get('sessionAttributes') is not None:
+            session.session_attributes = dict(state['sessionAttributes'])
+        if state.get('intent'):
+            session.intent = copy.deepcopy(state['intent'])
+        session.dialog_action = dict(state.get('dialogAction') or {})
+        return response
+
+
+class _RuntimeHandler(BaseHTTPRequestHandler):
+    """The session paths of the Lex V2 runtime API"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _route(self, method: str):
+        match = _SESSION_PATH.match(self.path.split('?')[0])
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        emulator: LexEmulator = self.server.stub.emulator
+        try:
+            if match is None:
+                raise LexError(404, 'ResourceNotFoundException', self.path)
+            ids = match.groups()[:4]
+            if method == 'POST' and match.group(5):
+                result = emulator.recognize_text(
+                    *ids,
+                    body.get('text', ''),
+                    body.get('sessionState'),
+                    body.get('requestAttributes'),
+                )
+            elif method == 'GET' and not match.group(5):
+                result = emulator.get_session(*ids)
+            elif method == 'DELETE' and not match.group(5):
+                result = emulator.delete_session(*ids)
+            else:
+                raise LexError(405, 'ValidationException', f'{method} {self.path}')
+            status, headers = 200, {}
+        except LexError as e:
+            status, result = e.status, {'message': str(e)}
+            headers = {'x-amzn-ErrorType': e.error_type}
+        data = json.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_PUT(self):
+        self._route('POST')
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+    def log_message(self, *args):
+        pass
+
+
+class LexRuntimeServer(StubServer):
+    """A RecognizeText compatible endpoint for an emulator"""
+
+    def __init__(self, emulator: LexEmulator, port: int = 0):
+        super().__init__(_RuntimeHandler, port)
+        self.emulator = emulator
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.address}'
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.harness.lex_emulator',
+        description=__doc__.split('\n')[1],
+    )
+    parser.add_argument(
+        '--cdk-out',
+        default=os.path.join(replay.ROOT, 'cdk.out'),
+        help='synthesized cloud assembly (default: cdk.out, run cdk synth first)',
+    )
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+        '--bot-id',
+        action='append',
+        default=[],
+        metavar='ID=NAME',
+        help='serve the bot named NAME as ID (like the ids of the test case CSVs)',
+    )
+    args = parser.parse_args(argv)
+
+    bot_ids = dict(pair.split('=', 1) for pair in args.bot_id)
+    emulator = LexEmulator.from_cdk_out(args.cdk_out, bot_ids)
+    if not emulator.bots:
+        print(f'No bots in {args.cdk_out}, run cdk synth first', file=sys.stderr)
+        return 1
+    with LexRuntimeServer(emulator, args.port) as server:
+        for bot in emulator.bots:
+            print(f'{bot.name}: {", ".join(bot.locales)}')
+        print(f'Serving RecognizeText on {server.url}', flush=True)
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    # Only the emulator's own output, unless asked for the handlers' logs
+    os.environ.setdefault('LOGGING_LEVEL', 'WARNING')
+    sys.exit(main())
@@ -0,0 +1,441 @@
+"""
+Load generator: the scripted test case dialogs as concurrent virtual callers
+
+Callers arrive at a rate (a Poisson process, all at once by default), each
+playing a test case of the scripts (round robin) with a think time between
+turns, against the handlers in-process or a RecognizeText compatible endpoint
+(see lex_emulator.py):
+
+    python -m tests.harness.load [CSV ...] [--callers 200] [--rate 50]
+        [--think 0.5] [--workers 1] [--endpoint http://127.0.0.1:8000]
+        [--json report.json] [--baseline baseline.json] [--tolerance 0.2]
+
+- Every turn is timed as the caller sees it (waiting for a handler worker
+  included) and checked against its row like replay.py does
+- Latencies are reported per bot, intent and response state with their p50,
+  p95 and p99, besides the throughput (turns per second) and error rate
+- In-process, the handlers of a bot run in --workers threads, like as many
+  warm Lambda instances; the handlers are imported up front
+- --baseline compares with the JSON report of an earlier run: the run fails
+  when a percentile of a group is more than --tolerance (and --noise-ms) above
+  it, or when the error rate exceeds --max-error-rate
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from tests.harness import replay
+
+PERCENTILES = (50, 95, 99)
+
+# (text of the messages, intent name, intent state) of a turn's response
+Outcome = Tuple[str, str, str]
+
+
+@dataclass
+class Histogram:
+    """Latencies of a group of turns, in milliseconds"""
+
+    samples: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def add(self, latency_ms: float, error: bool = False):
+        self.samples.append(latency_ms)
+        self.errors += error
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile, 0 without samples"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+    def buckets(self) -> Dict[str, int]:
+        """Counts of latencies up to powers of two milliseconds"""
+        counts: Dict[str, int] = {}
+        for sample in sorted(self.samples):
+            bound = 2 ** max(math.ceil(math.log2(sample)), -4) if sample > 0 else 0.0625
+            key = f'<={bound:g}'
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'turns': len(self.samples),
+            'errors': self.errors,
+            **{f'p{p}': round(self.percentile(p), 3) for p in PERCENTILES},
+            'buckets': self.buckets(),
+        }
+
+
+class InProcessTarget:
+    """The handlers of the scripts, called in a pool of worker threads"""
+
+    def __init__(self, scripts: List[replay.Script], workers: int = 1):
+        # Imported here, not concurrently by the callers
+        for script in scripts:
+            replay.load_handler(script.lambda_dir)
+        self.executor = ThreadPoolExecutor(max(workers, 1))
+
+    def open(self, script: replay.Script) -> '_HandlerSession':
+        return _HandlerSession(self, script)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class _HandlerSession:
+    def __init__(self, target: InProcessTarget, script: replay.Script):
+        first = script.turns[0]
+        self.target = target
+        self.conversation = replay.Conversation(
+            replay.load_handler(script.lambda_dir),
+            first.bot_id,
+            first.alias_id,
+            first.locale_id,
+        )
+
+    async def say(self, turn: replay.Turn) -> Outcome:
+        self.conversation.session_attributes.update(turn.session_attributes)
+        response, _ = await asyncio.get_running_loop().run_in_executor(
+            self.target.executor,
+            self.conversation.say,
+            turn.utterance,
+            turn.expected_intent,
+        )
+        return outcome(response)
+
+    async def close(self):
+        pass
+
+
+class EndpointTarget:
+    """
+    A RecognizeText compatible endpoint, a keep-alive connection per caller
+
+    The requests aren't signed: meant for lex_emulator.py, not AWS.
+    """
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+
+    def open(self, script: replay.Script) -> '_EndpointSession':
+        return _EndpointSession(self)
+
+    def close(self):
+        pass
+
+
+class _EndpointSession:
+    def __init__(self, target: EndpointTarget):
+        self.target = target
+        self.session_id = uuid.uuid4().hex
+        self.session_attributes: Dict[str, str] = {}
+        self.streams: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+
+    async def say(self, turn: replay.Turn) -> Outcome:
+        self.session_attributes.update(turn.session_attributes)
+        path = (
+            f'{self.target.prefix}/bots/{turn.bot_id}/botAliases/'
+            f'{turn.alias_id or "TSTALIASID"}/botLocales/{turn.locale_id}'
+            f'/sessions/{self.session_id}/text'
+        )
+        request = {'text': turn.utterance}
+        if self.session_attributes:
+            request['sessionState'] = {'sessionAttributes': self.session_attributes}
+        response = await self._post(path, request)
+        attributes = response.get('sessionState', {}).get('sessionAttributes')
+        if attributes is not None:
+            self.session_attributes = dict(attributes)
+        return outcome(response)
+
+    async def _post(self, path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self.streams is None:
+            self.streams = await asyncio.open_connection(
+                self.target.host, self.target.port
+            )
+        reader, writer = self.streams
+        body = json.dumps(request).encode('utf-8')
+        writer.write(
+            (
+                f'POST {path} HTTP/1.1\r\n'
+                f'Host: {self.target.host}:{self.target.port}\r\n'
+                'Content-Type: application/json\r\n'
+                f'Content-Length: {len(body)}\r\n\r\n'
+            ).encode('ascii')
+            + body
+        )
+        await writer.drain()
+        status = (await reader.readline()).decode('ascii').split(' ', 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        data = await reader.readexactly(int(headers.get('content-length', 0)))
+        if len(status) < 2 or status[1] != '200':
+            raise RuntimeError(
+                f'HTTP {" ".join(status[1:]).strip()}: '
+                f'{headers.get("x-amzn-errortype", "")} {data.decode("utf-8")}'
+            )
+        return json.loads(data)
+
+    async def close(self):
+        if self.streams is not None:
+            writer = self.streams[1]
+            writer.close()
+            await writer.wait_closed()
+
+
+def outcome(response: Dict[str, Any]) -> Outcome:
+    """Text, intent name and state of a code hook or RecognizeText response"""
+    text = ' '.join(
+        message.get('content', '') for message in response.get('messages') or []
+    )
+    intent = (response.get('sessionState') or {}).get('intent') or {}
+    return text, intent.get('name', ''), intent.get('state', '')
+
+
+def bot_name(script: replay.Script) -> str:
+    """The bot directory of the handler of a script (the lambdas/ parent)"""
+    return os.path.basename(os.path.dirname(script.lambda_dir))
+
+
+@dataclass
+class Report:
+    callers: int
+    duration_s: float
+    groups: Dict[str, Histogram]
+    errors: List[str]
+
+    @property
+    def turns(self) -> int:
+        return len(self.groups['all'].samples) if 'all' in self.groups else 0
+
+    @property
+    def error_rate(self) -> float:
+        return self.groups['all'].errors / self.turns if self.turns else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.turns / self.duration_s if self.duration_s else 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'callers': self.callers,
+            'turns': self.turns,
+            'durationS': round(self.duration_s, 3),
+            'throughput': round(self.throughput, 1),
+            'errorRate': round(self.error_rate, 4),
+            'groups': {key: h.to_json() for key, h in sorted(self.groups.items())},
+            'errors': self.errors[:20],
+        }
+
+
+class _Recorder:
+    def __init__(self):
+        self.groups: Dict[str, Histogram] = {}
+        self.errors: List[str] = []
+
+    def record(
+        self,
+        script: replay.Script,
+        turn: replay.Turn,
+        got: Outcome,
+        ms: float,
+        error: Optional[str],
+    ):
+        _, intent, state = got
+        keys = (
+            'all',
+            f'bot:{bot_name(script)}',
+            f'intent:{intent or turn.expected_intent or "-"}',
+            f'state:{state or "-"}',
+        )
+        for key in keys:
+            self.groups.setdefault(key, Histogram()).add(ms, error is not None)
+        if error is not None:
+            self.errors.append(f'{script.name} step {turn.step}: {error}')
+
+
+async def _caller(
+    target,
+    script: replay.Script,
+    think: float,
+    rng: random.Random,
+    recorder: _Recorder,
+):
+    session = target.open(script)
+    try:
+        for i, turn in enumerate(script.turns):
+            if i and think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+            start = time.perf_counter()
+            try:
+                got = await session.say(turn)
+            except Exception as e:
+                # The conversation can't go on
+                ms = (time.perf_counter() - start) * 1000
+                recorder.record(script, turn, ('', '', ''), ms, f'Raised {e!r}')
+                break
+            ms = (time.perf_counter() - start) * 1000
+            recorder.record(script, turn, got, ms, replay.check(turn, *got))
+    finally:
+        await session.close()
+
+
+async def generate(
+    scripts: List[replay.Script],
+    target,
+    callers: int,
+    rate: float = 0.0,
+    think: float = 0.0,
+    seed: int = 0,
+) -> Report:
+    """
+    Play callers test cases against target, arriving rate callers per second
+    (all at once when 0), pausing think seconds on average between turns
+    """
+    scripts = [script for script in scripts if script.turns]
+    rng = random.Random(seed)
+    recorder = _Recorder()
+    tasks = []
+    start = time.perf_counter()
+    for i in range(callers):
+        if rate and i:
+            await asyncio.sleep(rng.expovariate(rate))
+        script = scripts[i % len(scripts)]
+        tasks.append(
+            asyncio.ensure_future(
+                _caller(target, script, think, random.Random(rng.random()), recorder)
+            )
+        )
+    await asyncio.gather(*tasks)
+    return Report(
+        callers, time.perf_counter() - start, recorder.groups, recorder.errors
+    )
+
+
+def regressions(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    noise_ms: float = 0.5,
+) -> List[str]:
+    """Percentiles of the groups of report above the ones of baseline"""
+    found = []
+    for key, before in baseline.get('groups', {}).items():
+        after = report['groups'].get(key)
+        if after is None:
+            continue
+        for p in PERCENTILES:
+            limit = before[f'p{p}'] * (1 + tolerance) + noise_ms
+            if after[f'p{p}'] > limit:
+                found.append(
+                    f'{key} p{p} {after[f"p{p}"]:.3f} ms > {limit:.3f} ms '
+                    f'(baseline {before[f"p{p}"]:.3f} ms)'
+                )
+    return found
+
+
+def summary(report: Report) -> str:
+    lines = [
+        f'{"group":<40} {"turns":>6} {"errors":>6} '
+        + ' '.join(f'{f"p{p} ms":>9}' for p in PERCENTILES)
+    ]
+    for key, histogram in sorted(report.groups.items()):
+        lines.append(
+            f'{key:<40} {len(histogram.samples):>6} {histogram.errors:>6} '
+            + ' '.join(f'{histogram.percentile(p):>9.3f}' for p in PERCENTILES)
+        )
+    lines.extend(f'  {error}' for error in report.errors[:10])
+    lines.append(
+        f'{report.callers} callers, {report.turns} turns in '
+        f'{report.duration_s:.2f} s: {report.throughput:.1f} turns/s, '
+        f'{report.error_rate:.1%} errors'
+    )
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.harness.load', description=__doc__.split('\n')[1]
+    )
+    parser.add_argument('csv', nargs='*', help='test case CSVs (default: all)')
+    parser.add_argument('--callers', type=int, default=200, help='virtual callers')
+    parser.add_argument(
+        '--rate', type=float, default=0.0, help='callers arriving per second'
+    )
+    parser.add_argument(
+        '--think', type=float, default=0.0, help='mean seconds between turns'
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1, help='in-process handler threads'
+    )
+    parser.add_argument('--endpoint', help='RecognizeText endpoint URL')
+    parser.add_argument(
+        '--lambdas', help='lambda directory of the handler (default: ../lambdas)'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--baseline', help='JSON report to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--noise-ms', type=float, default=0.5)
+    parser.add_argument('--max-error-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    scripts = [
+        script
+        for path in args.csv or replay.find_scripts()
+        for script in replay.load_scripts(path, args.lambdas)
+    ]
+    if args.endpoint:
+        target = EndpointTarget(args.endpoint)
+    else:
+        target = InProcessTarget(scripts, args.workers)
+    try:
+        report = asyncio.run(
+            generate(scripts, target, args.callers, args.rate, args.think, args.seed)
+        )
+    finally:
+        target.close()
+    print(summary(report))
+    result = report.to_json()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    failed = report.error_rate > args.max_error_rate
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            found = regressions(result, json.load(f), args.tolerance, args.noise_ms)
+        for line in found:
+            print(f'REGRESSION {line}')
+        failed = failed or bool(found)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    # Only the load generator's own output, unless asked for the handlers' logs
+    if 'LOGGING_LEVEL' not in os.environ:
+        os.environ['LOGGING_LEVEL'] = 'WARNING'
+        # The dialog and cache stats records too, logged at INFO regardless
+        logging.disable(logging.INFO)
+    sys.exit(main())
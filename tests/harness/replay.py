@@ -0,0 +1,437 @@
+"""
+Offline replay of the scripted dialogs in the bots' docs/*-test-case.csv
+
+The rows of a script (see docs/TODO.md for the columns) are grouped by
+test_case into conversations and replayed in file order against the bot's
+lambda handler (lambdas/index.py next to docs/), in-process. The replay plays
+the part of Lex between turns:
+
+- The utterance fills the slot elicited by the previous response, answers its
+  ConfirmIntent, or else starts the intent of the row (expected_intent: the
+  intent Lex recognized when the script was recorded)
+- Session attributes (merged with the row's session_attributes JSON) and slots
+  are carried forward from the responses, the intent ends on Close and
+  ElicitIntent
+- Delegate continues with the FulfillmentCodeHook invocation
+
+Each turn passes when the messages, intent name and intent state of the
+response match the row (ignoring case and repeated whitespace, empty columns
+aren't checked). Turns are timed and the peak memory allocated during each
+conversation is traced:
+
+    python -m tests.harness.replay [CSV ...] [--json report.json] [--no-memory]
+        [--lambdas DIR]
+
+Without CSV arguments every script under infrastructure/bots_ssa is replayed.
+The exit status is 1 when a turn failed.
+"""
+
+import argparse
+import copy
+import csv
+import glob
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BOTS_DIR = os.path.join(ROOT, 'infrastructure', 'bots_ssa')
+# The lex_runtime layer, which Lambda adds to the path of the bot lambdas
+LAYER_DIR = os.path.join(
+    ROOT, 'infrastructure', 'lambda_layers', 'lex_runtime', 'python'
+)
+if LAYER_DIR not in sys.path:
+    sys.path.append(LAYER_DIR)
+
+from lex_runtime.lexicon import YES_NO  # noqa: E402
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+# Handlers by lambda directory, loaded once per process
+_HANDLERS: Dict[str, Handler] = {}
+
+
+@dataclass
+class Turn:
+    step: str
+    utterance: str
+    session_attributes: Dict[str, str]
+    expected_response: str
+    expected_intent: str
+    expected_state: str
+    bot_id: str = ''
+    alias_id: str = ''
+    locale_id: str = 'en_US'
+
+
+@dataclass
+class Script:
+    name: str
+    path: str
+    lambda_dir: str
+    turns: List[Turn] = field(default_factory=list)
+
+
+@dataclass
+class TurnResult:
+    step: str
+    utterance: str
+    response: str
+    intent: str
+    state: str
+    latency_ms: float
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ScriptResult:
+    name: str
+    path: str
+    turns: List[TurnResult]
+    peak_memory: Optional[int] = None
+
+    @property
+    def passed(self) -> bool:
+        return all(turn.passed for turn in self.turns)
+
+
+def find_scripts(root: str = BOTS_DIR) -> List[str]:
+    """The test case CSVs of the bots under root"""
+    return sorted(
+        glob.glob(os.path.join(root, '**', 'docs', '*test-case.csv'), recursive=True)
+    )
+
+
+def load_scripts(path: str, lambda_dir: Optional[str] = None) -> List[Script]:
+    """The conversations of a test case CSV, in file order"""
+    if lambda_dir is None:
+        lambda_dir = os.path.join(
+            os.path.dirname(os.path.abspath(path)), '..', 'lambdas'
+        )
+    scripts: Dict[str, Script] = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = row['test_case']
+            script = scripts.get(name)
+            if script is None:
+                script = scripts[name] = Script(name, path, os.path.abspath(lambda_dir))
+            script.turns.append(
+                Turn(
+                    step=row['step'],
+                    utterance=row['utterance'],
+                    session_attributes=json.loads(row['session_attributes'] or '{}'),
+                    # (sic) the column is misspelled in the recorded scripts
+                    expected_response=row['expected_reponse'],
+                    expected_intent=row['expected_intent'],
+                    expected_state=row['expected_state'],
+                    bot_id=row.get('bot_id', ''),
+                    alias_id=row.get('alias_id', ''),
+                    locale_id=row.get('locale_id') or 'en_US',
+                )
+            )
+    return list(scripts.values())
+
+
+def load_handler(lambda_dir: str) -> Handler:
+    """
+    The handler function of lambdas/index.py, imported once
+
+    The lambdas' own modules have generic names (conversation, prompts), so they
+    are removed from sys.modules again for the next bot to import its own.
+    """
+    lambda_dir = os.path.abspath(lambda_dir)
+    handler = _HANDLERS.get(lambda_dir)
+    if handler is not None:
+        return handler
+
+    before = set(sys.modules)
+    sys.path.insert(0, lambda_dir)
+    try:
+        name = 'replay_' + re.sub(r'\W', '_', os.path.relpath(lambda_dir, ROOT))
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(lambda_dir, 'index.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(lambda_dir)
+        for name in set(sys.modules) - before:
+            path = getattr(sys.modules[name], '__file__', None) or ''
+            if os.path.abspath(path).startswith(lambda_dir + os.sep):
+                del sys.modules[name]
+    handler = _HANDLERS[lambda_dir] = module.handler
+    return handler
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercased text with single spaces, as compared by tests/lambdas/index.py"""
+    return ' '.join((text or '').strip().lower().split())
+
+
+def lambda_event(
+    bot: Dict[str, str],
+    session_id: str,
+    utterance: str,
+    source: str,
+    session_attributes: Dict[str, str],
+    intent: Dict[str, Any],
+    interpretations: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """A Lex V2 code hook event, with copies of the session state"""
+    intent = copy.deepcopy(intent)
+    if interpretations is None:
+        interpretations = [{'intent': copy.deepcopy(intent), 'nluConfidence': 1.0}]
+    return {
+        'messageVersion': '1.0',
+        'invocationSource': source,
+        'inputMode': 'Text',
+        'responseContentType': 'text/plain; charset=utf-8',
+        'sessionId': session_id,
+        'inputTranscript': utterance,
+        'bot': dict(bot),
+        'interpretations': copy.deepcopy(interpretations),
+        'requestAttributes': {},
+        'sessionState': {
+            'sessionAttributes': dict(session_attributes),
+            'activeContexts': [],
+            'intent': intent,
+        },
+        'transcriptions': [{'transcription': utterance}],
+    }
+
+
+class Conversation:
+    """One Lex session against a handler, see the module docstring"""
+
+    def __init__(
+        self,
+        handler: Handler,
+        bot_id: str = '',
+        alias_id: str = '',
+        locale_id: str = 'en_US',
+    ):
+        self.handler = handler
+        self.bot = {
+            'id': bot_id or 'REPLAY',
+            'name': 'replay',
+            'aliasId': alias_id or 'TSTALIASID',
+            'aliasName': 'TestBotAlias',
+            'localeId': locale_id,
+            'version': 'DRAFT',
+        }
+        self.session_id = uuid.uuid4().hex
+        self.session_attributes: Dict[str, str] = {}
+        self.intent: Optional[Dict[str, Any]] = None
+        self.dialog_action: Dict[str, Any] = {}
+
+    def say(self, utterance: str, intent_name: str) -> Tuple[Dict[str, Any], float]:
+        """
+        Respond to an utterance, starting intent_name unless the previous
+        response elicited a slot or a confirmation
+
+        Returns the last response of the handler and the milliseconds spent in it.
+        """
+        action = self.dialog_action
+        if self.intent and action.get('type') == 'ElicitSlot':
+            self.intent.setdefault('slots', {})[action['slotToElicit']] = {
+                'shape': 'Scalar',
+                'value': {
+                    'originalValue': utterance,
+                    'interpretedValue': utterance,
+                    'resolvedValues': [utterance],
+                },
+            }
+        elif self.intent and action.get('type') == 'ConfirmIntent':
+            answer = YES_NO.label(utterance, self.bot['localeId'])
+            self.intent['confirmationState'] = (
+                'Confirmed' if answer == 'yes' else 'Denied'
+            )
+        else:
+            self.intent = {
+                'name': intent_name,
+                'slots': {},
+                'state': 'InProgress',
+                'confirmationState': 'None',
+            }
+
+        elapsed = 0
+        response, took = self._invoke(utterance, 'DialogCodeHook')
+        elapsed += took
+        if self.dialog_action.get('type') == 'Delegate':
+            self.intent['state'] = 'ReadyForFulfillment'
+            response, took = self._invoke(utterance, 'FulfillmentCodeHook')
+            elapsed += took
+        if self.dialog_action.get('type') in ('Close', 'ElicitIntent'):
+            self.intent = None
+        return response, elapsed / 1e6
+
+    def _invoke(self, utterance: str, source: str) -> Tuple[Dict[str, Any], int]:
+        event = lambda_event(
+            self.bot,
+            self.session_id,
+            utterance,
+            source,
+            self.session_attributes,
+            self.intent,
+        )
+        start = time.perf_counter_ns()
+        response = self.handler(event, None)
+        took = time.perf_counter_ns() - start
+        if not isinstance(response, dict):
+            raise ValueError(f'The {source} returned {response!r}')
+
+        session_state = response.get('sessionState') or {}
+        attributes = session_state.get('sessionAttributes')
+        if attributes is not None:
+            self.session_attributes = dict(attributes)
+        if session_state.get('intent'):
+            self.intent = copy.deepcopy(session_state['intent'])
+        self.dialog_action = session_state.get('dialogAction') or {}
+        return response, took
+
+
+def check(turn: Turn, response: str, intent: str, state: str) -> Optional[str]:
+    """Why the response of a turn doesn't match its row, None if it does"""
+    expected = (
+        ('response', turn.expected_response, response),
+        ('intent', turn.expected_intent, intent),
+        ('state', turn.expected_state, state),
+    )
+    for what, want, got in expected:
+        if want and normalize(want) != normalize(got):
+            return f'Expected {what} = {want!r}, got {got!r}'
+    return None
+
+
+def replay(script: Script, memory: bool = True) -> ScriptResult:
+    """Replay a conversation, tracing its peak memory unless memory is False"""
+    handler = load_handler(script.lambda_dir)
+    first = script.turns[0] if script.turns else Turn('', '', {}, '', '', '')
+    conversation = Conversation(handler, first.bot_id, first.alias_id, first.locale_id)
+    results: List[TurnResult] = []
+    if memory:
+        tracemalloc.start()
+    try:
+        for turn in script.turns:
+            conversation.session_attributes.update(turn.session_attributes)
+            try:
+                response, latency = conversation.say(
+                    turn.utterance, turn.expected_intent
+                )
+            except Exception as e:
+                results.append(
+                    TurnResult(
+                        turn.step, turn.utterance, '', '', '', 0.0, f'Raised {e!r}'
+                    )
+                )
+                break
+            text = ' '.join(
+                message.get('content', '') for message in response.get('messages') or []
+            )
+            intent = (response.get('sessionState') or {}).get('intent') or {}
+            result = TurnResult(
+                turn.step,
+                turn.utterance,
+                text,
+                intent.get('name', ''),
+                intent.get('state', ''),
+                latency,
+            )
+            result.error = check(turn, text, result.intent, result.state)
+            results.append(result)
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return ScriptResult(script.name, script.path, results, peak)
+
+
+def summary(results: List[ScriptResult]) -> str:
+    """Text report of the replayed conversations"""
+    lines = []
+    for result in results:
+        memory = (
+            f', peak {result.peak_memory / 1024:.0f} KiB'
+            if result.peak_memory is not None
+            else ''
+        )
+        lines.append(
+            f'{"PASS" if result.passed else "FAIL"} {result.name} '
+            f'({os.path.relpath(result.path, ROOT)}{memory})'
+        )
+        for turn in result.turns:
+            lines.append(
+                f'  {"ok  " if turn.passed else "FAIL"} {turn.step:>3} '
+                f'{turn.utterance!r:<24} {turn.latency_ms:8.3f} ms'
+            )
+            if turn.error:
+                lines.append(f'       {turn.error}')
+    passed = sum(result.passed for result in results)
+    turns = [turn for result in results for turn in result.turns]
+    total_ms = sum(turn.latency_ms for turn in turns)
+    lines.append(
+        f'{passed}/{len(results)} test cases passed, '
+        f'{len(turns)} turns in {total_ms:.1f} ms'
+    )
+    return '\n'.join(lines)
+
+
+def to_json(results: List[ScriptResult]) -> Dict[str, Any]:
+    return {
+        'testCases': [
+            {
+                **asdict(result),
+                'passed': result.passed,
+                'turns': [
+                    {**asdict(turn), 'passed': turn.passed} for turn in result.turns
+                ],
+            }
+            for result in results
+        ]
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.harness.replay', description=__doc__.split('\n')[1]
+    )
+    parser.add_argument('csv', nargs='*', help='test case CSVs (default: all)')
+    parser.add_argument(
+        '--lambdas', help='lambda directory of the handler (default: ../lambdas)'
+    )
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument(
+        '--no-memory',
+        dest='memory',
+        action='store_false',
+        help="don't trace memory (faster, untraced latencies)",
+    )
+    args = parser.parse_args(argv)
+
+    results = [
+        replay(script, args.memory)
+        for path in args.csv or find_scripts()
+        for script in load_scripts(path, args.lambdas)
+    ]
+    print(summary(results))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(to_json(results), f, indent=2)
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    # Only the harness' own output, unless asked for the handlers' logs
+    os.environ.setdefault('LOGGING_LEVEL', 'WARNING')
+    sys.exit(main())
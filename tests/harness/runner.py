@@ -0,0 +1,234 @@
+"""
+Parallel runner for the scripted test case dialogs, see replay.py
+
+The test cases of the scripts are independent conversations: they are sharded
+across a pool of worker processes, each importing the handlers it replays on
+its own, and the results are merged into one report in script order:
+
+    python -m tests.harness.runner [CSV ...] [--workers N] [--junit junit.xml]
+        [--json report.json] [--no-memory] [--lambdas DIR] [--watch]
+
+- Shards are contiguous runs of the test cases sorted by handler, so a worker
+  imports as few handlers as possible
+- The JUnit report has a test case per turn (classname: script test case)
+  with its latency, the JSON report is the one of replay.py
+- --watch runs again whenever a script, a handler directory or the lex_runtime
+  layer changes, replaying only the test cases of the changed scripts and
+  handlers (all of them for a layer change), in new worker processes
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tests.harness import replay
+
+# A test case: its script, lambda directory and name
+Job = Tuple[str, str, str]
+
+WATCH_INTERVAL = 1.0
+
+
+def collect_jobs(paths: Iterable[str], lambda_dir: Optional[str] = None) -> List[Job]:
+    return [
+        (path, script.lambda_dir, script.name)
+        for path in paths
+        for script in replay.load_scripts(path, lambda_dir)
+    ]
+
+
+def shard(jobs: List[Job], count: int) -> List[List[Job]]:
+    """Split jobs into at most count contiguous shards, grouped by handler"""
+    ordered = sorted(jobs, key=lambda job: job[1])
+    size = -(-len(ordered) // max(count, 1))
+    return [ordered[i : i + size] for i in range(0, len(ordered), size)]
+
+
+def _run_shard(jobs: List[Job], memory: bool) -> List[Tuple[Job, replay.ScriptResult]]:
+    """Replay the test cases of a shard, in a worker process"""
+    scripts: Dict[Tuple[str, str], Dict[str, replay.Script]] = {}
+    results = []
+    for path, lambda_dir, name in jobs:
+        loaded = scripts.get((path, lambda_dir))
+        if loaded is None:
+            loaded = scripts[path, lambda_dir] = {
+                script.name: script for script in replay.load_scripts(path, lambda_dir)
+            }
+        results.append(((path, lambda_dir, name), replay.replay(loaded[name], memory)))
+    return results
+
+
+def run(
+    jobs: List[Job], workers: Optional[int] = None, memory: bool = True
+) -> List[replay.ScriptResult]:
+    """Replay jobs in a new pool of worker processes, results in job order"""
+    if not jobs:
+        return []
+    shards = shard(jobs, workers or os.cpu_count() or 1)
+    # Spawned, not forked: workers don't inherit handlers imported by the parent
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(len(shards), mp_context=context) as pool:
+        futures = [pool.submit(_run_shard, part, memory) for part in shards]
+        by_job = dict(pair for future in futures for pair in future.result())
+    return [by_job[job] for job in jobs]
+
+
+def to_junit(results: List[replay.ScriptResult]) -> ET.ElementTree:
+    """A testsuite per script, a testcase per turn"""
+    root = ET.Element('testsuites')
+    suites: Dict[str, ET.Element] = {}
+    for result in results:
+        suite = suites.get(result.path)
+        if suite is None:
+            suite = suites[result.path] = ET.SubElement(
+                root,
+                'testsuite',
+                name=os.path.relpath(result.path, replay.ROOT),
+                tests='0',
+                failures='0',
+                time='0',
+            )
+        for turn in result.turns:
+            case = ET.SubElement(
+                suite,
+                'testcase',
+                classname=result.name,
+                name=f'step {turn.step}: {turn.utterance}',
+                time=f'{turn.latency_ms / 1000:.6f}',
+            )
+            if not turn.passed:
+                ET.SubElement(case, 'failure', message=turn.error).text = turn.response
+                suite.set('failures', str(int(suite.get('failures')) + 1))
+            suite.set('tests', str(int(suite.get('tests')) + 1))
+            suite.set(
+                'time', f'{float(suite.get("time")) + turn.latency_ms / 1000:.6f}'
+            )
+    for name in ('tests', 'failures'):
+        root.set(name, str(sum(int(suite.get(name)) for suite in root)))
+    return ET.ElementTree(root)
+
+
+def write_reports(results: List[replay.ScriptResult], args: argparse.Namespace):
+    if args.junit:
+        to_junit(results).write(args.junit, encoding='utf-8', xml_declaration=True)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(replay.to_json(results), f, indent=2)
+
+
+def fingerprint(paths: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """Modification time and size of the files of paths (files or directories)"""
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            found = [path]
+        else:
+            found = [
+                os.path.join(directory, name)
+                for directory, subdirs, names in os.walk(path)
+                if '__pycache__' not in directory
+                for name in names
+            ]
+        for name in found:
+            stat = os.stat(name)
+            files[name] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def changed_jobs(
+    jobs: List[Job],
+    before: Dict[str, Tuple[int, int]],
+    after: Dict[str, Tuple[int, int]],
+) -> List[Job]:
+    """The jobs whose script, handler directory or the layer changed"""
+    changed = {
+        name
+        for name in before.keys() | after.keys()
+        if before.get(name) != after.get(name)
+    }
+    if any(name.startswith(replay.LAYER_DIR + os.sep) for name in changed):
+        return jobs
+    return [
+        job
+        for job in jobs
+        if job[0] in changed
+        or any(name.startswith(job[1] + os.sep) for name in changed)
+    ]
+
+
+def watch(paths: List[str], args: argparse.Namespace):
+    """Run all test cases, then the changed ones whenever files change"""
+
+    def watched():
+        jobs = collect_jobs(paths, args.lambdas)
+        dirs = {job[1] for job in jobs}
+        return jobs, fingerprint([*paths, *dirs, replay.LAYER_DIR])
+
+    jobs, files = watched()
+    pending = jobs
+    while True:
+        if pending:
+            start = time.perf_counter()
+            results = run(pending, args.workers, args.memory)
+            print(replay.summary(results))
+            print(f'Ran in {time.perf_counter() - start:.2f} s, watching for changes')
+            write_reports(results, args)
+        time.sleep(WATCH_INTERVAL)
+        try:
+            jobs, after = watched()
+        except (OSError, ValueError, KeyError) as e:
+            # A script or handler in the middle of being saved
+            print(f'Waiting for changes: {e}')
+            continue
+        pending = changed_jobs(jobs, files, after)
+        files = after
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m tests.harness.runner', description=__doc__.split('\n')[1]
+    )
+    parser.add_argument('csv', nargs='*', help='test case CSVs (default: all)')
+    parser.add_argument(
+        '--workers', type=int, help='worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--lambdas', help='lambda directory of the handler (default: ../lambdas)'
+    )
+    parser.add_argument('--junit', help='write a JUnit XML report to this file')
+    parser.add_argument('--json', help='write a JSON report to this file')
+    parser.add_argument(
+        '--no-memory',
+        dest='memory',
+        action='store_false',
+        help="don't trace memory (faster, untraced latencies)",
+    )
+    parser.add_argument(
+        '--watch', action='store_true', help='run again when files change'
+    )
+    args = parser.parse_args(argv)
+    paths = [os.path.abspath(path) for path in args.csv] or replay.find_scripts()
+    if args.watch:
+        try:
+            watch(paths, args)
+        except KeyboardInterrupt:
+            return 0
+
+    start = time.perf_counter()
+    results = run(collect_jobs(paths, args.lambdas), args.workers, args.memory)
+    print(replay.summary(results))
+    print(f'Ran in {time.perf_counter() - start:.2f} s')
+    write_reports(results, args)
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    # Inherited by the workers: only the harness' own output
+    os.environ.setdefault('LOGGING_LEVEL', 'WARNING')
+    sys.exit(main())
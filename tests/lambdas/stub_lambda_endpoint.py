@@ -0,0 +1,106 @@
+"""
+Local stand-ins for the Lambda Invoke API and the Lambda Extensions API
+
+Point a botocore lambda client at StubLambdaEndpoint.url (or set
+LAMBDA_ENDPOINT_URL) to record invocations instead of calling AWS. Set
+AWS_LAMBDA_RUNTIME_API to StubRuntimeApi.address to register internal extensions.
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+INVOKE_PATH = re.compile(r'^/2015-03-31/functions/([^/]+)/invocations')
+
+
+class StubServer:
+    def __init__(self, handler_class, port: int = 0):
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler_class)
+        self.server.stub = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address
+        return f'{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _InvokeHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        match = INVOKE_PATH.match(self.path)
+        if not match:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        time.sleep(stub.latency)
+        with stub.lock:
+            stub.invocations.append((match.group(1), json.loads(body or b'null')))
+        self.send_response(202)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StubLambdaEndpoint(StubServer):
+    """Accepts Invoke requests, records (function name, payload) after `latency`"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(_InvokeHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.invocations: List[Tuple[str, object]] = []
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.address}'
+
+
+class _ExtensionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.stub.registered.append(self.headers['Lambda-Extension-Name'])
+        self.send_response(200)
+        self.send_header('Lambda-Extension-Identifier', 'stub-extension-id')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def do_GET(self):
+        stub = self.server.stub
+        # The extension is done with the previous invocation
+        stub.next_calls.put(time.monotonic())
+        event = json.dumps(stub.events.get()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(event)))
+        self.end_headers()
+        self.wfile.write(event)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubRuntimeApi(StubServer):
+    """Registers extensions and hands out the events put in `events`"""
+
+    def __init__(self):
+        super().__init__(_ExtensionHandler)
+        self.registered: List[str] = []
+        self.events: 'queue.Queue' = queue.Queue()
+        self.next_calls: 'queue.Queue' = queue.Queue()
@@ -0,0 +1,88 @@
+"""
+Local stand-in for the office lookup API (OFFICE_API_ENDPOINT)
+
+Serves GET /<zip code> from `offices` in the format of the office API, over
+keep-alive connections. Latency and failures can be injected to exercise the
+retries and circuit breaker of lex_runtime.api_client:
+
+    with StubOfficeApi({'12345': {...}}) as api:
+        api.failures = 3        # the next 3 requests return `failure_status`
+        api.latency = 0.5       # every request waits first
+        client = ApiClient(api.url)
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, Optional
+
+from tests.lambdas.stub_lambda_endpoint import StubServer
+
+
+class _OfficeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes, don't wait for delayed ACKs
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def do_GET(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests += 1
+            fail = stub.failures > 0 or stub.rng.random() < stub.failure_rate
+            stub.failures = max(0, stub.failures - 1)
+        time.sleep(stub.latency)
+
+        office = stub.offices.get(self.path.rsplit('/', 1)[-1])
+        if fail:
+            status, body = stub.failure_status, {'status': 'failure'}
+        elif office is None:
+            status, body = 404, {'status': 'failure'}
+        else:
+            status, body = 200, {'status': 'success', **office}
+        data = json.dumps(body).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except ConnectionError:
+            # The client timed out and closed the connection
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class StubOfficeApi(StubServer):
+    """Office API returning `offices` by zip code, see the module docstring"""
+
+    def __init__(
+        self,
+        offices: Dict[str, Dict[str, Any]],
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(_OfficeHandler)
+        self.offices = offices
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.failures = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.address}/offices'
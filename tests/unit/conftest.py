@@ -0,0 +1,15 @@
+import os
+import sys
+
+# The lex_runtime layer, which Lambda adds to the path of the bot lambdas
+sys.path.append(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'infrastructure',
+        'lambda_layers',
+        'lex_runtime',
+        'python',
+    )
+)
@@ -0,0 +1,111 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from lex_runtime import api_client
+from lex_runtime.api_client import ApiClient, ApiError, CircuitBreaker, CircuitOpenError
+
+from tests.lambdas.stub_office_api import StubOfficeApi
+
+OFFICE = {'office_address': '123 Main St', 'office_hours': '9am - 5pm'}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def api():
+    with StubOfficeApi({'12345': OFFICE}) as api:
+        yield api
+
+
+def test_connections_are_kept_alive(api):
+    client = ApiClient(api.url)
+    for _ in range(5):
+        assert client.get_json('/12345') == {'status': 'success', **OFFICE}
+    assert client.get_json('/99999') is None
+    assert api.requests == 6
+    assert api.connections == 1
+
+
+def test_failed_attempts_are_retried(api):
+    client = ApiClient(api.url, retries=2, backoff=0)
+    api.failures = 2
+    assert client.get_json('/12345')['office_address'] == '123 Main St'
+    assert api.requests == 3
+
+    api.failures = 3
+    with pytest.raises(ApiError) as error:
+        client.get_json('/12345')
+    assert error.value.status == 503
+
+
+def test_client_errors_are_not_retried(api):
+    api.failure_status = 400
+    api.failures = 1
+    with pytest.raises(ApiError, match='returned 400'):
+        ApiClient(api.url, backoff=0).get_json('/12345')
+    assert api.requests == 1
+
+
+def test_calls_fit_in_the_budget(api):
+    api.latency = 0.3
+    client = ApiClient(api.url, budget=0.25, read_timeout=0.1, backoff=0.01)
+    start = time.monotonic()
+    with pytest.raises(ApiError, match='timed out'):
+        client.get_json('/12345')
+    assert time.monotonic() - start < 0.3
+
+
+def test_an_overslept_backoff_raises_the_last_error(api, monkeypatch):
+    # The backoff sleeps past the deadline
+    clock = SimpleNamespace(
+        monotonic=time.monotonic, sleep=lambda delay: time.sleep(delay + 0.1)
+    )
+    monkeypatch.setattr(api_client, 'time', clock)
+    api.failures = 5
+    client = ApiClient(api.url, budget=0.05, backoff=0.01)
+    with pytest.raises(ApiError, match='returned 503'):
+        client.get_json('/12345')
+    assert api.requests == 1
+    with pytest.raises(ApiError, match='budget exhausted'):
+        ApiClient(api.url, budget=0).get_json('/12345')
+
+
+def test_breaker_opens_and_recovers(api):
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    client = ApiClient(api.url, retries=1, backoff=0, breaker=breaker)
+
+    api.failures = 3
+    with pytest.raises(ApiError):
+        client.get_json('/12345')
+    assert breaker.state == 'closed'
+    with pytest.raises(CircuitOpenError):
+        client.get_json('/12345')
+    assert breaker.state == 'open'
+    assert api.requests == 3
+
+    clock.now = 10
+    assert breaker.state == 'half-open'
+    assert client.get_json('/12345')['office_hours'] == '9am - 5pm'
+    assert breaker.state == 'closed'
+
+    # A failed trial call opens it again
+    api.failures = 3
+    with pytest.raises(ApiError):
+        client.get_json('/12345')
+    with pytest.raises(CircuitOpenError):
+        client.get_json('/12345')
+    clock.now = 25
+    api.failures = 1
+    requests = api.requests
+    with pytest.raises(CircuitOpenError):
+        client.get_json('/12345')
+    assert api.requests == requests + 1
+    assert breaker.state == 'open'
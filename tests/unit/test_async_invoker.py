@@ -0,0 +1,63 @@
+import time
+
+import botocore.session
+import pytest
+from lex_runtime.dispatch import AsyncInvoker
+
+from tests.lambdas.stub_lambda_endpoint import StubLambdaEndpoint, StubRuntimeApi
+
+EVENT = {'sessionState': {'intent': {'name': 'OfficeLocator'}}}
+ARN = 'arn:aws:lambda:us-east-1:123456789012:function:custom-handler'
+
+
+@pytest.fixture
+def endpoint():
+    with StubLambdaEndpoint(latency=0.2) as endpoint:
+        yield endpoint
+
+
+def make_invoker(endpoint: StubLambdaEndpoint, **kwargs) -> AsyncInvoker:
+    client = botocore.session.get_session().create_client(
+        'lambda',
+        region_name='us-east-1',
+        endpoint_url=endpoint.url,
+        aws_access_key_id='test',
+        aws_secret_access_key='test',
+    )
+    return AsyncInvoker(client=client, **kwargs)
+
+
+def test_submit_does_not_wait_for_the_invoke(endpoint):
+    invoker = make_invoker(endpoint)
+
+    start = time.monotonic()
+    invoker.submit(ARN, EVENT)
+    assert time.monotonic() - start < 0.1
+    assert endpoint.invocations == []
+
+    assert invoker.drain()
+    assert endpoint.invocations == [('custom-handler', EVENT)]
+
+
+def test_sync_mode_invokes_inline(endpoint):
+    invoker = make_invoker(endpoint, mode='sync')
+    invoker.submit(ARN, EVENT)
+    assert endpoint.invocations == [('custom-handler', EVENT)]
+
+
+def test_extension_drains_before_the_next_event(endpoint, monkeypatch):
+    with StubRuntimeApi() as runtime_api:
+        monkeypatch.setenv('AWS_LAMBDA_RUNTIME_API', runtime_api.address)
+        invoker = make_invoker(endpoint)
+        assert invoker.start_drain_extension()
+        assert runtime_api.registered == ['lex-runtime-drain']
+        runtime_api.next_calls.get(timeout=2)  # Ready after init
+
+        runtime_api.events.put({'eventType': 'INVOKE'})
+        invoker.submit(ARN, EVENT)
+        invoker.handler_finished()
+        assert endpoint.invocations == []
+
+        # The environment can only freeze once the invocation was sent
+        runtime_api.next_calls.get(timeout=2)
+        assert endpoint.invocations == [('custom-handler', EVENT)]
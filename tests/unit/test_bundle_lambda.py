@@ -0,0 +1,84 @@
+import json
+import os
+
+from aws_cdk import App, Stack
+
+from infrastructure.utils import bundle_lambda
+from infrastructure.utils.bundle_lambda import LambdaBundle, find_python, select_files
+from infrastructure.utils.create_lambda import create_lambda
+
+LEX_HANDLER = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    '..',
+    'infrastructure',
+    'constructs',
+    'menu_bot',
+    'lambdas',
+    'lex_handler',
+)
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_tests_fixtures_and_caches_are_left_out():
+    bundled, excluded = select_files(LEX_HANDLER)
+    assert {'index.py', 'actions.py', 'menu_config.json'} <= set(bundled)
+    assert {'test_index.py', 'fulfilled.json'} <= set(excluded)
+    assert not any('__pycache__' in path for path in bundled)
+
+
+def test_include_and_exclude_rules_and_hash(tmp_path):
+    for name in ['index.py', 'data/offices.idx', 'data/notes.md', 'tests/test_a.py']:
+        write(str(tmp_path / name), name)
+    source = str(tmp_path)
+
+    assert select_files(source, exclude=(*bundle_lambda.EXCLUDE, 'tests')) == (
+        ['data/offices.idx', 'index.py'],
+        ['data/notes.md', 'tests/test_a.py'],
+    )
+    assert select_files(source, include=['data/*'])[0] == ['data/offices.idx']
+
+    bundle = LambdaBundle(source)
+    assert LambdaBundle(source).asset_hash == bundle.asset_hash
+    assert len(bundle.asset_hash) == 64
+    # Excluded files don't change the bundle, bundled ones and the target do
+    write(str(tmp_path / 'data' / 'notes.md'), 'changed')
+    assert LambdaBundle(source).asset_hash == bundle.asset_hash
+    assert LambdaBundle(source, python='python3.9').asset_hash != bundle.asset_hash
+    write(str(tmp_path / 'index.py'), 'changed')
+    assert LambdaBundle(source).asset_hash != bundle.asset_hash
+
+
+def test_create_lambda_bundles_once_and_reports_sizes(tmp_path, monkeypatch):
+    source = str(tmp_path / 'handler')
+    write(os.path.join(source, 'index.py'), 'def handler(event, context):\n    pass\n')
+    write(os.path.join(source, 'test_index.py'), 'import index\n')
+    outdir = str(tmp_path / 'cdk.out')
+    calls = []
+    try_bundle = LambdaBundle.try_bundle
+
+    def counted(self, output_dir, options):
+        calls.append(self.source_dir)
+        return try_bundle(self, output_dir, options)
+
+    monkeypatch.setattr(LambdaBundle, 'try_bundle', counted)
+    for _ in range(2):
+        app = App(outdir=outdir)
+        create_lambda(Stack(app, 'Stack'), 'Handler', source)
+        app.synth()
+
+    # The layer and the function, the second synth reuses the staged assets
+    assert len(calls) == 2
+    with open(os.path.join(outdir, bundle_lambda.REPORT_FILE)) as f:
+        report = json.load(f)['Stack/Handler']
+    assert report['excluded'] == ['test_index.py']
+    compiled = 1 if find_python() else 0
+    assert (report['files'], report['compiled']) == (1 + compiled, compiled)
+    assert 0 < report['zipBytes'] and report['bytes'] > 0
+    staged = os.listdir(os.path.join(outdir, f'asset.{report["assetHash"]}'))
+    assert 'test_index.py' not in staged and 'index.py' in staged
@@ -0,0 +1,40 @@
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from infrastructure.utils.canonical_stringify import (
+    canonical_bytes,
+    canonical_stringify,
+    iter_canonical_bytes,
+)
+
+
+@dataclass
+class Node:
+    name: str
+    utterances: List[str] = field(default_factory=list)
+    child: Optional['Node'] = None
+
+
+def test_lists_are_serialized_inline_with_sorted_keys():
+    text = canonical_stringify(Node(name='Yes', utterances=['yes', 'sí']))
+    assert text == '{"child":null,"name":"Yes","utterances":["yes","sí"]}'
+    assert json.loads(text)['utterances'] == ['yes', 'sí']
+
+
+def test_shared_objects_are_reused_and_cycles_are_broken():
+    shared = ['help', 'operator']
+    node = Node(name='root', utterances=shared)
+    node.child = Node(name='leaf', utterances=shared, child=node)
+
+    parsed = json.loads(canonical_stringify(node))
+    assert parsed['child']['utterances'] == ['help', 'operator']
+    assert parsed['child']['child'] == '{circular}'
+
+
+def test_byte_apis_agree():
+    node = Node(name='x', utterances=[str(i) for i in range(5000)])
+    assert b''.join(iter_canonical_bytes(node)) == canonical_bytes(node)
+    assert (
+        canonical_bytes({'b': lambda: None, 'a': 1.5}) == b'{"a":1.5,"b":"{function}"}'
+    )
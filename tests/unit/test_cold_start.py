@@ -0,0 +1,41 @@
+import json
+import os
+
+from tests.harness import cold_start, replay
+
+
+def test_every_lambda_is_in_the_baseline():
+    names = {
+        os.path.relpath(path, replay.ROOT).replace(os.sep, '/')
+        for path in cold_start.find_lambda_dirs()
+    }
+    assert 'infrastructure/bots_ssa/office_locator_bot/lambdas' in names
+    assert 'infrastructure/bots/address_change_bot/handler' in names
+    with open(cold_start.BASELINE, encoding='utf-8') as f:
+        baseline = json.load(f)['lambdas']
+    assert names == set(baseline)
+
+
+def test_handlers_import_no_third_party_package_at_init():
+    # boto3, botocore and urllib3 are only imported by the first call using them
+    for path in cold_start.find_lambda_dirs():
+        result = cold_start.measure_once(path)
+        assert result['packages'] == [], path
+        assert result['importMs'] > 0
+
+
+def test_regressions():
+    before = {'importMs': 10.0, 'initRssKiB': 1000, 'modules': 30, 'packages': []}
+    baseline = {'menu': before}
+    assert cold_start.regressions({'menu': dict(before)}, baseline) == []
+    assert cold_start.regressions({'other': dict(before)}, baseline) == []
+
+    after = {**before, 'importMs': 50.0, 'packages': ['botocore', 'urllib3']}
+    assert cold_start.regressions({'menu': after}, baseline, 0.5, 20.0, 2048) == [
+        'menu imports botocore, urllib3 at init',
+        'menu imports in 50.0 ms > 35.0 ms',
+    ]
+    after = {**before, 'initRssKiB': 4000}
+    assert cold_start.regressions({'menu': after}, baseline, 0.5, 0, 0) == [
+        'menu adds 4000 KiB RSS > 1500 KiB'
+    ]
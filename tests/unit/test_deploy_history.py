@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+from infrastructure.constructs.deploy_history import (
+    BotOutcome,
+    DeployHistory,
+    DeployRun,
+    outcomes_from_events,
+)
+from infrastructure.constructs.deploy_simulator import simulate_deploy, simulate_policy
+
+DURATIONS = {
+    'MenuBot': 600,
+    'PamphletBot': 420,
+    'OfficeLocatorBot': 300,
+    'AddressChangeBot': 240,
+    'PinAuthBot': 180,
+    'AgentBusyBot': 120,
+    'YesNoBot': 90,
+    'OfficeClosedBot': 90,
+}
+
+
+def test_builds_over_the_limit_are_throttled():
+    lanes = [['MenuBot'], ['PamphletBot'], ['YesNoBot']]
+    run = simulate_deploy(lanes, DURATIONS, build_limit=2, retry_delay=60)
+    assert run.bots['YesNoBot'] == BotOutcome(duration=510, throttled=True)
+    assert not run.bots['MenuBot'].throttled
+
+    assert not simulate_deploy(lanes, DURATIONS, build_limit=3).throttled
+
+
+def test_policy_backs_off_after_throttling_and_probes_after_clean_runs():
+    history = DeployHistory(
+        [DeployRun(parallelism=4, bots={'A': BotOutcome(10, True)})]
+    )
+    assert history.choose_parallelism() == 3
+
+    history.record(DeployRun(parallelism=3, bots={'A': BotOutcome(10)}))
+    # 4 throttled within the window
+    assert history.choose_parallelism() == 3
+
+
+def test_policy_converges_on_the_build_limit():
+    runs = simulate_policy(DURATIONS, build_limit=3, deploys=8)
+    assert [run.parallelism for run in runs][:4] == [2, 3, 4, 3]
+    assert all(run.parallelism == 3 and not run.throttled for run in runs[3:])
+    assert runs[-1].duration < runs[0].duration
+
+
+def test_history_round_trip_and_costs(tmp_path):
+    path = str(tmp_path / 'history.json')
+    history = DeployHistory()
+    history.record(
+        DeployRun(parallelism=2, bots={'A': BotOutcome(100), 'B': BotOutcome(50)})
+    )
+    history.save(path)
+
+    loaded = DeployHistory.load(path)
+    assert loaded.runs == history.runs
+    # C has no history, its estimate is scaled by the seconds per unit of A and B
+    assert loaded.costs(['A', 'B', 'C'], [10, 5, 3]) == [100, 50, 30]
+
+
+def test_outcomes_from_stack_events():
+    start = datetime(2024, 1, 1)
+    events = [
+        {
+            'LogicalResourceId': 'YesNoBot0A7D32DB',
+            'Timestamp': start,
+            'ResourceStatus': 'CREATE_IN_PROGRESS',
+        },
+        {
+            'LogicalResourceId': 'YesNoBot0A7D32DB',
+            'Timestamp': start + timedelta(seconds=30),
+            'ResourceStatus': 'CREATE_FAILED',
+            'ResourceStatusReason': 'Rate exceeded',
+        },
+        {
+            'LogicalResourceId': 'YesNoBotAlias4605A404',
+            'Timestamp': start + timedelta(seconds=95),
+            'ResourceStatus': 'CREATE_COMPLETE',
+        },
+        {
+            'LogicalResourceId': 'LogGroup',
+            'Timestamp': start,
+            'ResourceStatus': 'CREATE_COMPLETE',
+        },
+    ]
+    ids = {'YesNoBot0A7D32DB': 'YesNoBot', 'YesNoBotAlias4605A404': 'YesNoBot'}
+    assert outcomes_from_events(events, ids) == {'YesNoBot': BotOutcome(95, True)}
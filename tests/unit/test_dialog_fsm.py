@@ -0,0 +1,164 @@
+import logging
+import os
+
+import pytest
+from lex_runtime import fsm
+from lex_runtime.fsm import DialogMachine
+
+STATES = {
+    'zipCode': {
+        'slot': 'zipCode',
+        'prompt': 'What is your zip code?',
+        'match': {'dontKnow': ["*don't know*"], 'valid': [r're:^\d{5}$']},
+        'on': {
+            'dontKnow': 'agent',
+            'valid': 'confirmZip',
+            'other': {'say': 'That zip code is invalid.', 'clear': ['zipCode']},
+        },
+    },
+    'confirmZip': {
+        'slot': 'confirmZip',
+        'prompt': 'That zip code is {zipCode}. Right?',
+        'match': {'no': ['no', 'nope'], 'yes': ['yes', 'right*']},
+        'on': {
+            'no': {
+                'next': 'zipCode',
+                'say': "Let's try again.",
+                'clear': ['zipCode', 'confirmZip'],
+            },
+            'yes': {'next': 'fulfill', 'set': {'zipConfirmed': 'true'}},
+        },
+    },
+    'agent': {'close': 'Let me get an agent.', 'set': {'action': 'TransferToAgent'}},
+    'fulfill': {'fulfill': True},
+    'goodbye': {'delegate': 'Goodbye.'},
+}
+
+MACHINE = DialogMachine(
+    STATES, intents={'LocateOffice': 'zipCode'}, default='goodbye', name='test'
+)
+
+
+def event(intent='LocateOffice', **values):
+    slots = {'zipCode': None, 'confirmZip': None}
+    for slot_name, value in values.items():
+        slots[slot_name] = {'value': {'interpretedValue': value}}
+    return {
+        'invocationSource': 'DialogCodeHook',
+        'sessionState': {
+            'intent': {'name': intent, 'slots': slots},
+            'sessionAttributes': {},
+        },
+    }
+
+
+def summary(response):
+    session_state = response['sessionState']
+    return (
+        session_state['dialogAction'].get('slotToElicit')
+        or session_state['dialogAction']['type'],
+        [message['content'] for message in response.get('messages', [])],
+    )
+
+
+def fulfilled(event):
+    return {'fulfilled': event['sessionState']['sessionAttributes']}
+
+
+def test_turns_walk_through_the_filled_slots():
+    assert summary(MACHINE.handle(event())) == (
+        'zipCode',
+        ['What is your zip code?'],
+    )
+    assert summary(MACHINE.handle(event(zipCode='12345'))) == (
+        'confirmZip',
+        ['That zip code is 12345. Right?'],
+    )
+    assert MACHINE.handle(
+        event(zipCode='12345', confirmZip='Right, thanks'), fulfilled
+    ) == {'fulfilled': {'zipConfirmed': 'true'}}
+
+
+def test_transitions_say_clear_and_close():
+    response = MACHINE.handle(event(zipCode='1234'))
+    assert summary(response) == ('zipCode', ['That zip code is invalid.'])
+    assert response['sessionState']['intent']['slots']['zipCode'] is None
+
+    response = MACHINE.handle(event(zipCode='12345', confirmZip='nope'))
+    assert summary(response) == ('zipCode', ["Let's try again."])
+    assert response['sessionState']['intent']['slots'] == {
+        'zipCode': None,
+        'confirmZip': None,
+    }
+
+    response = MACHINE.handle(event(zipCode="I don't know"))
+    assert summary(response) == ('Close', ['Let me get an agent.'])
+    assert response['sessionState']['sessionAttributes'] == {
+        'action': 'TransferToAgent'
+    }
+
+    assert summary(MACHINE.handle(event('Other'))) == ('Delegate', ['Goodbye.'])
+
+
+def test_unmatched_values_elicit_the_slot_again():
+    assert summary(MACHINE.handle(event(zipCode='12345', confirmZip='maybe'))) == (
+        'confirmZip',
+        ['That zip code is 12345. Right?'],
+    )
+
+
+@pytest.mark.parametrize(
+    'states, intents, error',
+    [
+        ({'a': {'close': 'Bye', 'slot': 'a'}}, {'I': 'a'}, 'needs one of'),
+        ({'a': {'slot': 'a', 'on': {'other': 'b'}}}, {'I': 'a'}, 'unknown state b'),
+        ({'a': {'slot': 'a', 'on': {'other': 'a'}}}, {'I': 'a'}, 'no prompt'),
+        ({'a': {'close': 'Bye'}}, {'I': 'b'}, 'intent I goes to unknown state b'),
+        (
+            {'a': {'close': 'Bye'}, 'b': {'close': 'Bye'}},
+            {'I': 'a'},
+            'unreachable states b',
+        ),
+    ],
+)
+def test_invalid_declarations_fail_to_compile(states, intents, error):
+    with pytest.raises(ValueError, match=error):
+        DialogMachine(states, intents)
+
+
+def test_turns_are_counted_per_state(caplog):
+    machine = DialogMachine(
+        STATES, intents={'LocateOffice': 'zipCode'}, default='goodbye'
+    )
+    machine.handle(event())
+    machine.handle(event(zipCode='1234'))
+    machine.handle(event(zipCode='12345'))
+
+    stats = machine.stats_summary()
+    assert list(stats) == ['zipCode', 'confirmZip']
+    assert stats['zipCode']['turns'] == 2
+
+    with caplog.at_level(logging.INFO, logger='lex_runtime.fsm.stats'):
+        machine.flush_stats()
+    (record,) = [r for r in caplog.records if r.name == 'lex_runtime.fsm.stats']
+    assert record.dialogStats == stats
+    assert machine.stats == {}
+
+    dot = machine.to_dot(stats)
+    assert '"zipCode" -> "confirmZip" [label="valid"];' in dot
+    assert '2 turns' in dot
+
+
+def test_graph_of_a_bot_can_be_dumped(capsys):
+    path = os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'infrastructure',
+        'bots_ssa',
+        'office_locator_bot',
+        'lambdas',
+        'index.py',
+    )
+    fsm.main([path])
+    assert '"intent:LocateOffice" -> "zipCode";' in capsys.readouterr().out
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from typing import List
+
+from infrastructure.utils.hash_code import hash_code, stable_hash
+
+
+@dataclass
+class Intent:
+    name: str
+    utterances: List[str]
+
+
+def reference_hash_code(text: str) -> int:
+    """The original character-by-character implementation"""
+    hash_val = 0
+    for char in text:
+        hash_val = ((hash_val << 5) - hash_val) + ord(char)
+        hash_val = hash_val & 0xFFFFFFFF
+    if hash_val & 0x80000000:
+        hash_val = -((hash_val ^ 0xFFFFFFFF) + 1)
+    return hash_val
+
+
+def test_hash_code_matches_legacy_ids():
+    from infrastructure.utils.safe_stringify import safe_stringify
+
+    intent = Intent(name='Yes', utterances=['yes', 'sí', 'claro'] * 3000)
+    assert hash_code(intent) == reference_hash_code(safe_stringify(intent))
+    assert hash_code('') == reference_hash_code(safe_stringify(''))
+
+
+def test_stable_hash_is_deterministic_and_content_sensitive():
+    first = stable_hash(Intent(name='Yes', utterances=['yes', 'yeah']))
+    assert first == stable_hash(Intent(name='Yes', utterances=['yes', 'yeah']))
+    assert first != stable_hash(Intent(name='Yes', utterances=['yeah', 'yes']))
+    assert len(first) == 16
@@ -0,0 +1,177 @@
+import os
+
+import boto3
+
+from tests.harness import replay
+from tests.harness.lex_emulator import LexEmulator, LexRuntimeServer, load_bots
+
+OFFICE_LOCATOR = os.path.join(replay.BOTS_DIR, 'office_locator_bot', 'lambdas')
+
+
+def prompt(text):
+    return {'MessageGroupsList': [{'Message': {'PlainTextMessage': {'Value': text}}}]}
+
+
+def slot(name, slot_type, text, constraint='Required'):
+    return {
+        'Name': name,
+        'SlotTypeName': slot_type,
+        'ValueElicitationSetting': {
+            'SlotConstraint': constraint,
+            'PromptSpecification': prompt(text),
+        },
+    }
+
+
+def template(intents, function=None):
+    properties = {
+        'Name': 'lex-deploy-demo-py-office-locator',
+        'BotLocales': [{'LocaleId': 'en_US', 'Intents': intents}],
+    }
+    if function:
+        arn = {'Fn::GetAtt': [function, 'Arn']}
+        properties['TestBotAliasSettings'] = {
+            'BotAliasLocaleSettings': [
+                {
+                    'LocaleId': 'en_US',
+                    'BotAliasLocaleSetting': {
+                        'Enabled': True,
+                        'CodeHookSpecification': {'LambdaCodeHook': {'LambdaArn': arn}},
+                    },
+                }
+            ]
+        }
+    return {
+        'Resources': {
+            'OfficeLocatorBotFB6F5C05': {
+                'Type': 'AWS::Lex::Bot',
+                'Properties': properties,
+            }
+        }
+    }
+
+
+def office_intents(hooks):
+    fallback = {
+        'Name': 'FallbackIntent',
+        'ParentIntentSignature': 'AMAZON.FallbackIntent',
+    }
+    locate = {
+        'Name': 'LocateOffice',
+        'SampleUtterances': [
+            {'Utterance': 'find an office'},
+            {'Utterance': 'office locations'},
+            {'Utterance': 'office near {zipCode}'},
+        ],
+        'Slots': [
+            slot('confirmZip', 'AMAZON.Confirmation', 'Right?', 'Optional'),
+            slot('zipCode', 'AMAZON.Number', 'What is the zip code?'),
+        ],
+        'SlotPriorities': [
+            {'Priority': 1, 'SlotName': 'zipCode'},
+            {'Priority': 2, 'SlotName': 'confirmZip'},
+        ],
+    }
+    finished = {
+        'Name': 'Finished',
+        'SampleUtterances': [{'Utterance': 'I am finished'}, {'Utterance': 'done'}],
+    }
+    intents = [locate, finished, fallback]
+    for intent in intents:
+        intent['DialogCodeHook'] = {'Enabled': hooks}
+        intent['FulfillmentCodeHook'] = {'Enabled': hooks}
+    return intents
+
+
+def test_sample_utterances_recognize_intents_and_fill_slots():
+    (bot,) = load_bots(template(office_intents(hooks=False)), {})
+    locale = bot.locales['en_US']
+    assert [slot.name for slot in locale.intent('LocateOffice').slots] == [
+        'zipCode',
+        'confirmZip',
+    ]
+
+    intent, score, slots = locale.recognize('Office near 12345!')[0]
+    assert (intent.name, score, slots) == ('LocateOffice', 1.0, {'zipCode': '12345'})
+    intent, score, slots = locale.recognize('office')[0]
+    assert (intent.name, round(score, 2), slots) == ('LocateOffice', 0.67, {})
+    assert [intent.name for intent, _, _ in locale.recognize('what')] == [
+        'FallbackIntent'
+    ]
+
+
+def test_lex_elicits_slots_confirms_and_fulfills_without_code_hooks():
+    intents = office_intents(hooks=False)
+    intents[0]['IntentConfirmationSetting'] = {
+        'PromptSpecification': prompt('Search this zip code?')
+    }
+    intents[0]['FulfillmentCodeHook']['PostFulfillmentStatusSpecification'] = {
+        'SuccessResponse': prompt('Here is your office.')
+    }
+    emulator = LexEmulator(load_bots(template(intents), {}))
+
+    def say(text, session_id='session'):
+        response = emulator.recognize_text(
+            'office-locator', 'TSTALIASID', 'en_US', session_id, text
+        )
+        state = response['sessionState']
+        messages = [message['content'] for message in response['messages']]
+        return messages, state['dialogAction']['type'], state['intent']
+
+    assert say('find an office')[:2] == (['What is the zip code?'], 'ElicitSlot')
+    assert say('one two three four five')[:2] == (
+        ['Search this zip code?'],
+        'ConfirmIntent',
+    )
+    messages, action, intent = say('yes')
+    assert (messages, action, intent['state']) == (
+        ['Here is your office.'],
+        'Close',
+        'Fulfilled',
+    )
+    assert intent['slots']['zipCode']['value']['interpretedValue'] == '12345'
+
+    assert say('office near 12345', 'other')[1] == 'ConfirmIntent'
+    messages, action, intent = say('no', 'other')
+    assert (messages, action, intent['state']) == ([], 'Close', 'Failed')
+    # A new utterance starts another intent
+    assert say('done', 'other')[2]['name'] == 'Finished'
+
+
+def test_recognize_text_endpoint_calls_the_handler():
+    bots = load_bots(
+        template(office_intents(hooks=True), 'OfficeLocatorFn'),
+        {'OfficeLocatorFn': OFFICE_LOCATOR},
+    )
+    emulator = LexEmulator(bots, {'S7IGLOYNUF': 'lex-deploy-demo-py-office-locator'})
+    with LexRuntimeServer(emulator) as server:
+        client = boto3.client(
+            'lexv2-runtime',
+            endpoint_url=server.url,
+            region_name='us-east-1',
+            aws_access_key_id='testing',
+            aws_secret_access_key='testing',
+        )
+        session = {
+            'botId': 'S7IGLOYNUF',
+            'botAliasId': 'TSTALIASID',
+            'localeId': 'en_US',
+            'sessionId': 'session',
+        }
+        replies = []
+        for text in ['find an office', '12345', 'yes', 'no']:
+            response = client.recognize_text(text=text, **session)
+            replies.append(response['messages'][0]['content'])
+        assert replies[0].startswith('Go ahead and say or enter the five digit zip')
+        assert replies[1] == 'That zip code is 12345. Right?'
+        assert 'servicing office in the zip code 12345' in replies[3]
+        state = client.get_session(**session)['sessionState']
+        assert state['dialogAction']['type'] == 'Close'
+
+        client.delete_session(**session)
+        try:
+            client.get_session(**session)
+        except client.exceptions.ResourceNotFoundException:
+            pass
+        else:
+            raise AssertionError('The session was not deleted')
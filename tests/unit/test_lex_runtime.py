@@ -0,0 +1,56 @@
+import os
+
+from aws_cdk import App, Stack
+from aws_cdk.assertions import Template
+
+from infrastructure.utils.create_lambda import LEX_RUNTIME_PATH, create_lambda
+from lex_runtime import LexHelper
+
+EVENT = {
+    'bot': {'localeId': 'es_US'},
+    'interpretations': [{'intent': {'name': 'Top', 'slots': {}}}],
+    'sessionState': {
+        'sessionAttributes': {'lang': 'es'},
+        'intent': {
+            'name': 'Active',
+            'slots': {'zip': {'value': {'interpretedValue': '12345'}}},
+        },
+    },
+}
+
+
+class InterpretationHelper(LexHelper):
+    __slots__ = ()
+    intent_source = 'interpretation'
+
+
+def test_view_reads_the_configured_intent_once():
+    helper = LexHelper(EVENT)
+    assert helper.intent_name == 'Active'
+    assert helper.slot_value('zip') == '12345'
+    assert helper.intent is helper.intent
+    assert InterpretationHelper(EVENT).intent_name == 'Top'
+
+
+def test_responses_reference_the_event():
+    helper = LexHelper(EVENT)
+    response = helper.fulfilled_response('Done')
+    assert (
+        response['sessionState']['sessionAttributes']
+        is EVENT['sessionState']['sessionAttributes']
+    )
+    assert response['sessionState']['intent']['state'] == 'Fulfilled'
+    assert response['messages'] == [{'contentType': 'PlainText', 'content': 'Done'}]
+    assert 'messages' not in helper.fulfilled_response()
+    assert helper.failed_response('')['messages'][0]['content'] == ''
+
+
+def test_functions_share_one_runtime_layer():
+    stack = Stack(App(), 'Test')
+    handler_path = os.path.join(LEX_RUNTIME_PATH, 'python')
+    create_lambda(stack, 'One', handler_path)
+    create_lambda(stack, 'Two', handler_path)
+
+    template = Template.from_stack(stack)
+    template.resource_count_is('AWS::Lambda::LayerVersion', 1)
+    template.resource_count_is('AWS::Lambda::Function', 2)
@@ -0,0 +1,60 @@
+import json
+import logging
+
+from lex_runtime import log
+
+
+class Payload:
+    """Counts how often it is serialized"""
+
+    serialized = 0
+
+    def __str__(self):
+        Payload.serialized += 1
+        return 'payload'
+
+
+def test_payloads_are_only_serialized_when_written(caplog):
+    logger = logging.getLogger('test_log')
+    logger.setLevel(logging.ERROR)
+    logger.debug('Event: %s', log.lazy_json({'p': Payload()}))
+    assert Payload.serialized == 0
+
+    with caplog.at_level(logging.DEBUG, logger='test_log'):
+        logger.debug('Event: %s', log.lazy_json({'p': Payload()}))
+    assert Payload.serialized > 0
+    assert caplog.records[0].getMessage() == 'Event: {"p":"payload"}'
+
+
+def test_records_are_one_line_of_json():
+    record = logging.LogRecord(
+        'root', logging.INFO, __file__, 1, 'Slots: %s', (log.lazy_json({'a': 1}),), None
+    )
+    record.aws_request_id = 'abc'
+    record.intent = 'OfficeLocator'
+
+    line = log.JsonFormatter().format(record)
+    assert '\n' not in line
+    assert json.loads(line) == {
+        'level': 'INFO',
+        'message': 'Slots: {"a":1}',
+        'logger': 'root',
+        'requestId': 'abc',
+        'intent': 'OfficeLocator',
+    }
+
+
+def test_sampled_invocations_log_the_event_at_debug(monkeypatch, caplog):
+    root = logging.getLogger()
+    monkeypatch.setattr(log, 'LOGGING_LEVEL', 'ERROR')
+    monkeypatch.setattr(root, 'level', logging.ERROR)
+
+    monkeypatch.setattr(log, 'LOG_SAMPLE_RATE', 1.0)
+    log.log_event(root, {'inputTranscript': 'hi'})
+    assert caplog.records[-1].getMessage() == 'Event: {"inputTranscript":"hi"}'
+
+    # The next invocation is back at the configured level
+    monkeypatch.setattr(log, 'LOG_SAMPLE_RATE', 0)
+    log.log_event(root, {'inputTranscript': 'bye'})
+    assert root.level == logging.ERROR
+    assert len(caplog.records) == 1
@@ -0,0 +1,119 @@
+import pytest
+from lex_runtime.fsm import DialogMachine
+from lex_runtime.lexicon import YES_NO, Lexicon, Match, tokenize
+
+
+@pytest.mark.parametrize(
+    'text, label',
+    [
+        ('Yes', 'yes'),
+        ('yeah sure', 'yes'),
+        ("That's right.", 'yes'),
+        ('no thank you', 'no'),
+        ("I don't", 'no'),
+        ('that is not right', 'no'),
+        ('nobody', None),
+        ('yesterday', None),
+        ('now', None),
+        ('yes no', None),
+        ('not sure', None),
+        ("I'm not sure", None),
+        ('not sure I agree', None),
+        ("I don't know", None),
+        ('no, right', None),
+        ('no no', 'no'),
+        ('yes I think so', None),
+        ('', None),
+        (None, None),
+    ],
+)
+def test_yes_no_answers_match_whole_words(text, label):
+    assert YES_NO.label(text, 'en_US') == label
+
+
+def test_locales_have_their_own_phrases():
+    assert tokenize('¿Sí, está bien?') == ['si', 'esta', 'bien']
+    assert YES_NO.match('Sí, está bien', 'es_US') == Match('yes', 1.0)
+    assert YES_NO.match('claro', 'en_US') is None
+    # Without a (known) locale every locale is matched
+    assert YES_NO.label('claro') == 'yes'
+    assert YES_NO.label('claro', 'fr_CA') == 'yes'
+    assert YES_NO.label('No sé', 'es_US') is None
+    assert YES_NO.label('no estoy seguro') is None
+
+
+def test_confidence_is_the_share_of_matched_words():
+    assert YES_NO.match('yes please') == Match('yes', 1.0)
+    assert YES_NO.match('yes I think so') == Match('yes', 0.25)
+    # The longest phrase wins, other labels count against the winner
+    assert YES_NO.match('yes, yes of course, no') == Match('yes', 0.6)
+
+
+def test_labels_need_the_minimum_confidence():
+    assert YES_NO.min_confidence == 0.5
+    assert YES_NO.label('yes I think so') is None
+    assert YES_NO.label('yes I think so', min_confidence=0.25) == 'yes'
+    assert YES_NO.label('that is not right') == 'no'
+
+
+def test_conflicting_phrases_fail_to_compile():
+    with pytest.raises(ValueError, match="phrase 'Go on' is both"):
+        Lexicon({'en_US': {'continue': ['go on'], 'stop': ['Go on']}})
+
+
+def test_dialog_states_classify_with_a_lexicon():
+    machine = DialogMachine(
+        name='test',
+        intents={'Confirm': 'confirm'},
+        states={
+            'confirm': {
+                'slot': 'confirm',
+                'prompt': 'Right?',
+                'lexicon': YES_NO,
+                'match': {'unsure': ['*not sure*']},
+                'on': {'yes': 'done', 'no': 'done', 'unsure': 'done'},
+            },
+            'done': {'fulfill': True},
+        },
+    )
+    confirm = machine.states['confirm']
+    assert confirm.classify('yep', 'en_US') == 'yes'
+    assert confirm.classify('nope', 'en_US') == 'no'
+    # Uncertain answers are left to the match patterns
+    assert confirm.classify("I'm not sure", 'en_US') == 'unsure'
+    assert confirm.classify('not sure I agree', 'en_US') == 'unsure'
+    assert confirm.classify('nobody', 'en_US') == 'other'
+    assert confirm.classify('yes I think so', 'en_US') == 'other'
+    assert confirm.classify('sí', 'es_US') == 'yes'
+
+    fulfilled = []
+    event = {
+        'bot': {'localeId': 'en_US'},
+        'sessionState': {
+            'intent': {
+                'name': 'Confirm',
+                'slots': {'confirm': {'value': {'interpretedValue': 'yep'}}},
+            },
+            'sessionAttributes': {},
+        },
+    }
+    machine.handle(event, fulfilled.append)
+    assert fulfilled == [event]
+
+
+def test_dialog_states_can_lower_the_minimum_confidence():
+    machine = DialogMachine(
+        name='test',
+        intents={'Confirm': 'confirm'},
+        states={
+            'confirm': {
+                'slot': 'confirm',
+                'prompt': 'Right?',
+                'lexicon': YES_NO,
+                'min_confidence': 0.25,
+                'on': {'yes': 'done', 'no': 'done'},
+            },
+            'done': {'fulfill': True},
+        },
+    )
+    assert machine.states['confirm'].classify('yes I think so', 'en_US') == 'yes'
@@ -0,0 +1,78 @@
+import asyncio
+
+from tests.harness import load, replay
+from tests.harness.lex_emulator import LexEmulator, LexRuntimeServer, load_bots
+from tests.unit.test_lex_emulator import OFFICE_LOCATOR, office_intents, template
+
+SCRIPT = (
+    'test_case,step,utterance,session_attributes,expected_reponse,'
+    'expected_intent,expected_state,bot_id,alias_id,locale_id,notes\n'
+    'office,1,find an office,,,LocateOffice,InProgress,S7IGLOYNUF,,en_US,\n'
+    'office,2,12345,,"That zip code is 12345. Right?",LocateOffice,,S7IGLOYNUF,,en_US,\n'
+    'office,3,yes,,,LocateOffice,InProgress,S7IGLOYNUF,,en_US,\n'
+    'wrong,1,find an office,,,LocateOffice,Fulfilled,S7IGLOYNUF,,en_US,\n'
+)
+
+
+def test_percentiles_and_regressions():
+    histogram = load.Histogram()
+    for ms in range(1, 101):
+        histogram.add(float(ms), error=ms > 98)
+    assert [histogram.percentile(p) for p in load.PERCENTILES] == [50, 95, 99]
+    report = histogram.to_json()
+    assert (report['turns'], report['errors']) == (100, 2)
+    assert report['buckets']['<=1'] == 1 and report['buckets']['<=128'] == 36
+
+    baseline = {'groups': {'all': report, 'bot:gone': report}}
+    slower = {**report, 'p99': 130.0}
+    assert load.regressions({'groups': {'all': report}}, baseline) == []
+    (found,) = load.regressions({'groups': {'all': slower}}, baseline, 0.2, 1.0)
+    assert found.startswith('all p99 130.000 ms > 119.800 ms')
+
+
+def test_callers_replay_the_scripts_concurrently(tmp_path):
+    path = tmp_path / 'test-case.csv'
+    path.write_text(SCRIPT)
+    scripts = replay.load_scripts(str(path), OFFICE_LOCATOR)
+    target = load.InProcessTarget(scripts, workers=2)
+    try:
+        report = asyncio.run(
+            load.generate(scripts, target, callers=20, rate=2000, think=0.001)
+        )
+    finally:
+        target.close()
+
+    # 10 callers of each test case, the wrong one fails its only turn
+    assert (report.callers, report.turns) == (20, 40)
+    assert report.error_rate == 10 / 40
+    assert report.errors[0].startswith("wrong step 1: Expected state = 'Fulfilled'")
+    assert len(report.groups['intent:LocateOffice'].samples) == 40
+    assert report.groups['state:InProgress'].errors == 10
+    assert report.groups['bot:office_locator_bot'].errors == 10
+    assert load.summary(report).endswith('25.0% errors')
+
+
+def test_callers_talk_to_a_recognize_text_endpoint(tmp_path):
+    path = tmp_path / 'test-case.csv'
+    path.write_text(SCRIPT.replace('Fulfilled', 'InProgress'))
+    bots = load_bots(
+        template(office_intents(hooks=True), 'OfficeLocatorFn'),
+        {'OfficeLocatorFn': OFFICE_LOCATOR},
+    )
+    emulator = LexEmulator(bots, {'S7IGLOYNUF': 'lex-deploy-demo-py-office-locator'})
+    with LexRuntimeServer(emulator) as server:
+        scripts = replay.load_scripts(str(path))
+        report = asyncio.run(
+            load.generate(scripts, load.EndpointTarget(server.url), callers=10)
+        )
+        assert report.error_rate == 0, report.errors
+        assert report.turns == 20
+        assert len(emulator.sessions) == 10
+
+        missing = replay.load_scripts(str(path))
+        missing[0].turns[0].bot_id = 'NOSUCHBOT0'
+        report = asyncio.run(
+            load.generate(missing[:1], load.EndpointTarget(server.url), callers=1)
+        )
+        assert report.turns == 1
+        assert 'HTTP 404 Not Found: ResourceNotFoundException' in report.errors[0]
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+from lex_runtime.fsm import load_machine
+
+MACHINE = load_machine(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'infrastructure',
+        'bots_ssa',
+        'medicare_card_replacement_bot',
+        'lambdas',
+        'index.py',
+    )
+)
+
+
+@pytest.mark.parametrize('state', ['privacyAcknowledgment', 'termsAgreement'])
+@pytest.mark.parametrize(
+    'value, outcome',
+    [
+        ('Yes', 'yes'),
+        ('No', 'no'),
+        ("I don't", 'no'),
+        ('I know', 'other'),
+        ('nobody told me', 'other'),
+        ('yesterday', 'other'),
+    ],
+)
+def test_agreements_match_whole_yes_no_words(state, value, outcome):
+    assert MACHINE.states[state].classify(value, 'en_US') == outcome
+
+
+def test_the_answers_the_prompts_ask_for_are_matched():
+    privacy = MACHINE.states['privacyAcknowledgment']
+    assert privacy.classify('more information', 'en_US') == 'more'
+    assert privacy.classify('Continue', 'en_US') == 'yes'
+    terms = MACHINE.states['termsAgreement']
+    assert terms.classify('I agree', 'en_US') == 'yes'
+    assert terms.classify('disagree', 'en_US') == 'no'
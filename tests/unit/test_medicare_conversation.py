@@ -0,0 +1,194 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from infrastructure.utils.check_prompts import check_prompts
+
+LAMBDAS_PATH = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    '..',
+    'infrastructure',
+    'bots_ssa',
+    'medicare_enrollment_bot',
+    'lambdas',
+)
+sys.path.append(LAMBDAS_PATH)
+
+import conversation  # noqa: E402
+from prompts import PROMPTS  # noqa: E402
+
+ENGLISH = PROMPTS['en_US']
+
+
+def load_handler():
+    # Every bot has an `index` module, load this one under its own name
+    spec = importlib.util.spec_from_file_location(
+        'medicare_enrollment_index', os.path.join(LAMBDAS_PATH, 'index.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.handler
+
+
+def event(session_attributes, answer=None, source='DialogCodeHook', locale='en_US'):
+    slots = {'Confirmation': None}
+    if answer:
+        slots['Confirmation'] = {'value': {'interpretedValue': answer}}
+    return {
+        'bot': {'localeId': locale},
+        'invocationSource': source,
+        'sessionState': {
+            'intent': {'name': 'MedicareEnrollment', 'slots': slots},
+            'sessionAttributes': session_attributes,
+        },
+    }
+
+
+def state(session_attributes):
+    return conversation.SESSION.decode(session_attributes['enrollment'])
+
+
+def test_steps_are_compiled_with_resolved_prompts():
+    step = conversation.STEPS['step_5']
+    assert step.message.render('en_US') == ' '.join(
+        [
+            ENGLISH['P1375'].format(**conversation.PROMPT_VALUES),
+            ENGLISH['P1376'],
+        ]
+    )
+    assert '$17,600' in step.message.render('es_US')
+    assert step.next['yes'] is conversation.STEPS['step_repeat_info']
+    assert (
+        conversation.STEPS['step_transfer_card_replacement'].message.render()
+        == (ENGLISH['TRANSFER_MEDICARE_CARD'])
+    )
+
+
+@pytest.mark.parametrize(
+    'steps, error',
+    [
+        (
+            [{'id': 'step_1', 'attribute': 'a', 'prompt': 'P1370'}],
+            'not terminal',
+        ),
+        (
+            [
+                {
+                    'id': 'step_1',
+                    'attribute': 'a',
+                    'prompt': 'P1370',
+                    'outcomes': {'yes': {'next': 'step_1'}},
+                }
+            ],
+            'not terminal and has no retry_prompt',
+        ),
+        (
+            [
+                {
+                    'id': 'step_1',
+                    'attribute': 'a',
+                    'prompt': 'P1370',
+                    'retry_prompt': 'P1370a',
+                    'outcomes': {'yes': {'next': 'step_2'}},
+                }
+            ],
+            'unknown step step_2',
+        ),
+        (
+            [
+                {
+                    'id': 'step_1',
+                    'attribute': 'a',
+                    'prompt': 'P1370 + P9999',
+                    'is_terminal': True,
+                }
+            ],
+            'Unknown prompt P9999',
+        ),
+        (
+            [
+                {
+                    'id': 'step_1',
+                    'attribute': 'a',
+                    'prompt': 'P1382',
+                    'is_terminal': True,
+                },
+                {
+                    'id': 'step_orphan',
+                    'attribute': 'b',
+                    'prompt': 'P1382',
+                    'is_terminal': True,
+                },
+            ],
+            'Unreachable steps: step_orphan',
+        ),
+    ],
+)
+def test_invalid_graphs_fail_to_compile(steps, error):
+    with pytest.raises(ValueError, match=error):
+        conversation.compile_steps(steps)
+
+
+def test_conversation_walks_the_graph():
+    handler = load_handler()
+
+    response = handler(event({}))
+    session_attributes = response['sessionState']['sessionAttributes']
+    assert response['messages'][0]['content'] == ENGLISH['P1370']
+
+    response = handler(event(session_attributes, 'maybe'))
+    assert response['messages'][0]['content'] == ENGLISH['P1370a']
+    assert state(session_attributes)['retry_count'] == 1
+
+    response = handler(event(session_attributes, 'yes'))
+    assert state(session_attributes)['current_step'] == 'step_2'
+    assert response['sessionState']['dialogAction']['slotToElicit'] == 'Confirmation'
+
+    response = handler(event(session_attributes, 'Yeah'))
+    assert response['sessionState']['dialogAction']['type'] == 'Close'
+    assert response['messages'][0]['content'] == (ENGLISH['TRANSFER_MEDICARE_CARD'])
+    assert state(session_attributes) == {
+        'current_step': 'step_transfer_card_replacement',
+        'retry_count': 0,
+        'steps_completed': 2,
+        'retries': 1,
+        'start_time': state(session_attributes)['start_time'],
+        'answered': ['step_1', 'step_2', 'step_transfer_card_replacement'],
+        'answers': ['step_1', 'step_2', 'step_transfer_card_replacement'],
+    }
+    # Lex session attributes are strings: the state is one short attribute
+    assert list(session_attributes) == ['enrollment']
+    assert len(session_attributes['enrollment']) < 24
+
+
+def test_prompts_follow_the_bot_locale():
+    handler = load_handler()
+
+    response = handler(event({}, locale='es_US'))
+    assert response['messages'][0]['content'] == PROMPTS['es_US']['P1370']
+
+    # Locales without prompts get the default (en_US) prompts
+    response = handler(event({}, locale='en_GB'))
+    assert response['messages'][0]['content'] == ENGLISH['P1370']
+
+
+def test_prompt_fields_need_a_value():
+    steps = [{'id': 'step_1', 'attribute': 'a', 'prompt': 'P1375', 'is_terminal': True}]
+    with pytest.raises(ValueError, match='No value for couple_maximum'):
+        conversation.compile_steps(steps, values={'individual_maximum': '$1'})
+
+
+def test_prompts_are_checked_at_synth(tmp_path):
+    check_prompts(LAMBDAS_PATH)
+
+    (tmp_path / 'prompts.py').write_text(
+        'from lex_runtime.prompts import PromptCatalog\n'
+        "CATALOG = PromptCatalog({'en_US': {'P1': 'Hi'}, 'es_US': {}})\n"
+        "CATALOG.prompt('P1')\n"
+    )
+    (tmp_path / 'conversation.py').write_text('import prompts\n')
+    with pytest.raises(ValueError, match="Unknown prompt P1 in 'P1' for locale es_US"):
+        check_prompts(str(tmp_path))
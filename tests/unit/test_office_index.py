@@ -0,0 +1,326 @@
+import importlib.util
+import math
+import os
+import random
+import sys
+
+import pytest
+from aws_cdk import App, Stack
+from aws_cdk.assertions import Annotations, Match
+from lex_runtime.api_client import ApiClient, CircuitBreaker
+
+from infrastructure.bots_ssa.office_locator_bot.lex.office_locator_bot import (
+    OfficeLocatorBot,
+)
+from tests.lambdas.stub_office_api import StubOfficeApi
+
+BOT_PATH = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    '..',
+    'infrastructure',
+    'bots_ssa',
+    'office_locator_bot',
+)
+LAMBDAS_PATH = os.path.join(BOT_PATH, 'lambdas')
+sys.path.append(LAMBDAS_PATH)
+
+from office_api import OfficeApi  # noqa: E402
+from office_index import (  # noqa: E402
+    HEADER,
+    Office,
+    OfficeIndex,
+    build_index,
+    write_index,
+)
+
+ROWS = [
+    {
+        'zip_code': zip_code,
+        'name': 'Social Security Administration',
+        'address': address,
+        'city': 'Springfield',
+        'state': 'CO',
+        'card_center_address': '',
+        'hours': '9am - 5pm',
+        'phone': '867-5309',
+    }
+    for zip_code, address in [
+        ('80202', '1 Plaza Ñ'),
+        ('00501', '123 Main St'),
+        ('12345', '123 Main St'),
+    ]
+]
+
+
+def load_handler():
+    # Every bot has an `index` module, load this one under its own name
+    spec = importlib.util.spec_from_file_location(
+        'office_locator_index', os.path.join(LAMBDAS_PATH, 'index.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def event(zip_code, source='FulfillmentCodeHook', intent='LocateOffice', **attributes):
+    slots = {}
+    if zip_code:
+        slots = {
+            'zipCode': {'value': {'interpretedValue': zip_code}},
+            'confirmZip': {'value': {'interpretedValue': 'yes'}},
+            'needsCard': {'value': {'interpretedValue': 'no'}},
+        }
+    return {
+        'invocationSource': source,
+        'sessionState': {
+            'intent': {'name': intent, 'slots': slots},
+            'sessionAttributes': attributes,
+        },
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'offices.idx'
+    path.write_bytes(build_index(ROWS))
+    return OfficeIndex(str(path))
+
+
+def test_zip_codes_are_found(index):
+    assert len(index) == 3
+    assert index.lookup('00501') == Office('00501', *list(ROWS[1].values())[1:])
+    assert index.lookup('80202').address == '1 Plaza Ñ'
+    assert index.lookup('12345').address == '123 Main St'
+
+
+@pytest.mark.parametrize('zip_code', ['00000', '12344', '99999', '1234', 'abcde', None])
+def test_unknown_zip_codes_are_not_found(index, zip_code):
+    assert index.lookup(zip_code) is None
+
+
+def test_offices_are_stored_once():
+    # 00501 and 12345 share their office record
+    distinct = ROWS[:2] + [{**ROWS[2], 'address': '124 Main St'}]
+    record = len(build_index(ROWS[2:])) - HEADER.size - 8
+    assert len(build_index(distinct)) - len(build_index(ROWS)) == record
+
+
+@pytest.mark.parametrize(
+    'rows, error',
+    [
+        (ROWS + ROWS[:1], 'Duplicate zip code 80202'),
+        ([{**ROWS[0], 'zip_code': '8020'}], "Invalid zip code '8020'"),
+        (
+            [ROWS[1], {**ROWS[2], 'latitude': '1', 'longitude': '2'}],
+            'Office of 12345 has other coordinates',
+        ),
+        ([{**ROWS[0], 'latitude': '91', 'longitude': '0'}], 'Invalid coordinates'),
+    ],
+)
+def test_invalid_rows_fail_to_build(rows, error):
+    with pytest.raises(ValueError, match=error):
+        build_index(rows)
+
+
+def test_nearest_offices_match_a_linear_search(tmp_path):
+    rng = random.Random(3)
+    rows = [
+        {
+            **ROWS[0],
+            'zip_code': f'{i:05d}',
+            'address': f'{i} Main St',
+            'card_center_address': 'Card center' if i % 3 == 0 else '',
+            'latitude': str(rng.uniform(18, 65)),
+            'longitude': str(rng.uniform(-165, -67)),
+        }
+        for i in range(1, 400)
+    ]
+    centroids = [
+        {
+            'zip_code': f'{i:05d}',
+            'latitude': str(rng.uniform(18, 65)),
+            'longitude': str(rng.uniform(-165, -67)),
+        }
+        for i in range(1000, 1100)
+    ]
+    path = tmp_path / 'offices.idx'
+    path.write_bytes(build_index(rows, centroids))
+    index = OfficeIndex(str(path))
+
+    for centroid in centroids:
+        nearby = index.nearest(centroid['zip_code'], 3)
+        cards = index.nearest(centroid['zip_code'], 3, card_center=True)
+        assert [miles for miles, _ in nearby] == sorted(m for m, _ in nearby)
+        assert all(office.card_center_address for _, office in cards)
+
+        distances = sorted(
+            (
+                haversine(centroid, row),
+                row['address'],
+                bool(row['card_center_address']),
+            )
+            for row in rows
+        )
+        expected = [address for _, address, _ in distances[:3]]
+        assert [office.address for _, office in nearby] == expected
+        expected = [address for _, address, card in distances if card][:3]
+        assert [office.address for _, office in cards] == expected
+        assert nearby[0].miles == pytest.approx(distances[0][0], abs=0.01)
+
+        close = index.nearest(centroid['zip_code'], 3, max_miles=500)
+        expected = [address for miles, address, _ in distances[:3] if miles <= 500]
+        assert [office.address for _, office in close] == expected
+
+
+def haversine(a, b):
+    lat1, lon1, lat2, lon2 = (
+        math.radians(float(point[key]))
+        for point in (a, b)
+        for key in ('latitude', 'longitude')
+    )
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 3958.8 * math.asin(math.sqrt(h))
+
+
+def test_zip_codes_without_centroid_have_no_nearest_office(index):
+    assert index.nearest('80202') == []
+    assert index.nearest(None) == []
+    assert not index.has_centroid('80202')
+
+
+def test_other_files_fail_to_open(tmp_path):
+    path = tmp_path / 'offices.idx'
+    path.write_bytes(b'SSAO\x01\x00' + bytes(22))
+    with pytest.raises(ValueError, match='is not an office index version 2'):
+        OfficeIndex(str(path))
+
+
+def test_offices_of_the_api_fall_back_to_the_snapshot(index):
+    with StubOfficeApi(
+        {'12345': {'office_address': '9 API St', 'office_phone': '555-0100'}}
+    ) as api:
+        breaker = CircuitBreaker(failure_threshold=2)
+        offices = OfficeApi(
+            api.url, index, ApiClient(api.url, retries=1, backoff=0, breaker=breaker)
+        )
+        office = offices.lookup('12345')
+        assert (office.address, office.phone, office.hours) == (
+            '9 API St',
+            '555-0100',
+            '',
+        )
+        assert offices.lookup('00501') is None
+
+        api.failures = 2
+        assert offices.lookup('12345').address == '123 Main St'
+        assert breaker.state == 'open'
+        requests = api.requests
+        assert offices.lookup('00501').address == '123 Main St'
+        assert api.requests == requests
+
+    # Without an endpoint, the snapshot is the only source
+    assert OfficeApi(None, index).lookup('00501').address == '123 Main St'
+
+
+def test_bundled_index_is_up_to_date(tmp_path):
+    path = str(tmp_path / 'offices.idx')
+    write_index(
+        os.path.join(BOT_PATH, 'data', 'offices.csv'),
+        path,
+        os.path.join(BOT_PATH, 'data', 'zip_centroids.csv'),
+    )
+    with open(path, 'rb') as f:
+        built = f.read()
+    with open(os.path.join(LAMBDAS_PATH, 'offices.idx'), 'rb') as f:
+        assert f.read() == built, 'Rebuild it with python office_index.py'
+
+
+def test_office_of_the_zip_code_is_fulfilled():
+    handler = load_handler().handler
+
+    response = handler(event('12345'))
+    assert response['sessionState']['dialogAction']['type'] == 'Close'
+    message = response['messages'][0]['content']
+    assert (
+        'The address is 123 Main St. The hours of operation are 9am - 5pm.' in message
+    )
+
+    # 12348 has no office, the nearest ones are offered
+    response = handler(event('12348'))
+    assert response['sessionState']['dialogAction']['type'] == 'Close'
+    message = response['messages'][0]['content']
+    assert message.startswith(
+        "Okay, there's no servicing office in the zip code 12348. The nearest one"
+        ' is about 14 miles away in Springfield, at 123 Main St.'
+    )
+    assert 'Another one is about 209 miles away in Shelbyville' in message
+
+    response = handler(event('99999'))
+    assert response['sessionState']['dialogAction']['slotToElicit'] == 'zipCode'
+    assert response['sessionState']['intent']['slots']['confirmZip'] is None
+    assert response['messages'][0]['content'].startswith('That is an invalid Zip Code.')
+
+
+def test_offices_too_far_away_are_not_offered(tmp_path, monkeypatch):
+    rows = [{**ROWS[2], 'latitude': '37.4083', 'longitude': '-102.6143'}]
+    # Anchorage, about 2700 miles from the only office
+    centroids = [{'zip_code': '99501', 'latitude': '61.2166', 'longitude': '-149.8767'}]
+    path = tmp_path / 'offices.idx'
+    path.write_bytes(build_index(rows, centroids))
+    module = load_handler()
+    monkeypatch.setattr(module, 'OFFICES', OfficeApi(None, OfficeIndex(str(path))))
+    assert module.OFFICES.has_centroid('99501')
+    assert module.OFFICES.nearest('99501')[0].miles > module.NEAREST_MAX_MILES
+
+    # A valid zip code, not an invalid one: the caller is transferred
+    response = module.handler(event('99501'))
+    assert response['sessionState']['dialogAction']['type'] == 'Close'
+    assert response['sessionState']['sessionAttributes'] == {
+        'action': 'TransferToAgent',
+        'reason': 'NoOfficeNearby',
+    }
+    assert response['messages'][0]['content'] == (
+        "Sorry, I couldn't find an office near the zip code 99501. Let me connect"
+        ' you to an agent.'
+    )
+
+    # Without a centroid it is still invalid
+    response = module.handler(event('99502'))
+    assert response['sessionState']['dialogAction']['slotToElicit'] == 'zipCode'
+    assert response['messages'][0]['content'].startswith('That is an invalid Zip Code.')
+
+
+def test_sample_office_data_is_a_synth_warning():
+    stack = Stack(App(context={'bundleLambdas': False}), 'Test')
+    OfficeLocatorBot(
+        stack,
+        'OfficeLocator',
+        prefix='test',
+        connect_instance_arn='arn:aws:connect:us-east-1:123456789012:instance/test',
+        city_hall_queue_arn='arn:aws:connect:us-east-1:123456789012:instance/test/queue/test',
+    )
+    Annotations.from_stack(stack).has_warning(
+        '/Test/OfficeLocator',
+        Match.string_like_regexp(r'offices\.idx is built from sample data \(7 zip'),
+    )
+
+
+def test_repeat_that_is_answered_from_the_cache():
+    module = load_handler()
+    offices = module.handler_instance.offices
+
+    first = module.handler(event('12348'))
+    attributes = first['sessionState']['sessionAttributes']
+    assert attributes == {'zipCode': '12348', 'needsCard': 'no'}
+    again = module.handler(event(None, 'DialogCodeHook', 'RepeatOffice', **attributes))
+    assert again['messages'] == first['messages']
+    assert (offices.stats['misses'], offices.stats['hits']) == (1, 1)
+
+    # Nothing to repeat yet
+    response = module.handler(event(None, 'DialogCodeHook', 'RepeatOffice'))
+    assert response['sessionState']['intent']['name'] == 'LocateOffice'
+    assert response['sessionState']['dialogAction']['slotToElicit'] == 'zipCode'
@@ -0,0 +1,217 @@
+import copy
+import importlib.util
+import os
+
+import pytest
+
+LAMBDAS_PATH = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    '..',
+    'infrastructure',
+    'bots_ssa',
+    'pamphlet_bot',
+    'lambdas',
+)
+
+
+def load_handler():
+    # Every bot has an `index` module, load this one under its own name
+    spec = importlib.util.spec_from_file_location(
+        'pamphlet_index', os.path.join(LAMBDAS_PATH, 'index.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+MODULE = load_handler()
+
+# The slots of the intents, see lex/pamphlet_bot.py
+SLOTS = {
+    'ProcessPamphletRequest': MODULE.PAMPHLETS
+    + [
+        'HearAllChoicesAgain',
+        'HearNextPamphletChoiceConfirmation',
+        'Finished',
+        'StreetName',
+        'City',
+        'State',
+        'ZipCode',
+        'AddressConfirmation',
+    ],
+    'Repeat': [],
+    'ReturnToMenu': ['ConfirmationMainMenu'],
+}
+
+
+class Session:
+    """
+    Plays the part of Lex: an answer fills the elicited slot, an intent name
+    starts that intent, every slot of the intent is sent (None when empty)
+    """
+
+    def __init__(self):
+        self.attributes = {}
+        self.intent = None
+        self.action = {}
+
+    def say(self, answer, intent=None):
+        if intent or self.intent is None:
+            self.intent = {'name': intent, 'slots': {}, 'state': 'InProgress'}
+        elif self.action.get('type') == 'ElicitSlot':
+            self.intent['slots'][self.action['slotToElicit']] = {
+                'value': {'originalValue': answer, 'interpretedValue': answer}
+            }
+        response = self.invoke('DialogCodeHook')
+        if self.action.get('type') == 'Delegate':
+            response = self.invoke('FulfillmentCodeHook')
+        if self.action.get('type') == 'Close':
+            self.intent = None
+        session_state = response['sessionState']
+        return (
+            ' '.join(message['content'] for message in response.get('messages', [])),
+            session_state['intent'].get('name'),
+            self.action.get('slotToElicit') or self.action.get('type'),
+        )
+
+    def invoke(self, source):
+        intent = copy.deepcopy(self.intent)
+        intent['slots'] = {
+            **dict.fromkeys(SLOTS[intent['name']]),
+            **(intent.get('slots') or {}),
+        }
+        response = MODULE.handler(
+            {
+                'invocationSource': source,
+                'bot': {'localeId': 'en_US'},
+                'sessionState': {
+                    'sessionAttributes': dict(self.attributes),
+                    'intent': intent,
+                },
+            }
+        )
+        session_state = response['sessionState']
+        self.attributes = dict(session_state['sessionAttributes'])
+        self.intent = copy.deepcopy(session_state['intent'])
+        self.intent.setdefault('slots', intent['slots'])
+        self.action = session_state['dialogAction']
+        return response
+
+
+OFFER_FIRST = 'Would you like to hear the pamphlet on Understanding Social Security?'
+MORE_CHOICES = 'Before I get your mailing address, would you like to hear more choices?'
+
+
+@pytest.fixture(autouse=True)
+def api_succeeds(monkeypatch):
+    # The mock order API fails one time in ten
+    monkeypatch.setattr(MODULE.random, 'random', lambda: 0.5)
+
+
+def test_pamphlets_are_ordered_to_the_confirmed_address():
+    session = Session()
+    assert session.say('pamphlet', 'ProcessPamphletRequest') == (
+        OFFER_FIRST,
+        'ProcessPamphletRequest',
+        'UnderstandingSocialSecurity',
+    )
+    assert session.say('yes')[::2] == (
+        MORE_CHOICES,
+        'HearNextPamphletChoiceConfirmation',
+    )
+    assert session.say('yes')[::2] == (
+        'Do you want the pamphlet on RetirementBenefits?',
+        'RetirementBenefits',
+    )
+    assert session.say('sure')[::2] == (
+        MORE_CHOICES,
+        'HearNextPamphletChoiceConfirmation',
+    )
+    assert session.say('no')[::2] == (
+        "Thanks. Now let's get your address. What is your street name? (2)",
+        'StreetName',
+    )
+    assert session.say('123 Main St')[::2] == ('Thanks. What is your city?', 'City')
+    assert session.say('Springfield')[::2] == ('Thanks. What is your state?', 'State')
+    assert session.say('CO')[::2] == ('Thanks. What is your zip code?', 'ZipCode')
+    assert session.say('12345')[::2] == (
+        'Is this your address: 123 Main St, Springfield, CO, 12345?',
+        'AddressConfirmation',
+    )
+    assert session.say('yes') == (
+        (
+            "All set. I've put your order through, and you should receive the "
+            'pamphlets, Understanding Social Security and Retirement Benefits, in '
+            'the mail within two weeks.'
+        ),
+        'ProcessPamphletRequest',
+        'Close',
+    )
+
+
+def test_repeat_plays_the_last_prompt_again():
+    session = Session()
+    session.say('pamphlet', 'ProcessPamphletRequest')
+    assert session.say('repeat', 'Repeat') == (
+        f'Sure, let me repeat that: {OFFER_FIRST}',
+        'ProcessPamphletRequest',
+        'UnderstandingSocialSecurity',
+    )
+    session.say('yes')
+    assert session.say('repeat that', 'Repeat')[::2] == (
+        f'Sure, let me repeat that: {MORE_CHOICES}',
+        'HearNextPamphletChoiceConfirmation',
+    )
+    # Not "Sure, let me repeat that: Sure, let me repeat that: ..."
+    assert session.say('repeat', 'Repeat')[::2] == (
+        f'Sure, let me repeat that: {MORE_CHOICES}',
+        'HearNextPamphletChoiceConfirmation',
+    )
+    assert session.say('yes')[::2] == (
+        'Do you want the pamphlet on RetirementBenefits?',
+        'RetirementBenefits',
+    )
+
+
+def test_return_to_menu_asks_first():
+    session = Session()
+    session.say('pamphlet', 'ProcessPamphletRequest')
+    session.say('yes')
+    assert session.say('main menu', 'ReturnToMenu') == (
+        'Are you sure you want to return to the main menu?',
+        'ReturnToMenu',
+        'ConfirmationMainMenu',
+    )
+    # No: back to the question of the pamphlet request
+    assert session.say('no') == (
+        MORE_CHOICES,
+        'ProcessPamphletRequest',
+        'HearNextPamphletChoiceConfirmation',
+    )
+    assert session.say('yes')[::2] == (
+        'Do you want the pamphlet on RetirementBenefits?',
+        'RetirementBenefits',
+    )
+
+    session.say('main menu', 'ReturnToMenu')
+    assert session.say('yes') == (
+        'Returning to the main menu.',
+        'ReturnToMenu',
+        'Close',
+    )
+
+
+def test_no_pamphlet_is_ordered_without_a_yes():
+    session = Session()
+    session.say('pamphlet', 'ProcessPamphletRequest')
+    # The first pamphlet is offered again until one is selected
+    for _ in range(len(MODULE.PAMPHLETS) + 1):
+        assert session.say('no') == (
+            'Do you want the pamphlet on UnderstandingSocialSecurity?',
+            'ProcessPamphletRequest',
+            'UnderstandingSocialSecurity',
+        )
+    assert (
+        MODULE.SESSION.decode(session.attributes['pamphlet'])['selectedPamphlets'] == []
+    )
@@ -0,0 +1,50 @@
+import pytest
+from lex_runtime.prompts import PromptCatalog
+
+CATALOG = PromptCatalog(
+    {
+        'en_US': {
+            'P1': 'Your office is open {hours}.',
+            'P2': 'Call {phone!s} or visit {site:>5}.',
+            'P3': 'Goodbye.',
+        },
+        'es_US': {
+            'P1': 'Su oficina abre {hours}.',
+            'P2': 'Llame al {phone!s} o visite {site:>5}.',
+            'P3': 'Adiós.',
+        },
+    }
+)
+
+
+def test_combined_prompts_are_joined_per_locale():
+    prompt = CATALOG.prompt('P1 + P3', hours='9am - 5pm')
+    assert prompt.fields == frozenset()
+    assert prompt.render('en_US') == 'Your office is open 9am - 5pm. Goodbye.'
+    assert prompt.render('es_US') == 'Su oficina abre 9am - 5pm. Adiós.'
+    assert prompt.render() == prompt.render('fr_CA') == prompt.render('en_US')
+
+
+def test_unbound_fields_are_rendered_per_call():
+    prompt = CATALOG.prompt('P2', site='ssa')
+    assert prompt.fields == frozenset(['phone'])
+    assert prompt.render('en_US', phone=8675309) == 'Call 8675309 or visit   ssa.'
+    assert CATALOG.render('P2', 'es_US', phone='911', site='x') == (
+        'Llame al 911 o visite     x.'
+    )
+    with pytest.raises(KeyError):
+        prompt.render('en_US')
+
+
+def test_prompts_are_compiled_once():
+    assert CATALOG.prompt('P3') is CATALOG.prompt('P3')
+
+
+def test_prompts_missing_from_a_locale_fail_to_compile():
+    catalog = PromptCatalog(
+        {'en_US': {'P1': 'Hi', 'P2': 'Bye'}, 'es_US': {'P1': 'Hola'}}
+    )
+    with pytest.raises(
+        ValueError, match="Unknown prompt P2 in 'P1 \\+ P2' for locale es_US"
+    ):
+        catalog.prompt('P1 + P2')
@@ -0,0 +1,67 @@
+import json
+import os
+
+from tests.harness import replay
+
+MEDICARE_ENROLLMENT = os.path.join(
+    replay.BOTS_DIR, 'medicare_enrollment_bot', 'lambdas'
+)
+
+HEADER = (
+    'test_case,step,utterance,session_attributes,expected_reponse,'
+    'expected_intent,expected_state,bot_id,alias_id,locale_id,notes\n'
+)
+
+
+def test_recorded_scripts_pass():
+    paths = replay.find_scripts()
+    assert any('office-locator' in path for path in paths)
+    results = [
+        replay.replay(script) for path in paths for script in replay.load_scripts(path)
+    ]
+    assert results
+    assert all(result.passed for result in results), replay.summary(results)
+    assert all(result.peak_memory for result in results)
+
+
+def test_slots_and_session_attributes_are_carried_forward(tmp_path):
+    script = tmp_path / 'test-case.csv'
+    rows = [
+        (
+            'enrolled,1,medicare,,"Ok, Medicare. One moment. Are you enrolled in '
+            'Medicare?",MedicareEnrollment,InProgress,,,en_US,'
+        ),
+        # Not a no: asked again
+        (
+            'enrolled,2,nobody,,"Let\'s try again. Medicare. Are you enrolled in '
+            'Medicare?",MedicareEnrollment,InProgress,,,en_US,'
+        ),
+        'enrolled,3,yes,,"Do you want a new medicare card?",,,,,en_US,',
+        'spanish,1,medicare,,,MedicareEnrollment,InProgress,,,es_US,',
+        'spanish,2,sí,,"the wrong answer",MedicareEnrollment,,,,es_US,',
+        'spanish,3,no,,,MedicareEnrollment,InProgress,,,es_US,',
+    ]
+    script.write_text(HEADER + '\n'.join(rows) + '\n')
+    scripts = replay.load_scripts(str(script), MEDICARE_ENROLLMENT)
+    assert [script.name for script in scripts] == ['enrolled', 'spanish']
+
+    enrolled, spanish = (replay.replay(script, memory=False) for script in scripts)
+    assert enrolled.passed, replay.summary([enrolled])
+    assert enrolled.peak_memory is None
+    assert [turn.passed for turn in spanish.turns] == [True, False, True]
+    assert spanish.turns[1].error.startswith("Expected response = 'the wrong answer'")
+
+    report = replay.to_json([enrolled, spanish])
+    assert json.loads(json.dumps(report))['testCases'][1]['passed'] is False
+    assert replay.main([str(script), '--lambdas', MEDICARE_ENROLLMENT]) == 1
+
+
+def test_handler_errors_fail_the_turn(tmp_path, monkeypatch):
+    script = tmp_path / 'test-case.csv'
+    script.write_text(HEADER + 'broken,1,medicare,,,,,,,en_US,\n')
+    (scripted,) = replay.load_scripts(str(script), MEDICARE_ENROLLMENT)
+    monkeypatch.setitem(
+        replay._HANDLERS, os.path.abspath(MEDICARE_ENROLLMENT), lambda event, _: None
+    )
+    (turn,) = replay.replay(scripted).turns
+    assert 'returned None' in turn.error
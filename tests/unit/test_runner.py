@@ -0,0 +1,67 @@
+import os
+
+from tests.harness import replay, runner
+
+MEDICARE_ENROLLMENT = os.path.join(
+    replay.BOTS_DIR, 'medicare_enrollment_bot', 'lambdas'
+)
+
+
+def test_shards_group_the_test_cases_by_handler():
+    jobs = [('a.csv', 'office', '1'), ('b.csv', 'medicare', '1')] * 2
+    assert runner.shard(jobs, 2) == [
+        [('b.csv', 'medicare', '1'), ('b.csv', 'medicare', '1')],
+        [('a.csv', 'office', '1'), ('a.csv', 'office', '1')],
+    ]
+    assert len(runner.shard(jobs, 8)) == 4
+
+
+def test_test_cases_run_in_worker_processes(tmp_path):
+    script = tmp_path / 'test-case.csv'
+    script.write_text(
+        'test_case,step,utterance,session_attributes,expected_reponse,'
+        'expected_intent,expected_state\n'
+        + ''.join(
+            f'case_{i},1,medicare,,,MedicareEnrollment,InProgress\n'
+            f'case_{i},2,{answer},,"{response}",MedicareEnrollment,\n'
+            for i, (answer, response) in enumerate(
+                [
+                    ('yes', 'Do you want a new medicare card?'),
+                    ('no', 'Do you want a new medicare card?'),
+                    ('yes', 'Do you want a new medicare card?'),
+                ]
+            )
+        )
+    )
+    jobs = runner.collect_jobs(replay.find_scripts()) + runner.collect_jobs(
+        [str(script)], MEDICARE_ENROLLMENT
+    )
+    results = runner.run(jobs, workers=2, memory=False)
+    assert [result.name for result in results] == [job[2] for job in jobs]
+    assert [result.passed for result in results] == [True, True, False, True]
+
+    junit = runner.to_junit(results).getroot()
+    assert (junit.get('tests'), junit.get('failures')) == ('11', '1')
+    (failure,) = junit.iter('failure')
+    assert failure.get('message').startswith("Expected response = 'Do you want")
+
+
+def test_changed_handlers_and_scripts_select_their_test_cases():
+    office = ('office.csv', '/bots/office/lambdas', 'main_route_1')
+    medicare = ('medicare.csv', '/bots/medicare/lambdas', 'enrolled')
+    before = {
+        'office.csv': (1, 1),
+        'medicare.csv': (1, 1),
+        '/bots/office/lambdas/index.py': (1, 1),
+    }
+    assert runner.changed_jobs([office, medicare], before, dict(before)) == []
+    assert runner.changed_jobs(
+        [office, medicare], before, {**before, '/bots/office/lambdas/index.py': (2, 1)}
+    ) == [office]
+    assert runner.changed_jobs(
+        [office, medicare], before, {**before, 'medicare.csv': (2, 3)}
+    ) == [medicare]
+    layer = os.path.join(replay.LAYER_DIR, 'lex_runtime', 'fsm.py')
+    assert runner.changed_jobs(
+        [office, medicare], before, {**before, layer: (1, 1)}
+    ) == [office, medicare]
@@ -0,0 +1,73 @@
+import pytest
+from lex_runtime.session import Bits, Enum, Int, SessionCodec, Text
+
+FIELDS = [
+    Enum('phase', ['selection', 'address']),
+    Int('index'),
+    Bits('selected', ['a', 'b', 'c']),
+    Text('address'),
+]
+CODEC = SessionCodec('s', FIELDS)
+
+
+def test_values_round_trip():
+    values = {
+        'phase': 'address',
+        'index': 300,
+        'selected': ['a', 'c'],
+        'address': '1 Calle Ñ, Springfield',
+    }
+    encoded = CODEC.encode(values)
+    assert CODEC.decode(encoded) == values
+    assert CODEC.decode(CODEC.encode({'index': 0, 'selected': []})) == {
+        'index': 0,
+        'selected': [],
+    }
+
+
+def test_unset_fields_at_the_end_are_dropped():
+    assert len(CODEC.encode({'phase': 'selection'})) == 3
+    # Fields appended to the declaration decode as unset from older states
+    codec = SessionCodec('s', FIELDS + [Int('added')])
+    assert codec.decode(CODEC.encode({'index': 2})) == {'index': 2}
+
+
+@pytest.mark.parametrize(
+    'values, error',
+    [
+        ({'phase': 'done'}, 'Unknown phase'),
+        ({'selected': ['d']}, 'Unknown selected'),
+        ({'index': -1}, 'must not be negative'),
+        ({'other': 1}, 'Unknown session fields other'),
+    ],
+)
+def test_values_that_cant_be_encoded(values, error):
+    with pytest.raises(ValueError, match=error):
+        CODEC.encode(values)
+
+
+def test_other_versions_and_garbage_start_empty():
+    encoded = SessionCodec('s', FIELDS, version=2).encode({'index': 1})
+    assert CODEC.decode(encoded) == {}
+    assert CODEC.decode('AQ9') == {}
+    assert CODEC.decode(None) == {}
+
+
+def test_state_is_decoded_lazily_and_saved_when_changed():
+    session_attributes = {'s': CODEC.encode({'index': 1}), 'other': 'x'}
+    state = CODEC.state(session_attributes)
+    assert state._values is None
+    state.save(session_attributes)
+    assert state._values is None
+
+    state['selected'] = state.get('selected', []) + ['b']
+    assert 'selected' in state and 'phase' not in state
+    state.save(session_attributes)
+    assert CODEC.decode(session_attributes['s']) == {'index': 1, 'selected': ['b']}
+
+    with pytest.raises(KeyError):
+        state['unknown'] = 1
+
+    state.clear()
+    state.save(session_attributes)
+    assert session_attributes == {'other': 'x'}
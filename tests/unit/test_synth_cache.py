@@ -0,0 +1,59 @@
+from infrastructure.constructs import synth_cache
+from infrastructure.constructs.simple_bot import SimpleIntent, SimpleSlot
+from infrastructure.constructs.synth_cache import SynthCache
+
+
+def make_intent(utterance: str = 'My account is {accountId}') -> SimpleIntent:
+    return SimpleIntent(
+        name='AccountNumber',
+        utterances=[utterance, 'Hello'],
+        slots=[
+            SimpleSlot(
+                name='accountId',
+                slot_type_name='AMAZON.AlphaNumeric',
+                elicitation_messages=['What is your Account Number?'],
+                required=True,
+            )
+        ],
+        confirmation_prompt='Is that right?',
+    )
+
+
+def build(cache: SynthCache, intent: SimpleIntent):
+    return cache.get_or_build(
+        'intent',
+        intent,
+        (False, True),
+        lambda: intent.to_cdk_intent(False, True, cache),
+    )
+
+
+def test_unchanged_intent_is_served_from_disk(tmp_path):
+    path = str(tmp_path / 'cache.json')
+
+    cold = SynthCache(path)
+    tree = build(cold, make_intent())
+    cold.save()
+    assert (cold.hits, cold.misses) == (0, 2)  # intent and slot
+    assert tree['sampleUtterances'][1] == {'utterance': 'Hello'}
+    assert tree['slots'][0]['valueElicitationSetting']['slotConstraint'] == 'Required'
+
+    warm = SynthCache(path)
+    assert build(warm, make_intent()) == tree
+    assert (warm.hits, warm.misses) == (1, 0)
+
+    build(warm, make_intent('It is {accountId}'))
+    assert warm.misses == 1  # the slot is still a hit
+    assert warm.hits == 2
+
+
+def test_another_cdk_version_misses(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.json')
+    cold = SynthCache(path)
+    build(cold, make_intent())
+    cold.save()
+
+    monkeypatch.setattr(synth_cache, 'CDK_VERSION', '2.999.0')
+    upgraded = SynthCache(path)
+    build(upgraded, make_intent())
+    assert (upgraded.hits, upgraded.misses) == (0, 2)
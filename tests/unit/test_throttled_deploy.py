@@ -0,0 +1,86 @@
+import pytest
+from aws_cdk import App, Stack
+from constructs import Construct
+
+from infrastructure.constructs import throttled_deploy as td
+from infrastructure.constructs.simple_bot import (
+    SimpleBot,
+    SimpleBotProps,
+    SimpleIntent,
+    SimpleLocale,
+    SimpleSlot,
+)
+
+
+def make_bot(scope: Construct, id: str, locales: int, intents: int) -> SimpleBot:
+    slot = SimpleSlot(
+        name='accountId',
+        slot_type_name='AMAZON.AlphaNumeric',
+        elicitation_messages=['What is your Account Number?'],
+    )
+    return SimpleBot(
+        scope,
+        id,
+        props=SimpleBotProps(
+            name=id,
+            locales=[
+                SimpleLocale(
+                    locale_id=f'en_US{locale}',
+                    voice_id='Joanna',
+                    intents=[
+                        SimpleIntent(name=f'Intent{i}', utterances=['hi'], slots=[slot])
+                        for i in range(intents)
+                    ],
+                )
+                for locale in range(locales)
+            ],
+        ),
+    )
+
+
+def test_cost_counts_locales_intents_and_slots():
+    stack = Stack(App(context={'synthCache': False}), 'Test')
+    bot = make_bot(stack, 'Bot', locales=2, intents=3)
+    assert td.estimate_cost(bot) == td.BOT_COST + 2 * (
+        td.LOCALE_COST + 3 * (td.INTENT_COST + td.SLOT_COST)
+    )
+    assert td.estimate_cost(Construct(stack, 'Empty')) == 1
+
+
+def test_lanes_are_balanced_longest_first(monkeypatch):
+    stack = Stack(App(), 'Test')
+    costs = {'A': 8, 'B': 7, 'C': 6, 'D': 5, 'E': 4, 'F': 2}
+    constructs = [Construct(stack, id) for id in costs]
+    monkeypatch.setattr(td, 'estimate_cost', lambda c: costs[c.node.id])
+
+    lanes = td.throttled_deploy(constructs, parallelism=2)
+
+    assert [[c.node.id for c in lane.constructs] for lane in lanes] == [
+        ['A', 'D', 'E'],
+        ['B', 'C', 'F'],
+    ]
+    assert [lane.cost for lane in lanes] == [17, 15]
+    # Chained constructs of the same lane
+    assert constructs[3].node.dependencies == [constructs[0]]
+    assert constructs[5].node.dependencies == [constructs[2]]
+
+
+@pytest.mark.parametrize('parallelism', [0, -1, 'Auto', '4', 2.0, True])
+def test_invalid_parallelism_is_rejected(parallelism):
+    constructs = [Construct(Stack(App(), 'Test'), 'A')]
+    with pytest.raises(ValueError, match="positive int or 'auto'"):
+        td.throttled_deploy(constructs, parallelism=parallelism)
+
+
+@pytest.mark.parametrize(
+    'context, parallelism',
+    [
+        ({}, 2),
+        ({'deployParallelism': '3'}, 3),
+        ({'deployParallelism': 1}, 1),
+        ({'deployParallelism': 'auto'}, 'auto'),
+    ],
+)
+def test_parallelism_comes_from_the_context(context, parallelism):
+    stack = Stack(App(context=context), 'Test')
+    assert td.context_parallelism(stack) == parallelism
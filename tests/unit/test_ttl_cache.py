@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+
+import pytest
+from lex_runtime.cache import TtlCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = TtlCache('test', maxsize=2)
+    loads = []
+
+    def load(key):
+        return lambda: loads.append(key) or key.upper()
+
+    assert cache.get('a', load('a')) == 'A'
+    assert cache.get('b', load('b')) == 'B'
+    assert cache.get('a', load('a')) == 'A'
+    assert cache.get('c', load('c')) == 'C'
+    assert cache.get('a', load('a')) == 'A'
+    assert cache.get('b', load('b')) == 'B'
+    assert loads == ['a', 'b', 'c', 'b']
+    assert cache.stats == {
+        'hits': 2,
+        'misses': 4,
+        'coalesced': 0,
+        'evictions': 2,
+        'expirations': 0,
+    }
+
+
+def test_negative_entries_expire_first():
+    clock = Clock()
+    cache = TtlCache('test', ttl=300, negative_ttl=30, clock=clock)
+    cache.get('found', lambda: 'office')
+    cache.get('missing', lambda: None)
+
+    clock.now = 29
+    assert cache.get('missing', lambda: 'late') is None
+    clock.now = 30
+    assert cache.get('missing', lambda: 'late') == 'late'
+    assert cache.get('found', lambda: 'other') == 'office'
+    clock.now = 300
+    assert cache.get('found', lambda: 'other') == 'other'
+    assert cache.stats['expirations'] == 2
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = TtlCache('test')
+    release = threading.Event()
+    loads = []
+
+    def load():
+        loads.append(1)
+        release.wait(5)
+        return 'office'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get('12345', load)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats['misses'] + cache.stats['coalesced'] < 5:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['office'] * 5
+    assert len(loads) == 1
+    assert (cache.stats['misses'], cache.stats['coalesced']) == (1, 4)
+
+
+def test_errors_are_raised_to_the_coalesced_misses_and_not_cached():
+    cache = TtlCache('test')
+    loading = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        loading.set()
+        release.wait(5)
+        raise ConnectionError('down')
+
+    errors = []
+
+    def get():
+        try:
+            cache.get('12345', fail)
+        except ConnectionError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=get)
+    first.start()
+    loading.wait(5)
+    second = threading.Thread(target=get)
+    second.start()
+    while cache.stats['coalesced'] < 1:
+        time.sleep(0.001)
+    release.set()
+    first.join()
+    second.join()
+
+    assert len(errors) == 2
+    assert cache.get('12345', lambda: 'office') == 'office'
+
+
+def test_stats_are_logged_and_reset(caplog):
+    cache = TtlCache('offices')
+    cache.get('a', lambda: 1)
+    cache.get('a', lambda: 1)
+    with caplog.at_level(logging.INFO, logger='lex_runtime.cache.stats'):
+        cache.flush_stats()
+    (record,) = [r for r in caplog.records if r.name == 'lex_runtime.cache.stats']
+    assert record.cache == 'offices'
+    assert record.cacheStats == {
+        'hits': 1,
+        'misses': 1,
+        'coalesced': 0,
+        'evictions': 0,
+        'expirations': 0,
+        'size': 1,
+    }
+    assert cache.stats['hits'] == 0
+
+
+@pytest.mark.parametrize('key', [None, 'a'])
+def test_entries_can_be_invalidated(key):
+    cache = TtlCache('test')
+    cache.get('a', lambda: 1)
+    cache.invalidate(key)
+    assert len(cache) == 0